@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Agendador de alertas automáticos do OKR Backend (processo separado da API)
+Uso: python alert_scheduler.py [--once] [--interval SEGUNDOS] [--workers N]
+                               [--shard-index I --shard-count N]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.core.config import SUPABASE_URL  # noqa: E402,F401 - carrega o .env
+from app.core.settings import settings  # noqa: E402
+from app.services.alert_scheduler import AlertScheduler  # noqa: E402
+from app.utils.supabase import get_admin_client  # noqa: E402
+
+
+def main():
+    """Função principal do agendador"""
+    parser = argparse.ArgumentParser(description='Agendador multi-empresa de alertas automáticos')
+    parser.add_argument('--once', action='store_true', help='Executar uma única rodada e sair')
+    parser.add_argument('--interval', type=int, default=settings.ALERT_SCHEDULER_INTERVAL, help='Segundos entre rodadas')
+    parser.add_argument('--workers', type=int, default=settings.ALERT_SCHEDULER_MAX_WORKERS, help='Empresas processadas em paralelo')
+    parser.add_argument('--tenant-timeout', type=int, default=settings.ALERT_SCHEDULER_TENANT_TIMEOUT, help='Timeout por empresa (segundos)')
+    parser.add_argument('--shard-index', type=int, default=0, help='Índice do shard desta instância (padrão: 0)')
+    parser.add_argument('--shard-count', type=int, default=1, help='Total de shards (padrão: 1)')
+
+    args = parser.parse_args()
+
+    scheduler = AlertScheduler(
+        get_admin_client(),
+        max_workers=args.workers,
+        tenant_timeout=args.tenant_timeout,
+        shard_index=args.shard_index,
+        shard_count=args.shard_count,
+    )
+
+    print("🔔 Agendador de alertas iniciando...")
+    print(f"   🧩 Shard: {args.shard_index + 1}/{args.shard_count}")
+    print(f"   👥 Workers: {args.workers}")
+    print(f"   ⏱️  Timeout por empresa: {args.tenant_timeout}s")
+    print(f"   🔄 Intervalo: {'rodada única' if args.once else f'{args.interval}s'}")
+
+    try:
+        if args.once:
+            metrics = asyncio.run(scheduler.run_once())
+            scheduler.release_lock()
+            sys.exit(0 if metrics is None or not metrics.tenants_failed else 1)
+        asyncio.run(scheduler.run_forever(args.interval))
+    except KeyboardInterrupt:
+        print("\n🛑 Agendador interrompido pelo usuário.")
+        scheduler.release_lock()
+
+
+if __name__ == "__main__":
+    main()
@@ -58,6 +58,113 @@ class Settings:
     
     # 💳 Configurações de pagamento
     ASAAS_API_KEY: str = os.getenv("ASAAS_API_KEY", "")
+    ASAAS_API_URL: str = os.getenv("ASAAS_API_URL", "https://api-sandbox.asaas.com/v3")
+    ASAAS_CONNECT_TIMEOUT: float = float(os.getenv("ASAAS_CONNECT_TIMEOUT", "3"))
+    ASAAS_READ_TIMEOUT: float = float(os.getenv("ASAAS_READ_TIMEOUT", "10"))
+    ASAAS_MAX_RETRIES: int = int(os.getenv("ASAAS_MAX_RETRIES", "2"))
+    ASAAS_RETRY_BASE_DELAY: float = float(os.getenv("ASAAS_RETRY_BASE_DELAY", "0.3"))
+    ASAAS_MAX_CONCURRENCY: int = int(os.getenv("ASAAS_MAX_CONCURRENCY", "10"))  # bulkhead por worker
+    ASAAS_BULKHEAD_TIMEOUT: float = float(os.getenv("ASAAS_BULKHEAD_TIMEOUT", "2"))
+    ASAAS_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("ASAAS_BREAKER_FAILURE_THRESHOLD", "5"))
+    ASAAS_BREAKER_BASE_BACKOFF: float = float(os.getenv("ASAAS_BREAKER_BASE_BACKOFF", "5"))
+    ASAAS_BREAKER_MAX_BACKOFF: float = float(os.getenv("ASAAS_BREAKER_MAX_BACKOFF", "120"))
+    ASAAS_WEBHOOK_TOKEN: str = os.getenv("ASAAS_WEBHOOK_TOKEN", "")  # header asaas-access-token
+    SUBSCRIPTION_CACHE_TTL: int = int(os.getenv("SUBSCRIPTION_CACHE_TTL", "60"))
+    SUBSCRIPTION_RECONCILE_INTERVAL: int = int(os.getenv("SUBSCRIPTION_RECONCILE_INTERVAL", "21600"))  # 6 horas
+    SUBSCRIPTION_RECONCILE_LOCK_TTL: int = int(os.getenv("SUBSCRIPTION_RECONCILE_LOCK_TTL", "300"))
+    SUBSCRIPTION_WEBHOOK_RETRY_WINDOW: int = int(os.getenv("SUBSCRIPTION_WEBHOOK_RETRY_WINDOW", "3600"))  # reenvio de eventos sem linha local
+    
+    # 🔔 Agendador de alertas automáticos (alert_scheduler.py)
+    ALERT_SCHEDULER_INTERVAL: int = int(os.getenv("ALERT_SCHEDULER_INTERVAL", "900"))  # 15 minutos
+    ALERT_SCHEDULER_MAX_WORKERS: int = int(os.getenv("ALERT_SCHEDULER_MAX_WORKERS", "4"))
+    ALERT_SCHEDULER_TENANT_TIMEOUT: int = int(os.getenv("ALERT_SCHEDULER_TENANT_TIMEOUT", "120"))
+    ALERT_SCHEDULER_FULL_REFRESH_INTERVAL: int = int(os.getenv("ALERT_SCHEDULER_FULL_REFRESH_INTERVAL", str(24 * 3600)))
+    ALERT_SCHEDULER_CHANGE_SCAN_WINDOW: int = int(os.getenv("ALERT_SCHEDULER_CHANGE_SCAN_WINDOW", "3600"))  # 1 hora, maior que o intervalo
+    ALERT_SCHEDULER_LOCK_TTL: int = int(os.getenv("ALERT_SCHEDULER_LOCK_TTL", "300"))
+    
+    # 🩺 Prober de conectividade Supabase + circuit breaker (um por worker)
+    SUPABASE_PROBE_INTERVAL: int = int(os.getenv("SUPABASE_PROBE_INTERVAL", "15"))
+    SUPABASE_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("SUPABASE_BREAKER_FAILURE_THRESHOLD", "3"))
+    SUPABASE_BREAKER_BASE_BACKOFF: float = float(os.getenv("SUPABASE_BREAKER_BASE_BACKOFF", "2"))
+    SUPABASE_BREAKER_MAX_BACKOFF: float = float(os.getenv("SUPABASE_BREAKER_MAX_BACKOFF", "60"))
+    
+    # 🔑 Gateway do Supabase Auth (pool HTTP compartilhado)
+    AUTH_GATEWAY_TIMEOUT: float = float(os.getenv("AUTH_GATEWAY_TIMEOUT", "10"))
+    AUTH_GATEWAY_MAX_CONNECTIONS: int = int(os.getenv("AUTH_GATEWAY_MAX_CONNECTIONS", "100"))
+    
+    # 🔑 Sessões: cache de validação e gravação em lote de last_used_at
+    SESSION_CACHE_TTL: int = int(os.getenv("SESSION_CACHE_TTL", "60"))
+    SESSION_NEGATIVE_CACHE_TTL: int = int(os.getenv("SESSION_NEGATIVE_CACHE_TTL", "10"))
+    SESSION_ACTIVITY_FLUSH_INTERVAL: int = int(os.getenv("SESSION_ACTIVITY_FLUSH_INTERVAL", "30"))
+    SESSION_ACTIVITY_MAX_PENDING: int = int(os.getenv("SESSION_ACTIVITY_MAX_PENDING", "500"))
+    
+    # 🔒 Lista de revogação de tokens (Bloom filter em memória)
+    REVOCATION_FILTER_CAPACITY: int = int(os.getenv("REVOCATION_FILTER_CAPACITY", "100000"))
+    REVOCATION_FILTER_FP_RATE: float = float(os.getenv("REVOCATION_FILTER_FP_RATE", "0.001"))
+    REVOCATION_POLL_INTERVAL: int = int(os.getenv("REVOCATION_POLL_INTERVAL", "15"))
+    REVOCATION_REBUILD_INTERVAL: int = int(os.getenv("REVOCATION_REBUILD_INTERVAL", "3600"))
+    
+    # 🧹 Manutenção em lotes (maintenance.py)
+    MAINTENANCE_INTERVAL: int = int(os.getenv("MAINTENANCE_INTERVAL", "3600"))
+    MAINTENANCE_CHUNK_SIZE: int = int(os.getenv("MAINTENANCE_CHUNK_SIZE", "1000"))
+    MAINTENANCE_ROWS_PER_SECOND: int = int(os.getenv("MAINTENANCE_ROWS_PER_SECOND", "5000"))
+    MAINTENANCE_MAX_ROWS_PER_REQUEST: int = int(os.getenv("MAINTENANCE_MAX_ROWS_PER_REQUEST", "10000"))
+    SESSION_RETENTION_DAYS: int = int(os.getenv("SESSION_RETENTION_DAYS", "7"))
+    NOTIFICATION_RETENTION_DAYS: int = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+    
+    # 🔔 Cache em processo dos contadores de notificações (badge do sino)
+    NOTIFICATION_COUNTER_CACHE_TTL: int = int(os.getenv("NOTIFICATION_COUNTER_CACHE_TTL", "30"))
+    NOTIFICATION_COUNTER_SYNC_INTERVAL: int = int(os.getenv("NOTIFICATION_COUNTER_SYNC_INTERVAL", "5"))  # outros processos
+    
+    # 📅 Calendário de ciclos em memória (invalidado nas alterações de ciclos)
+    CYCLE_CALENDAR_TTL: int = int(os.getenv("CYCLE_CALENDAR_TTL", "300"))
+    CYCLE_CALENDAR_VERSION_CHECK: int = int(os.getenv("CYCLE_CALENDAR_VERSION_CHECK", "5"))  # outros workers
+    GLOBAL_CYCLE_REFRESH_INTERVAL: int = int(os.getenv("GLOBAL_CYCLE_REFRESH_INTERVAL", "86400"))  # 1 dia
+    CYCLE_PREFERENCE_CACHE_TTL: int = int(os.getenv("CYCLE_PREFERENCE_CACHE_TTL", "5"))  # curto: o PUT só atualiza o worker que o recebe
+
+    # 📈 Série de evolução do dashboard (evolution_service.py)
+    EVOLUTION_REFRESH_INTERVAL: int = int(os.getenv("EVOLUTION_REFRESH_INTERVAL", "30"))  # agrupa check-ins em rajada
+
+    # 📄 PDF em partes paralelas (pdf_parallel.py)
+    REPORT_PDF_WORKERS: int = int(os.getenv("REPORT_PDF_WORKERS", str(os.cpu_count() or 1)))
+    REPORT_PDF_PARALLEL_THRESHOLD: int = int(os.getenv("REPORT_PDF_PARALLEL_THRESHOLD", "300"))  # objetivos + KRs
+    REPORT_PDF_OBJECTIVES_PER_CHUNK: int = int(os.getenv("REPORT_PDF_OBJECTIVES_PER_CHUNK", "50"))
+    REPORT_PDF_KEY_RESULTS_PER_CHUNK: int = int(os.getenv("REPORT_PDF_KEY_RESULTS_PER_CHUNK", "200"))
+    
+    # 📊 Gráficos vetoriais dos PDFs (pdf_charts.py)
+    REPORT_CHART_MAX_POINTS: int = int(os.getenv("REPORT_CHART_MAX_POINTS", "120"))  # LTTB acima disso
+    REPORT_CHART_MAX_BARS: int = int(os.getenv("REPORT_CHART_MAX_BARS", "25"))  # acima: histograma por faixa
+    REPORT_CHART_CACHE_SIZE: int = int(os.getenv("REPORT_CHART_CACHE_SIZE", "128"))
+    
+    # 🧱 Exportação colunar Parquet/Arrow (columnar_report.py)
+    REPORT_COLUMNAR_BATCH_ROWS: int = int(os.getenv("REPORT_COLUMNAR_BATCH_ROWS", "10000"))  # linhas por row group/lote
+    REPORT_PARQUET_COMPRESSION: str = os.getenv("REPORT_PARQUET_COMPRESSION", "zstd")  # zstd | snappy | none
+    REPORT_ARROW_COMPRESSION: str = os.getenv("REPORT_ARROW_COMPRESSION", "zstd")  # zstd | lz4 | vazio
+    
+    # 🧾 Exportação CSV (csv_report.py)
+    REPORT_CSV_GZIP_LEVEL: int = int(os.getenv("REPORT_CSV_GZIP_LEVEL", "6"))  # 1 (rápido) a 9 (menor)
+    
+    # 🗓️ Relatórios agendados (report_scheduler.py)
+    REPORT_SCHEDULER_INTERVAL: int = int(os.getenv("REPORT_SCHEDULER_INTERVAL", "60"))  # busca de agendamentos vencidos
+    REPORT_SCHEDULER_MAX_WORKERS: int = int(os.getenv("REPORT_SCHEDULER_MAX_WORKERS", "2"))
+    REPORT_SCHEDULER_TIMEOUT: int = int(os.getenv("REPORT_SCHEDULER_TIMEOUT", "900"))  # por relatório
+    REPORT_SCHEDULER_LOCK_TTL: int = int(os.getenv("REPORT_SCHEDULER_LOCK_TTL", "300"))
+    REPORT_SCHEDULER_BATCH_SIZE: int = int(os.getenv("REPORT_SCHEDULER_BATCH_SIZE", "50"))  # agendamentos por rodada
+    # Diretório compartilhado entre o agendador e a API (download do último arquivo)
+    REPORT_SCHEDULE_OUTPUT_DIR: str = os.getenv("REPORT_SCHEDULE_OUTPUT_DIR", os.path.join("/tmp", "okr_scheduled_reports"))
+    REPORT_SCHEDULE_TIMEZONE: str = os.getenv("REPORT_SCHEDULE_TIMEZONE", "America/Sao_Paulo")  # fuso das expressões cron
+    REPORT_SCHEDULE_SPREAD_MINUTES: int = int(os.getenv("REPORT_SCHEDULE_SPREAD_MINUTES", "60"))  # espalha o mesmo horário
+    REPORT_SCHEDULE_MAX_INCREMENTAL: int = int(os.getenv("REPORT_SCHEDULE_MAX_INCREMENTAL", "200"))  # acima: busca completa
+    REPORT_SCHEDULE_FULL_REFRESH_INTERVAL: int = int(os.getenv("REPORT_SCHEDULE_FULL_REFRESH_INTERVAL", str(30 * 24 * 3600)))
+
+    # 🗜️ Compressão das respostas (utils/compression.py, ligada por ENABLE_GZIP)
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1000"))  # bytes
+    COMPRESSION_ENCODINGS: str = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip")  # ordem de preferência do servidor
+    # Níveis por content type: "tipo:codificação=nível,...;..." ("text/*" vale para todo text/)
+    COMPRESSION_LEVELS: str = os.getenv("COMPRESSION_LEVELS", "application/json:zstd=3,br=4,gzip=6;text/*:zstd=6,br=5,gzip=6")
+    COMPRESSION_THREAD_THRESHOLD: int = int(os.getenv("COMPRESSION_THREAD_THRESHOLD", "65536"))  # acima: comprime em thread
+    COMPRESSION_CACHE_MAX_BYTES: int = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # por worker
+    COMPRESSION_CACHE_MAX_ENTRY: int = int(os.getenv("COMPRESSION_CACHE_MAX_ENTRY", str(1024 * 1024)))  # resposta comprimida
 
 # Instância global das configurações
 settings = Settings() 
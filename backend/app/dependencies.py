@@ -1,6 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from supabase import Client
+import asyncio
 import traceback
 import time
 from functools import lru_cache
@@ -8,6 +9,8 @@ import os
 
 from .utils.supabase import get_client, get_admin_client, get_connectivity_status, refresh_all_connections
 from .models.user import UserProfile
+from .services.token_service import TokenService
+from .services.revocation_service import revocation_service
 
 # Define o esquema OAuth2 para obter o token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -68,6 +71,17 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserProfile:
                 detail=error_detail
             )
         
+        # Verificar revogação: só tokens "talvez revogados" pelo filtro consultam o banco
+        token_hash = TokenService._hash_token(token)
+        if revocation_service.might_be_revoked(token_hash):
+            if await asyncio.to_thread(revocation_service.confirm_revoked, token_hash):
+                print(f"DEBUG: Token de sessão revogada rejeitado")
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Sua sessão foi encerrada. Faça login novamente.",
+                    headers={"WWW-Authenticate": "Bearer", "X-Refresh-Required": "true"},
+                )
+        
         # Obter o usuário usando o token JWT
         try:
             # Usar o token para autenticar e obter user info
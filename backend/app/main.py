@@ -1,6 +1,5 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi import HTTPException, status, Request, Response
 from fastapi.responses import JSONResponse
@@ -10,10 +9,38 @@ import asyncio
 import time
 from .routers import auth, users, subscriptions, companies, cycles, dashboard, objectives, key_results, reports, analytics, notifications, global_cycles
 from .core.settings import settings
+from .utils.json_response import FastJSONResponse, ORJSON_AVAILABLE
+from .utils.compression import CompressionMiddleware, parse_encodings
 
 # Task para renovação automática de conexões
 _refresh_task = None
 
+# Task de gravação em lote da atividade de sessões
+_session_activity_task = None
+
+# Task de atualização da lista de revogação de tokens
+_revocation_task = None
+
+# Task do prober de conectividade Supabase (circuit breaker)
+_health_prober_task = None
+
+# Task de reconciliação das assinaturas com o Asaas
+_subscription_reconcile_task = None
+
+# Task de recarga diária do registro de ciclos globais
+_global_cycle_task = None
+
+# Task de atualização das séries de evolução do dashboard
+_evolution_task = None
+
+# Prefixos de todos os roteadores que consultam o Supabase (ver include_router abaixo):
+# com o circuito aberto respondem 503 na hora em vez de esperar timeouts
+SUPABASE_ROUTE_PREFIXES = (
+    "/api/auth", "/api/users", "/api/companies", "/api/cycles", "/api/objectives",
+    "/api/dashboard", "/api/reports", "/api/analytics", "/api/notifications",
+    "/api/subscriptions", "/api/global-cycles",
+)
+
 # 🔧 Middleware personalizado para detectar e resolver problemas de JWT automaticamente
 class JWTHealthMiddleware:
     """Middleware que detecta problemas de JWT e renova conexões automaticamente"""
@@ -32,15 +59,24 @@ class JWTHealthMiddleware:
         
         # Detectar se é uma rota que usa Supabase
         path = request.url.path
-        uses_supabase = any(route in path for route in [
-            "/api/auth", "/api/users", "/api/companies", "/api/cycles", 
-            "/api/objectives", "/api/dashboard", "/api/reports"
-        ])
+        uses_supabase = path.startswith(SUPABASE_ROUTE_PREFIXES)
         
         if not uses_supabase:
             await self.app(scope, receive, send)
             return
         
+        # Circuito aberto (prober detectou indisponibilidade): responder 503 na hora
+        from .utils.supabase import supabase_breaker
+        if not supabase_breaker.is_closed():
+            retry_after = max(1, round(supabase_breaker.retry_in()))
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Serviço temporariamente indisponível. Tente novamente em instantes."},
+                headers={"Retry-After": str(retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        
         # Função para capturar respostas
         response_body = b""
         status_code = 200
@@ -90,7 +126,7 @@ class JWTHealthMiddleware:
             await self.app(scope, receive, send)
 
 async def refresh_connections_periodically():
-    """Task que roda em background para renovar conexões do Supabase periodicamente"""
+    """Task que roda em background para renovar os clientes Supabase periodicamente"""
     from .utils.supabase import refresh_all_connections, check_connection
     
     while True:
@@ -98,61 +134,74 @@ async def refresh_connections_periodically():
             # Aguardar 30 minutos em vez de 1 hora para evitar JWT expirado
             await asyncio.sleep(1800)  # 30 minutos
             
-            print("🔄 Verificando conexões Supabase...")
-            
-            # Verificar se a conexão está funcionando
-            if not check_connection():
-                print("⚠️  Conexão Supabase com problemas, renovando...")
-                refresh_all_connections()
-                
-                # Verificar novamente após renovação
-                if check_connection():
-                    print("✅ Conexões renovadas com sucesso")
-                else:
-                    print("❌ Falha na renovação - problemas persistem")
-            else:
+            # O estado vem do prober de conectividade (sem sondas extras aqui)
+            if check_connection():
                 print("✅ Conexões Supabase funcionando normalmente")
-                # Renovar proativamente mesmo quando funcionando (evitar JWT expirar)
-                refresh_all_connections()
-                print("🔄 Renovação proativa concluída")
+            else:
+                print("⚠️  Prober indica Supabase indisponível, renovando clientes mesmo assim...")
+            
+            # Renovar proativamente (evitar JWT expirar); recriar clientes não faz I/O
+            refresh_all_connections()
+            print("🔄 Renovação proativa concluída")
                 
         except asyncio.CancelledError:
             print("🛑 Task de renovação de conexões cancelada")
             break
         except Exception as e:
             print(f"❌ Erro na task de renovação: {e}")
-            # Tentar renovar mesmo com erro
-            try:
-                refresh_all_connections()
-                print("🔧 Renovação de emergência executada")
-            except Exception as e_emergency:
-                print(f"❌ Falha na renovação de emergência: {e_emergency}")
-            
-            # Aguardar menos tempo antes de tentar novamente
             await asyncio.sleep(300)  # Aguardar 5 minutos antes de tentar novamente
 
 # Lifecycle manager otimizado para startup/shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global _refresh_task
+    global _refresh_task, _session_activity_task, _revocation_task, _health_prober_task, _subscription_reconcile_task
+    global _global_cycle_task, _evolution_task
     
     # Startup
     print("🚀 Sistema OKR Backend iniciando...")
-    print(f"   🗜️  Compressão GZip: {'Ativada' if settings.ENABLE_GZIP else 'Desativada'}")
+    print(f"   🗜️  Compressão: {', '.join(parse_encodings(settings.COMPRESSION_ENCODINGS)) if settings.ENABLE_GZIP else 'Desativada'}")
     print(f"   💾 Cache TTL: {settings.CACHE_TTL}s")
+    print(f"   ⚡ Serialização JSON: {'orjson' if ORJSON_AVAILABLE else 'json (orjson não instalado)'}")
     print(f"   🔧 Configurações carregadas com sucesso")
     
-    # Verificar conexão inicial
-    from .utils.supabase import check_connection
-    if check_connection():
+    # Verificar conexão inicial (uma sonda) e iniciar o prober de conectividade
+    from .utils.supabase import probe_connection, run_health_prober
+    if await asyncio.to_thread(probe_connection):
         print("✅ Conexão inicial com Supabase: OK")
     else:
         print("⚠️  Conexão inicial com Supabase: FALHOU")
+    _health_prober_task = asyncio.create_task(run_health_prober())
+    
+    # Aquecimento: ciclos globais em memória antes da primeira requisição
+    from .utils.cycle_calendar import load_global_cycles, run_global_cycle_refresher
+    try:
+        cycles_loaded = await asyncio.to_thread(load_global_cycles)
+        print(f"📅 Ciclos globais carregados em memória: {cycles_loaded}")
+    except Exception as e:
+        print(f"⚠️  Ciclos globais não carregados no startup (carga na primeira requisição): {e}")
+    _global_cycle_task = asyncio.create_task(run_global_cycle_refresher())
     
     # Iniciar task de renovação automática de conexões
     print("🔄 Iniciando sistema de renovação automática de conexões...")
     _refresh_task = asyncio.create_task(refresh_connections_periodically())
     
+    # Iniciar gravação em lote de last_used_at das sessões
+    from .services.token_service import session_activity_buffer
+    _session_activity_task = asyncio.create_task(session_activity_buffer.run_periodically())
+    
+    # Carregar lista de revogação de tokens e manter atualizada por polling
+    from .services.revocation_service import revocation_service
+    _revocation_task = asyncio.create_task(revocation_service.run_periodically())
+    
+    # Reconciliação periódica das assinaturas com o Asaas (o webhook cobre o dia a dia)
+    if settings.ASAAS_API_KEY:
+        from .services.subscription_service import subscription_service
+        _subscription_reconcile_task = asyncio.create_task(subscription_service.run_periodically())
+    
+    # Séries de evolução do dashboard: atualização agrupada após check-ins
+    from .services.evolution_service import evolution_service
+    _evolution_task = asyncio.create_task(evolution_service.run_periodically())
+    
     yield
     
     # Shutdown
@@ -167,6 +216,63 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             pass
     
+    # Cancelar prober de conectividade
+    if _health_prober_task:
+        _health_prober_task.cancel()
+        try:
+            await _health_prober_task
+        except asyncio.CancelledError:
+            pass
+    
+    # Cancelar recarga dos ciclos globais
+    if _global_cycle_task:
+        _global_cycle_task.cancel()
+        try:
+            await _global_cycle_task
+        except asyncio.CancelledError:
+            pass
+    
+    # Cancelar task da lista de revogação
+    if _revocation_task:
+        _revocation_task.cancel()
+        try:
+            await _revocation_task
+        except asyncio.CancelledError:
+            pass
+    
+    # Cancelar reconciliação de assinaturas
+    if _subscription_reconcile_task:
+        _subscription_reconcile_task.cancel()
+        try:
+            await _subscription_reconcile_task
+        except asyncio.CancelledError:
+            pass
+    
+    # Cancelar task das séries de evolução (faz a última atualização)
+    if _evolution_task:
+        _evolution_task.cancel()
+        try:
+            await _evolution_task
+        except asyncio.CancelledError:
+            pass
+    
+    # Cancelar task de atividade de sessões (faz o último flush)
+    if _session_activity_task:
+        _session_activity_task.cancel()
+        try:
+            await _session_activity_task
+        except asyncio.CancelledError:
+            pass
+    
+    # Encerrar o pool de processos da renderização de PDFs em partes
+    from .services import pdf_parallel
+    await asyncio.to_thread(pdf_parallel.shutdown_executor)
+    
+    # Fechar pools HTTP (gateway de autenticação e Asaas)
+    from .utils import auth_gateway, asaas
+    await auth_gateway.close_http_client()
+    await asaas.close_http_client()
+    
     print("✅ Shutdown completo")
 
 # Configuração otimizada do FastAPI
@@ -175,6 +281,8 @@ app = FastAPI(
     version="1.0.0",
     description="Backend para sistema de gestão de OKRs com autenticação hierárquica",
     lifespan=lifespan,
+    # Respostas serializadas com orjson (ver utils/json_response.py)
+    default_response_class=FastJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     # Fix para redirecionamentos 307 - IMPORTANTE!
@@ -182,13 +290,14 @@ app = FastAPI(
     root_path=""  # Fix para proxy reverso
 )
 
-# Middleware de compressão GZip para melhorar performance
-if settings.ENABLE_GZIP:
-    app.add_middleware(GZipMiddleware, minimum_size=1000)
-
 # 🔧 Middleware personalizado para detectar problemas de JWT (DEVE ser adicionado ANTES dos outros)
 app.add_middleware(JWTHealthMiddleware)
 
+# Middleware de compressão (zstd/br/gzip) - adicionado depois do JWTHealth para envolvê-lo:
+# o JWTHealthMiddleware precisa ler o corpo das respostas ainda sem compressão
+if settings.ENABLE_GZIP:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
 # Middleware de hosts confiáveis (segurança) - ATUALIZADO
 app.add_middleware(
     TrustedHostMiddleware, 
@@ -247,6 +356,7 @@ async def root():
         "supabase_connection": supabase_status,
         "performance": {
             "gzip_enabled": settings.ENABLE_GZIP,
+            "compression": parse_encodings(settings.COMPRESSION_ENCODINGS) if settings.ENABLE_GZIP else [],
             "cache_ttl": settings.CACHE_TTL,
             "connection_timeout": settings.CONNECTION_TIMEOUT
         }
@@ -256,6 +366,8 @@ async def root():
 async def health_check():
     """Endpoint adicional para verificação de saúde com informações detalhadas"""
     from .utils.supabase import check_connection, get_connectivity_status
+    from .services.revocation_service import revocation_service
+    from .utils.cycle_calendar import get_global_registry_status
     import os
     
     supabase_status = check_connection()
@@ -276,6 +388,8 @@ async def health_check():
             "last_refresh": connectivity_info.get("last_success", 0),
             "error_count": connectivity_info.get("error_count", 0)
         },
+        "revocation_list": revocation_service.get_status(),
+        "global_cycles": get_global_registry_status(),
         "config": {
             "workers": settings.WORKERS_COUNT,
             "timeout_keep_alive": settings.TIMEOUT_KEEP_ALIVE,
@@ -386,11 +500,10 @@ async def check_token_status(request: Request):
 async def monitor_jwt_status():
     """Endpoint de monitoramento específico para status dos JWTs (pode ser chamado pelo frontend)"""
     try:
-        from .utils.supabase import get_admin_client, _test_client_health, get_connectivity_status
+        from .utils.supabase import check_connection, get_connectivity_status
         
-        # Testar cliente admin
-        admin_client = get_admin_client()
-        admin_healthy = _test_client_health(admin_client) if admin_client else False
+        # Estado mantido pelo prober (sem sonda por chamada)
+        admin_healthy = check_connection()
         
         connectivity = get_connectivity_status()
         
@@ -475,13 +588,13 @@ async def debug_connectivity():
 async def force_refresh_connections():
     """Endpoint administrativo para forçar renovação de conexões"""
     try:
-        from .utils.supabase import refresh_all_connections, check_connection
+        from .utils.supabase import refresh_all_connections, probe_connection
         
         print("🔧 Renovação manual de conexões solicitada...")
         refresh_all_connections()
         
-        # Verificar se funcionou
-        status = check_connection()
+        # Verificar se funcionou (sonda explícita, atualiza o circuit breaker)
+        status = await asyncio.to_thread(probe_connection)
         
         return {
             "message": "Conexões renovadas com sucesso",
@@ -500,13 +613,12 @@ async def force_refresh_connections():
 async def check_jwt_health():
     """Endpoint para verificar saúde dos JWTs e renovar se necessário"""
     try:
-        from .utils.supabase import get_admin_client, _test_client_health, refresh_all_connections
+        from .utils.supabase import probe_connection, refresh_all_connections
         
         print("🔍 Verificando saúde dos tokens JWT...")
         
-        # Testar cliente admin
-        admin_client = get_admin_client()
-        admin_healthy = _test_client_health(admin_client)
+        # Sonda explícita (atualiza o circuit breaker)
+        admin_healthy = await asyncio.to_thread(probe_connection)
         
         result = {
             "admin_jwt_healthy": admin_healthy,
@@ -519,8 +631,7 @@ async def check_jwt_health():
             refresh_all_connections()
             
             # Testar novamente
-            admin_client_new = get_admin_client()
-            admin_healthy_new = _test_client_health(admin_client_new)
+            admin_healthy_new = await asyncio.to_thread(probe_connection)
             
             result.update({
                 "admin_jwt_healthy_after_refresh": admin_healthy_new,
@@ -117,6 +117,12 @@ class NotificationStatsResponse(BaseModel):
     recent_count: int = Field(..., description="Notificações das últimas 24h")
 
 
+class UnreadCountResponse(BaseModel):
+    """Resposta do contador de não lidas (badge do sino)"""
+    unread_count: int = Field(..., description="Quantidade de não lidas")
+    total: int = Field(..., description="Total de notificações")
+
+
 class MarkReadRequest(BaseModel):
     """Modelo para marcar notificações como lidas"""
     notification_ids: List[str] = Field(..., description="IDs das notificações para marcar como lidas")
@@ -9,6 +9,8 @@ class ReportFormat(str, Enum):
     CSV = "CSV"
     EXCEL = "EXCEL"
     PDF = "PDF"
+    PARQUET = "PARQUET"
+    ARROW = "ARROW"
 
 class ReportStatus(str, Enum):
     """Status do relatório"""
@@ -36,6 +38,7 @@ class ReportFilters(BaseModel):
     end_date: Optional[str] = None
     include_key_results: bool = True
     include_checkins: bool = False
+    columns: Optional[List[str]] = None  # Parquet/Arrow: colunas exportadas (vazio = todas)
 
 class ReportRequest(BaseModel):
     """Solicitação de geração de relatório"""
@@ -44,6 +47,7 @@ class ReportRequest(BaseModel):
     format: ReportFormat = Field(..., description="Formato de exportação")
     filters: Optional[ReportFilters] = Field(default_factory=ReportFilters, description="Filtros aplicados")
     include_charts: bool = Field(default=False, description="Incluir gráficos (apenas PDF)")
+    compress: bool = Field(default=False, description="Compactar com gzip (apenas CSV)")
 
 class ObjectiveReportData(BaseModel):
     """Dados de objetivo para relatório"""
@@ -65,6 +69,7 @@ class KeyResultReportData(BaseModel):
     id: str
     title: str
     description: Optional[str] = None
+    objective_id: Optional[str] = None
     objective_title: str
     owner_name: Optional[str] = None
     target_value: float
@@ -104,6 +109,8 @@ class ReportMetadata(BaseModel):
     file_path: Optional[str] = None
     download_url: Optional[str] = None
     filters_applied: Optional[ReportFilters] = None
+    include_charts: bool = False
+    compressed: bool = False
     records_count: int = 0
     generation_started_at: datetime
     generation_completed_at: Optional[datetime] = None
@@ -156,9 +163,44 @@ class AvailableFormatsResponse(BaseModel):
             }
         }
 
+class EvolutionReportData(BaseModel):
+    """Série semanal de progresso para o gráfico de evolução"""
+    title: str
+    weeks: List[str]
+    progress: List[float]
+
 class ReportContent(BaseModel):
     """Conteúdo completo do relatório"""
     metadata: ReportMetadata
     dashboard_data: Optional[DashboardReportData] = None
     objectives: Optional[List[ObjectiveReportData]] = None
-    key_results: Optional[List[KeyResultReportData]] = None 
\ No newline at end of file
+    key_results: Optional[List[KeyResultReportData]] = None
+    evolution: Optional[EvolutionReportData] = None
+
+class ReportScheduleCreate(BaseModel):
+    """Definição de relatório agendado"""
+    name: str = Field(..., min_length=1, max_length=200, description="Nome do relatório")
+    report_type: ReportType = Field(..., description="Tipo do relatório")
+    format: ReportFormat = Field(..., description="Formato de exportação")
+    filters: Optional[ReportFilters] = Field(default_factory=ReportFilters, description="Filtros aplicados")
+    include_charts: bool = Field(default=False, description="Incluir gráficos (apenas PDF)")
+    compress: bool = Field(default=False, description="Compactar com gzip (apenas CSV)")
+    cron: str = Field(default="0 5 * * 1", description="Expressão cron no fuso da empresa (padrão: segunda às 05h)")
+    enabled: bool = True
+
+class ReportSchedule(ReportScheduleCreate):
+    """Agendamento com o estado da última execução"""
+    id: str
+    company_id: str
+    created_by: Optional[str] = None
+    next_run_at: Optional[datetime] = None
+    last_run_at: Optional[datetime] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+    last_file_size: Optional[int] = None
+    download_url: Optional[str] = None
+
+class ReportScheduleListResponse(BaseModel):
+    """Agendamentos de relatórios da empresa"""
+    schedules: List[ReportSchedule]
+    total: int
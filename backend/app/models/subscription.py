@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime
 
 # Modelos para a tabela subscriptions no banco de dados
 class SubscriptionDB(BaseModel):
@@ -86,4 +86,14 @@ class SubscriptionDetails(BaseModel):
      status: str
      plan: str
      created_at: datetime
-     updated_at: datetime 
\ No newline at end of file
+     updated_at: datetime 
+     next_due_date: Optional[date] = None
+
+# Modelo para resposta do direito de uso do plano (GET /subscriptions/entitlement)
+class SubscriptionEntitlement(BaseModel):
+    user_id: str
+    active: bool
+    plan: Optional[str] = None
+    status: Optional[str] = None
+    subscription_id: Optional[str] = None
+    next_due_date: Optional[date] = None
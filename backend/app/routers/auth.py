@@ -15,6 +15,8 @@ from ..models.user import UserRegister, UserLogin, UserProfile, UserRegisterResp
 from ..models.session import UserSessionsResponse, RevokeSessionRequest
 from ..services.token_service import TokenService
 from ..utils.supabase import supabase_client, supabase_admin
+from ..utils import auth_gateway
+from ..utils.auth_gateway import AuthGatewayError
 from ..utils.asaas import asaas_request, create_asaas_customer
 from ..dependencies import get_current_user
 from ..core.settings import settings, get_environment_config
@@ -142,7 +144,7 @@ async def register_user(user_data: UserRegister):
                 "description": user_data.description or ""
             }
             
-            asaas_customer_data = create_asaas_customer(asaas_customer_payload)
+            asaas_customer_data = await create_asaas_customer(asaas_customer_payload)
             asaas_customer_id = asaas_customer_data.get("id")
             print(f"DEBUG: Cliente Asaas criado: {asaas_customer_id}")
         except Exception as e_asaas:
@@ -186,7 +188,7 @@ async def register_user(user_data: UserRegister):
                 if asaas_customer_id:
                     # Tentar deletar cliente Asaas apenas se foi criado
                     try:
-                        asaas_request("DELETE", f"customers/{asaas_customer_id}")
+                        await asaas_request("DELETE", f"customers/{asaas_customer_id}")
                         print(f"DEBUG: Rollback do cliente Asaas {asaas_customer_id} executado.")
                     except Exception as e_asaas_delete:
                         print(f"DEBUG: Erro no rollback do cliente Asaas (não crítico): {e_asaas_delete}")
@@ -213,6 +215,13 @@ async def register_user(user_data: UserRegister):
         print(f"DEBUG: Stack trace: {traceback.format_exc()}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro interno: {str(e_general)}")
 
+async def _discard_auth_session(access_token: str):
+    """Encerra no GoTrue uma sessão recém-emitida que não será entregue ao cliente"""
+    try:
+        await auth_gateway.sign_out(access_token)
+    except Exception as e:
+        print(f"DEBUG: Erro ao encerrar sessão no Supabase Auth (não crítico): {e}")
+
 @router.post("/login", response_model=AuthResponse, summary="Realiza login e retorna tokens")
 async def login_user(user_data: UserLogin, request: Request):
     """
@@ -230,19 +239,9 @@ async def login_user(user_data: UserLogin, request: Request):
         
         print(f"DEBUG: JWT configurado para expirar em {jwt_expiration // (24*3600)} dias")
         
-        # Fazer login no Supabase Auth com configuração personalizada
+        # Fazer login no Supabase Auth (gateway stateless: sem sessão compartilhada)
         try:
-            # Tentativa de login padrão
-            auth_response = supabase_client().auth.sign_in_with_password({
-                "email": user_data.email,
-                "password": user_data.password
-            })
-            
-            if not auth_response.session:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED, 
-                    detail="Credenciais inválidas. Verifique seu email e senha."
-                )
+            auth_session = await auth_gateway.sign_in_with_password(user_data.email, user_data.password)
                 
         except Exception as e_auth:
             print(f"DEBUG: Erro no Supabase Auth login: {e_auth}")
@@ -279,7 +278,7 @@ async def login_user(user_data: UserLogin, request: Request):
             
             if not user_check.data:
                 # Se usuário não existe na tabela users, fazer logout do Auth
-                supabase_client().auth.sign_out()
+                await _discard_auth_session(auth_session.access_token)
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED, 
                     detail="Usuário não encontrado no sistema. Entre em contato com o administrador."
@@ -289,7 +288,7 @@ async def login_user(user_data: UserLogin, request: Request):
             
             # Verificar se usuário está ativo (removido temporariamente para debug)
             if not user_profile.get('is_active', True):
-                supabase_client().auth.sign_out()
+                await _discard_auth_session(auth_session.access_token)
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED, 
                     detail="Usuário desativado. Entre em contato com o administrador."
@@ -300,7 +299,7 @@ async def login_user(user_data: UserLogin, request: Request):
         except Exception as e_user_check:
             print(f"DEBUG: Erro ao verificar usuário na tabela: {e_user_check}")
             # Se não conseguir verificar, invalidar sessão por segurança
-            supabase_client().auth.sign_out()
+            await _discard_auth_session(auth_session.access_token)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
                 detail="Erro interno ao verificar usuário. Tente novamente."
@@ -321,8 +320,8 @@ async def login_user(user_data: UserLogin, request: Request):
             # Criar sessão usando TokenService
             session = await TokenService.create_session(
                 user_id=UUID(user_profile["id"]),
-                access_token=auth_response.session.access_token,
-                refresh_token=auth_response.session.refresh_token,
+                access_token=auth_session.access_token,
+                refresh_token=auth_session.refresh_token,
                 ip_address=client_ip,
                 user_agent=user_agent,
                 expires_in_seconds=jwt_expiration
@@ -335,10 +334,10 @@ async def login_user(user_data: UserLogin, request: Request):
             # Continuar mesmo se sessão no banco falhar
         
         return AuthResponse(
-            access_token=auth_response.session.access_token,
+            access_token=auth_session.access_token,
             token_type="bearer",
             expires_in=jwt_expiration,  # Retornar tempo em segundos
-            refresh_token=auth_response.session.refresh_token,
+            refresh_token=auth_session.refresh_token,
             user={
                 "id": user_profile["id"],
                 "email": user_profile["email"],
@@ -367,15 +366,15 @@ async def logout_user(request: Request, current_user: UserProfile = Depends(get_
     """
     check_supabase_config()
     
+    # Obter token atual do header
+    auth_header = request.headers.get("Authorization", "")
+    current_token = auth_header.replace("Bearer ", "") if auth_header.startswith("Bearer ") else None
+    
     try:
         print(f"DEBUG: Logout para usuário: {current_user.email}")
         
         # 🔒 NOVO: Revogar sessão no banco de dados
         try:
-            # Obter token atual do header
-            auth_header = request.headers.get("Authorization", "")
-            current_token = auth_header.replace("Bearer ", "") if auth_header.startswith("Bearer ") else None
-            
             if current_token:
                 # Buscar e revogar sessão no banco
                 session = await TokenService.validate_access_token(current_token, update_last_used=False)
@@ -386,8 +385,9 @@ async def logout_user(request: Request, current_user: UserProfile = Depends(get_
         except Exception as e_session:
             print(f"DEBUG: Erro ao revogar sessão no banco (não crítico): {e_session}")
         
-        # Usar o cliente global para logout
-        supabase_client().auth.sign_out()
+        # Encerrar a sessão deste token no Supabase Auth (sem tocar no cliente global)
+        if current_token:
+            await _discard_auth_session(current_token)
         return {"message": "Logout realizado com sucesso"}
     except Exception as e:
         print(f"DEBUG: Erro no logout: {e}")
@@ -411,24 +411,25 @@ async def refresh_token(refresh_data: dict, request: Request):
         
         print(f"DEBUG: Tentativa de refresh token")
         
-        # Tentar refresh da sessão
-        auth_response = supabase_client().auth.refresh_session(refresh_token)
-        
-        if not auth_response.session:
+        # Tentar refresh da sessão (gateway stateless)
+        try:
+            auth_session = await auth_gateway.refresh_session(refresh_token)
+        except AuthGatewayError as e_refresh:
+            print(f"DEBUG: Erro no refresh do Supabase Auth: {e_refresh}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, 
                 detail="Refresh token inválido ou expirado. Faça login novamente."
             )
         
-        # Obter dados do usuário para incluir na resposta
+        # Obter dados do usuário para incluir na resposta (já vêm na resposta do GoTrue)
         try:
-            user_response = supabase_client().auth.get_user(auth_response.session.access_token)
-            if user_response.user:
-                user_check = supabase_admin().from_('users').select("*").eq('email', user_response.user.email).execute()
+            auth_user = auth_session.user
+            if auth_user.get("email"):
+                user_check = supabase_admin().from_('users').select("*").eq('email', auth_user["email"]).execute()
                 if user_check.data:
                     user_profile = user_check.data[0]
                 else:
-                    user_profile = {"id": user_response.user.id, "email": user_response.user.email}
+                    user_profile = {"id": auth_user.get("id"), "email": auth_user["email"]}
             else:
                 user_profile = {}
         except:
@@ -443,8 +444,8 @@ async def refresh_token(refresh_data: dict, request: Request):
         try:
             refresh_response = await TokenService.refresh_session(
                 refresh_token=refresh_token,
-                new_access_token=auth_response.session.access_token,
-                new_refresh_token=auth_response.session.refresh_token
+                new_access_token=auth_session.access_token,
+                new_refresh_token=auth_session.refresh_token
             )
             
             if refresh_response:
@@ -458,8 +459,8 @@ async def refresh_token(refresh_data: dict, request: Request):
                     
                     await TokenService.create_session(
                         user_id=UUID(user_profile["id"]),
-                        access_token=auth_response.session.access_token,
-                        refresh_token=auth_response.session.refresh_token,
+                        access_token=auth_session.access_token,
+                        refresh_token=auth_session.refresh_token,
                         ip_address=client_ip,
                         user_agent=user_agent,
                         expires_in_seconds=jwt_expiration
@@ -471,10 +472,10 @@ async def refresh_token(refresh_data: dict, request: Request):
         print(f"DEBUG: Token refreshed com sucesso, expira em {jwt_expiration // (24*3600)} dias")
         
         return AuthResponse(
-            access_token=auth_response.session.access_token,
+            access_token=auth_session.access_token,
             token_type="bearer",
             expires_in=jwt_expiration,
-            refresh_token=auth_response.session.refresh_token,
+            refresh_token=auth_session.refresh_token,
             user={
                 **user_profile,
                 "expires_at": expires_at
@@ -617,36 +618,25 @@ async def update_password_with_token(update_data: UpdatePasswordRequest):
     check_supabase_config()
     
     try:
-        # Definir uma sessão com os tokens recebidos
-        session_response = supabase_admin().auth.set_session(
-            access_token=update_data.access_token,
-            refresh_token=update_data.refresh_token
-        )
-        
-        if not session_response.session:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tokens inválidos ou expirados")
-        
-        # Validar que o token é válido obtendo o usuário
-        user_response = supabase_admin().auth.get_user(update_data.access_token)
-        
-        if not user_response.user:
+        # Validar que o token é válido obtendo o usuário (sem definir sessão no cliente global)
+        try:
+            auth_user = await auth_gateway.get_user(update_data.access_token)
+        except AuthGatewayError:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token inválido ou expirado")
         
         # Verificar se usuário ainda está ativo
-        user_check = supabase_admin().from_('users').select("is_active").eq('email', user_response.user.email).execute()
+        user_check = supabase_admin().from_('users').select("is_active").eq('email', auth_user.get("email")).execute()
         
         if user_check.data and not user_check.data[0].get('is_active', True):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário desativado")
         
-        # Atualizar senha usando o cliente admin com o token definido
-        password_update_response = supabase_admin().auth.update_user({
-            "password": update_data.new_password
-        })
-        
-        if not password_update_response.user:
+        # Atualizar senha com o token recebido
+        try:
+            await auth_gateway.update_user(update_data.access_token, {"password": update_data.new_password})
+        except AuthGatewayError:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Erro ao atualizar senha")
         
-        print(f"DEBUG: Senha atualizada com sucesso para: {user_response.user.email}")
+        print(f"DEBUG: Senha atualizada com sucesso para: {auth_user.get('email')}")
         
         return {"message": "Senha atualizada com sucesso"}
         
@@ -667,13 +657,7 @@ async def change_password(password_data: ChangePasswordRequest, current_user: Us
     try:
         # Verificar senha atual fazendo login
         try:
-            login_response = supabase_client().auth.sign_in_with_password({
-                "email": current_user.email,
-                "password": password_data.current_password
-            })
-            
-            if not login_response.user:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Senha atual incorreta")
+            login_session = await auth_gateway.sign_in_with_password(current_user.email, password_data.current_password)
             
         except Exception as e:
             print(f"DEBUG: Erro ao verificar senha atual: {e}")
@@ -681,13 +665,8 @@ async def change_password(password_data: ChangePasswordRequest, current_user: Us
         
         # Atualizar senha usando o token da sessão atual
         try:
-            # Usar o cliente autenticado para atualizar a senha
-            update_response = supabase_client().auth.update_user({
-                "password": password_data.new_password
-            })
-            
-            if not update_response.user:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao atualizar senha")
+            # Usar a sessão recém-emitida para atualizar a senha
+            await auth_gateway.update_user(login_session.access_token, {"password": password_data.new_password})
             
         except Exception as e:
             print(f"DEBUG: Erro ao atualizar senha via cliente: {e}")
@@ -704,6 +683,9 @@ async def change_password(password_data: ChangePasswordRequest, current_user: Us
             except Exception as admin_error:
                 print(f"DEBUG: Admin update também falhou: {admin_error}")
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao atualizar senha. Tente novamente mais tarde.")
+        finally:
+            # A sessão de verificação nunca é entregue ao cliente, com ou sem sucesso
+            await _discard_auth_session(login_session.access_token)
         
         print(f"DEBUG: Senha alterada com sucesso para usuário: {current_user.email}")
         
@@ -835,7 +817,11 @@ async def cleanup_expired_sessions(
         )
     
     try:
-        cleaned_count = await TokenService.cleanup_expired_sessions(older_than_days=7)
+        # Limitado por chamada; a limpeza completa roda no job `maintenance.py`
+        cleaned_count = await TokenService.cleanup_expired_sessions(
+            older_than_days=settings.SESSION_RETENTION_DAYS,
+            max_rows=settings.MAINTENANCE_MAX_ROWS_PER_REQUEST
+        )
         
         return {
             "message": f"{cleaned_count} sessões expiradas foram removidas",
@@ -1,59 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from uuid import UUID
-from datetime import datetime, date
 
 from ..dependencies import get_current_user
 from ..models.user import UserProfile, UserRole
 from ..models.cycle import (
     Cycle, CycleCreate, CycleUpdate, CycleStatus
 )
-from ..models.global_cycle import GlobalCycleWithStatus
 from ..utils.supabase import supabase_admin
+from ..utils.cycle_calendar import (
+    cycle_timeline, get_company_calendar, invalidate_company_cycles, resolve_user_global_cycle
+)
 
 router = APIRouter()
 
 def calculate_cycle_status(cycle_data: dict) -> CycleStatus:
-    """Calcula o status e progresso de um ciclo"""
-    start_date = cycle_data['start_date']
-    end_date = cycle_data['end_date']
-    today = date.today()
-    
-    # Converter strings para date se necessário
-    if isinstance(start_date, str):
-        start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-    if isinstance(end_date, str):
-        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-    
-    # Cálculos temporais
-    days_total = (end_date - start_date).days + 1
-    days_elapsed = max(0, (today - start_date).days + 1)
-    days_remaining = max(0, (end_date - today).days)
-    
-    # Progresso percentual
-    if days_total > 0:
-        progress_percentage = min(100.0, max(0.0, (days_elapsed / days_total) * 100))
-    else:
-        progress_percentage = 0.0
-    
-    # Status temporal
-    is_current = start_date <= today <= end_date
-    is_future = today < start_date
-    is_past = today > end_date
+    """Calcula o status e progresso de um ciclo (memoizado por ciclo e dia)"""
+    timeline = cycle_timeline(cycle_data)
     
     return CycleStatus(
         id=cycle_data['id'],
         name=cycle_data['name'],
-        start_date=start_date,
-        end_date=end_date,
         is_active=cycle_data.get('is_active', True),
-        days_total=days_total,
-        days_elapsed=days_elapsed,
-        days_remaining=days_remaining,
-        progress_percentage=round(progress_percentage, 2),
-        is_current=is_current,
-        is_future=is_future,
-        is_past=is_past
+        **timeline.as_dict()
     )
 
 @router.get("/", response_model=List[CycleStatus], summary="Listar ciclos da empresa")
@@ -68,16 +37,11 @@ async def list_cycles(current_user: UserProfile = Depends(get_current_user)):
                 detail="Usuário não possui empresa associada"
             )
         
-        # Buscar ciclos da empresa
-        response = supabase_admin().from_('cycles').select(
-            "id, name, start_date, end_date, is_active, created_at, updated_at"
-        ).eq('company_id', str(current_user.company_id)).order('start_date', desc=True).execute()
-        
-        if not response.data:
-            return []
+        # Ciclos da empresa vêm do calendário em memória (já ordenados por início)
+        calendar = get_company_calendar(str(current_user.company_id))
         
         # Calcular status para cada ciclo
-        cycles_with_status = [calculate_cycle_status(cycle) for cycle in response.data]
+        cycles_with_status = [calculate_cycle_status(cycle) for cycle in calendar.by_start(descending=True)]
         
         return cycles_with_status
         
@@ -141,6 +105,8 @@ async def create_cycle(cycle_data: CycleCreate, current_user: UserProfile = Depe
                 detail="Erro ao criar ciclo"
             )
         
+        invalidate_company_cycles(str(current_user.company_id))
+        
         # Buscar dados completos do ciclo criado
         cycle_id = insert_response.data[0]['id']
         full_cycle = supabase_admin().from_('cycles').select("*").eq('id', cycle_id).single().execute()
@@ -176,52 +142,20 @@ async def get_active_cycle(current_user: UserProfile = Depends(get_current_user)
             )
         
         # Primeiro, tentar buscar ciclo ativo personalizado (legado)
-        response = supabase_admin().from_('cycles').select(
-            "id, name, start_date, end_date, is_active, created_at, updated_at"
-        ).eq('company_id', str(current_user.company_id)).eq('is_active', True).execute()
+        active_cycle = get_company_calendar(str(current_user.company_id)).first_where('is_active')
         
-        if response.data:
+        if active_cycle:
             # Se há ciclo ativo personalizado, usar ele
-            active_cycle = response.data[0]
             cycle_status = calculate_cycle_status(active_cycle)
             return cycle_status
         
         # Se não há ciclo ativo personalizado, tentar usar preferência global do usuário
         try:
-            # Buscar preferência do usuário
-            pref_response = supabase_admin().from_('user_cycle_preferences').select(
-                "*"
-            ).eq('user_id', str(current_user.id)).eq('company_id', str(current_user.company_id)).execute()
-            
-            if pref_response.data:
-                preference = pref_response.data[0]
-                
-                # Buscar o ciclo global correspondente
-                global_cycle_response = supabase_admin().from_('global_cycles').select(
-                    "*"
-                ).eq('code', preference['global_cycle_code']).eq('year', preference['year']).execute()
-                
-                if global_cycle_response.data:
-                    global_cycle = global_cycle_response.data[0]
-                    
-                    # Converter para formato compatível com CycleStatus
-                    cycle_data = {
-                        'id': global_cycle['id'],
-                        'name': global_cycle['name'],
-                        'start_date': global_cycle['start_date'],
-                        'end_date': global_cycle['end_date'],
-                        'is_active': global_cycle['is_current']
-                    }
-                    return calculate_cycle_status(cycle_data)
-            
-            # Se não há preferência, usar ciclo atual baseado na data
-            current_year = datetime.now().year
-            current_global = supabase_admin().from_('global_cycles').select(
-                "*"
-            ).eq('year', current_year).eq('is_current', True).execute()
+            # Preferência (cache por usuário) ou ciclo global atual, sem consultas
+            global_cycle = resolve_user_global_cycle(str(current_user.id), str(current_user.company_id))
             
-            if current_global.data:
-                global_cycle = current_global.data[0]
+            if global_cycle:
+                # Converter para formato compatível com CycleStatus
                 cycle_data = {
                     'id': global_cycle['id'],
                     'name': global_cycle['name'],
@@ -315,6 +249,7 @@ async def update_cycle(
         
         # Executar atualização
         update_response = supabase_admin().from_('cycles').update(update_data).eq('id', str(cycle_id)).execute()
+        invalidate_company_cycles(str(current_user.company_id))
         
         if not update_response.data:
             raise HTTPException(
@@ -383,6 +318,7 @@ async def delete_cycle(cycle_id: UUID, current_user: UserProfile = Depends(get_c
         
         # Deletar ciclo
         delete_response = supabase_admin().from_('cycles').delete().eq('id', str(cycle_id)).execute()
+        invalidate_company_cycles(str(current_user.company_id))
         
         return {"message": "Ciclo deletado com sucesso"}
         
@@ -437,6 +373,7 @@ async def activate_cycle(cycle_id: UUID, current_user: UserProfile = Depends(get
             'is_active': True,
             'updated_at': 'now()'
         }).eq('id', str(cycle_id)).execute()
+        invalidate_company_cycles(str(current_user.company_id))
         
         if not activate_response.data:
             raise HTTPException(
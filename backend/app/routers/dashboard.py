@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Optional
+import asyncio
 from datetime import datetime, date, timedelta
 import calendar
 
@@ -15,6 +16,11 @@ from ..models.dashboard import (
     TrendDirection, StatusColor, TrendAnalysis, PerformanceSummary
 )
 from ..utils.supabase import supabase_admin
+from ..utils.json_response import ModelResponse
+from ..services.evolution_service import evolution_service, series_points, week_start
+from ..utils.cycle_calendar import (
+    cycle_timeline, find_global_cycle, get_company_calendar, parse_cycle_date, resolve_user_global_cycle
+)
 
 router = APIRouter()
 
@@ -141,12 +147,10 @@ async def get_active_cycle_status(company_id: str) -> Optional[CycleStatus]:
     try:
         from .cycles import calculate_cycle_status
         
-        response = supabase_admin().from_('cycles').select(
-            "id, name, start_date, end_date, is_active, created_at, updated_at"
-        ).eq('company_id', company_id).eq('is_active', True).execute()
+        active_cycle = get_company_calendar(company_id).first_where('is_active')
         
-        if response.data:
-            return calculate_cycle_status(response.data[0])
+        if active_cycle:
+            return calculate_cycle_status(active_cycle)
         
         return None
     except Exception as e:
@@ -158,18 +162,8 @@ async def get_all_company_cycles(company_id: str) -> List[CycleStatus]:
     try:
         from .cycles import calculate_cycle_status
         
-        response = supabase_admin().from_('cycles').select(
-            "id, name, start_date, end_date, is_active, created_at, updated_at"
-        ).eq('company_id', company_id).order('created_at', desc=True).execute()
-        
-        if response.data:
-            cycles = []
-            for cycle_data in response.data:
-                cycle_status = calculate_cycle_status(cycle_data)
-                cycles.append(cycle_status)
-            return cycles
-        
-        return []
+        # Ordem do calendário da empresa: created_at desc
+        return [calculate_cycle_status(cycle_data) for cycle_data in get_company_calendar(company_id).cycles]
     except Exception as e:
         print(f"DEBUG: Erro ao buscar ciclos da empresa: {e}")
         return []
@@ -179,12 +173,9 @@ async def get_global_cycle_info(cycle_code: str, cycle_year: int) -> Optional[di
     try:
         from .global_cycles import calculate_cycle_status
         
-        response = supabase_admin().from_('global_cycles').select(
-            "*"
-        ).eq('code', cycle_code).eq('year', cycle_year).execute()
+        cycle_data = find_global_cycle(cycle_code, cycle_year)
         
-        if response.data:
-            cycle_data = response.data[0]
+        if cycle_data:
             cycle_status = calculate_cycle_status(cycle_data)
             return {
                 'progress_percentage': cycle_status.progress_percentage,
@@ -203,38 +194,10 @@ async def get_user_preferred_cycle_info(user_id: str, company_id: str) -> Option
     try:
         from .global_cycles import calculate_cycle_status
         
-        # Buscar preferência do usuário
-        pref_response = supabase_admin().from_('user_cycle_preferences').select(
-            "*"
-        ).eq('user_id', user_id).eq('company_id', company_id).execute()
+        # Preferência (cache por usuário) ou ciclo global atual, sem consultas
+        cycle_data = resolve_user_global_cycle(str(user_id), str(company_id))
         
-        if pref_response.data:
-            preference = pref_response.data[0]
-            
-            # Buscar o ciclo global correspondente
-            cycle_response = supabase_admin().from_('global_cycles').select(
-                "*"
-            ).eq('code', preference['global_cycle_code']).eq('year', preference['year']).execute()
-            
-            if cycle_response.data:
-                cycle_data = cycle_response.data[0]
-                cycle_status = calculate_cycle_status(cycle_data)
-                return {
-                    'progress_percentage': cycle_status.progress_percentage,
-                    'days_total': cycle_status.days_total,
-                    'days_elapsed': cycle_status.days_elapsed,
-                    'days_remaining': cycle_status.days_remaining
-                }
-        
-        # Se não há preferência, usar ciclo atual padrão
-        current_year = datetime.now().year
-        current_response = supabase_admin().from_('global_cycles').select(
-            "*"
-        ).eq('year', current_year).eq('is_current', True).execute()
-        
-        if current_response.data:
-            # Pegar o primeiro ciclo atual (pode haver múltiplos tipos de ciclo atuais)
-            cycle_data = current_response.data[0]
+        if cycle_data:
             cycle_status = calculate_cycle_status(cycle_data)
             return {
                 'progress_percentage': cycle_status.progress_percentage,
@@ -277,12 +240,12 @@ async def get_time_cards(current_user: UserProfile = Depends(get_current_user)):
         # Buscar todos os ciclos da empresa
         all_cycles = await get_all_company_cycles(str(current_user.company_id))
         
-        return TimeCardsResponse(
+        return ModelResponse(TimeCardsResponse(
             available_cards=available_cards,
             user_preferences=user_preferences,
             active_cycle=active_cycle,
             all_cycles=all_cycles
-        )
+        ))
         
     except HTTPException:
         raise
@@ -397,23 +360,8 @@ def calculate_expected_progress(cycle_data: dict, today: date = None) -> float:
         today = date.today()
     
     try:
-        start_date = datetime.strptime(cycle_data['start_date'], '%Y-%m-%d').date()
-        end_date = datetime.strptime(cycle_data['end_date'], '%Y-%m-%d').date()
-        
-        # Se ainda não começou o ciclo
-        if today < start_date:
-            return 0.0
-        
-        # Se já passou do ciclo
-        if today > end_date:
-            return 100.0
-        
-        # Calcular progresso baseado no tempo
-        total_days = (end_date - start_date).days + 1
-        elapsed_days = (today - start_date).days + 1
-        
-        expected_progress = (elapsed_days / total_days) * 100
-        return min(100.0, max(0.0, expected_progress))
+        # Antes do início: 0%; depois do fim: 100%; no meio: proporcional aos dias
+        return cycle_timeline(cycle_data, today).progress_percentage
         
     except Exception as e:
         print(f"DEBUG: Erro ao calcular progresso esperado: {e}")
@@ -485,7 +433,7 @@ async def get_dashboard_stats(current_user: UserProfile = Depends(get_current_us
             last_updated=datetime.now().isoformat()
         )
         
-        return stats
+        return ModelResponse(stats)
         
     except HTTPException:
         raise
@@ -612,7 +560,7 @@ async def get_dashboard_progress(
             cycle_days_remaining=cycle_days_remaining
         )
         
-        return progress_data
+        return ModelResponse(progress_data)
         
     except HTTPException:
         raise
@@ -642,7 +590,7 @@ async def get_objectives_count(current_user: UserProfile = Depends(get_current_u
         objectives_data = await get_objectives_data(company_id)
         
         if not objectives_data:
-            return ObjectivesCount(
+            return ModelResponse(ObjectivesCount(
                 total=0,
                 completed=0,
                 on_track=0,
@@ -651,7 +599,7 @@ async def get_objectives_count(current_user: UserProfile = Depends(get_current_u
                 planned=0,
                 completion_rate=0.0,
                 on_track_rate=0.0
-            )
+            ))
         
         # Contar por status
         status_counts = {
@@ -689,7 +637,7 @@ async def get_objectives_count(current_user: UserProfile = Depends(get_current_u
             on_track_rate=round(on_track_rate, 2)
         )
         
-        return objectives_count
+        return ModelResponse(objectives_count)
         
     except HTTPException:
         raise
@@ -716,90 +664,87 @@ async def get_dashboard_evolution(current_user: UserProfile = Depends(get_curren
         company_id = str(current_user.company_id)
         today = date.today()
         
-        # Buscar dados necessários
-        objectives_data = await get_objectives_data(company_id)
-        active_cycle = await get_active_cycle_status(company_id)
+        # Série semanal pronta (uma leitura) + ciclo ativo do calendário em memória
+        series = await asyncio.to_thread(evolution_service.get_or_build_series, company_id)
+        active_cycle = get_company_calendar(company_id).first_where('is_active')
         
-        # Definir período de análise (último mês ou ciclo ativo)
-        if active_cycle:
+        # Período de análise: ciclo ativo ou últimos 30 dias
+        period_start = period_end = None
+        if active_cycle and active_cycle.get('start_date') and active_cycle.get('end_date'):
             try:
-                # Tratar diferentes formatos de data
-                start_date_str = active_cycle.start_date
-                end_date_str = active_cycle.end_date
-                
-                if start_date_str and end_date_str:
-                    # Tentar diferentes formatos de data
-                    try:
-                        # Formato ISO completo com timezone
-                        if 'T' in start_date_str:
-                            period_start = datetime.fromisoformat(start_date_str.replace('Z', '+00:00')).date()
-                            period_end = datetime.fromisoformat(end_date_str.replace('Z', '+00:00')).date()
-                        else:
-                            # Formato simples YYYY-MM-DD
-                            period_start = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-                            period_end = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-                    except ValueError as parse_error:
-                        print(f"DEBUG: Erro ao parsear datas (start='{start_date_str}', end='{end_date_str}'): {parse_error}. Usando fallback.")
-                        raise
-                else:
-                    print(f"DEBUG: Datas do ciclo estão vazias. Usando fallback.")
-                    raise ValueError("Datas vazias")
-
-            except Exception as date_error:
-                print(f"DEBUG: Erro geral ao processar datas do ciclo: {date_error}. Usando fallback para período de 30 dias.")
-                # Fallback seguro
-                period_start = today - timedelta(days=30)
-                period_end = today
-        else:
-            print(f"DEBUG: Nenhum ciclo ativo encontrado. Usando período padrão de 30 dias.")
+                period_start = parse_cycle_date(active_cycle['start_date'])
+                period_end = parse_cycle_date(active_cycle['end_date'])
+            except ValueError as date_error:
+                print(f"DEBUG: Erro ao processar datas do ciclo: {date_error}. Usando período padrão de 30 dias.")
+                period_start = period_end = None
+        if period_start is None:
+            print(f"DEBUG: Nenhum ciclo ativo com datas válidas. Usando período padrão de 30 dias.")
             period_start = today - timedelta(days=30)
             period_end = today
         
-        # Gerar pontos de evolução (semanal)
+        last_day = min(today, period_end)
+        total_days = (period_end - period_start).days + 1
+        all_points = series_points(series, last_day)
+        
+        # Estado de cada semana do período: o da semana que contém a data (semanas
+        # anteriores ao primeiro evento da empresa ficam com progresso 0)
+        by_week = {point['week']: point for point in all_points}
         evolution_points = []
+        period_weeks = []
         current_date = period_start
-        
-        while current_date <= min(today, period_end):
-            # Em uma implementação real, buscaríamos dados históricos
-            # Por enquanto, simular evolução baseada na data
+        while current_date <= last_day:
+            point = by_week.get(week_start(current_date))
             days_from_start = (current_date - period_start).days
-            total_days = (period_end - period_start).days + 1
-            
-            # Simular progresso real (com alguma variação)
-            expected_at_date = (days_from_start / total_days) * 100
-            
-            # Simular progresso real com base nos objetivos atuais
-            if objectives_data:
-                base_progress = sum(float(obj.get('progress', 0)) for obj in objectives_data) / len(objectives_data)
-                # Simular que o progresso foi gradual até chegar no atual
-                actual_progress = min(base_progress, expected_at_date + 10)  # Simular leve adiantamento
-            else:
-                actual_progress = expected_at_date
-            
+            expected_at_date = min(100.0, (days_from_start / total_days) * 100)
             evolution_points.append(EvolutionPoint(
                 date=current_date.isoformat(),
-                actual_progress=round(actual_progress, 2),
+                actual_progress=round(point['progress'], 2) if point else 0.0,
                 expected_progress=round(expected_at_date, 2),
-                objectives_count=len(objectives_data)
+                objectives_count=point['objectives_count'] if point else 0
             ))
-            
-            # Avançar uma semana
+            if point:
+                period_weeks.append(point)
             current_date += timedelta(days=7)
         
-        # Análise de tendência
+        # Análise de tendência a partir das variações semanais reais
+        weekly_deltas = [
+            b.actual_progress - a.actual_progress
+            for a, b in zip(evolution_points, evolution_points[1:])
+        ]
+        average_weekly_growth = sum(weekly_deltas) / len(weekly_deltas) if weekly_deltas else 0.0
+        if average_weekly_growth > 0.5:
+            direction = "UP"
+        elif average_weekly_growth < -0.5:
+            direction = "DOWN"
+        else:
+            direction = "STABLE"
+        consistency_score = (
+            sum(1 for delta in weekly_deltas if delta >= 0) / len(weekly_deltas) * 100
+            if weekly_deltas else 100.0
+        )
+        current_progress = evolution_points[-1].actual_progress if evolution_points else 0.0
+        expected_progress = evolution_points[-1].expected_progress if evolution_points else 0.0
+        
         trend_analysis = TrendAnalysis(
-            direction="UP" if len(evolution_points) > 1 and evolution_points[-1].actual_progress > evolution_points[0].actual_progress else "STABLE",
-            average_weekly_growth=2.5,  # Simulado
-            consistency_score=85.0,     # Simulado
-            prediction_next_week=evolution_points[-1].actual_progress + 3.0 if evolution_points else 0.0
+            direction=direction,
+            average_weekly_growth=round(average_weekly_growth, 2),
+            consistency_score=round(consistency_score, 2),
+            prediction_next_week=round(max(0.0, min(100.0, current_progress + average_weekly_growth)), 2)
         )
         
         # Resumo de performance
+        # - time_efficiency: progresso real relativo ao esperado para a data
+        # - team_engagement: % dos KRs com check-in (KRs distintos) nas últimas 4 semanas do período
+        time_efficiency = min(100.0, current_progress / expected_progress * 100) if expected_progress > 0 else 100.0
+        last_week = period_weeks[-1] if period_weeks else None
+        total_krs = last_week['kr_count'] if last_week else 0
+        active_krs = last_week['active_krs_window'] if last_week else 0
+        team_engagement = min(100.0, active_krs / total_krs * 100) if total_krs else 0.0
         performance_summary = PerformanceSummary(
-            overall_score=78.5,      # Simulado
-            time_efficiency=82.0,    # Simulado
-            goal_achievement=75.0,   # Simulado
-            team_engagement=80.0     # Simulado
+            overall_score=round((current_progress + time_efficiency + team_engagement) / 3, 2),
+            time_efficiency=round(time_efficiency, 2),
+            goal_achievement=round(current_progress, 2),
+            team_engagement=round(team_engagement, 2)
         )
         
         evolution_data = EvolutionData(
@@ -811,7 +756,7 @@ async def get_dashboard_evolution(current_user: UserProfile = Depends(get_curren
             performance_summary=performance_summary
         )
         
-        return evolution_data
+        return ModelResponse(evolution_data)
         
     except HTTPException:
         raise
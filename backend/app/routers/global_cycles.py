@@ -13,47 +13,26 @@ from ..models.global_cycle import (
     CyclePreferenceCreate
 )
 from ..utils.supabase import supabase_admin
+from ..utils.cycle_calendar import (
+    cycle_timeline, find_global_cycle, get_current_global_cycle, get_global_calendar, get_global_years,
+    resolve_user_global_cycle, set_user_cycle_preference
+)
 
 router = APIRouter()
 
 def calculate_cycle_status(cycle_data: dict) -> GlobalCycleWithStatus:
-    """Calcula o status e progresso de um ciclo global"""
-    start_date = cycle_data['start_date']
-    end_date = cycle_data['end_date']
-    today = date.today()
-    
-    # Converter strings para date se necessário
-    if isinstance(start_date, str):
-        start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-    if isinstance(end_date, str):
-        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-    
-    # Cálculos temporais
-    days_total = (end_date - start_date).days + 1
-    days_elapsed = max(0, (today - start_date).days + 1)
-    days_remaining = max(0, (end_date - today).days)
-    
-    # Progresso percentual
-    if days_total > 0:
-        progress_percentage = min(100.0, max(0.0, (days_elapsed / days_total) * 100))
-    else:
-        progress_percentage = 0.0
-    
-    # Status temporal
-    is_future = today < start_date
-    is_past = today > end_date
-    
-    # Criar cópia dos dados sem duplicar is_current
-    cycle_data_copy = cycle_data.copy()
+    """Calcula o status e progresso de um ciclo global (memoizado por ciclo e dia)"""
+    timeline = cycle_timeline(cycle_data)
     
+    # is_current vem da tabela (ciclo marcado como atual), não do calendário
     return GlobalCycleWithStatus(
-        **cycle_data_copy,
-        days_total=days_total,
-        days_elapsed=days_elapsed,
-        days_remaining=days_remaining,
-        progress_percentage=round(progress_percentage, 2),
-        is_future=is_future,
-        is_past=is_past
+        **cycle_data,
+        days_total=timeline.days_total,
+        days_elapsed=timeline.days_elapsed,
+        days_remaining=timeline.days_remaining,
+        progress_percentage=timeline.progress_percentage,
+        is_future=timeline.is_future,
+        is_past=timeline.is_past
     )
 
 @router.get("/global", response_model=List[GlobalCycleWithStatus], summary="Listar ciclos globais disponíveis")
@@ -67,16 +46,11 @@ async def list_global_cycles(year: int = None, current_user: UserProfile = Depen
         if year is None:
             year = datetime.now().year
         
-        # Buscar ciclos globais do ano especificado
-        response = supabase_admin().from_('global_cycles').select(
-            "*"
-        ).eq('year', year).order('start_date').execute()
-        
-        if not response.data:
-            return []
+        # Ciclos globais do ano vêm do calendário em memória
+        calendar = get_global_calendar(year)
         
         # Calcular status para cada ciclo
-        cycles_with_status = [calculate_cycle_status(cycle) for cycle in response.data]
+        cycles_with_status = [calculate_cycle_status(cycle) for cycle in calendar.cycles]
         
         return cycles_with_status
         
@@ -93,21 +67,15 @@ async def get_current_cycle(current_user: UserProfile = Depends(get_current_user
     Retorna o ciclo global que está ativo no momento atual.
     """
     try:
-        current_year = datetime.now().year
-        
-        # Buscar ciclo atual (is_current = true)
-        response = supabase_admin().from_('global_cycles').select(
-            "*"
-        ).eq('year', current_year).eq('is_current', True).execute()
+        # Ciclo marcado como atual (is_current = true), lido do registro em memória
+        current_cycle = get_current_global_cycle()
         
-        if not response.data:
+        if not current_cycle:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Nenhum ciclo global ativo encontrado"
             )
         
-        # Retornar o primeiro (deveria haver apenas um)
-        current_cycle = response.data[0]
         cycle_status = calculate_cycle_status(current_cycle)
         
         return cycle_status
@@ -134,26 +102,16 @@ async def get_user_cycle_preference(current_user: UserProfile = Depends(get_curr
                 detail="Usuário não possui empresa associada"
             )
         
-        # Buscar preferência do usuário
-        pref_response = supabase_admin().from_('user_cycle_preferences').select(
-            "*"
-        ).eq('user_id', str(current_user.id)).eq('company_id', str(current_user.company_id)).execute()
+        # Preferência (cache por usuário) ou, sem preferência válida, o ciclo atual
+        cycle_data = resolve_user_global_cycle(str(current_user.id), str(current_user.company_id))
         
-        if pref_response.data:
-            # Usuário tem preferência definida
-            preference = pref_response.data[0]
-            
-            # Buscar o ciclo global correspondente
-            cycle_response = supabase_admin().from_('global_cycles').select(
-                "*"
-            ).eq('code', preference['global_cycle_code']).eq('year', preference['year']).execute()
-            
-            if cycle_response.data:
-                cycle_data = cycle_response.data[0]
-                return calculate_cycle_status(cycle_data)
+        if not cycle_data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Nenhum ciclo global ativo encontrado"
+            )
         
-        # Se não há preferência ou ciclo não encontrado, retornar ciclo atual
-        return await get_current_cycle(current_user)
+        return calculate_cycle_status(cycle_data)
         
     except HTTPException:
         raise
@@ -183,12 +141,8 @@ async def update_user_cycle_preference(
         # Definir ano padrão como atual
         year = preference_data.year or datetime.now().year
         
-        # Verificar se o ciclo global existe
-        cycle_check = supabase_admin().from_('global_cycles').select(
-            "id"
-        ).eq('code', preference_data.global_cycle_code).eq('year', year).execute()
-        
-        if not cycle_check.data:
+        # Verificar se o ciclo global existe (registro em memória)
+        if not find_global_cycle(preference_data.global_cycle_code, year):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Ciclo global '{preference_data.global_cycle_code}' do ano {year} não encontrado"
@@ -217,6 +171,7 @@ async def update_user_cycle_preference(
                     detail="Erro ao atualizar preferência"
                 )
             
+            set_user_cycle_preference(str(current_user.id), str(current_user.company_id), update_response.data[0])
             return UserCyclePreference(**update_response.data[0])
         else:
             # Criar nova preferência
@@ -239,6 +194,7 @@ async def update_user_cycle_preference(
                     detail="Erro ao criar preferência"
                 )
             
+            set_user_cycle_preference(str(current_user.id), str(current_user.company_id), create_response.data[0])
             return UserCyclePreference(**create_response.data[0])
         
     except HTTPException:
@@ -256,21 +212,12 @@ async def get_available_years(current_user: UserProfile = Depends(get_current_us
     Lista todos os anos para os quais existem ciclos globais.
     """
     try:
-        response = supabase_admin().from_('global_cycles').select(
-            "year"
-        ).execute()
-        
-        if not response.data:
-            return []
-        
-        # Extrair anos únicos e ordenar
-        years = sorted(list(set([item['year'] for item in response.data])))
-        
-        return years
+        # Anos do registro em memória (já únicos e ordenados)
+        return get_global_years()
         
     except Exception as e:
         print(f"DEBUG: Erro ao buscar anos disponíveis: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
             detail="Erro interno do servidor"
-        ) 
\ No newline at end of file
+        )
@@ -11,16 +11,22 @@ from ..models.key_result import (
     Checkin, CheckinCreate, CheckinUpdate, CheckinWithDetails, CheckinListResponse
 )
 from ..utils.supabase import supabase_admin
+from ..utils.json_response import ModelResponse
+from ..utils.row_mapper import RowMapper, nested
+from ..utils.kr_progress import calculate_progress
+from ..services.evolution_service import evolution_service
 
 router = APIRouter()
 
-def calculate_progress(current_value: float, start_value: float, target_value: float) -> float:
-    """Calcula o progresso do Key Result baseado nos valores"""
-    if target_value == start_value:
-        return 100.0 if current_value >= target_value else 0.0
-    
-    progress = ((current_value - start_value) / (target_value - start_value)) * 100
-    return max(0.0, min(100.0, progress))  # Limita entre 0 e 100
+# Linha de key_results com "owner:users(name), objective:objectives(title)" -> KeyResultWithDetails
+KEY_RESULT_MAPPER = RowMapper(
+    KeyResultWithDetails,
+    owner_name=nested('owner', 'name'),
+    objective_title=nested('objective', 'title', 'Objetivo não encontrado')
+)
+
+# Linha de kr_checkins com "author:users(name)" -> CheckinWithDetails
+CHECKIN_MAPPER = RowMapper(CheckinWithDetails, author_name=nested('author', 'name'))
 
 def update_status_based_on_progress(progress: float) -> str:
     """Atualiza o status baseado no progresso"""
@@ -139,36 +145,16 @@ async def list_key_results(
         kr_data = response.data if response.data else []
         
         # Converter dados para modelos
-        key_results = []
-        for kr in kr_data:
-            formatted_data = {
-                'id': kr['id'],
-                'title': kr['title'],
-                'description': kr['description'],
-                'objective_id': kr['objective_id'],
-                'owner_id': kr['owner_id'],
-                'target_value': float(kr['target_value']),
-                'current_value': float(kr['current_value']) if kr['current_value'] else 0.0,
-                'start_value': float(kr['start_value']) if kr['start_value'] else 0.0,
-                'unit': kr['unit'],
-                'confidence_level': float(kr['confidence_level']) if kr['confidence_level'] else None,
-                'status': kr['status'],
-                'progress': float(kr['progress']) if kr['progress'] else 0.0,
-                'created_at': kr['created_at'],
-                'updated_at': kr['updated_at'],
-                'owner_name': kr['owner']['name'] if kr.get('owner') else None,
-                'objective_title': kr['objective']['title'] if kr.get('objective') else 'Objetivo não encontrado'
-            }
-            key_results.append(KeyResultWithDetails(**formatted_data))
+        key_results = KEY_RESULT_MAPPER.many(kr_data)
         
         has_more = (offset + limit) < total
         
-        return KeyResultListResponse(
+        return ModelResponse(KeyResultListResponse(
             key_results=key_results,
             total=total,
             has_more=has_more,
             filters_applied=filters
-        )
+        ))
         
     except HTTPException:
         raise
@@ -257,6 +243,7 @@ async def create_key_result(
         
         # Atualizar progresso do objetivo
         await update_objective_progress(str(objective_id))
+        evolution_service.mark_dirty(current_user.company_id)
         
         # Buscar dados completos do Key Result criado
         kr_id = insert_response.data[0]['id']
@@ -332,27 +319,7 @@ async def get_key_result(
                 detail="Key Result não encontrado"
             )
         
-        # Preparar dados para o modelo
-        formatted_data = {
-            'id': kr_data['id'],
-            'title': kr_data['title'],
-            'description': kr_data['description'],
-            'objective_id': kr_data['objective_id'],
-            'owner_id': kr_data['owner_id'],
-            'target_value': float(kr_data['target_value']),
-            'current_value': float(kr_data['current_value']) if kr_data['current_value'] else 0.0,
-            'start_value': float(kr_data['start_value']) if kr_data['start_value'] else 0.0,
-            'unit': kr_data['unit'],
-            'confidence_level': float(kr_data['confidence_level']) if kr_data['confidence_level'] else None,
-            'status': kr_data['status'],
-            'progress': float(kr_data['progress']) if kr_data['progress'] else 0.0,
-            'created_at': kr_data['created_at'],
-            'updated_at': kr_data['updated_at'],
-            'owner_name': kr_data['owner']['name'] if kr_data.get('owner') else None,
-            'objective_title': kr_data['objective']['title'] if kr_data.get('objective') else 'Objetivo não encontrado'
-        }
-        
-        return KeyResultWithDetails(**formatted_data)
+        return ModelResponse(KEY_RESULT_MAPPER(kr_data))
         
     except HTTPException:
         raise
@@ -466,6 +433,11 @@ async def update_key_result(
         # Atualizar progresso do objetivo
         await update_objective_progress(existing_kr.data['objective_id'])
         
+        # Novos valores de início/meta mudam o progresso de todo o histórico do KR;
+        # valor atual editado direto (sem check-in) muda o ponto de partida da série
+        if 'start_value' in update_data or 'target_value' in update_data or 'current_value' in update_data:
+            evolution_service.mark_dirty(current_user.company_id, rebuild=True)
+        
         # Buscar dados atualizados
         updated_kr = supabase_admin().from_('key_results').select("*").eq('id', str(kr_id)).single().execute()
         
@@ -547,6 +519,7 @@ async def delete_key_result(
         
         # Atualizar progresso do objetivo
         await update_objective_progress(objective_id)
+        evolution_service.mark_dirty(current_user.company_id, rebuild=True)
         
         return {"message": "Key Result deletado com sucesso"}
         
@@ -601,25 +574,12 @@ async def list_checkins(
         checkins_data = response.data if response.data else []
         
         # Converter dados para modelos
-        checkins = []
-        for checkin in checkins_data:
-            formatted_data = {
-                'id': checkin['id'],
-                'key_result_id': checkin['key_result_id'],
-                'author_id': checkin['author_id'],
-                'checkin_date': checkin['checkin_date'],
-                'value_at_checkin': float(checkin['value_at_checkin']),
-                'confidence_level_at_checkin': float(checkin['confidence_level_at_checkin']) if checkin['confidence_level_at_checkin'] else None,
-                'notes': checkin['notes'],
-                'created_at': checkin['created_at'],
-                'author_name': checkin['author']['name'] if checkin.get('author') else None
-            }
-            checkins.append(CheckinWithDetails(**formatted_data))
+        checkins = CHECKIN_MAPPER.many(checkins_data)
         
-        return CheckinListResponse(
+        return ModelResponse(CheckinListResponse(
             checkins=checkins,
             total=len(checkins)
-        )
+        ))
         
     except HTTPException:
         raise
@@ -708,6 +668,7 @@ async def create_checkin(
         
         # Atualizar progresso do objetivo
         await update_objective_progress(kr_check.data['objective_id'])
+        evolution_service.mark_dirty(current_user.company_id)
         
         # Buscar dados completos do check-in criado
         checkin_id = insert_response.data[0]['id']
@@ -846,6 +807,8 @@ async def update_checkin(
                 
                 # Atualizar progresso do objetivo
                 await update_objective_progress(kr_data.data['objective_id'])
+            
+            evolution_service.mark_dirty(current_user.company_id, rebuild=True)
         
         # Buscar dados atualizados
         updated_checkin = supabase_admin().from_('kr_checkins').select("*").eq('id', str(checkin_id)).single().execute()
@@ -922,6 +885,7 @@ async def delete_checkin(
         
         # Deletar check-in
         delete_response = supabase_admin().from_('kr_checkins').delete().eq('id', str(checkin_id)).execute()
+        evolution_service.mark_dirty(current_user.company_id, rebuild=True)
         
         return {"message": "Check-in deletado com sucesso"}
         
@@ -7,7 +7,8 @@ from ..models.user import UserProfile
 from ..models.notification import (
     NotificationFilter, NotificationListResponse, NotificationStatsResponse,
     NotificationSettings, NotificationSettingsUpdate, NotificationSettingsCreate,
-    MarkReadRequest, MarkReadResponse, NotificationType, NotificationPriority
+    MarkReadRequest, MarkReadResponse, NotificationType, NotificationPriority,
+    UnreadCountResponse
 )
 from ..services.notification_service import NotificationService
 
@@ -146,6 +147,29 @@ async def get_notification_stats(
     return NotificationStatsResponse(**stats)
 
 
+@router.get("/unread-count", response_model=UnreadCountResponse)
+async def get_unread_count(
+    current_user: UserProfile = Depends(get_current_user),
+    supabase_admin = Depends(get_supabase_admin)
+):
+    """
+    Retorna a quantidade de notificações não lidas (badge do sino).
+    
+    Lê os contadores mantidos por trigger (notification_counters), com cache
+    em processo invalidado a cada criação/marcação como lida. Alterações feitas
+    por outros processos (alertas agendados, outros workers) aparecem em até
+    NOTIFICATION_COUNTER_SYNC_INTERVAL segundos.
+    """
+    
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="Usuário não possui empresa associada")
+    
+    service = NotificationService(supabase_admin)
+    counters = service.get_counters(current_user.id, str(current_user.company_id))
+    
+    return UnreadCountResponse(unread_count=counters["unread"], total=counters["total"])
+
+
 @router.get("/settings", response_model=NotificationSettings)
 async def get_notification_settings(
     current_user: UserProfile = Depends(get_current_user),
@@ -229,7 +253,7 @@ async def generate_automatic_alerts(
     - Fim de ciclo (aproximação do término)
     - Metas atingidas (100% de progresso)
     
-    **Nota:** Esta funcionalidade normalmente roda automaticamente via cron job.
+    **Nota:** Esta funcionalidade normalmente roda automaticamente via `alert_scheduler.py`.
     """
     
     if not current_user.company_id:
@@ -245,20 +269,8 @@ async def generate_automatic_alerts(
             service = NotificationService(supabase_admin)
             alerts = await service.generate_automatic_alerts(str(current_user.company_id))
             
-            # Cria notificações para cada alerta
-            created_count = 0
-            for alert in alerts:
-                for user_id in alert.user_ids:
-                    await service.create_notification(
-                        user_id=user_id,
-                        company_id=str(current_user.company_id),
-                        notification_type=alert.type,
-                        title=alert.title,
-                        message=alert.message,
-                        data=alert.data,
-                        priority=alert.priority
-                    )
-                    created_count += 1
+            # Cria as notificações em lote, ignorando alertas já enviados no período
+            created_count = await service.create_notifications_bulk(str(current_user.company_id), alerts)
             
             print(f"[ALERTS] Gerados {created_count} alertas para empresa {current_user.company_id}")
             
@@ -309,6 +321,7 @@ async def health_check():
             "GET /api/notifications/",
             "POST /api/notifications/mark-read",
             "GET /api/notifications/stats",
+            "GET /api/notifications/unread-count",
             "GET /api/notifications/settings",
             "PUT /api/notifications/settings",
             "POST /api/notifications/generate-alerts"
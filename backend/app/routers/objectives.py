@@ -10,19 +10,25 @@ from ..models.objective import (
     ObjectiveFilter, ObjectiveListResponse, ObjectiveStatsResponse, ObjectiveStatus
 )
 from ..utils.supabase import supabase_admin
+from ..utils.json_response import ModelResponse
+from ..utils.row_mapper import RowMapper, nested
+from ..utils.cycle_calendar import get_company_calendar
+from ..services.evolution_service import evolution_service
 
 router = APIRouter()
 
+# Linha de objectives com "owner:users(name), cycle:cycles(name)" -> ObjectiveWithDetails
+OBJECTIVE_MAPPER = RowMapper(
+    ObjectiveWithDetails,
+    owner_name=nested('owner', 'name'),
+    cycle_name=nested('cycle', 'name')
+)
+
 async def get_active_cycle_id(company_id: str) -> Optional[str]:
     """Busca o ID do ciclo ativo da empresa"""
     try:
-        response = supabase_admin().from_('cycles').select('id').eq(
-            'company_id', company_id
-        ).eq('is_active', True).execute()
-        
-        if response.data:
-            return response.data[0]['id']
-        return None
+        active_cycle = get_company_calendar(company_id).first_where('is_active')
+        return active_cycle['id'] if active_cycle else None
     except Exception as e:
         print(f"DEBUG: Erro ao buscar ciclo ativo: {e}")
         return None
@@ -106,34 +112,19 @@ async def list_objectives(
         objectives_data = response.data if response.data else []
         
         # Converter dados para modelos
-        objectives = []
-        for obj_data in objectives_data:
-            # Preparar dados para o modelo
-            formatted_data = {
-                'id': obj_data['id'],
-                'title': obj_data['title'],
-                'description': obj_data['description'],
-                'owner_id': obj_data['owner_id'],
-                'company_id': obj_data['company_id'],
-                'cycle_id': obj_data['cycle_id'],
-                'status': obj_data['status'],
-                'progress': float(obj_data['progress']) if obj_data['progress'] else 0.0,
-                'created_at': obj_data['created_at'],
-                'updated_at': obj_data['updated_at'],
-                'owner_name': obj_data['owner']['name'] if obj_data.get('owner') else None,
-                'cycle_name': obj_data['cycle']['name'] if obj_data.get('cycle') and obj_data['cycle'] else None,
-                'key_results_count': await get_key_results_count(obj_data['id'])
-            }
-            objectives.append(ObjectiveWithDetails(**formatted_data))
+        objectives = [
+            OBJECTIVE_MAPPER(obj_data, key_results_count=await get_key_results_count(obj_data['id']))
+            for obj_data in objectives_data
+        ]
         
         has_more = (offset + limit) < total
         
-        return ObjectiveListResponse(
+        return ModelResponse(ObjectiveListResponse(
             objectives=objectives,
             total=total,
             has_more=has_more,
             filters_applied=filters
-        )
+        ))
         
     except HTTPException:
         raise
@@ -226,6 +217,8 @@ async def create_objective(
                 detail="Objetivo criado mas erro ao buscar dados"
             )
         
+        evolution_service.mark_dirty(current_user.company_id)
+        
         return Objective(**full_objective.data)
         
     except HTTPException:
@@ -265,24 +258,7 @@ async def get_objective(
         
         obj_data = response.data
         
-        # Preparar dados para o modelo
-        formatted_data = {
-            'id': obj_data['id'],
-            'title': obj_data['title'],
-            'description': obj_data['description'],
-            'owner_id': obj_data['owner_id'],
-            'company_id': obj_data['company_id'],
-            'cycle_id': obj_data['cycle_id'],
-            'status': obj_data['status'],
-            'progress': float(obj_data['progress']) if obj_data['progress'] else 0.0,
-            'created_at': obj_data['created_at'],
-            'updated_at': obj_data['updated_at'],
-            'owner_name': obj_data['owner']['name'] if obj_data.get('owner') else None,
-            'cycle_name': obj_data['cycle']['name'] if obj_data.get('cycle') and obj_data['cycle'] else None,
-            'key_results_count': await get_key_results_count(obj_data['id'])
-        }
-        
-        return ObjectiveWithDetails(**formatted_data)
+        return ModelResponse(OBJECTIVE_MAPPER(obj_data, key_results_count=await get_key_results_count(obj_data['id'])))
         
     except HTTPException:
         raise
@@ -424,6 +400,7 @@ async def delete_objective(
         
         # Deletar objetivo
         delete_response = supabase_admin().from_('objectives').delete().eq('id', str(objective_id)).execute()
+        evolution_service.mark_dirty(current_user.company_id, rebuild=True)
         
         return {"message": "Objetivo deletado com sucesso"}
         
@@ -457,14 +434,14 @@ async def get_objectives_stats(current_user: UserProfile = Depends(get_current_u
         
         if not objectives_data:
             # Retornar stats zeradas se não há dados
-            return ObjectiveStatsResponse(
+            return ModelResponse(ObjectiveStatsResponse(
                 total_objectives=0,
                 by_status={status: 0 for status in ObjectiveStatus},
                 average_progress=0.0,
                 completed_count=0,
                 in_progress_count=0,
                 planned_count=0
-            )
+            ))
         
         # Calcular estatísticas
         total_objectives = len(objectives_data)
@@ -489,14 +466,14 @@ async def get_objectives_stats(current_user: UserProfile = Depends(get_current_u
             elif obj_status == 'PLANNED':
                 planned_count += 1
         
-        return ObjectiveStatsResponse(
+        return ModelResponse(ObjectiveStatsResponse(
             total_objectives=total_objectives,
             by_status=status_counts,
             average_progress=round(average_progress, 2),
             completed_count=completed_count,
             in_progress_count=in_progress_count,
             planned_count=planned_count
-        )
+        ))
         
     except HTTPException:
         raise
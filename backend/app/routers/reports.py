@@ -1,22 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from fastapi.responses import FileResponse
-from typing import List, Optional, Dict, Any
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import List, Optional, Dict, Any, Sequence
 from datetime import datetime, timedelta
 import os
 import tempfile
 from uuid import uuid4
 import asyncio
 import re
+import shutil
 
 from ..dependencies import get_current_user
-from ..models.user import UserProfile
+from ..models.user import UserProfile, UserRole
 from ..models.reports import (
     ReportRequest, ReportResponse, ReportListResponse, 
     AvailableFormatsResponse, ReportMetadata, ReportFormat,
-    ReportType, ReportStatus, ReportContent, DashboardReportData,
-    ObjectiveReportData, KeyResultReportData, ReportFilters
+    ReportType, ReportStatus, ReportContent, ReportFilters,
+    ReportScheduleCreate, ReportSchedule, ReportScheduleListResponse
 )
-from ..services.report_generator import ReportGenerator
+from ..services.columnar_report import ARROW_AVAILABLE, EXTENSIONS as COLUMNAR_EXTENSIONS, MEDIA_TYPES as COLUMNAR_MEDIA_TYPES, stream_columnar
+from ..services.report_data import (
+    get_dashboard_data_for_report, get_evolution_for_report, get_key_results_for_report,
+    get_objectives_for_report, get_single_objective_for_report
+)
+from ..services.report_generator import ReportGenerator, columnar_metadata
+from ..services.report_rows import KEY_RESULT_COLUMNS, OBJECTIVE_COLUMNS, ReportColumn, select_columns
+from ..services.report_scheduler import SCHEDULE_TABLE, next_run_at, schedule_dir
+from ..utils.cron import CronExpression
 from ..utils.supabase import supabase_admin
 
 router = APIRouter()
@@ -25,374 +34,15 @@ router = APIRouter()
 reports_cache: Dict[str, ReportMetadata] = {}
 reports_files: Dict[str, str] = {}  # ID -> filepath
 
-def safe_parse_datetime(date_string: str) -> datetime:
-    """
-    Função helper para parser seguro de datas ISO que podem ter microssegundos com muitos dígitos
-    """
-    if not date_string:
-        return datetime.now()
-    
-    try:
-        # Remover Z e adicionar timezone UTC
-        clean_date = date_string.replace('Z', '+00:00')
-        
-        # Se tem microssegundos com mais de 6 dígitos, truncar para 6
-        if '.' in clean_date and '+' in clean_date:
-            parts = clean_date.split('+')
-            date_part = parts[0]
-            tz_part = '+' + parts[1]
-            
-            if '.' in date_part:
-                main_part, microsec_part = date_part.split('.')
-                # Truncar microssegundos para 6 dígitos
-                microsec_part = microsec_part[:6].ljust(6, '0')
-                clean_date = f"{main_part}.{microsec_part}{tz_part}"
-        
-        return datetime.fromisoformat(clean_date)
-    except Exception as e:
-        print(f"DEBUG: Erro ao parser data '{date_string}': {e}")
-        return datetime.now()
-
-async def get_company_data(company_id: str):
-    """Busca dados da empresa"""
-    try:
-        response = supabase_admin().from_('companies').select('name').eq('id', company_id).single().execute()
-        return response.data if response.data else None
-    except Exception as e:
-        print(f"DEBUG: Erro ao buscar empresa: {e}")
-        return None
-
-async def get_single_objective_for_report(company_id: str, objective_id: str) -> Optional[ObjectiveReportData]:
-    """Busca dados detalhados de um objetivo específico para relatório"""
-    try:
-        # Buscar o objetivo
-        response = supabase_admin().from_('objectives').select(
-            '''
-            id, title, description, owner_id, company_id, cycle_id, 
-            status, progress, created_at, updated_at,
-            owner:users!owner_id(name),
-            cycle:cycles!cycle_id(name)
-            '''
-        ).eq('company_id', company_id).eq('id', objective_id).single().execute()
-        
-        if not response.data:
-            return None
-        
-        obj = response.data
-        
-        # Buscar Key Results detalhados do objetivo
-        kr_response = supabase_admin().from_('key_results').select(
-            '''
-            id, title, description, objective_id, owner_id, target_value,
-            current_value, start_value, unit, status, progress, confidence_level,
-            created_at, updated_at,
-            owner:users!owner_id(name)
-            '''
-        ).eq('objective_id', objective_id).execute()
-        
-        kr_data = kr_response.data if kr_response.data else []
-        
-        # Contar Key Results
-        kr_count = len(kr_data)
-        kr_completed = len([kr for kr in kr_data if kr.get('status') == 'COMPLETED'])
-        
-        # Formatar Key Results para incluir no relatório
-        formatted_key_results = []
-        for kr in kr_data:
-            # Buscar check-ins do Key Result
-            checkins_response = supabase_admin().from_('kr_checkins').select(
-                'id, checkin_date, value_at_checkin, notes, confidence_level_at_checkin'
-            ).eq('key_result_id', kr['id']).order('checkin_date', desc=True).limit(5).execute()
-            
-            checkins_data = checkins_response.data if checkins_response.data else []
-            
-            formatted_key_results.append({
-                'id': kr['id'],
-                'title': kr['title'],
-                'description': kr.get('description'),
-                'objective_id': kr['objective_id'],
-                'target_value': float(kr.get('target_value', 0)) if kr.get('target_value') else None,
-                'current_value': float(kr.get('current_value', 0)) if kr.get('current_value') else None,
-                'start_value': float(kr.get('start_value', 0)) if kr.get('start_value') else None,
-                'unit': kr.get('unit'),
-                'status': kr.get('status'),
-                'progress': float(kr.get('progress', 0)) if kr.get('progress') else 0.0,
-                'confidence_level': float(kr.get('confidence_level', 0)) if kr.get('confidence_level') else None,
-                'owner_name': kr['owner']['name'] if kr.get('owner') else None,
-                'created_at': kr['created_at'],
-                'updated_at': kr['updated_at'],
-                'recent_checkins': checkins_data
-            })
-        
-        return ObjectiveReportData(
-            id=obj['id'],
-            title=obj['title'],
-            description=obj.get('description'),
-            owner_name=obj['owner']['name'] if obj.get('owner') else None,
-            cycle_name=obj['cycle']['name'] if obj.get('cycle') else 'Sem ciclo',
-            status=obj.get('status', 'PLANNED'),
-            progress=float(obj.get('progress', 0)),
-            created_at=safe_parse_datetime(obj['created_at']),
-            updated_at=safe_parse_datetime(obj['updated_at']),
-            key_results_count=kr_count,
-            key_results_completed=kr_completed,
-            key_results=formatted_key_results
-        )
-    
-    except Exception as e:
-        print(f"DEBUG: Erro ao buscar objetivo para relatório: {e}")
-        return None
-
-async def get_objectives_for_report(company_id: str, filters: ReportFilters) -> List[ObjectiveReportData]:
-    """Busca objetivos formatados para relatório"""
-    try:
-        # Query base
-        query = supabase_admin().from_('objectives').select(
-            '''
-            id, title, description, owner_id, company_id, cycle_id, 
-            status, progress, created_at, updated_at,
-            owner:users!owner_id(name),
-            cycle:cycles!cycle_id(name)
-            '''
-        ).eq('company_id', company_id)
-        
-        # Aplicar filtros
-        if filters.search:
-            # Para busca, faremos client-side filtering (idealmente seria no banco)
-            pass
-        
-        if filters.status:
-            query = query.in_('status', filters.status)
-            
-        if filters.owner_id:
-            query = query.eq('owner_id', filters.owner_id)
-            
-        if filters.cycle_id:
-            query = query.eq('cycle_id', filters.cycle_id)
-        
-        response = query.execute()
-        objectives_data = response.data if response.data else []
-        
-        # Buscar contagem de Key Results para cada objetivo
-        objectives_with_kr_count = []
-        
-        for obj in objectives_data:
-            # Filtrar por busca textual se necessário
-            if filters.search:
-                search_term = filters.search.lower()
-                if (search_term not in obj.get('title', '').lower() and 
-                    search_term not in obj.get('description', '').lower()):
-                    continue
-            
-            # Contar Key Results
-            kr_response = supabase_admin().from_('key_results').select(
-                'id, status'
-            ).eq('objective_id', obj['id']).execute()
-            
-            kr_data = kr_response.data if kr_response.data else []
-            kr_count = len(kr_data)
-            kr_completed = len([kr for kr in kr_data if kr.get('status') == 'COMPLETED'])
-            
-            # Incluir Key Results se solicitado
-            key_results = None
-            if filters.include_key_results:
-                kr_detailed = supabase_admin().from_('key_results').select(
-                    'id, title, current_value, target_value, unit, status, progress'
-                ).eq('objective_id', obj['id']).execute()
-                key_results = kr_detailed.data if kr_detailed.data else []
-            
-            objectives_with_kr_count.append(ObjectiveReportData(
-                id=obj['id'],
-                title=obj['title'],
-                description=obj.get('description'),
-                owner_name=obj['owner']['name'] if obj.get('owner') else None,
-                cycle_name=obj['cycle']['name'] if obj.get('cycle') else 'Sem ciclo',
-                status=obj.get('status', 'PLANNED'),
-                progress=float(obj.get('progress', 0)),
-                created_at=safe_parse_datetime(obj['created_at']),
-                updated_at=safe_parse_datetime(obj['updated_at']),
-                key_results_count=kr_count,
-                key_results_completed=kr_completed,
-                key_results=key_results
-            ))
-        
-        return objectives_with_kr_count
-    
-    except Exception as e:
-        print(f"DEBUG: Erro ao buscar objetivos para relatório: {e}")
-        return []
-
-async def get_key_results_for_report(company_id: str, filters: ReportFilters) -> List[KeyResultReportData]:
-    """Busca Key Results formatados para relatório"""
-    try:
-        # Se filtro por objetivo específico, usar diretamente
-        if filters.objective_id:
-            objective_ids = [filters.objective_id]
-        else:
-            # Primeiro, buscar objetivos da empresa
-            objectives_response = supabase_admin().from_('objectives').select('id').eq('company_id', company_id).execute()
-            
-            if not objectives_response.data:
-                return []
-            
-            objective_ids = [obj['id'] for obj in objectives_response.data]
-        
-        # Buscar Key Results
-        query = supabase_admin().from_('key_results').select(
-            '''
-            id, title, description, objective_id, owner_id, target_value,
-            current_value, start_value, unit, status, progress, confidence_level,
-            created_at, updated_at,
-            owner:users!owner_id(name),
-            objective:objectives!objective_id(title)
-            '''
-        ).in_('objective_id', objective_ids)
-        
-        # Aplicar filtros
-        if filters.status:
-            query = query.in_('status', filters.status)
-            
-        if filters.owner_id:
-            query = query.eq('owner_id', filters.owner_id)
-        
-        response = query.execute()
-        kr_data = response.data if response.data else []
-        
-        # Processar dados
-        key_results = []
-        
-        for kr in kr_data:
-            # Filtrar por busca textual se necessário
-            if filters.search:
-                search_term = filters.search.lower()
-                if (search_term not in kr.get('title', '').lower() and 
-                    search_term not in kr.get('description', '').lower()):
-                    continue
-            
-            # Contar check-ins e buscar último
-            checkins_response = supabase_admin().from_('kr_checkins').select(
-                'id, checkin_date'
-            ).eq('key_result_id', kr['id']).order('checkin_date', desc=True).execute()
-            
-            checkins_data = checkins_response.data if checkins_response.data else []
-            checkins_count = len(checkins_data)
-            last_checkin_date = None
-            
-            if checkins_data:
-                last_checkin_date = safe_parse_datetime(checkins_data[0]['checkin_date'])
-            
-            key_results.append(KeyResultReportData(
-                id=kr['id'],
-                title=kr['title'],
-                description=kr.get('description'),
-                objective_title=kr['objective']['title'] if kr.get('objective') else 'Objetivo não encontrado',
-                owner_name=kr['owner']['name'] if kr.get('owner') else None,
-                target_value=float(kr.get('target_value', 0)),
-                current_value=float(kr.get('current_value', 0)),
-                start_value=float(kr.get('start_value', 0)),
-                unit=kr.get('unit', 'NUMBER'),
-                status=kr.get('status', 'PLANNED'),
-                progress=float(kr.get('progress', 0)),
-                confidence_level=float(kr.get('confidence_level', 0)) if kr.get('confidence_level') else None,
-                created_at=safe_parse_datetime(kr['created_at']),
-                updated_at=safe_parse_datetime(kr['updated_at']),
-                checkins_count=checkins_count,
-                last_checkin_date=last_checkin_date
-            ))
-        
-        return key_results
-    
-    except Exception as e:
-        print(f"DEBUG: Erro ao buscar Key Results para relatório: {e}")
-        return []
-
-async def get_dashboard_data_for_report(company_id: str) -> DashboardReportData:
-    """Busca dados do dashboard para relatório"""
-    try:
-        # Buscar empresa
-        company_data = await get_company_data(company_id)
-        
-        # Buscar estatísticas
-        objectives_data = await get_objectives_for_report(company_id, ReportFilters())
-        key_results_data = await get_key_results_for_report(company_id, ReportFilters())
-        
-        # Contar usuários ativos
-        users_response = supabase_admin().from_('users').select('id').eq(
-            'company_id', company_id
-        ).eq('is_active', True).execute()
-        active_users = len(users_response.data) if users_response.data else 0
-        
-        # Buscar ciclo ativo
-        cycle_response = supabase_admin().from_('cycles').select(
-            'name'
-        ).eq('company_id', company_id).eq('is_active', True).execute()
-        
-        active_cycle_name = None
-        if cycle_response.data:
-            active_cycle_name = cycle_response.data[0]['name']
-        
-        # Calcular métricas
-        total_objectives = len(objectives_data)
-        total_key_results = len(key_results_data)
-        
-        # Progresso geral
-        overall_progress = 0.0
-        if objectives_data:
-            overall_progress = sum(obj.progress for obj in objectives_data) / len(objectives_data)
-        
-        # Contadores por status
-        objectives_by_status = {}
-        for obj in objectives_data:
-            status = obj.status
-            objectives_by_status[status] = objectives_by_status.get(status, 0) + 1
-        
-        # Taxas de conclusão
-        completed_count = objectives_by_status.get('COMPLETED', 0)
-        on_track_count = objectives_by_status.get('ON_TRACK', 0)
-        
-        completion_rate = (completed_count / total_objectives * 100) if total_objectives > 0 else 0
-        on_track_rate = ((completed_count + on_track_count) / total_objectives * 100) if total_objectives > 0 else 0
-        
-        return DashboardReportData(
-            company_name=company_data.get('name', 'Empresa') if company_data else 'Empresa',
-            report_period=f"Até {datetime.now().strftime('%d/%m/%Y')}",
-            generation_date=datetime.now(),
-            total_objectives=total_objectives,
-            total_key_results=total_key_results,
-            active_users=active_users,
-            active_cycle_name=active_cycle_name,
-            overall_progress=overall_progress,
-            objectives_by_status=objectives_by_status,
-            completion_rate=completion_rate,
-            on_track_rate=on_track_rate
-        )
-    
-    except Exception as e:
-        print(f"DEBUG: Erro ao buscar dados do dashboard para relatório: {e}")
-        # Retornar dados mínimos em caso de erro
-        return DashboardReportData(
-            company_name="Empresa",
-            report_period=f"Até {datetime.now().strftime('%d/%m/%Y')}",
-            generation_date=datetime.now(),
-            total_objectives=0,
-            total_key_results=0,
-            active_users=0,
-            active_cycle_name=None,
-            overall_progress=0.0,
-            objectives_by_status={},
-            completion_rate=0.0,
-            on_track_rate=0.0
-        )
-
 async def generate_report_async(report_id: str, content: ReportContent, format: ReportFormat):
     """Gerar relatório em background"""
     try:
         # Atualizar status para PROCESSING
         reports_cache[report_id].status = ReportStatus.PROCESSING
         
-        # Gerar relatório
+        # Gerar relatório (em thread: a renderização é CPU-bound e não pode travar o event loop)
         generator = ReportGenerator(output_dir=tempfile.gettempdir())
-        filepath = generator.generate_report(content, format)
+        filepath = await asyncio.to_thread(generator.generate_report, content, format)
         
         # Armazenar arquivo
         reports_files[report_id] = filepath
@@ -424,7 +74,9 @@ async def get_available_formats(current_user: UserProfile = Depends(get_current_
             "name": "CSV",
             "description": "Arquivo CSV separado por ponto e vírgula",
             "extension": ".csv",
-            "supports_charts": False
+            "supports_charts": False,
+            "supports_compression": True,
+            "note": "compress=true gera .csv.gz"
         },
         {
             "format": "EXCEL",
@@ -432,7 +84,7 @@ async def get_available_formats(current_user: UserProfile = Depends(get_current_
             "description": "Planilha do Microsoft Excel com múltiplas abas",
             "extension": ".xlsx",
             "supports_charts": False,
-            "note": "Requer pandas instalado"
+            "note": "Requer openpyxl instalado"
         },
         {
             "format": "PDF",
@@ -441,11 +93,106 @@ async def get_available_formats(current_user: UserProfile = Depends(get_current_
             "extension": ".pdf",
             "supports_charts": True,
             "note": "Requer reportlab instalado"
+        },
+        {
+            "format": "PARQUET",
+            "name": "Parquet",
+            "description": "Colunas tipadas (números, datas, enums) com compressão, para BI/data warehouse",
+            "extension": ".parquet",
+            "supports_charts": False,
+            "supports_columns": True,
+            "report_types": ["OBJECTIVES", "KEY_RESULTS"],
+            "columns": {
+                "OBJECTIVES": [column.key for column in OBJECTIVE_COLUMNS],
+                "KEY_RESULTS": [column.key for column in KEY_RESULT_COLUMNS]
+            },
+            "streaming": True,
+            "available": ARROW_AVAILABLE,
+            "note": "Requer pyarrow instalado"
+        },
+        {
+            "format": "ARROW",
+            "name": "Arrow IPC",
+            "description": "Arrow IPC stream com as mesmas colunas tipadas do Parquet",
+            "extension": ".arrows",
+            "supports_charts": False,
+            "supports_columns": True,
+            "report_types": ["OBJECTIVES", "KEY_RESULTS"],
+            "columns": {
+                "OBJECTIVES": [column.key for column in OBJECTIVE_COLUMNS],
+                "KEY_RESULTS": [column.key for column in KEY_RESULT_COLUMNS]
+            },
+            "streaming": True,
+            "available": ARROW_AVAILABLE,
+            "note": "Requer pyarrow instalado"
         }
     ]
     
     return AvailableFormatsResponse(formats=formats)
 
+def get_columnar_columns(report_request: ReportRequest) -> Optional[Sequence[ReportColumn]]:
+    """Colunas de uma exportação Parquet/Arrow (None para os demais formatos); 400 se o pedido for inválido"""
+    if report_request.format not in (ReportFormat.PARQUET, ReportFormat.ARROW):
+        return None
+    if not ARROW_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato indisponível: pyarrow não instalado"
+        )
+    
+    if report_request.report_type == ReportType.OBJECTIVES:
+        available = OBJECTIVE_COLUMNS
+    elif report_request.report_type == ReportType.KEY_RESULTS:
+        available = KEY_RESULT_COLUMNS
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet/Arrow exportam uma tabela: use o tipo OBJECTIVES ou KEY_RESULTS"
+        )
+    
+    try:
+        return select_columns(available, report_request.filters.columns if report_request.filters else None)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.post("/export/stream", summary="Exportar Parquet/Arrow em streaming")
+async def export_report_stream(
+    report_request: ReportRequest,
+    current_user: UserProfile = Depends(get_current_user)
+):
+    """
+    Exporta objetivos ou Key Results em Parquet/Arrow direto na resposta, lote a lote,
+    sem arquivo intermediário nem etapa de download. Com filters.columns, só os campos
+    dessas colunas são buscados no banco.
+    """
+    if not current_user.company_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Usuário não possui empresa associada"
+        )
+    
+    columns = get_columnar_columns(report_request)
+    if columns is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Streaming disponível apenas para os formatos PARQUET e ARROW"
+        )
+    
+    company_id = str(current_user.company_id)
+    filters = report_request.filters or ReportFilters()
+    if report_request.report_type == ReportType.OBJECTIVES:
+        items = await get_objectives_for_report(company_id, filters, columns, include_nested=False)
+    else:
+        items = await get_key_results_for_report(company_id, filters, columns)
+    
+    format = report_request.format.value
+    filename = f"{report_request.name.replace(' ', '_')}{COLUMNAR_EXTENSIONS[format]}"
+    return StreamingResponse(
+        stream_columnar(items, columns, format, columnar_metadata(report_request.report_type.value, report_request.name)),
+        media_type=COLUMNAR_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
 @router.post("/export", response_model=ReportResponse, summary="Gerar relatório para exportação")
 async def export_report(
     report_request: ReportRequest,
@@ -465,6 +212,9 @@ async def export_report(
         
         company_id = str(current_user.company_id)
         
+        # Parquet/Arrow: valida tipo/colunas antes de buscar (só as colunas pedidas são buscadas)
+        columns = get_columnar_columns(report_request)
+        
         # Gerar ID único para o relatório
         report_id = str(uuid4())
         
@@ -476,6 +226,8 @@ async def export_report(
             format=report_request.format,
             status=ReportStatus.PENDING,
             filters_applied=report_request.filters,
+            include_charts=report_request.include_charts and report_request.format == ReportFormat.PDF,
+            compressed=report_request.compress and report_request.format == ReportFormat.CSV,
             records_count=0,
             generation_started_at=datetime.now()
         )
@@ -517,17 +269,26 @@ async def export_report(
             key_results = []
         
         elif report_request.report_type in [ReportType.OBJECTIVES, ReportType.COMPLETE]:
-            objectives = await get_objectives_for_report(company_id, report_request.filters)
+            objectives = await get_objectives_for_report(
+                company_id, report_request.filters, columns, include_nested=columns is None
+            )
         
         if report_request.report_type in [ReportType.KEY_RESULTS, ReportType.COMPLETE]:
-            key_results = await get_key_results_for_report(company_id, report_request.filters)
+            key_results = await get_key_results_for_report(company_id, report_request.filters, columns)
+        
+        # Série de evolução para o gráfico (apenas PDF com gráficos)
+        evolution = None
+        if metadata.include_charts and report_request.report_type in [ReportType.DASHBOARD, ReportType.COMPLETE, ReportType.SINGLE_OBJECTIVE]:
+            single_objective_id = report_request.filters.objective_id if report_request.report_type == ReportType.SINGLE_OBJECTIVE else None
+            evolution = await get_evolution_for_report(company_id, single_objective_id)
         
         # Criar conteúdo do relatório
         content = ReportContent(
             metadata=metadata,
             dashboard_data=dashboard_data,
             objectives=objectives,
-            key_results=key_results
+            key_results=key_results,
+            evolution=evolution
         )
         
         # Atualizar contagem de registros
@@ -582,6 +343,30 @@ async def get_report_status(
     
     return reports_cache[report_id]
 
+def report_file_response(filepath: str, name: str, format: ReportFormat, compressed: bool = False) -> FileResponse:
+    """Arquivo de relatório como anexo (extensão e media type pelo formato)"""
+    extension_map = {
+        ReportFormat.CSV: '.csv',
+        ReportFormat.EXCEL: '.xlsx',
+        ReportFormat.PDF: '.pdf',
+        ReportFormat.PARQUET: COLUMNAR_EXTENSIONS['PARQUET'],
+        ReportFormat.ARROW: COLUMNAR_EXTENSIONS['ARROW']
+    }
+    
+    extension = extension_map.get(format, '.txt')
+    media_type = COLUMNAR_MEDIA_TYPES.get(format.value, 'application/octet-stream')
+    if compressed:
+        extension += '.gz'
+        media_type = 'application/gzip'
+    filename = f"{name.replace(' ', '_')}{extension}"
+    
+    return FileResponse(
+        filepath,
+        media_type=media_type,
+        filename=filename,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
 @router.get("/{report_id}/download", summary="Download do relatório gerado")
 async def download_report(
     report_id: str,
@@ -625,22 +410,7 @@ async def download_report(
             detail="Relatório expirado"
         )
     
-    # Determinar nome do arquivo
-    extension_map = {
-        ReportFormat.CSV: '.csv',
-        ReportFormat.EXCEL: '.xlsx',
-        ReportFormat.PDF: '.pdf'
-    }
-    
-    extension = extension_map.get(report_metadata.format, '.txt')
-    filename = f"{report_metadata.name.replace(' ', '_')}{extension}"
-    
-    return FileResponse(
-        filepath,
-        media_type='application/octet-stream',
-        filename=filename,
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+    return report_file_response(filepath, report_metadata.name, report_metadata.format, report_metadata.compressed)
 
 @router.get("/", response_model=ReportListResponse, summary="Listar relatórios do usuário")
 async def list_user_reports(current_user: UserProfile = Depends(get_current_user)):
@@ -706,4 +476,207 @@ async def delete_report(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro interno do servidor"
-        ) 
\ No newline at end of file
+        )
+
+# ---------- Relatórios agendados (gerados pelo report_scheduler.py) ----------
+
+def check_schedule_permission(current_user: UserProfile):
+    """Agendamentos valem para a empresa: só owner/admin/manager podem alterá-los"""
+    if not current_user.company_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Usuário não possui empresa associada"
+        )
+    if not current_user.is_owner and current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas owners, administradores e gerentes podem gerenciar relatórios agendados"
+        )
+
+def validate_schedule(schedule: ReportScheduleCreate):
+    """400 para cron inválido ou definição que o agendador não gera"""
+    try:
+        CronExpression.parse(schedule.cron)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    if schedule.report_type == ReportType.SINGLE_OBJECTIVE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Relatórios de objetivo único não podem ser agendados: use OBJECTIVES com filtro"
+        )
+    
+    get_columnar_columns(ReportRequest(
+        name=schedule.name,
+        report_type=schedule.report_type,
+        format=schedule.format,
+        filters=schedule.filters
+    ))
+
+def schedule_row(schedule: ReportScheduleCreate) -> Dict[str, Any]:
+    return {
+        "name": schedule.name,
+        "report_type": schedule.report_type.value,
+        "format": schedule.format.value,
+        "filters": (schedule.filters or ReportFilters()).model_dump(mode="json", exclude_none=True),
+        "include_charts": schedule.include_charts,
+        "compress": schedule.compress,
+        "cron": schedule.cron,
+        "enabled": schedule.enabled,
+    }
+
+def schedule_from_row(row: Dict[str, Any]) -> ReportSchedule:
+    has_file = row.get("last_file_path") and row.get("last_status") == ReportStatus.COMPLETED.value
+    return ReportSchedule(
+        **{key: value for key, value in row.items() if key in ReportSchedule.model_fields},
+        download_url=f"/api/reports/schedules/{row['id']}/latest" if has_file else None
+    )
+
+def get_company_schedule(schedule_id: str, company_id: str) -> Dict[str, Any]:
+    response = supabase_admin().from_(SCHEDULE_TABLE).select("*").eq(
+        'id', schedule_id
+    ).eq('company_id', company_id).execute()
+    if not response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Agendamento não encontrado"
+        )
+    return response.data[0]
+
+@router.post("/schedules", response_model=ReportSchedule, status_code=status.HTTP_201_CREATED, summary="Agendar relatório")
+async def create_report_schedule(
+    schedule: ReportScheduleCreate,
+    current_user: UserProfile = Depends(get_current_user)
+):
+    """
+    Cria um relatório recorrente (expressão cron no fuso REPORT_SCHEDULE_TIMEZONE).
+    O agendador gera o arquivo fora do pico, com um deslocamento fixo por agendamento,
+    e o último arquivo fica disponível em /schedules/{id}/latest.
+    """
+    check_schedule_permission(current_user)
+    validate_schedule(schedule)
+    
+    try:
+        schedule_id = str(uuid4())
+        row = schedule_row(schedule)
+        row.update({
+            "id": schedule_id,
+            "company_id": str(current_user.company_id),
+            "created_by": str(current_user.id),
+            "next_run_at": next_run_at(schedule.cron, schedule_id).isoformat() if schedule.enabled else None,
+        })
+        response = supabase_admin().from_(SCHEDULE_TABLE).insert(row).execute()
+        return schedule_from_row(response.data[0])
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"DEBUG: Erro ao criar agendamento de relatório: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro interno do servidor"
+        )
+
+@router.get("/schedules", response_model=ReportScheduleListResponse, summary="Listar relatórios agendados")
+async def list_report_schedules(current_user: UserProfile = Depends(get_current_user)):
+    """
+    Lista os relatórios agendados da empresa, com o estado da última execução.
+    """
+    if not current_user.company_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Usuário não possui empresa associada"
+        )
+    
+    try:
+        response = supabase_admin().from_(SCHEDULE_TABLE).select("*").eq(
+            'company_id', str(current_user.company_id)
+        ).order('created_at').execute()
+        schedules = [schedule_from_row(row) for row in response.data or []]
+        return ReportScheduleListResponse(schedules=schedules, total=len(schedules))
+        
+    except Exception as e:
+        print(f"DEBUG: Erro ao listar agendamentos de relatório: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro interno do servidor"
+        )
+
+@router.put("/schedules/{schedule_id}", response_model=ReportSchedule, summary="Atualizar relatório agendado")
+async def update_report_schedule(
+    schedule_id: str,
+    schedule: ReportScheduleCreate,
+    current_user: UserProfile = Depends(get_current_user)
+):
+    """
+    Substitui a definição do agendamento e recalcula a próxima execução.
+    Mudar tipo, formato ou filtros descarta o snapshot incremental na próxima execução.
+    """
+    check_schedule_permission(current_user)
+    validate_schedule(schedule)
+    get_company_schedule(schedule_id, str(current_user.company_id))
+    
+    try:
+        row = schedule_row(schedule)
+        row.update({
+            "next_run_at": next_run_at(schedule.cron, schedule_id).isoformat() if schedule.enabled else None,
+            "updated_at": datetime.utcnow().isoformat(),
+        })
+        response = supabase_admin().from_(SCHEDULE_TABLE).update(row).eq('id', schedule_id).execute()
+        return schedule_from_row(response.data[0])
+        
+    except Exception as e:
+        print(f"DEBUG: Erro ao atualizar agendamento de relatório: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro interno do servidor"
+        )
+
+@router.delete("/schedules/{schedule_id}", summary="Remover relatório agendado")
+async def delete_report_schedule(
+    schedule_id: str,
+    current_user: UserProfile = Depends(get_current_user)
+):
+    """
+    Remove o agendamento, o último arquivo gerado e o snapshot incremental.
+    """
+    check_schedule_permission(current_user)
+    get_company_schedule(schedule_id, str(current_user.company_id))
+    
+    try:
+        supabase_admin().from_(SCHEDULE_TABLE).delete().eq('id', schedule_id).execute()
+        shutil.rmtree(schedule_dir(schedule_id), ignore_errors=True)
+        return {"message": "Agendamento removido com sucesso"}
+        
+    except Exception as e:
+        print(f"DEBUG: Erro ao remover agendamento de relatório: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro interno do servidor"
+        )
+
+@router.get("/schedules/{schedule_id}/latest", summary="Download do último relatório agendado")
+async def download_latest_scheduled_report(
+    schedule_id: str,
+    current_user: UserProfile = Depends(get_current_user)
+):
+    """
+    Faz download do último arquivo gerado pelo agendamento, sem gerar nada na API.
+    """
+    if not current_user.company_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Usuário não possui empresa associada"
+        )
+    
+    row = get_company_schedule(schedule_id, str(current_user.company_id))
+    filepath = row.get("last_file_path")
+    if not filepath or not os.path.exists(filepath):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="O agendamento ainda não gerou nenhum arquivo"
+        )
+    
+    report_format = ReportFormat(row["format"])
+    compressed = bool(row.get("compress")) and report_format == ReportFormat.CSV
+    return report_file_response(filepath, row["name"], report_format, compressed)
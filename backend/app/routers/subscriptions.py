@@ -1,12 +1,15 @@
+import asyncio
+import hmac
+
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from supabase import Client
-import requests
 
-from ..dependencies import get_current_user
-from ..models.subscription import SubscriptionCreatePayload, SubscriptionDB, SubscriptionCancelResponse, SubscriptionDetails, CreditCardHolderInfoAsaas
+from ..core.settings import settings
+from ..dependencies import get_current_user, get_supabase_admin
+from ..models.subscription import SubscriptionCreatePayload, SubscriptionDB, SubscriptionCancelResponse, SubscriptionDetails, CreditCardHolderInfoAsaas, SubscriptionEntitlement
 from ..models.user import UserProfile
-from ..utils.asaas import asaas_request
-from ..utils.supabase import supabase_client
+from ..services.subscription_service import subscription_service, invalidate_entitlements, UnknownSubscriptionError
+from ..utils.asaas import asaas_request, AsaasError
 
 router = APIRouter()
 
@@ -15,7 +18,7 @@ async def create_subscription(
     request: Request,
     subscription_payload: SubscriptionCreatePayload,
     current_user: UserProfile = Depends(get_current_user),
-    supabase: Client = Depends(lambda: supabase_client)
+    supabase: Client = Depends(get_supabase_admin)
 ):
     """
     Cria uma nova assinatura no Asaas para o usuário autenticado
@@ -86,7 +89,7 @@ async def create_subscription(
         # Chamar a API do Asaas para criar a assinatura
         # O endpoint para criar assinatura é POST /v3/subscriptions
         # Ref: https://docs.asaas.com/reference/criar-nova-assinatura
-        asaas_response = asaas_request("POST", "subscriptions", data=asaas_payload)
+        asaas_response = await asaas_request("POST", "subscriptions", data=asaas_payload)
         asaas_subscription_data = asaas_response.json()
         asaas_subscription_id = asaas_subscription_data.get("id")
         asaas_subscription_status = asaas_subscription_data.get("status")
@@ -120,35 +123,66 @@ async def create_subscription(
                 detail="Erro ao salvar dados da assinatura no banco de dados."
             )
 
+        invalidate_entitlements([current_user.id])
+
         # Retornar os dados da assinatura criada
         # A resposta da inserção geralmente retorna os dados inseridos.
         # Podemos retornar o objeto SubscriptionDB ou um subset relevante.
         # Para simplificar, retornaremos uma confirmação e o ID do Asaas e status.
         return {"subscription_id": asaas_subscription_id, "status": asaas_subscription_status}
 
-    except requests.exceptions.RequestException as e:
-        detail = f"Erro na comunicação com Asaas: {e}"
-        status_code_val = status.HTTP_500_INTERNAL_SERVER_ERROR
-        if hasattr(e, 'response') and e.response is not None:
-             try:
-                error_data = e.response.json()
-                detail = f"Erro na comunicação com Asaas: {error_data}" 
-             except ValueError: # Não é JSON
-                detail = f"Erro na comunicação com Asaas: {e.response.text}"
-             status_code_val = e.response.status_code if e.response.status_code else status_code_val
-        
-        print(f"RequestException ao criar assinatura Asaas: {detail}")
-        raise HTTPException(status_code=status_code_val, detail=detail)
+    except HTTPException:
+        raise
+    except AsaasError as e:
+        # 4xx do Asaas mantém o status; indisponibilidade (timeout, circuito aberto) vira 503
+        detail = f"Erro na comunicação com Asaas: {e.detail}"
+        print(f"AsaasError ao criar assinatura Asaas: {detail}")
+        raise HTTPException(status_code=e.status_code, detail=detail)
     except Exception as e:
         # Captura outras exceções inesperadas
         print(f"Erro inesperado ao criar assinatura: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Erro interno do servidor: {e}")
 
+@router.post("/webhook", summary="Recebe eventos do Asaas e atualiza o estado local das assinaturas")
+async def asaas_webhook(request: Request):
+    """
+    Webhook do Asaas (cobranças e assinaturas).
+    Autenticado pelo header asaas-access-token configurado no painel do Asaas.
+    Responde 200 mesmo para eventos ignorados: outro status pausa a fila de envio.
+    Exceção: evento recente de uma assinatura ainda sem linha local responde 409,
+    para que o Asaas reenvie depois que a rota de criação gravar a assinatura.
+    """
+    received_token = request.headers.get("asaas-access-token", "")
+    if not settings.ASAAS_WEBHOOK_TOKEN or not hmac.compare_digest(received_token, settings.ASAAS_WEBHOOK_TOKEN):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token do webhook inválido")
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Payload inválido")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Payload inválido")
+
+    try:
+        applied = await asyncio.to_thread(subscription_service.apply_webhook_event, payload)
+    except UnknownSubscriptionError as e:
+        # Assinatura ainda sendo registrada pela rota de criação: o Asaas reenvia o evento
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {"received": True, "applied": applied}
+
+@router.get("/entitlement", response_model=SubscriptionEntitlement, summary="Plano e status da assinatura do usuário (sem chamar o Asaas)")
+async def get_entitlement(current_user: UserProfile = Depends(get_current_user)):
+    """
+    Retorna o plano e se a assinatura do usuário dá direito de uso.
+    Lido da tabela local (mantida pelo webhook e pela reconciliação) com cache em processo.
+    """
+    return subscription_service.get_entitlement(str(current_user.id))
+
 @router.get("/{subscription_id}", response_model=SubscriptionDetails, summary="Retorna os detalhes de uma assinatura")
 async def get_subscription_details(
     subscription_id: str,
     current_user: UserProfile = Depends(get_current_user),
-    supabase: Client = Depends(lambda: supabase_client)
+    supabase: Client = Depends(get_supabase_admin)
 ):
     """
     Retorna os detalhes de uma assinatura específica pertencente ao usuário autenticado.
@@ -188,7 +222,7 @@ async def get_subscription_details(
 async def cancel_subscription(
     subscription_id: str,
     current_user: UserProfile = Depends(get_current_user),
-    supabase: Client = Depends(lambda: supabase_client)
+    supabase: Client = Depends(get_supabase_admin)
 ):
     """
     Cancela uma assinatura no Asaas e atualiza o status no banco de dados local.
@@ -215,7 +249,7 @@ async def cancel_subscription(
         # O endpoint para cancelar assinatura é DELETE /v3/subscriptions/{id}
         # Ref: https://docs.asaas.com/reference/remover-assinatura
         try:
-            asaas_response = asaas_request("DELETE", f"subscriptions/{subscription_id}")
+            asaas_response = await asaas_request("DELETE", f"subscriptions/{subscription_id}")
             # A API do Asaas retorna 200 OK em caso de sucesso na exclusão (cancelamento)
             if asaas_response.status_code != 200:
                  # Se a API do Asaas retornar um erro diferente de 200, levantar exceção
@@ -226,17 +260,10 @@ async def cancel_subscription(
             # asaas_cancel_data = asaas_response.json()
             # Verificar um campo de status na resposta se houver
 
-        except requests.exceptions.RequestException as e:
-            # Erro na comunicação com a API do Asaas
+        except AsaasError as e:
+            # Erro na comunicação com a API do Asaas (4xx, 5xx após retries ou circuito aberto)
             print(f"Erro na comunicação com Asaas ao cancelar assinatura {subscription_id}: {e}")
-            detail = f"Erro na comunicação com Asaas: {e}"
-            if hasattr(e, 'response') and e.response is not None:
-                 detail = f"Erro na comunicação com Asaas: {e.response.text}"
-                 status_code = e.response.status_code
-            else:
-                status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
-
-            raise HTTPException(status_code=status_code, detail=detail)
+            raise HTTPException(status_code=e.status_code, detail=f"Erro na comunicação com Asaas: {e.detail}")
 
         # 3. Atualizar o status da assinatura no banco de dados local para 'cancelled'
         # Nota: A política RLS deve permitir que o usuário autenticado atualize seus próprios dados (feito na RLS policy)
@@ -256,6 +283,7 @@ async def cancel_subscription(
                  detail="Assinatura cancelada no Asaas, mas falha ao atualizar o status no banco de dados local."
              )
 
+        invalidate_entitlements([current_user.id])
         return {"message": "Assinatura cancelada com sucesso"}
 
     except HTTPException as e:
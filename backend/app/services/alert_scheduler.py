@@ -0,0 +1,278 @@
+"""
+Agendador multi-empresa de alertas automáticos
+
+Substitui a geração de alertas disparada por requisição (BackgroundTask dentro do
+worker da API) por um processo separado que:
+- usa um lease no banco (scheduler_locks) para que apenas uma instância rode por shard;
+- reavalia só as empresas com mudanças desde a última execução (watermarks), com
+  reavaliação completa periódica para alertas que dependem apenas do tempo; a
+  busca de mudanças cobre no máximo change_scan_window (empresa atrasada além
+  disso é reavaliada direto, sem alargar a busca das demais);
+- processa as empresas em um pool limitado de workers, com prazo por empresa
+  verificado dentro do worker (empresa fora do prazo não avança o watermark);
+- interrompe a rodada se o lease for perdido (outra instância pode ter assumido);
+- registra métricas de cada execução em alert_scheduler_runs.
+"""
+import asyncio
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from supabase import Client
+
+from .notification_service import NotificationService
+from ..core.settings import settings
+from ..utils.scheduler_lease import SchedulerLease
+from ..utils.supabase import fetch_all
+
+
+class TenantDeadlineExceeded(Exception):
+    """Empresa passou do prazo (ou o lease foi perdido): o worker para sem gravar o watermark"""
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Timestamp do banco (com ou sem fuso) -> datetime em UTC, comparável"""
+    parsed = datetime.fromisoformat(value)
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed.astimezone(timezone.utc)
+
+
+@dataclass
+class SchedulerRunMetrics:
+    """Métricas de uma execução do agendador"""
+    run_id: str
+    holder: str
+    shard_index: int
+    shard_count: int
+    started_at: str
+    finished_at: Optional[str] = None
+    duration_seconds: float = 0.0
+    tenants_total: int = 0
+    tenants_evaluated: int = 0
+    tenants_skipped: int = 0
+    tenants_failed: int = 0
+    tenants_timed_out: int = 0
+    alerts_generated: int = 0
+    notifications_created: int = 0
+    lease_lost: bool = False
+    errors: List[str] = field(default_factory=list)
+
+
+class AlertScheduler:
+    """Executa a geração de alertas para todas as empresas de um shard"""
+
+    WATERMARK_TABLE = "alert_scheduler_watermarks"
+    RUNS_TABLE = "alert_scheduler_runs"
+
+    def __init__(
+        self,
+        supabase_admin: Client,
+        max_workers: int = settings.ALERT_SCHEDULER_MAX_WORKERS,
+        tenant_timeout: int = settings.ALERT_SCHEDULER_TENANT_TIMEOUT,
+        full_refresh_interval: int = settings.ALERT_SCHEDULER_FULL_REFRESH_INTERVAL,
+        change_scan_window: int = settings.ALERT_SCHEDULER_CHANGE_SCAN_WINDOW,
+        lock_ttl: int = settings.ALERT_SCHEDULER_LOCK_TTL,
+        shard_index: int = 0,
+        shard_count: int = 1,
+    ):
+        self.supabase = supabase_admin
+        self.max_workers = max_workers
+        self.tenant_timeout = tenant_timeout
+        self.full_refresh_interval = full_refresh_interval
+        self.change_scan_window = change_scan_window
+        self.lock_ttl = lock_ttl
+        self.shard_index = shard_index
+        self.shard_count = max(1, shard_count)
+        self.lease = SchedulerLease(supabase_admin, f"alert_scheduler:{self.shard_index}/{self.shard_count}", lock_ttl)
+        self.holder = self.lease.holder
+        self.lock_name = self.lease.name
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="alert-worker")
+
+    # ---------- Eleição de líder (lease no banco) ----------
+
+    def acquire_lock(self) -> bool:
+        """Adquire ou renova o lease deste shard. Retorna False se outra instância é líder."""
+        return self.lease.acquire()
+
+    def release_lock(self):
+        self.lease.release()
+
+    # ---------- Seleção de empresas ----------
+
+    def _in_shard(self, company_id: str) -> bool:
+        return zlib.crc32(company_id.encode()) % self.shard_count == self.shard_index
+
+    def _load_watermarks(self) -> Dict[str, Dict[str, Any]]:
+        rows = fetch_all(lambda: self.supabase.table(self.WATERMARK_TABLE).select(
+            "company_id, last_run_at"
+        ).order("company_id"))
+        return {row["company_id"]: row for row in rows}
+
+    def _changed_companies(self, since: str) -> Set[str]:
+        """Empresas com objetivos, Key Results ou check-ins alterados desde 'since' (3 consultas no total)"""
+        changed = set()
+        for row in fetch_all(lambda: self.supabase.table("objectives").select(
+            "company_id"
+        ).gte("updated_at", since).order("id")):
+            changed.add(row["company_id"])
+        for row in fetch_all(lambda: self.supabase.table("key_results").select(
+            "objectives!inner(company_id)"
+        ).gte("updated_at", since).order("id")):
+            changed.add(row["objectives"]["company_id"])
+        for row in fetch_all(lambda: self.supabase.table("kr_checkins").select(
+            "key_results!inner(objectives!inner(company_id))"
+        ).gte("created_at", since).order("id")):
+            changed.add(row["key_results"]["objectives"]["company_id"])
+        return changed
+
+    def select_tenants(self) -> tuple[List[str], int]:
+        """Retorna (empresas a reavaliar, total de empresas do shard)"""
+        companies = [
+            row["id"] for row in fetch_all(lambda: self.supabase.table("companies").select("id").order("id"))
+            if self._in_shard(row["id"])
+        ]
+        watermarks = self._load_watermarks()
+
+        # Comparar datetimes, não textos: o banco devolve "+00:00" e frações variáveis
+        last_runs = {
+            company_id: parse_timestamp(watermark["last_run_at"])
+            for company_id, watermark in watermarks.items()
+            if watermark.get("last_run_at")
+        }
+        now = datetime.now(timezone.utc)
+
+        # A busca de mudanças parte do watermark mais antigo, mas só entre os recentes:
+        # uma empresa travada (falhando ou estourando o prazo) não avança o watermark e,
+        # sem esse limite, alargaria a busca de todas as outras em toda execução.
+        # Empresas atrasadas além da janela são reavaliadas sem consultar mudanças.
+        scan_cutoff = now - timedelta(seconds=self.change_scan_window)
+        recent_last_runs = [last_runs[c] for c in companies if c in last_runs and last_runs[c] >= scan_cutoff]
+        changed = self._changed_companies(min(recent_last_runs).isoformat()) if recent_last_runs else set()
+
+        # Alertas como "check-in pendente" e "fim de ciclo" mudam só com o tempo:
+        # empresas sem mudanças ainda são reavaliadas a cada full_refresh_interval
+        full_refresh_cutoff = now - timedelta(seconds=self.full_refresh_interval)
+        selected = []
+        for company_id in companies:
+            last_run_at = last_runs.get(company_id)
+            if (last_run_at is None or company_id in changed
+                    or last_run_at < scan_cutoff or last_run_at < full_refresh_cutoff):
+                selected.append(company_id)
+        return selected, len(companies)
+
+    # ---------- Execução ----------
+
+    def _check_deadline(self, company_id: str, deadline: float, stop: threading.Event):
+        if stop.is_set():
+            raise TenantDeadlineExceeded(f"{company_id}: lease perdido, empresa interrompida")
+        if time.monotonic() >= deadline:
+            raise TenantDeadlineExceeded(f"{company_id}: timeout após {self.tenant_timeout}s")
+
+    def _process_tenant_sync(self, company_id: str, run_started_at: str, deadline: float, stop: threading.Event) -> tuple[int, int]:
+        """
+        Gera e grava os alertas de uma empresa e avança seu watermark (roda em thread do pool).
+
+        Uma thread não pode ser interrompida de fora: o prazo é verificado entre as
+        etapas e, vencido, a empresa para antes de gravar notificações ou o watermark
+        (e é reavaliada na próxima rodada).
+        """
+        service = NotificationService(self.supabase)
+        alerts = asyncio.run(service.generate_automatic_alerts(company_id))
+        self._check_deadline(company_id, deadline, stop)
+        created = asyncio.run(service.create_notifications_bulk(company_id, alerts))
+        self._check_deadline(company_id, deadline, stop)
+        self.supabase.table(self.WATERMARK_TABLE).upsert({
+            "company_id": company_id,
+            "last_run_at": run_started_at,
+        }, on_conflict="company_id").execute()
+        return len(alerts), created
+
+    async def _run_tenant(self, company_id: str, run_started_at: str, semaphore: asyncio.Semaphore,
+                          stop: threading.Event, metrics: SchedulerRunMetrics):
+        async with semaphore:
+            if stop.is_set():
+                return
+            loop = asyncio.get_running_loop()
+            deadline = time.monotonic() + self.tenant_timeout
+            try:
+                # Sem wait_for: o semáforo só é liberado quando a thread termina de fato,
+                # então a vaga do pool nunca fica ocupada por uma empresa "já encerrada"
+                alerts, created = await loop.run_in_executor(
+                    self._executor, self._process_tenant_sync, company_id, run_started_at, deadline, stop
+                )
+                metrics.tenants_evaluated += 1
+                metrics.alerts_generated += alerts
+                metrics.notifications_created += created
+            except TenantDeadlineExceeded as e:
+                metrics.tenants_timed_out += 1
+                metrics.errors.append(str(e))
+            except Exception as e:
+                metrics.tenants_failed += 1
+                metrics.errors.append(f"{company_id}: {e}")
+
+    async def run_once(self) -> Optional[SchedulerRunMetrics]:
+        """Uma rodada completa do shard. Retorna None se esta instância não é a líder."""
+        if not self.acquire_lock():
+            print(f"⏸️  Agendador: outra instância detém o lease '{self.lock_name}', aguardando...")
+            return None
+
+        started = time.perf_counter()
+        run_started_at = datetime.utcnow().isoformat()
+        metrics = SchedulerRunMetrics(
+            run_id=str(uuid.uuid4()),
+            holder=self.holder,
+            shard_index=self.shard_index,
+            shard_count=self.shard_count,
+            started_at=run_started_at,
+        )
+
+        stop = threading.Event()
+        lease_task = asyncio.create_task(self.lease.keep(stop))
+        try:
+            tenants, total = await asyncio.get_running_loop().run_in_executor(self._executor, self.select_tenants)
+            metrics.tenants_total = total
+            metrics.tenants_skipped = total - len(tenants)
+
+            semaphore = asyncio.Semaphore(self.max_workers)
+            await asyncio.gather(*(
+                self._run_tenant(company_id, run_started_at, semaphore, stop, metrics) for company_id in tenants
+            ))
+        except Exception as e:
+            metrics.errors.append(f"run: {e}")
+            print(f"❌ Agendador: erro na rodada: {e}")
+        finally:
+            lease_task.cancel()
+            metrics.lease_lost = stop.is_set()
+            metrics.duration_seconds = round(time.perf_counter() - started, 3)
+            metrics.finished_at = datetime.utcnow().isoformat()
+            self._record_metrics(metrics)
+
+        return metrics
+
+    def _record_metrics(self, metrics: SchedulerRunMetrics):
+        print(
+            f"📊 Agendador: {metrics.tenants_evaluated}/{metrics.tenants_total} empresas avaliadas "
+            f"({metrics.tenants_skipped} sem mudanças, {metrics.tenants_failed} falhas, "
+            f"{metrics.tenants_timed_out} timeouts), {metrics.alerts_generated} alertas, "
+            f"{metrics.notifications_created} notificações em {metrics.duration_seconds}s"
+        )
+        try:
+            row = asdict(metrics)
+            row["errors"] = metrics.errors[:50]
+            self.supabase.table(self.RUNS_TABLE).insert(row).execute()
+        except Exception as e:
+            print(f"DEBUG: Erro ao registrar métricas do agendador: {e}")
+
+    async def run_forever(self, interval: int = settings.ALERT_SCHEDULER_INTERVAL):
+        """Executa rodadas a cada 'interval' segundos até ser cancelado"""
+        try:
+            while True:
+                await self.run_once()
+                await asyncio.sleep(interval)
+        finally:
+            self.release_lock()
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -3,6 +3,8 @@ from typing import List, Dict, Optional, Tuple
 import statistics
 from supabase import Client
 
+from ..utils.cycle_calendar import cycle_timeline, get_company_calendar
+
 from ..models.analytics import (
     TrendDirection, PeriodGranularity, EvolutionPoint, TrendAnalysis,
     PerformanceSummary, HistoryData, ObjectiveHistoryPoint, ObjectiveHistory,
@@ -207,8 +209,7 @@ class AnalyticsService:
     async def _get_active_cycle(self, company_id: str) -> Optional[dict]:
         """Busca ciclo ativo da empresa"""
         try:
-            response = self.supabase.table("cycles").select("*").eq("company_id", company_id).eq("is_active", True).execute()
-            return response.data[0] if response.data else None
+            return get_company_calendar(company_id, self.supabase).first_where("is_active")
         except Exception:
             return None
 
@@ -225,20 +226,19 @@ class AnalyticsService:
         else:  # MONTHLY
             delta = timedelta(days=30)
         
+        # Ciclo ativo resolvido uma vez (calendário em memória), não a cada ponto
+        cycle = await self._get_active_cycle(company_id)
+        
         while current_date <= end_date:
             # Busca dados do dia específico
             daily_data = await self._get_daily_snapshot(company_id, current_date)
             
             # Calcula progresso esperado baseado no tempo
-            cycle = await self._get_active_cycle(company_id)
             expected_progress = 0.0
             if cycle:
-                cycle_start = datetime.fromisoformat(cycle['start_date']).date()
-                cycle_end = datetime.fromisoformat(cycle['end_date']).date()
-                if cycle_start <= current_date <= cycle_end:
-                    days_total = (cycle_end - cycle_start).days
-                    days_elapsed = (current_date - cycle_start).days
-                    expected_progress = (days_elapsed / days_total) * 100 if days_total > 0 else 0
+                timeline = cycle_timeline(cycle, current_date)
+                if timeline.is_current:
+                    expected_progress = timeline.progress_percentage
             
             point = EvolutionPoint(
                 date=current_date.isoformat(),
@@ -480,11 +480,7 @@ class AnalyticsService:
         cycle = await self._get_active_cycle(company_id)
         time_efficiency = 75.0  # Valor padrão
         if cycle:
-            cycle_start = datetime.fromisoformat(cycle['start_date']).date()
-            cycle_end = datetime.fromisoformat(cycle['end_date']).date()
-            cycle_total_days = (cycle_end - cycle_start).days
-            elapsed_days = (end_date - cycle_start).days
-            expected_progress = (elapsed_days / cycle_total_days) * 100 if cycle_total_days > 0 else 0
+            expected_progress = cycle_timeline(cycle, end_date).progress_percentage
             
             if expected_progress > 0:
                 time_efficiency = min(100, (avg_progress / expected_progress) * 100)
@@ -598,13 +594,7 @@ class AnalyticsService:
         """Calcula performance do ciclo atual"""
         
         # Calcula progresso temporal do ciclo
-        cycle_start = datetime.fromisoformat(cycle['start_date']).date()
-        cycle_end = datetime.fromisoformat(cycle['end_date']).date()
-        today = date.today()
-        
-        cycle_total_days = (cycle_end - cycle_start).days
-        cycle_elapsed_days = min(cycle_total_days, (today - cycle_start).days)
-        cycle_progress = (cycle_elapsed_days / cycle_total_days) * 100 if cycle_total_days > 0 else 0
+        cycle_progress = cycle_timeline(cycle).progress_percentage
         
         # Busca objetivos do ciclo
         objectives_query = self.supabase.table("objectives").select("progress").eq("company_id", company_id).eq("cycle_id", cycle['id']).execute()
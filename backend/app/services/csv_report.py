@@ -0,0 +1,146 @@
+"""
+Exportação CSV em uma passada (uma ou várias seções no mesmo arquivo)
+
+Cada seção (dashboard, objetivos, Key Results) é escrita direto no arquivo de
+saída, linha a linha, a partir das colunas de report_rows. A formatação de cada
+coluna é decidida uma vez por tabela (formatador por tipo) e as datas passam por
+um cache LRU: relatórios grandes repetem muito os mesmos instantes (criação em
+lote, check-ins do mesmo dia), então o strftime roda uma vez por valor distinto.
+
+Com compress=True a saída é gzip gerado durante a escrita (.csv.gz), sem
+arquivo intermediário descompactado.
+"""
+import csv
+import gzip
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, List, Sequence
+
+from ..core.settings import settings
+from ..models.reports import ReportContent, DashboardReportData
+from .report_rows import KEY_RESULT_COLUMNS, OBJECTIVE_COLUMNS, ReportColumn
+
+DELIMITER = ';'
+
+
+@lru_cache(maxsize=4096)
+def format_datetime(value: datetime) -> str:
+    return value.strftime('%d/%m/%Y %H:%M')
+
+
+@lru_cache(maxsize=4096)
+def format_date(value: datetime) -> str:
+    return value.strftime('%d/%m/%Y')
+
+
+# Formatação por tipo de coluna (valores não vazios); demais tipos saem como estão
+KIND_FORMATTERS = {
+    'integer': str,
+    'number': '{:.2f}'.format,
+    'percent': '{:.1f}%'.format,
+    'datetime': format_datetime,
+    'date': format_date,
+}
+# Exceções por coluna (formatos herdados do CSV original)
+COLUMN_FORMATTERS = {
+    'confidence': '{:.0f}%'.format,
+}
+
+
+def _formatter(column: ReportColumn) -> Callable[[Any], Any]:
+    """Valor tipado -> célula do CSV (ausente vira `column.empty`)"""
+    empty = column.empty
+    format = COLUMN_FORMATTERS.get(column.key) or KIND_FORMATTERS.get(column.kind)
+    if format is None:
+        # Texto: vazio e None usam o texto padrão da coluna
+        return lambda value: value or empty
+    return lambda value: empty if value is None else format(value)
+
+
+def row_formatter(columns: Sequence[ReportColumn]) -> Callable[[Any], List[Any]]:
+    """Função item -> linha formatada, montada uma vez por tabela"""
+    plan = [(column.getter, _formatter(column)) for column in columns]
+    return lambda item: [format(getter(item)) for getter, format in plan]
+
+
+class CsvReportWriter:
+    """Seções de relatório escritas em sequência no mesmo arquivo CSV"""
+
+    def __init__(self, stream):
+        self.writer = csv.writer(stream, delimiter=DELIMITER)
+
+    def row(self, *cells: Any):
+        self.writer.writerow(cells)
+
+    def blank(self):
+        self.writer.writerow([])
+
+    def table(self, columns: Sequence[ReportColumn], items: Sequence[Any]) -> int:
+        """Cabeçalho + uma linha por item; retorna a quantidade de linhas"""
+        self.writer.writerow([column.header for column in columns])
+        self.writer.writerows(map(row_formatter(columns), items))
+        return len(items)
+
+    def complete_header(self, data: DashboardReportData):
+        self.row('RELATÓRIO COMPLETO OKR')
+        self.row('Empresa:', data.company_name)
+        self.row('Período:', data.report_period)
+        self.row('Gerado em:', format_datetime(data.generation_date))
+        self.blank()
+
+        self.row('RESUMO EXECUTIVO')
+        self.row('Total de Objetivos:', data.total_objectives)
+        self.row('Total de Key Results:', data.total_key_results)
+        self.row('Usuários Ativos:', data.active_users)
+        self.row('Progresso Geral:', f"{data.overall_progress:.1f}%")
+        self.row('Taxa de Conclusão:', f"{data.completion_rate:.1f}%")
+        self.blank()
+
+    def dashboard(self, data: DashboardReportData):
+        self.row('DASHBOARD - RESUMO EXECUTIVO')
+        self.row('Empresa', data.company_name)
+        self.row('Período', data.report_period)
+        self.row('Total Objetivos', data.total_objectives)
+        self.row('Total Key Results', data.total_key_results)
+        self.row('Usuários Ativos', data.active_users)
+        self.row('Progresso Geral (%)', f"{data.overall_progress:.1f}")
+        self.row('Taxa Conclusão (%)', f"{data.completion_rate:.1f}")
+        self.row('Taxa No Prazo (%)', f"{data.on_track_rate:.1f}")
+
+        # Objetivos por status
+        self.blank()
+        self.row('OBJETIVOS POR STATUS')
+        for status, count in data.objectives_by_status.items():
+            self.row(status, count)
+
+
+def open_csv(filepath: str, compress: bool = False):
+    """Arquivo de texto para o CSV; com compress, gzip gerado durante a escrita"""
+    if compress:
+        return gzip.open(filepath, 'wt', newline='', encoding='utf-8', compresslevel=settings.REPORT_CSV_GZIP_LEVEL)
+    return open(filepath, 'w', newline='', encoding='utf-8')
+
+
+def write_csv_report(content: ReportContent, filepath: str, compress: bool = False) -> str:
+    """CSV do relatório conforme o tipo (COMPLETE: todas as seções no mesmo arquivo)"""
+    report_type = content.metadata.report_type
+    with open_csv(filepath, compress) as stream:
+        writer = CsvReportWriter(stream)
+        if report_type == "OBJECTIVES" and content.objectives:
+            writer.table(OBJECTIVE_COLUMNS, content.objectives)
+        elif report_type == "KEY_RESULTS" and content.key_results:
+            writer.table(KEY_RESULT_COLUMNS, content.key_results)
+        elif report_type == "COMPLETE":
+            if content.dashboard_data:
+                writer.complete_header(content.dashboard_data)
+            if content.objectives:
+                writer.row('OBJETIVOS')
+                writer.table(OBJECTIVE_COLUMNS, content.objectives)
+                writer.blank()
+            if content.key_results:
+                writer.row('KEY RESULTS')
+                writer.table(KEY_RESULT_COLUMNS, content.key_results)
+        elif content.dashboard_data:
+            # Dashboard ou tipo padrão
+            writer.dashboard(content.dashboard_data)
+    return filepath
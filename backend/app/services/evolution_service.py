@@ -0,0 +1,505 @@
+"""
+Evolução histórica do progresso da empresa por replay dos check-ins
+
+Os eventos da empresa (criação de objetivos e Key Results e os kr_checkins) são
+aplicados em ordem de tempo com a mesma regra das rotas de KRs (utils/kr_progress.py):
+- progresso do KR = calculate_progress(último valor de check-in, start, target);
+- progresso do objetivo = média dos seus KRs (update_objective_progress);
+- progresso da empresa = média dos objetivos.
+
+O resultado são séries semanais compactas (semanas começando na segunda-feira)
+da empresa, de cada objetivo e de cada KR, gravadas em dashboard_evolution_series
+junto com o estado do replay e a marca d'água do último check-in processado.
+Cada atualização busca apenas os check-ins novos e continua da semana em aberto;
+edições/remoções (ou check-ins com data anterior à semana em aberto) pedem a
+reconstrução completa.
+
+O endpoint /api/dashboard/evolution lê a série pronta em uma única consulta.
+"""
+import asyncio
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..core.settings import settings
+from ..utils.kr_progress import calculate_progress
+from ..utils.supabase import fetch_all, get_admin_client
+
+SERIES_TABLE = "dashboard_evolution_series"
+STATE_VERSION = 3  # 2: KR sem check-ins entra com o current_value; 3: KRs ativos distintos na janela
+
+# Janela (semanas) do engajamento: KRs distintos com check-in nas últimas N semanas
+ENGAGEMENT_WEEKS = 4
+
+# Ordem dos eventos com o mesmo instante: o objetivo existe antes do KR, o KR antes do check-in
+_EVENT_OBJECTIVE, _EVENT_KEY_RESULT, _EVENT_CHECKIN = 0, 1, 2
+
+
+def week_start(value: date) -> date:
+    """Segunda-feira da semana da data"""
+    return value - timedelta(days=value.weekday())
+
+
+def _event_date(value: Optional[str]) -> date:
+    # Timestamps do PostgREST: 'YYYY-MM-DDTHH:MM:SS...'; só a data importa para a semana
+    return date.fromisoformat(value[:10]) if value else date.today()
+
+
+def _as_float(value: Any, default: float = 0.0) -> float:
+    return float(value) if value is not None else default
+
+
+class EvolutionReplay:
+    """
+    Estado do replay: valores atuais dos KRs e somas incrementais por objetivo.
+
+    Cada evento custa O(1); o fechamento de uma semana custa O(objetivos).
+    """
+
+    def __init__(self, kr_params: Dict[str, Tuple[str, float, float]]):
+        # kr_id -> (objective_id, start_value, target_value) vindos das tabelas atuais
+        self.kr_params = kr_params
+        self.kr_progress: Dict[str, float] = {}
+        self.kr_values: Dict[str, Optional[float]] = {}
+        self.objectives: Dict[str, List[float]] = {}  # objective_id -> [soma, quantidade de KRs]
+        self.company_sum = 0.0
+        self.week_active: Set[str] = set()
+        # KRs com check-in nas semanas anteriores da janela (da mais antiga para a mais recente)
+        self.recent_active: List[Set[str]] = []
+
+    # ---------- Eventos ----------
+
+    def add_objective(self, objective_id: str):
+        self.objectives.setdefault(objective_id, [0.0, 0])
+
+    def add_key_result(self, kr_id: str, value: Optional[float] = None):
+        params = self.kr_params.get(kr_id)
+        if not params or kr_id in self.kr_progress:
+            return
+        objective_id, start_value, target_value = params
+        self.add_objective(objective_id)
+        progress = calculate_progress(start_value if value is None else value, start_value, target_value)
+        self.kr_values[kr_id] = value
+        self.kr_progress[kr_id] = progress
+        bucket = self.objectives[objective_id]
+        self._retire_objective(bucket)
+        bucket[0] += progress
+        bucket[1] += 1
+        self._admit_objective(bucket)
+
+    def apply_checkin(self, kr_id: str, value: float):
+        params = self.kr_params.get(kr_id)
+        if not params:
+            return
+        if kr_id not in self.kr_progress:
+            self.add_key_result(kr_id)
+        objective_id, start_value, target_value = params
+        progress = calculate_progress(value, start_value, target_value)
+        bucket = self.objectives[objective_id]
+        self._retire_objective(bucket)
+        bucket[0] += progress - self.kr_progress[kr_id]
+        self._admit_objective(bucket)
+        self.kr_progress[kr_id] = progress
+        self.kr_values[kr_id] = value
+        self.week_active.add(kr_id)
+
+    def _retire_objective(self, bucket: List[float]):
+        if bucket[1]:
+            self.company_sum -= bucket[0] / bucket[1]
+
+    def _admit_objective(self, bucket: List[float]):
+        if bucket[1]:
+            self.company_sum += bucket[0] / bucket[1]
+
+    def next_week(self):
+        """Fecha a semana: os KRs ativos dela entram na janela de engajamento"""
+        self.recent_active = (self.recent_active + [self.week_active])[-(ENGAGEMENT_WEEKS - 1):]
+        self.week_active = set()
+
+    def active_in_window(self, weeks: int = ENGAGEMENT_WEEKS) -> int:
+        """KRs distintos com check-in nas últimas `weeks` semanas (incluindo a atual)"""
+        active = set(self.week_active)
+        for week_set in self.recent_active[max(0, len(self.recent_active) - (weeks - 1)):]:
+            active |= week_set
+        return len(active)
+
+    # ---------- Snapshots ----------
+
+    def company_progress(self) -> float:
+        # Objetivo sem KRs fica com progresso 0 (valor padrão da tabela objectives)
+        if not self.objectives:
+            return 0.0
+        return self.company_sum / len(self.objectives)
+
+    def objective_progress(self) -> Dict[str, float]:
+        return {
+            objective_id: (bucket[0] / bucket[1] if bucket[1] else 0.0)
+            for objective_id, bucket in self.objectives.items()
+        }
+
+    # ---------- Persistência ----------
+
+    def dump(self) -> Dict[str, Any]:
+        return {
+            "objectives": list(self.objectives),
+            "krs": self.kr_values,
+            "week_active": sorted(self.week_active),
+            "recent_active": [sorted(week_set) for week_set in self.recent_active],
+        }
+
+    @classmethod
+    def load(cls, kr_params: Dict[str, Tuple[str, float, float]], state: Dict[str, Any]) -> "EvolutionReplay":
+        replay = cls(kr_params)
+        for objective_id in state.get("objectives") or []:
+            replay.add_objective(objective_id)
+        for kr_id, value in (state.get("krs") or {}).items():
+            replay.add_key_result(kr_id, value)
+        replay.week_active = set(state.get("week_active") or [])
+        replay.recent_active = [set(week_set) for week_set in state.get("recent_active") or []]
+        return replay
+
+
+class EvolutionSeries:
+    """Série semanal em colunas paralelas (formato gravado em JSONB)"""
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, detail: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        detail = detail or {}
+        self.weeks: List[str] = list(data.get("weeks") or [])
+        self.progress: List[float] = list(data.get("progress") or [])
+        self.objectives_count: List[int] = list(data.get("objectives_count") or [])
+        self.kr_count: List[int] = list(data.get("kr_count") or [])
+        self.active_krs: List[int] = list(data.get("active_krs") or [])
+        # KRs distintos com check-in nas ENGAGEMENT_WEEKS semanas terminadas em cada semana
+        self.active_krs_window: List[int] = list(data.get("active_krs_window") or [])
+        # Na última semana gravada: KRs distintos nas últimas N-1, N-2, ... 1 semanas
+        # (valor da janela nas semanas seguintes sem check-ins, ver series_points)
+        self.active_window_tail: List[int] = list(data.get("active_window_tail") or [])
+        # id -> [índice da primeira semana, [progresso por semana]]
+        self.objectives: Dict[str, List[Any]] = {k: [v[0], list(v[1])] for k, v in (detail.get("objectives") or {}).items()}
+        self.key_results: Dict[str, List[Any]] = {k: [v[0], list(v[1])] for k, v in (detail.get("key_results") or {}).items()}
+
+    def put_week(self, week: date, replay: EvolutionReplay):
+        """Grava (ou sobrescreve, se for a semana em aberto) o snapshot da semana"""
+        key = week.isoformat()
+        if self.weeks and self.weeks[-1] == key:
+            index = len(self.weeks) - 1
+        else:
+            index = len(self.weeks)
+            self.weeks.append(key)
+            for column in (self.progress, self.objectives_count, self.kr_count, self.active_krs, self.active_krs_window):
+                column.append(0)
+
+        self.progress[index] = round(replay.company_progress(), 2)
+        self.objectives_count[index] = len(replay.objectives)
+        self.kr_count[index] = len(replay.kr_progress)
+        self.active_krs[index] = len(replay.week_active)
+        self.active_krs_window[index] = replay.active_in_window()
+        self.active_window_tail = [replay.active_in_window(weeks) for weeks in range(ENGAGEMENT_WEEKS - 1, 0, -1)]
+
+        for objective_id, progress in replay.objective_progress().items():
+            self._put_value(self.objectives, objective_id, index, progress)
+        for kr_id, progress in replay.kr_progress.items():
+            self._put_value(self.key_results, kr_id, index, progress)
+
+    @staticmethod
+    def _put_value(columns: Dict[str, List[Any]], entity_id: str, index: int, progress: float):
+        entry = columns.setdefault(entity_id, [index, []])
+        values = entry[1]
+        # Semanas puladas (sem eventos) repetem o último valor
+        while entry[0] + len(values) < index:
+            values.append(values[-1] if values else 0.0)
+        if entry[0] + len(values) == index:
+            values.append(round(progress, 2))
+        else:
+            values[index - entry[0]] = round(progress, 2)
+
+    def fill_until(self, week: date, replay: EvolutionReplay):
+        """Semanas sem eventos entre a última gravada e `week` repetem o estado (sem check-ins)"""
+        if not self.weeks:
+            return
+        current = date.fromisoformat(self.weeks[-1]) + timedelta(days=7)
+        while current < week:
+            replay.next_week()
+            self.put_week(current, replay)
+            current += timedelta(days=7)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "weeks": self.weeks,
+            "progress": self.progress,
+            "objectives_count": self.objectives_count,
+            "kr_count": self.kr_count,
+            "active_krs": self.active_krs,
+            "active_krs_window": self.active_krs_window,
+            "active_window_tail": self.active_window_tail,
+        }
+
+    def detail_dict(self) -> Dict[str, Any]:
+        return {"objectives": self.objectives, "key_results": self.key_results}
+
+
+class EvolutionService:
+    """Constrói, atualiza incrementalmente e lê a série de evolução por empresa"""
+
+    def __init__(self, supabase_admin=None, refresh_interval: int = settings.EVOLUTION_REFRESH_INTERVAL):
+        self._supabase = supabase_admin
+        self.refresh_interval = refresh_interval
+        # company_id -> True se precisa de reconstrução completa (edição/remoção)
+        self._dirty: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def supabase(self):
+        return self._supabase or get_admin_client()
+
+    # ---------- Marcação de mudanças (caminho de escrita) ----------
+
+    def mark_dirty(self, company_id: Optional[str], rebuild: bool = False):
+        """Agenda a atualização da série; rebuild=True quando o histórico mudou (edição/remoção)"""
+        if not company_id:
+            return
+        with self._lock:
+            key = str(company_id)
+            self._dirty[key] = self._dirty.get(key, False) or rebuild
+
+    def _take_dirty(self) -> Dict[str, bool]:
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            return dirty
+
+    # ---------- Leitura (caminho quente) ----------
+
+    def get_series(self, company_id: str) -> Optional[Dict[str, Any]]:
+        """Série gravada da empresa (uma consulta) ou None se ainda não foi construída"""
+        response = self.supabase.table(SERIES_TABLE).select(
+            "series, updated_at"
+        ).eq("company_id", company_id).limit(1).execute()
+        if not response.data:
+            return None
+        row = response.data[0]
+        updated_at = row.get("updated_at")
+        if updated_at and datetime.fromisoformat(updated_at.replace("Z", "+00:00")).date() < date.today() - timedelta(days=1):
+            # Série antiga (ex.: atualização perdida em outro worker): serve e agenda a atualização
+            self.mark_dirty(company_id)
+        return row.get("series")
+
+    def get_objective_series(self, company_id: str, objective_id: str) -> Optional[Dict[str, Any]]:
+        """Semanas e progresso de um objetivo (da série detalhada) ou None se não houver"""
+        response = self.supabase.table(SERIES_TABLE).select(
+            "series, detail_series"
+        ).eq("company_id", company_id).limit(1).execute()
+        if not response.data:
+            return None
+        row = response.data[0]
+        entry = ((row.get("detail_series") or {}).get("objectives") or {}).get(objective_id)
+        if not entry:
+            return None
+        first_index, values = entry
+        weeks = (row.get("series") or {}).get("weeks") or []
+        return {"weeks": weeks[first_index:first_index + len(values)], "progress": values}
+
+    # ---------- Construção ----------
+
+    def _load_kr_params(self, company_id: str) -> Tuple[Dict[str, Tuple[str, float, float]], List[Dict[str, Any]]]:
+        key_results = fetch_all(lambda: self.supabase.table("key_results").select(
+            "id, objective_id, start_value, target_value, current_value, created_at, objectives!inner(company_id)"
+        ).eq("objectives.company_id", company_id).order("id"))
+        params = {
+            kr["id"]: (kr["objective_id"], _as_float(kr.get("start_value")), _as_float(kr.get("target_value")))
+            for kr in key_results
+        }
+        return params, key_results
+
+    def _load_stored(self, company_id: str) -> Optional[Dict[str, Any]]:
+        response = self.supabase.table(SERIES_TABLE).select(
+            "watermark_at, watermark_ids, state, series, detail_series"
+        ).eq("company_id", company_id).limit(1).execute()
+        return response.data[0] if response.data else None
+
+    def refresh(self, company_id: str, rebuild: bool = False) -> Dict[str, Any]:
+        """
+        Aplica os eventos novos desde a marca d'água (ou todos, em rebuild) e grava a série.
+
+        Os KRs e objetivos são lidos inteiros (parâmetros atuais, poucas linhas);
+        os check-ins, que crescem sem limite, só a partir da marca d'água.
+        """
+        started = time.perf_counter()
+        today_week = week_start(date.today())
+
+        stored = None if rebuild else self._load_stored(company_id)
+        if stored and (stored.get("state") or {}).get("version") != STATE_VERSION:
+            stored = None
+        watermark_at = stored.get("watermark_at") if stored else None
+        watermark_ids = set(stored.get("watermark_ids") or []) if stored else set()
+        state = (stored.get("state") or {}) if stored else {}
+        open_week = date.fromisoformat(state["open_week"]) if state.get("open_week") else None
+
+        kr_params, key_results = self._load_kr_params(company_id)
+        objectives = fetch_all(lambda: self.supabase.table("objectives").select(
+            "id, created_at"
+        ).eq("company_id", company_id).order("id"))
+
+        def build_checkins():
+            query = self.supabase.table("kr_checkins").select(
+                "id, key_result_id, value_at_checkin, checkin_date, created_at, key_results!inner(objectives!inner(company_id))"
+            ).eq("key_results.objectives.company_id", company_id)
+            if watermark_at:
+                # gte + ids já vistos no mesmo instante: não perde check-ins com created_at empatado
+                query = query.gte("created_at", watermark_at)
+            return query.order("created_at").order("id")
+
+        checkins = [c for c in fetch_all(build_checkins) if c["id"] not in watermark_ids]
+
+        if stored:
+            stored_replay = state.get("replay") or {}
+            # KRs ou objetivos removidos desde a última atualização invalidam o histórico gravado
+            if set(stored_replay.get("krs") or {}) - set(kr_params) or \
+                    set(stored_replay.get("objectives") or []) - {o["id"] for o in objectives}:
+                return self.refresh(company_id, rebuild=True)
+            replay = EvolutionReplay.load(kr_params, stored_replay)
+            series = EvolutionSeries(stored.get("series"), stored.get("detail_series"))
+            known_krs = set(replay.kr_progress)
+            known_objectives = set(replay.objectives)
+        else:
+            replay = EvolutionReplay(kr_params)
+            series = EvolutionSeries()
+            known_krs, known_objectives = set(), set()
+
+        events: List[Tuple[date, int, str, Dict[str, Any]]] = []
+        for objective in objectives:
+            if objective["id"] not in known_objectives:
+                events.append((_event_date(objective.get("created_at")), _EVENT_OBJECTIVE, objective.get("created_at") or "", objective))
+        for kr in key_results:
+            if kr["id"] not in known_krs:
+                events.append((_event_date(kr.get("created_at")), _EVENT_KEY_RESULT, kr.get("created_at") or "", kr))
+        for checkin in checkins:
+            moment = checkin.get("checkin_date") or checkin.get("created_at")
+            events.append((_event_date(moment), _EVENT_CHECKIN, moment or "", checkin))
+        events.sort(key=lambda event: (event[0], event[2], event[1]))
+        # KR sem check-ins: o valor atual (definido na criação ou editado direto) vale desde a criação;
+        # com check-ins, parte do valor inicial e os check-ins contam a história
+        checked_krs = {checkin["key_result_id"] for checkin in checkins}
+
+        if open_week and events and week_start(events[0][0]) < open_week:
+            # Evento datado antes da semana em aberto (check-in retroativo): refaz do zero
+            return self.refresh(company_id, rebuild=True)
+
+        current_week = open_week
+        for event_day, kind, _, row in events:
+            event_week = week_start(event_day)
+            if current_week is None:
+                current_week = event_week
+            elif event_week > current_week:
+                series.put_week(current_week, replay)
+                series.fill_until(event_week, replay)
+                replay.next_week()
+                current_week = event_week
+
+            if kind == _EVENT_OBJECTIVE:
+                replay.add_objective(row["id"])
+            elif kind == _EVENT_KEY_RESULT:
+                seed = None if row["id"] in checked_krs or row.get("current_value") is None else _as_float(row["current_value"])
+                replay.add_key_result(row["id"], seed)
+            else:
+                replay.apply_checkin(row["key_result_id"], _as_float(row.get("value_at_checkin")))
+
+        if current_week is None:
+            current_week = today_week
+        series.put_week(current_week, replay)
+
+        if checkins:
+            watermark_at = checkins[-1]["created_at"]
+            watermark_ids = {c["id"] for c in checkins if c["created_at"] == watermark_at} | (
+                watermark_ids if stored and watermark_at == stored.get("watermark_at") else set()
+            )
+
+        series_data = series.as_dict()
+        self.supabase.table(SERIES_TABLE).upsert({
+            "company_id": company_id,
+            "watermark_at": watermark_at,
+            "watermark_ids": sorted(watermark_ids),
+            "state": {
+                "version": STATE_VERSION,
+                "open_week": current_week.isoformat(),
+                "replay": replay.dump(),
+            },
+            "series": series_data,
+            "detail_series": series.detail_dict(),
+            "updated_at": datetime.utcnow().isoformat(),
+        }).execute()
+
+        return {
+            "company_id": company_id,
+            "rebuild": not stored,
+            "events": len(events),
+            "checkins": len(checkins),
+            "weeks": len(series.weeks),
+            "duration_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def get_or_build_series(self, company_id: str) -> Dict[str, Any]:
+        """Série gravada; na primeira leitura da empresa, constrói na hora"""
+        series = self.get_series(company_id)
+        if series is None:
+            metrics = self.refresh(company_id, rebuild=True)
+            print(f"DEBUG: Série de evolução construída: {metrics}")
+            series = self.get_series(company_id) or {}
+        return series
+
+    # ---------- Task de background ----------
+
+    def flush(self):
+        """Atualiza as empresas marcadas desde a última execução"""
+        for company_id, rebuild in self._take_dirty().items():
+            try:
+                metrics = self.refresh(company_id, rebuild=rebuild)
+                print(f"DEBUG: Série de evolução atualizada: {metrics}")
+            except Exception as e:
+                print(f"DEBUG: Erro ao atualizar série de evolução da empresa {company_id}: {e}")
+                self.mark_dirty(company_id, rebuild)
+
+    async def run_periodically(self):
+        """Task de background: agrupa as mudanças e atualiza a cada refresh_interval segundos"""
+        try:
+            while True:
+                await asyncio.sleep(self.refresh_interval)
+                await asyncio.to_thread(self.flush)
+        except asyncio.CancelledError:
+            # Último flush no shutdown para não perder mudanças marcadas
+            await asyncio.to_thread(self.flush)
+            raise
+
+
+def series_points(series: Dict[str, Any], until: date) -> List[Dict[str, Any]]:
+    """Pontos semanais da série, repetindo o último estado até a semana de `until`"""
+    weeks = series.get("weeks") or []
+    points = [
+        {
+            "week": date.fromisoformat(week),
+            "progress": series["progress"][i],
+            "objectives_count": series["objectives_count"][i],
+            "kr_count": series["kr_count"][i],
+            "active_krs": series["active_krs"][i],
+            # Séries gravadas antes da versão 3 (até a reconstrução): a semana sozinha
+            "active_krs_window": (series.get("active_krs_window") or series["active_krs"])[i],
+        }
+        for i, week in enumerate(weeks)
+    ]
+    if points:
+        last_week = week_start(until)
+        tail = series.get("active_window_tail") or []
+        current = points[-1]["week"] + timedelta(days=7)
+        elapsed = 0
+        while current <= last_week:
+            # Sem check-ins novos, a janela só perde as semanas mais antigas
+            window = tail[elapsed] if elapsed < len(tail) else 0
+            points.append({**points[-1], "week": current, "active_krs": 0, "active_krs_window": window})
+            current += timedelta(days=7)
+            elapsed += 1
+    return points
+
+
+# Instância por processo (worker)
+evolution_service = EvolutionService()
@@ -0,0 +1,132 @@
+"""
+Exportação Excel em modo streaming (openpyxl write_only)
+
+As linhas saem das colunas tipadas de report_rows direto para o XML da planilha:
+sem lista de dicionários nem DataFrame intermediários, e a memória não cresce com
+o número de linhas (no modo write_only cada linha é gravada ao ser adicionada).
+Valores numéricos e datas vão como números/datas do Excel; o formato de exibição
+de cada tipo de coluna é um estilo nomeado registrado uma vez por workbook.
+"""
+from typing import Any, Iterable, List, Sequence, Tuple
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+    from openpyxl.utils import get_column_letter
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+from ..models.reports import ReportContent, DashboardReportData
+from .report_rows import KEY_RESULT_COLUMNS, OBJECTIVE_COLUMNS, ReportColumn, iter_rows, naive
+
+# Formato de exibição por tipo de coluna (demais tipos: célula sem estilo)
+NUMBER_FORMATS = {
+    'number': '#,##0.00',
+    'percent': '0.0',
+    'datetime': 'DD/MM/YYYY HH:MM',
+    'date': 'DD/MM/YYYY',
+}
+COLUMN_WIDTHS = {'text': 40, 'enum': 14, 'integer': 12, 'number': 14, 'percent': 14, 'datetime': 18, 'date': 14}
+HEADER_STYLE = 'okr_header'
+
+
+class ExcelReportWriter:
+    """Workbook write_only com os estilos do relatório"""
+
+    def __init__(self):
+        self.workbook = Workbook(write_only=True)
+        self.workbook.add_named_style(NamedStyle(
+            name=HEADER_STYLE,
+            font=Font(bold=True, color='FFFFFF'),
+            fill=PatternFill('solid', fgColor='4F46E5'),
+            alignment=Alignment(vertical='center'),
+        ))
+        for kind, number_format in NUMBER_FORMATS.items():
+            self.workbook.add_named_style(NamedStyle(name=f'okr_{kind}', number_format=number_format))
+
+    def _sheet(self, title: str, headers: Sequence[str], widths: Sequence[float]):
+        sheet = self.workbook.create_sheet(title)
+        # Dimensões e painel congelado precisam ser definidos antes da primeira linha
+        sheet.freeze_panes = 'A2'
+        for index, width in enumerate(widths, start=1):
+            sheet.column_dimensions[get_column_letter(index)].width = width
+        cells = []
+        for header in headers:
+            cell = WriteOnlyCell(sheet, header)
+            cell.style = HEADER_STYLE
+            cells.append(cell)
+        sheet.append(cells)
+        return sheet
+
+    def add_table(self, title: str, columns: Sequence[ReportColumn], items: Iterable[Any]) -> int:
+        """Aba com uma linha por item; retorna a quantidade de linhas"""
+        sheet = self._sheet(title, [c.header for c in columns], [COLUMN_WIDTHS.get(c.kind, 20) for c in columns])
+
+        # Por coluna: (estilo nomeado ou None, texto para valor ausente, é data)
+        plan = [
+            (f'okr_{c.kind}' if c.kind in NUMBER_FORMATS else None, c.empty or None, c.kind in ('datetime', 'date'))
+            for c in columns
+        ]
+        append = sheet.append
+        count = 0
+        for row in iter_rows(items, columns):
+            values = []
+            for value, (style, empty, is_date) in zip(row, plan):
+                if value is None or value == '':
+                    values.append(empty)
+                elif style is None:
+                    values.append(value)
+                else:
+                    cell = WriteOnlyCell(sheet, naive(value) if is_date else value)
+                    cell.style = style
+                    values.append(cell)
+            append(values)
+            count += 1
+        return count
+
+    def add_key_values(self, title: str, headers: Tuple[str, str], rows: Iterable[Tuple[str, Any, str]]):
+        """Aba de duas colunas; cada linha é (rótulo, valor, tipo da coluna)"""
+        sheet = self._sheet(title, headers, [28, 24])
+        for label, value, kind in rows:
+            if kind in NUMBER_FORMATS:
+                cell = WriteOnlyCell(sheet, value)
+                cell.style = f'okr_{kind}'
+                value = cell
+            sheet.append([label, value])
+
+    def save(self, filepath: str) -> str:
+        self.workbook.save(filepath)
+        return filepath
+
+
+def _dashboard_rows(data: DashboardReportData) -> List[Tuple[str, Any, str]]:
+    return [
+        ('Empresa', data.company_name, 'text'),
+        ('Período', data.report_period, 'text'),
+        ('Total Objetivos', data.total_objectives, 'integer'),
+        ('Total Key Results', data.total_key_results, 'integer'),
+        ('Usuários Ativos', data.active_users, 'integer'),
+        ('Progresso Geral (%)', data.overall_progress, 'percent'),
+        ('Taxa Conclusão (%)', data.completion_rate, 'percent'),
+        ('Taxa No Prazo (%)', data.on_track_rate, 'percent'),
+    ]
+
+
+def write_excel_report(content: ReportContent, filepath: str) -> str:
+    """Abas Resumo/Status (dashboard), Objetivos e Key Results"""
+    writer = ExcelReportWriter()
+    if content.dashboard_data:
+        writer.add_key_values('Resumo', ('Métrica', 'Valor'), _dashboard_rows(content.dashboard_data))
+        writer.add_key_values('Status', ('Status', 'Quantidade'), (
+            (status, count, 'integer') for status, count in content.dashboard_data.objectives_by_status.items()
+        ))
+    if content.objectives:
+        writer.add_table('Objetivos', OBJECTIVE_COLUMNS, content.objectives)
+    if content.key_results:
+        writer.add_table('Key Results', KEY_RESULT_COLUMNS, content.key_results)
+    if not writer.workbook.worksheets:
+        # O Excel não abre um arquivo sem abas
+        writer.add_key_values('Resumo', ('Métrica', 'Valor'), [])
+    return writer.save(filepath)
@@ -0,0 +1,149 @@
+"""
+Manutenção do banco em lotes (sessões expiradas e retenção de notificações)
+
+Em vez de um único DELETE sobre a tabela inteira, cada tarefa apaga no máximo
+chunk_size linhas por comando, na ordem do índice (expires_at / created_at),
+e respeita um orçamento de linhas por segundo para não competir com a API.
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from postgrest.exceptions import APIError
+from supabase import Client
+
+from ..core.settings import settings
+
+
+@dataclass
+class MaintenanceMetrics:
+    """Progresso de uma tarefa de manutenção"""
+    task: str
+    cutoff: str
+    deleted: int = 0
+    chunks: int = 0
+    duration_seconds: float = 0.0
+    rows_per_second: float = 0.0
+    completed: bool = False
+    dry_run: bool = False
+
+
+class MaintenanceService:
+    """Remove linhas antigas em lotes limitados e com ritmo controlado"""
+
+    def __init__(
+        self,
+        supabase_admin: Client,
+        chunk_size: int = settings.MAINTENANCE_CHUNK_SIZE,
+        rows_per_second: int = settings.MAINTENANCE_ROWS_PER_SECOND,
+    ):
+        self.supabase = supabase_admin
+        self.chunk_size = max(1, chunk_size)
+        self.rows_per_second = rows_per_second
+
+    # ---------- Lotes ----------
+
+    def _delete_chunk(self, rpc_name: str, params: Dict[str, Any], table: str, build_select) -> int:
+        """Apaga um lote via função SQL (um comando); sem a função, SELECT dos ids + DELETE"""
+        try:
+            response = self.supabase.rpc(rpc_name, {**params, "p_limit": self.chunk_size}).execute()
+            return int(response.data or 0)
+        except APIError as e:
+            if "function" not in str(e).lower() and "PGRST202" not in str(e):
+                raise
+        ids = [row["id"] for row in (build_select().limit(self.chunk_size).execute().data or [])]
+        if not ids:
+            return 0
+        self.supabase.table(table).delete().in_("id", ids).execute()
+        return len(ids)
+
+    def _run(self, task: str, cutoff: str, delete_chunk, count_query, max_rows: Optional[int], dry_run: bool,
+             progress: bool) -> MaintenanceMetrics:
+        metrics = MaintenanceMetrics(task=task, cutoff=cutoff, dry_run=dry_run)
+        started = time.perf_counter()
+
+        if dry_run:
+            metrics.deleted = count_query().execute().count or 0
+            metrics.completed = True
+            return metrics
+
+        while max_rows is None or metrics.deleted < max_rows:
+            chunk_started = time.perf_counter()
+            deleted = delete_chunk()
+            metrics.deleted += deleted
+            metrics.chunks += 1
+
+            elapsed = time.perf_counter() - started
+            metrics.duration_seconds = round(elapsed, 3)
+            metrics.rows_per_second = round(metrics.deleted / elapsed, 1) if elapsed else 0.0
+            if progress:
+                print(f"   🧹 {task}: lote {metrics.chunks} -> {deleted} linhas "
+                      f"(total {metrics.deleted}, {metrics.rows_per_second}/s)")
+
+            if deleted < self.chunk_size:
+                metrics.completed = True
+                break
+
+            # Orçamento de linhas/segundo: dormir o que faltar para este lote
+            if self.rows_per_second > 0:
+                budget = deleted / self.rows_per_second
+                spent = time.perf_counter() - chunk_started
+                if budget > spent:
+                    time.sleep(budget - spent)
+
+        metrics.duration_seconds = round(time.perf_counter() - started, 3)
+        return metrics
+
+    # ---------- Tarefas ----------
+
+    def cleanup_sessions(
+        self,
+        older_than_days: int = settings.SESSION_RETENTION_DAYS,
+        max_rows: Optional[int] = None,
+        dry_run: bool = False,
+        progress: bool = False,
+    ) -> MaintenanceMetrics:
+        """
+        Remove sessões expiradas há mais de 'older_than_days' dias.
+
+        Sessões revogadas só saem depois de expirar: enquanto o JWT é válido, a linha
+        revogada é o que a confirmação de revogação consulta para recusá-lo.
+        """
+        cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).isoformat()
+
+        return self._run(
+            "user_sessions",
+            cutoff,
+            lambda: self._delete_chunk(
+                "delete_expired_sessions_chunk", {"p_cutoff": cutoff}, "user_sessions",
+                lambda: self.supabase.table("user_sessions").select("id").lt("expires_at", cutoff).order("expires_at")
+            ),
+            lambda: self.supabase.table("user_sessions").select("id", count="exact").lt("expires_at", cutoff).limit(1),
+            max_rows,
+            dry_run,
+            progress,
+        )
+
+    def compact_notifications(
+        self,
+        retention_days: int = settings.NOTIFICATION_RETENTION_DAYS,
+        max_rows: Optional[int] = None,
+        dry_run: bool = False,
+        progress: bool = False,
+    ) -> MaintenanceMetrics:
+        """Remove notificações criadas há mais de 'retention_days' dias"""
+        cutoff = (datetime.utcnow() - timedelta(days=retention_days)).isoformat()
+
+        return self._run(
+            "notifications",
+            cutoff,
+            lambda: self._delete_chunk(
+                "delete_old_notifications_chunk", {"p_cutoff": cutoff}, "notifications",
+                lambda: self.supabase.table("notifications").select("id").lt("created_at", cutoff).order("created_at")
+            ),
+            lambda: self.supabase.table("notifications").select("id", count="exact").lt("created_at", cutoff).limit(1),
+            max_rows,
+            dry_run,
+            progress,
+        )
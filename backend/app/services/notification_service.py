@@ -1,13 +1,72 @@
+import threading
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Iterable, Tuple
+from postgrest.exceptions import APIError
 from supabase import Client
 
+from ..core.settings import settings
+from ..utils.supabase import fetch_all
+
 from ..models.notification import (
     NotificationType, NotificationPriority, NotificationAlert, AlertContext,
     NotificationFilter, Notification, NotificationSettings
 )
 
 
+@dataclass
+class CompanyAlertSnapshot:
+    """Dados de uma empresa carregados uma única vez para a geração de alertas"""
+    company_id: str
+    objectives: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    key_results: List[Dict[str, Any]] = field(default_factory=list)
+    recent_checkin_kr_ids: Set[str] = field(default_factory=set)
+    active_cycle: Optional[Dict[str, Any]] = None
+
+
+# Linhas por INSERT em lote na criação de notificações
+NOTIFICATION_INSERT_CHUNK_SIZE = 500
+# Chaves por consulta de deduplicação (in.(...) vai na URL)
+DEDUP_LOOKUP_CHUNK_SIZE = 200
+
+
+def build_dedup_key(notification_type: NotificationType, data: Optional[Dict[str, Any]], period: str) -> str:
+    """Chave determinística de um alerta: tipo + entidade relacionada + período (dia)"""
+    data = data or {}
+    entity_id = data.get("key_result_id") or data.get("objective_id") or data.get("cycle_id") or "-"
+    return f"{notification_type.value}:{entity_id}:{period}"
+
+
+# Cache em processo dos contadores (total/não lidas) por (user_id, company_id).
+# A fonte da verdade é a tabela notification_counters, mantida por triggers;
+# o cache evita a consulta no badge do sino e é invalidado a cada escrita.
+# Escritas de outros processos (alert_scheduler, outros workers) são percebidas
+# por empresa: a cada NOTIFICATION_COUNTER_SYNC_INTERVAL segundos uma consulta
+# busca os contadores com updated_at posterior ao último visto e os descarta.
+_counter_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, int]]] = {}
+_counter_cache_lock = threading.Lock()
+# company_id -> (próxima sincronização, maior updated_at visto)
+_counter_sync: Dict[str, Tuple[float, Optional[str]]] = {}
+# Margem na busca por updated_at: now() é o início da transação, que pode confirmar depois
+COUNTER_SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def invalidate_notification_counters(user_ids: Iterable[str], company_id: str):
+    """Remove do cache os contadores dos usuários informados"""
+    with _counter_cache_lock:
+        for user_id in user_ids:
+            _counter_cache.pop((str(user_id), str(company_id)), None)
+
+
+def _parse_datetime(value: Optional[str]) -> datetime:
+    """Converte timestamps do Supabase (com ou sem timezone) para datetime local sem timezone"""
+    if not value:
+        return datetime.min
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
 class NotificationService:
     def __init__(self, supabase_admin: Client):
         self.supabase = supabase_admin
@@ -19,11 +78,14 @@ class NotificationService:
         # Busca configurações da empresa
         company_settings = await self._get_company_settings(company_id)
         
+        # Snapshot único dos dados da empresa, compartilhado por todos os geradores
+        snapshot = await self._load_company_snapshot(company_id, company_settings)
+        
         # Gera diferentes tipos de alertas
-        alerts.extend(await self._generate_checkin_pending_alerts(company_id, company_settings))
-        alerts.extend(await self._generate_objective_behind_alerts(company_id, company_settings))
-        alerts.extend(await self._generate_cycle_ending_alerts(company_id, company_settings))
-        alerts.extend(await self._generate_target_achieved_alerts(company_id, company_settings))
+        alerts.extend(await self._generate_checkin_pending_alerts(snapshot, company_settings))
+        alerts.extend(await self._generate_objective_behind_alerts(snapshot, company_settings))
+        alerts.extend(await self._generate_cycle_ending_alerts(snapshot, company_settings))
+        alerts.extend(await self._generate_target_achieved_alerts(snapshot, company_settings))
         
         return alerts
 
@@ -53,8 +115,92 @@ class NotificationService:
         }
         
         response = self.supabase.table("notifications").insert(notification_data).execute()
+        invalidate_notification_counters([user_id], company_id)
         return response.data[0]["id"]
 
+    async def create_notifications_bulk(
+        self,
+        company_id: str,
+        alerts: List[NotificationAlert],
+        chunk_size: int = NOTIFICATION_INSERT_CHUNK_SIZE
+    ) -> int:
+        """
+        Cria as notificações de vários alertas (fan-out por usuário) em lotes.
+        
+        Cada linha recebe uma chave determinística (tipo + entidade + período); linhas
+        cuja chave já existe em uma notificação não lida do usuário são descartadas
+        por uma consulta prévia (chaves exatas, em lotes) e, em caso de corrida, pelo
+        índice único parcial das não lidas (ON CONFLICT DO NOTHING).
+        """
+        now = datetime.now().isoformat()
+        period = datetime.now().date().isoformat()
+        
+        rows: Dict[tuple, Dict[str, Any]] = {}
+        for alert in alerts:
+            dedup_key = build_dedup_key(alert.type, alert.data, period)
+            for user_id in alert.user_ids:
+                rows.setdefault((user_id, dedup_key), {
+                    "user_id": user_id,
+                    "company_id": company_id,
+                    "type": alert.type.value,
+                    "title": alert.title,
+                    "message": alert.message,
+                    "data": alert.data or {},
+                    "priority": alert.priority.value,
+                    "is_read": False,
+                    "dedup_key": dedup_key,
+                    "created_at": now,
+                    "updated_at": now
+                })
+        
+        if not rows:
+            return 0
+        
+        for user_id, dedup_key in self._unread_dedup_keys(company_id, {key for _, key in rows}):
+            rows.pop((user_id, dedup_key), None)
+        
+        pending = list(rows.values())
+        created_count = 0
+        for start in range(0, len(pending), chunk_size):
+            created_count += self._insert_notifications_chunk(company_id, pending[start:start + chunk_size])
+        
+        invalidate_notification_counters({row["user_id"] for row in pending}, company_id)
+        return created_count
+
+    def _unread_dedup_keys(self, company_id: str, keys: Set[str]) -> Set[tuple]:
+        """(user_id, dedup_key) já notificados e ainda não lidos, buscando as chaves exatas (índice parcial)"""
+        keys = sorted(keys)
+        found = set()
+        for start in range(0, len(keys), DEDUP_LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + DEDUP_LOOKUP_CHUNK_SIZE]
+            for item in fetch_all(lambda: self.supabase.table("notifications").select(
+                "user_id, dedup_key"
+            ).eq("company_id", company_id).eq("is_read", False).in_("dedup_key", chunk).order("id")):
+                found.add((item["user_id"], item["dedup_key"]))
+        return found
+
+    def _insert_notifications_chunk(self, company_id: str, rows: List[Dict[str, Any]]) -> int:
+        """INSERT em lote via função SQL (ON CONFLICT no índice parcial); sem a função, INSERT simples"""
+        try:
+            response = self.supabase.rpc("insert_notifications_dedup", {"p_rows": rows}).execute()
+            return int(response.data or 0)
+        except APIError as e:
+            if "function" not in str(e).lower() and "PGRST202" not in str(e):
+                raise
+        try:
+            response = self.supabase.table("notifications").insert(rows).execute()
+            return len(response.data or [])
+        except APIError as e:
+            if getattr(e, "code", None) != "23505":
+                raise
+        # Corrida com outra execução: refazer a consulta prévia só para este lote
+        existing = self._unread_dedup_keys(company_id, {row["dedup_key"] for row in rows})
+        rows = [row for row in rows if (row["user_id"], row["dedup_key"]) not in existing]
+        if not rows:
+            return 0
+        response = self.supabase.table("notifications").insert(rows).execute()
+        return len(response.data or [])
+
     async def get_notifications(
         self, 
         user_id: str, 
@@ -87,14 +233,75 @@ class NotificationService:
         response = query.execute()
         notifications = [Notification(**item) for item in response.data]
         
-        # Conta total e não lidas
-        total_response = self.supabase.table("notifications").select("id", count="exact").eq("user_id", user_id).eq("company_id", company_id).execute()
-        total = total_response.count
-        
-        unread_response = self.supabase.table("notifications").select("id", count="exact").eq("user_id", user_id).eq("company_id", company_id).eq("is_read", False).execute()
-        unread_count = unread_response.count
+        # Total e não lidas vêm dos contadores (cache em processo / notification_counters)
+        counters = self.get_counters(user_id, company_id)
         
-        return notifications, total, unread_count
+        return notifications, counters["total"], counters["unread"]
+
+    def get_counters(self, user_id: str, company_id: str) -> Dict[str, int]:
+        """Contadores de total e não lidas do usuário (leitura O(1), com cache)"""
+        key = (str(user_id), str(company_id))
+        self._sync_company_counters(key[1])
+        now = time.monotonic()
+        with _counter_cache_lock:
+            cached = _counter_cache.get(key)
+            if cached and cached[0] > now:
+                return dict(cached[1])
+        
+        try:
+            response = self.supabase.table("notification_counters").select(
+                "total, unread"
+            ).eq("user_id", user_id).eq("company_id", company_id).execute()
+            row = response.data[0] if response.data else {}
+            counters = {"total": row.get("total", 0), "unread": row.get("unread", 0)}
+        except APIError as e:
+            # Tabela de contadores ainda não criada (performance_setup.sql): conta direto
+            print(f"DEBUG: notification_counters indisponível, contando notificações: {e}")
+            counters = self._count_notifications(user_id, company_id)
+        
+        with _counter_cache_lock:
+            if len(_counter_cache) >= settings.CACHE_MAXSIZE:
+                _counter_cache.clear()
+            _counter_cache[key] = (now + settings.NOTIFICATION_COUNTER_CACHE_TTL, counters)
+        return dict(counters)
+
+    def _sync_company_counters(self, company_id: str):
+        """Descarta do cache os contadores da empresa alterados por outros processos"""
+        now = time.monotonic()
+        with _counter_cache_lock:
+            next_sync, seen = _counter_sync.get(company_id, (0.0, None))
+            if next_sync > now:
+                return
+            _counter_sync[company_id] = (now + settings.NOTIFICATION_COUNTER_SYNC_INTERVAL, seen)
+        
+        query = self.supabase.table("notification_counters").select("user_id, updated_at").eq("company_id", company_id)
+        try:
+            if seen:
+                since = datetime.fromisoformat(seen.replace("Z", "+00:00")) - COUNTER_SYNC_OVERLAP
+                rows = query.gte("updated_at", since.isoformat()).execute().data or []
+            else:
+                # Primeira sincronização da empresa: só o ponto de partida
+                rows = query.order("updated_at", desc=True).limit(1).execute().data or []
+        except APIError as e:
+            # Sem a tabela (performance_setup.sql) ou falha: o TTL limita a defasagem
+            print(f"DEBUG: Falha ao sincronizar contadores de notificações: {e}")
+            return
+        
+        with _counter_cache_lock:
+            if seen:
+                for row in rows:
+                    _counter_cache.pop((str(row["user_id"]), company_id), None)
+            else:
+                for key in [key for key in _counter_cache if key[1] == company_id]:
+                    _counter_cache.pop(key, None)
+            if rows:
+                latest = max([row["updated_at"] for row in rows] + ([seen] if seen else []))
+                _counter_sync[company_id] = (_counter_sync[company_id][0], latest)
+
+    def _count_notifications(self, user_id: str, company_id: str) -> Dict[str, int]:
+        total_response = self.supabase.table("notifications").select("id", count="exact").eq("user_id", user_id).eq("company_id", company_id).limit(1).execute()
+        unread_response = self.supabase.table("notifications").select("id", count="exact").eq("user_id", user_id).eq("company_id", company_id).eq("is_read", False).limit(1).execute()
+        return {"total": total_response.count or 0, "unread": unread_response.count or 0}
 
     async def mark_as_read(self, notification_ids: List[str], user_id: str) -> int:
         """Marca notificações como lidas"""
@@ -104,6 +311,9 @@ class NotificationService:
             "updated_at": datetime.now().isoformat()
         }).in_("id", notification_ids).eq("user_id", user_id).execute()
         
+        for company_id in {item.get("company_id") for item in response.data or []}:
+            invalidate_notification_counters([user_id], company_id)
+        
         return len(response.data)
 
     async def get_settings(self, user_id: str, company_id: str) -> Optional[NotificationSettings]:
@@ -139,41 +349,50 @@ class NotificationService:
         return NotificationSettings(**response.data[0])
 
     async def get_notification_stats(self, user_id: str, company_id: str) -> Dict[str, Any]:
-        """Retorna estatísticas de notificações do usuário"""
-        
-        # Total de notificações
-        total_response = self.supabase.table("notifications").select("id", count="exact").eq("user_id", user_id).eq("company_id", company_id).execute()
-        total = total_response.count
-        
-        # Não lidas
-        unread_response = self.supabase.table("notifications").select("id", count="exact").eq("user_id", user_id).eq("company_id", company_id).eq("is_read", False).execute()
-        unread = unread_response.count
-        
-        # Por tipo
-        by_type = {}
-        for notification_type in NotificationType:
-            type_response = self.supabase.table("notifications").select("id", count="exact").eq("user_id", user_id).eq("company_id", company_id).eq("type", notification_type.value).execute()
-            by_type[notification_type.value] = type_response.count
-        
-        # Por prioridade
-        by_priority = {}
-        for priority in NotificationPriority:
-            priority_response = self.supabase.table("notifications").select("id", count="exact").eq("user_id", user_id).eq("company_id", company_id).eq("priority", priority.value).execute()
-            by_priority[str(priority.value)] = priority_response.count
-        
-        # Últimas 24h
-        yesterday = (datetime.now() - timedelta(days=1)).isoformat()
-        recent_response = self.supabase.table("notifications").select("id", count="exact").eq("user_id", user_id).eq("company_id", company_id).gte("created_at", yesterday).execute()
-        recent_count = recent_response.count
+        """Retorna estatísticas de notificações do usuário (uma única consulta agregada)"""
+        
+        try:
+            response = self.supabase.rpc("notification_stats", {
+                "p_user_id": user_id,
+                "p_company_id": company_id
+            }).execute()
+            raw = response.data or {}
+        except APIError as e:
+            # Função notification_stats() ainda não criada: agrega em Python com uma consulta
+            print(f"DEBUG: RPC notification_stats indisponível, agregando localmente: {e}")
+            raw = self._aggregate_notification_stats(user_id, company_id)
+        
+        # Mantém todas as chaves de tipo/prioridade, mesmo com contagem zero
+        by_type = {t.value: 0 for t in NotificationType}
+        by_type.update({k: int(v) for k, v in (raw.get("by_type") or {}).items()})
+        by_priority = {str(p.value): 0 for p in NotificationPriority}
+        by_priority.update({str(k): int(v) for k, v in (raw.get("by_priority") or {}).items()})
         
         return {
-            "total": total,
-            "unread": unread,
+            "total": int(raw.get("total") or 0),
+            "unread": int(raw.get("unread") or 0),
             "by_type": by_type,
             "by_priority": by_priority,
-            "recent_count": recent_count
+            "recent_count": int(raw.get("recent_count") or 0)
         }
 
+    def _aggregate_notification_stats(self, user_id: str, company_id: str) -> Dict[str, Any]:
+        rows = fetch_all(lambda: self.supabase.table("notifications").select(
+            "type, priority, is_read, created_at"
+        ).eq("user_id", user_id).eq("company_id", company_id).order("id"))
+        
+        yesterday = datetime.now() - timedelta(days=1)
+        stats = {"total": len(rows), "unread": 0, "recent_count": 0, "by_type": {}, "by_priority": {}}
+        for row in rows:
+            if not row.get("is_read"):
+                stats["unread"] += 1
+            if _parse_datetime(row.get("created_at")) >= yesterday:
+                stats["recent_count"] += 1
+            stats["by_type"][row["type"]] = stats["by_type"].get(row["type"], 0) + 1
+            priority = str(row["priority"])
+            stats["by_priority"][priority] = stats["by_priority"].get(priority, 0) + 1
+        return stats
+
     # Métodos privados para geração de alertas
     async def _get_company_settings(self, company_id: str) -> Dict[str, Any]:
         """Busca configurações consolidadas da empresa"""
@@ -196,7 +415,40 @@ class NotificationService:
             "target_achieved_enabled": any(s.get("target_achieved_enabled", True) for s in settings_list)
         }
 
-    async def _generate_checkin_pending_alerts(self, company_id: str, settings: Dict[str, Any]) -> List[NotificationAlert]:
+    async def _load_company_snapshot(self, company_id: str, settings: Dict[str, Any]) -> CompanyAlertSnapshot:
+        """Carrega de uma vez os dados da empresa usados por todos os geradores de alertas"""
+        
+        objectives = fetch_all(lambda: self.supabase.table("objectives").select(
+            "id, title, progress, status, owner_id, cycle_id, updated_at, cycles(start_date, end_date)"
+        ).eq("company_id", company_id).order("id"))
+        
+        key_results = fetch_all(lambda: self.supabase.table("key_results").select(
+            "id, title, objective_id, owner_id, progress, updated_at, objectives!inner(company_id)"
+        ).eq("objectives.company_id", company_id).order("id"))
+        
+        # Anti-join: KRs com check-in recente, em uma única consulta para a empresa toda
+        recent_checkin_kr_ids = set()
+        if settings.get("checkin_pending_enabled", True) and key_results:
+            cutoff_date = (datetime.now() - timedelta(days=settings.get("checkin_pending_days", 3))).isoformat()
+            checkins = fetch_all(lambda: self.supabase.table("kr_checkins").select(
+                "key_result_id, key_results!inner(objectives!inner(company_id))"
+            ).eq("key_results.objectives.company_id", company_id).gte("created_at", cutoff_date).order("id"))
+            recent_checkin_kr_ids = {c["key_result_id"] for c in checkins}
+        
+        active_cycle = None
+        if settings.get("cycle_ending_enabled", True):
+            cycle_response = self.supabase.table("cycles").select("id, name, end_date").eq("company_id", company_id).eq("is_active", True).limit(1).execute()
+            active_cycle = cycle_response.data[0] if cycle_response.data else None
+        
+        return CompanyAlertSnapshot(
+            company_id=company_id,
+            objectives={obj["id"]: obj for obj in objectives},
+            key_results=key_results,
+            recent_checkin_kr_ids=recent_checkin_kr_ids,
+            active_cycle=active_cycle
+        )
+
+    async def _generate_checkin_pending_alerts(self, snapshot: CompanyAlertSnapshot, settings: Dict[str, Any]) -> List[NotificationAlert]:
         """Gera alertas de check-in pendente"""
         alerts = []
         
@@ -204,47 +456,32 @@ class NotificationService:
             return alerts
         
         days_threshold = settings.get("checkin_pending_days", 3)
-        cutoff_date = (datetime.now() - timedelta(days=days_threshold)).isoformat()
-        
-        # Busca Key Results sem check-in há X dias
-        query = """
-        SELECT kr.id, kr.title, kr.objective_id, obj.title as objective_title, obj.owner_id, u.name as owner_name
-        FROM key_results kr
-        JOIN objectives obj ON kr.objective_id = obj.id
-        JOIN users u ON obj.owner_id = u.id
-        WHERE obj.company_id = %s
-        AND kr.id NOT IN (
-            SELECT DISTINCT key_result_id 
-            FROM kr_checkins 
-            WHERE created_at > %s
-        )
-        AND obj.status != 'COMPLETED'
-        """
         
-        # Simulação da query (adaptar para Supabase)
-        kr_response = self.supabase.table("key_results").select("id, title, objective_id, objectives!inner(title, owner_id, company_id, status, users!inner(name))").eq("objectives.company_id", company_id).neq("objectives.status", "COMPLETED").execute()
-        
-        for kr in kr_response.data:
-            # Verifica se tem check-in recente
-            checkin_response = self.supabase.table("kr_checkins").select("id").eq("key_result_id", kr["id"]).gte("created_at", cutoff_date).execute()
+        # Key Results de objetivos não concluídos sem check-in há X dias
+        for kr in snapshot.key_results:
+            if kr["id"] in snapshot.recent_checkin_kr_ids:
+                continue
             
-            if not checkin_response.data:
-                alerts.append(NotificationAlert(
-                    type=NotificationType.CHECKIN_PENDING,
-                    title=f"Check-in pendente: {kr['title'][:50]}...",
-                    message=f"O Key Result '{kr['title']}' não recebe atualização há {days_threshold} dias. Faça um check-in para manter o progresso atualizado.",
-                    user_ids=[kr["objectives"]["owner_id"]],
-                    data={
-                        "key_result_id": kr["id"],
-                        "objective_id": kr["objective_id"],
-                        "days_without_checkin": days_threshold
-                    },
-                    priority=NotificationPriority.MEDIUM
-                ))
+            objective = snapshot.objectives.get(kr["objective_id"])
+            if not objective or objective.get("status") == "COMPLETED" or not objective.get("owner_id"):
+                continue
+            
+            alerts.append(NotificationAlert(
+                type=NotificationType.CHECKIN_PENDING,
+                title=f"Check-in pendente: {kr['title'][:50]}...",
+                message=f"O Key Result '{kr['title']}' não recebe atualização há {days_threshold} dias. Faça um check-in para manter o progresso atualizado.",
+                user_ids=[objective["owner_id"]],
+                data={
+                    "key_result_id": kr["id"],
+                    "objective_id": kr["objective_id"],
+                    "days_without_checkin": days_threshold
+                },
+                priority=NotificationPriority.MEDIUM
+            ))
         
         return alerts
 
-    async def _generate_objective_behind_alerts(self, company_id: str, settings: Dict[str, Any]) -> List[NotificationAlert]:
+    async def _generate_objective_behind_alerts(self, snapshot: CompanyAlertSnapshot, settings: Dict[str, Any]) -> List[NotificationAlert]:
         """Gera alertas de objetivo atrasado"""
         alerts = []
         
@@ -252,91 +489,87 @@ class NotificationService:
             return alerts
         
         threshold = settings.get("objective_behind_threshold", 20)
+        now = datetime.now()
         
-        # Busca objetivos com progresso abaixo do esperado
-        objectives_response = self.supabase.table("objectives").select("id, title, progress, owner_id, cycle_id, cycles!inner(start_date, end_date), users!inner(name)").eq("company_id", company_id).neq("status", "COMPLETED").execute()
-        
-        for obj in objectives_response.data:
-            if obj.get("cycles"):
-                cycle = obj["cycles"]
-                start_date = datetime.fromisoformat(cycle["start_date"])
-                end_date = datetime.fromisoformat(cycle["end_date"])
-                now = datetime.now()
-                
-                # Calcula progresso esperado
-                total_days = (end_date - start_date).days
-                elapsed_days = (now - start_date).days
-                expected_progress = (elapsed_days / total_days) * 100 if total_days > 0 else 0
-                
-                actual_progress = obj.get("progress", 0)
-                
-                if expected_progress - actual_progress > threshold:
-                    alerts.append(NotificationAlert(
-                        type=NotificationType.OBJECTIVE_BEHIND,
-                        title=f"Objetivo atrasado: {obj['title'][:50]}...",
-                        message=f"O objetivo '{obj['title']}' está {expected_progress - actual_progress:.1f}% abaixo do progresso esperado para este período.",
-                        user_ids=[obj["owner_id"]],
-                        data={
-                            "objective_id": obj["id"],
-                            "actual_progress": actual_progress,
-                            "expected_progress": expected_progress,
-                            "gap": expected_progress - actual_progress
-                        },
-                        priority=NotificationPriority.HIGH
-                    ))
+        # Objetivos com progresso abaixo do esperado para o ciclo
+        for obj in snapshot.objectives.values():
+            cycle = obj.get("cycles")
+            if obj.get("status") == "COMPLETED" or not cycle or not obj.get("owner_id"):
+                continue
+            
+            start_date = datetime.fromisoformat(cycle["start_date"])
+            end_date = datetime.fromisoformat(cycle["end_date"])
+            
+            # Calcula progresso esperado
+            total_days = (end_date - start_date).days
+            elapsed_days = (now - start_date).days
+            expected_progress = (elapsed_days / total_days) * 100 if total_days > 0 else 0
+            
+            actual_progress = obj.get("progress") or 0
+            
+            if expected_progress - actual_progress > threshold:
+                alerts.append(NotificationAlert(
+                    type=NotificationType.OBJECTIVE_BEHIND,
+                    title=f"Objetivo atrasado: {obj['title'][:50]}...",
+                    message=f"O objetivo '{obj['title']}' está {expected_progress - actual_progress:.1f}% abaixo do progresso esperado para este período.",
+                    user_ids=[obj["owner_id"]],
+                    data={
+                        "objective_id": obj["id"],
+                        "actual_progress": actual_progress,
+                        "expected_progress": expected_progress,
+                        "gap": expected_progress - actual_progress
+                    },
+                    priority=NotificationPriority.HIGH
+                ))
         
         return alerts
 
-    async def _generate_cycle_ending_alerts(self, company_id: str, settings: Dict[str, Any]) -> List[NotificationAlert]:
+    async def _generate_cycle_ending_alerts(self, snapshot: CompanyAlertSnapshot, settings: Dict[str, Any]) -> List[NotificationAlert]:
         """Gera alertas de fim de ciclo"""
         alerts = []
         
-        if not settings.get("cycle_ending_enabled", True):
+        if not settings.get("cycle_ending_enabled", True) or not snapshot.active_cycle:
             return alerts
         
         days_threshold = settings.get("cycle_ending_days", 7)
-        
-        # Busca ciclo ativo
-        cycle_response = self.supabase.table("cycles").select("id, name, end_date").eq("company_id", company_id).eq("is_active", True).execute()
-        
-        if cycle_response.data:
-            cycle = cycle_response.data[0]
-            end_date = datetime.fromisoformat(cycle["end_date"])
-            days_remaining = (end_date - datetime.now()).days
+        cycle = snapshot.active_cycle
+        end_date = datetime.fromisoformat(cycle["end_date"])
+        days_remaining = (end_date - datetime.now()).days
+        
+        if 0 < days_remaining <= days_threshold:
+            # Busca todos os usuários da empresa (apenas quando o alerta é de fato gerado)
+            users_response = self.supabase.table("users").select("id").eq("company_id", snapshot.company_id).eq("is_active", True).execute()
+            user_ids = [u["id"] for u in users_response.data]
             
-            if 0 < days_remaining <= days_threshold:
-                # Busca todos os usuários da empresa
-                users_response = self.supabase.table("users").select("id").eq("company_id", company_id).eq("is_active", True).execute()
-                user_ids = [u["id"] for u in users_response.data]
-                
-                alerts.append(NotificationAlert(
-                    type=NotificationType.CYCLE_ENDING,
-                    title=f"Ciclo '{cycle['name']}' termina em {days_remaining} dias",
-                    message=f"O ciclo '{cycle['name']}' está próximo do fim. Finalize suas atividades e objetivos para garantir o melhor resultado.",
-                    user_ids=user_ids,
-                    data={
-                        "cycle_id": cycle["id"],
-                        "days_remaining": days_remaining,
-                        "end_date": cycle["end_date"]
-                    },
-                    priority=NotificationPriority.HIGH
-                ))
+            alerts.append(NotificationAlert(
+                type=NotificationType.CYCLE_ENDING,
+                title=f"Ciclo '{cycle['name']}' termina em {days_remaining} dias",
+                message=f"O ciclo '{cycle['name']}' está próximo do fim. Finalize suas atividades e objetivos para garantir o melhor resultado.",
+                user_ids=user_ids,
+                data={
+                    "cycle_id": cycle["id"],
+                    "days_remaining": days_remaining,
+                    "end_date": cycle["end_date"]
+                },
+                priority=NotificationPriority.HIGH
+            ))
         
         return alerts
 
-    async def _generate_target_achieved_alerts(self, company_id: str, settings: Dict[str, Any]) -> List[NotificationAlert]:
+    async def _generate_target_achieved_alerts(self, snapshot: CompanyAlertSnapshot, settings: Dict[str, Any]) -> List[NotificationAlert]:
         """Gera alertas de meta atingida"""
         alerts = []
         
         if not settings.get("target_achieved_enabled", True):
             return alerts
         
-        # Busca Key Results 100% concluídos nas últimas 24h
-        yesterday = (datetime.now() - timedelta(days=1)).isoformat()
+        # Metas 100% concluídas nas últimas 24h
+        yesterday = datetime.now() - timedelta(days=1)
         
-        kr_response = self.supabase.table("key_results").select("id, title, objective_id, owner_id, objectives!inner(title, users!inner(name))").eq("objectives.company_id", company_id).eq("progress", 100).gte("updated_at", yesterday).execute()
-        
-        for kr in kr_response.data:
+        for kr in snapshot.key_results:
+            if (kr.get("progress") or 0) < 100 or not kr.get("owner_id") or _parse_datetime(kr.get("updated_at")) < yesterday:
+                continue
+            
             alerts.append(NotificationAlert(
                 type=NotificationType.TARGET_ACHIEVED,
                 title=f"🎉 Meta atingida: {kr['title'][:50]}...",
@@ -350,10 +583,10 @@ class NotificationService:
                 priority=NotificationPriority.LOW
             ))
         
-        # Busca objetivos 100% concluídos nas últimas 24h
-        obj_response = self.supabase.table("objectives").select("id, title, owner_id, users!inner(name)").eq("company_id", company_id).eq("progress", 100).gte("updated_at", yesterday).execute()
-        
-        for obj in obj_response.data:
+        for obj in snapshot.objectives.values():
+            if (obj.get("progress") or 0) < 100 or not obj.get("owner_id") or _parse_datetime(obj.get("updated_at")) < yesterday:
+                continue
+            
             alerts.append(NotificationAlert(
                 type=NotificationType.TARGET_ACHIEVED,
                 title=f"🎯 Objetivo concluído: {obj['title'][:50]}...",
@@ -0,0 +1,258 @@
+"""
+Gráficos vetoriais dos relatórios PDF (reportlab.graphics, sem bibliotecas raster)
+
+- distribuição dos objetivos por status (pizza);
+- evolução semanal do progresso (linha);
+- progresso dos Key Results (barras por KR ou, com muitos KRs, por faixa de progresso).
+
+Cada gráfico parte de um template fixo (tamanho, fontes, cores) e o Drawing é
+guardado já expandido em formas primitivas, em um cache LRU por processo com
+chave no hash dos dados: exportações repetidas reaproveitam o desenho pronto.
+Séries longas passam por LTTB antes de virar gráfico, então o tempo de
+renderização fica limitado por REPORT_CHART_MAX_POINTS.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, List, Sequence, Tuple
+
+try:
+    from reportlab.graphics.charts.barcharts import HorizontalBarChart, VerticalBarChart
+    from reportlab.graphics.charts.legends import Legend
+    from reportlab.graphics.charts.lineplots import LinePlot
+    from reportlab.graphics.charts.piecharts import Pie
+    from reportlab.graphics.shapes import Drawing, Group, String, UserNode
+    from reportlab.graphics.widgets.markers import makeMarker
+    from reportlab.lib import colors
+    CHARTS_AVAILABLE = True
+except ImportError:
+    CHARTS_AVAILABLE = False
+
+from ..core.settings import settings
+from ..utils.downsampling import lttb
+
+# Largura útil da página A4 com as margens do relatório
+CHART_WIDTH = 451
+
+STATUS_COLORS = {
+    'PLANNED': '#9ca3af',
+    'ON_TRACK': '#10b981',
+    'AT_RISK': '#f59e0b',
+    'BEHIND': '#ef4444',
+    'COMPLETED': '#4f46e5',
+}
+# Rótulos sem emoji: a Helvetica dos gráficos não tem esses glifos
+STATUS_LABELS = {
+    'PLANNED': 'Planejado',
+    'ON_TRACK': 'No Prazo',
+    'AT_RISK': 'Em Risco',
+    'BEHIND': 'Atrasado',
+    'COMPLETED': 'Concluído',
+}
+# Faixas do histograma de KRs: (rótulo, limite inferior, cor)
+PROGRESS_BUCKETS = (
+    ('0-25%', 0, '#ef4444'),
+    ('25-50%', 25, '#f97316'),
+    ('50-75%', 50, '#f59e0b'),
+    ('75-99%', 75, '#10b981'),
+    ('100%', 100, '#059669'),
+)
+BAR_PALETTE = ((80, '#10b981'), (60, '#f59e0b'), (30, '#f97316'), (0, '#ef4444'))
+
+_cache: "OrderedDict[str, Tuple[float, float, Group]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached(kind: str, data: Tuple, build: Callable[[], "Drawing"]) -> "Drawing":
+    """
+    Drawing a partir do cache (chave: tipo + hash dos dados) ou montado, expandido e guardado.
+
+    O cache guarda só as formas primitivas; cada uso recebe um Drawing novo (o Flowable
+    guarda o canvas durante o desenho, então não pode ser compartilhado entre exportações).
+    """
+    key = kind + ':' + hashlib.sha1(repr(data).encode()).hexdigest()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+
+    if entry is None:
+        drawing = build()
+        entry = (drawing.width, drawing.height, _expanded(drawing))
+        with _cache_lock:
+            _cache[key] = entry
+            while len(_cache) > settings.REPORT_CHART_CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    width, height, shapes = entry
+    drawing = Drawing(width, height)
+    drawing.add(shapes)
+    return drawing
+
+
+def _expanded(node):
+    """
+    Cópia só com formas primitivas: o desenho pronto não recalcula eixos/escalas.
+
+    Group.expandUserNodes do ReportLab não expande os nós devolvidos pelos widgets
+    (rótulos dos eixos continuam widgets ligados ao gráfico original).
+    """
+    while isinstance(node, UserNode):
+        node = node.provideNode()
+    if not isinstance(node, Group):
+        return node
+    group = Group()
+    group.transform = node.transform[:]
+    for child in node.contents:
+        group.add(_expanded(child))
+    return group
+
+
+def _title(drawing: "Drawing", text: str, height: int):
+    drawing.add(String(0, height - 12, text, fontName='Helvetica-Bold', fontSize=10, fillColor=colors.HexColor('#374151')))
+
+
+def _bar_color(progress: float) -> str:
+    return next(color for minimum, color in BAR_PALETTE if progress >= minimum)
+
+
+def _short(text: str, size: int) -> str:
+    return text if len(text) <= size else text[:size - 3] + '...'
+
+
+# ---------- Templates ----------
+
+def status_chart(objectives_by_status: Dict[str, int]) -> "Drawing":
+    """Pizza da distribuição dos objetivos por status"""
+    data = tuple((status, count) for status, count in objectives_by_status.items() if count)
+
+    def build() -> "Drawing":
+        height = 170
+        drawing = Drawing(CHART_WIDTH, height)
+        _title(drawing, 'Objetivos por status', height)
+        pie = Pie()
+        pie.x, pie.y, pie.width, pie.height = 20, 10, 130, 130
+        pie.data = [count for _, count in data]
+        pie.labels = None
+        pie.sideLabels = False
+        pie.slices.strokeColor = colors.white
+        pie.slices.strokeWidth = 1
+        for i, (status, _) in enumerate(data):
+            pie.slices[i].fillColor = colors.HexColor(STATUS_COLORS.get(status, '#6b7280'))
+        drawing.add(pie)
+
+        total = sum(pie.data)
+        legend = Legend()
+        legend.x, legend.y = 190, 120
+        legend.fontName, legend.fontSize = 'Helvetica', 9
+        legend.dy, legend.deltay = 8, 16
+        legend.alignment = 'right'
+        legend.colorNamePairs = [
+            (colors.HexColor(STATUS_COLORS.get(status, '#6b7280')),
+             f"{STATUS_LABELS.get(status, status)}: {count} ({count / total * 100:.1f}%)")
+            for status, count in data
+        ]
+        drawing.add(legend)
+        return drawing
+
+    return _cached('status', data, build)
+
+
+def evolution_chart(weeks: Sequence[str], progress: Sequence[float], title: str = 'Evolução do progresso') -> "Drawing":
+    """Linha semanal do progresso (%), reduzida com LTTB acima de REPORT_CHART_MAX_POINTS pontos"""
+    points = [(float(date.fromisoformat(week).toordinal()), float(value)) for week, value in zip(weeks, progress)]
+    data = (title, tuple(lttb(points, settings.REPORT_CHART_MAX_POINTS)))
+
+    def build() -> "Drawing":
+        height = 200
+        drawing = Drawing(CHART_WIDTH, height)
+        _title(drawing, title, height)
+        plot = LinePlot()
+        plot.x, plot.y, plot.width, plot.height = 35, 30, CHART_WIDTH - 50, height - 55
+        plot.data = [list(data[1])]
+        plot.lines[0].strokeColor = colors.HexColor('#4f46e5')
+        plot.lines[0].strokeWidth = 1.5
+        if len(data[1]) <= 60:
+            plot.lines[0].symbol = makeMarker('FilledCircle', size=2.5)
+
+        plot.yValueAxis.valueMin, plot.yValueAxis.valueMax, plot.yValueAxis.valueStep = 0, 100, 25
+        plot.yValueAxis.labelTextFormat = '%d%%'
+        plot.yValueAxis.labels.fontSize = 7
+        plot.yValueAxis.visibleGrid = True
+        plot.yValueAxis.gridStrokeColor = colors.HexColor('#e5e7eb')
+
+        first, last = data[1][0][0], data[1][-1][0]
+        plot.xValueAxis.valueMin, plot.xValueAxis.valueMax = first, max(last, first + 7)
+        plot.xValueAxis.valueStep = max(7, round((last - first) / 6 / 7) * 7)
+        plot.xValueAxis.labelTextFormat = lambda value: date.fromordinal(int(value)).strftime('%d/%m/%y')
+        plot.xValueAxis.labels.fontSize = 7
+        drawing.add(plot)
+        return drawing
+
+    return _cached('evolution', data, build)
+
+
+def key_results_chart(items: Sequence[Tuple[str, float]]) -> "Drawing":
+    """Barras de progresso por KR; acima de REPORT_CHART_MAX_BARS, histograma por faixa de progresso"""
+    if len(items) > settings.REPORT_CHART_MAX_BARS:
+        counts = [0] * len(PROGRESS_BUCKETS)
+        for _, progress in items:
+            index = 4 if progress >= 100 else min(3, int(max(progress, 0) // 25))
+            counts[index] += 1
+        return _progress_histogram(tuple(counts))
+
+    data = tuple((_short(title, 45), round(progress, 1)) for title, progress in items)
+
+    def build() -> "Drawing":
+        bar_height = 16
+        height = 40 + bar_height * len(data)
+        drawing = Drawing(CHART_WIDTH, height)
+        _title(drawing, 'Progresso dos Key Results', height)
+        chart = HorizontalBarChart()
+        chart.x, chart.y, chart.width, chart.height = 190, 20, CHART_WIDTH - 200, bar_height * len(data)
+        # De cima para baixo na ordem recebida
+        chart.data = [[progress for _, progress in reversed(data)]]
+        chart.categoryAxis.categoryNames = [title for title, _ in reversed(data)]
+        chart.categoryAxis.labels.fontSize = 7
+        chart.categoryAxis.labels.boxAnchor = 'e'
+        chart.categoryAxis.labels.dx = -4
+        chart.valueAxis.valueMin, chart.valueAxis.valueMax, chart.valueAxis.valueStep = 0, 100, 25
+        chart.valueAxis.labelTextFormat = '%d%%'
+        chart.valueAxis.labels.fontSize = 7
+        chart.barWidth = bar_height * 0.6
+        chart.bars.strokeColor = None
+        for i, (_, progress) in enumerate(reversed(data)):
+            chart.bars[(0, i)].fillColor = colors.HexColor(_bar_color(progress))
+        drawing.add(chart)
+        return drawing
+
+    return _cached('key_results', data, build)
+
+
+def _progress_histogram(counts: Tuple[int, ...]) -> "Drawing":
+    def build() -> "Drawing":
+        height = 180
+        drawing = Drawing(CHART_WIDTH, height)
+        _title(drawing, f'Key Results por faixa de progresso ({sum(counts)} KRs)', height)
+        chart = VerticalBarChart()
+        chart.x, chart.y, chart.width, chart.height = 40, 25, CHART_WIDTH - 60, height - 50
+        chart.data = [list(counts)]
+        chart.categoryAxis.categoryNames = [label for label, _, _ in PROGRESS_BUCKETS]
+        chart.categoryAxis.labels.fontSize = 8
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.labels.fontSize = 7
+        chart.valueAxis.visibleGrid = True
+        chart.valueAxis.gridStrokeColor = colors.HexColor('#e5e7eb')
+        chart.bars.strokeColor = None
+        for i, (_, _, color) in enumerate(PROGRESS_BUCKETS):
+            chart.bars[(0, i)].fillColor = colors.HexColor(color)
+        drawing.add(chart)
+        return drawing
+
+    return _cached('key_results_histogram', counts, build)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
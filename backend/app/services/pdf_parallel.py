@@ -0,0 +1,352 @@
+"""
+Renderização de relatórios PDF grandes em partes paralelas
+
+Um relatório COMPLETE com milhares de objetivos/KRs não cabe em um único
+doc.build(story) em tempo razoável (o ReportLab usa um só núcleo). Aqui a story é
+dividida em seções independentes:
+- cabeçalho/resumo e conclusão (renderizados no processo principal);
+- lotes de objetivos e lotes de KRs (renderizados em um pool de processos).
+
+Cada parte vira um PDF sem numeração; depois as partes são unidas com pypdf, o
+sumário é montado com a numeração final, as páginas recebem "Página N de M" e
+os títulos viram marcadores (outline) do PDF.
+
+Com um PartCache (agendamentos de relatórios), cada parte fica guardada com a
+chave no hash dos seus dados: na execução seguinte só as partes cujos objetivos/KRs
+mudaram são renderizadas de novo.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    from pypdf import PdfWriter
+    from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
+    # Objeto indireto novo no PDF: add_object é a API pública (pypdf 5+); na versão
+    # fixada em requirements.txt (4.3.x) só existe _add_object. Sem nenhum dos dois,
+    # o relatório volta a ser renderizado em uma única passada.
+    _ADD_OBJECT = getattr(PdfWriter, "add_object", None) or getattr(PdfWriter, "_add_object", None)
+    PYPDF_AVAILABLE = _ADD_OBJECT is not None
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+from ..core.settings import settings
+from ..models.reports import ReportContent, KeyResultReportData
+from .pdf_report import PAGE_MARGINS, REPORTLAB_AVAILABLE, PdfReportRenderer, ReportDocTemplate, STYLES
+
+if REPORTLAB_AVAILABLE:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+
+    TOC_TABLE_STYLE = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#374151')),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+        ('TOPPADDING', (0, 0), (-1, -1), 3),
+        ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.HexColor('#e5e7eb')),
+    ])
+
+# Entrada do sumário: (nível, texto, página)
+TocEntry = Tuple[int, str, int]
+
+TOC_LABEL_MAX = 80
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """Pool criado na primeira renderização (spawn: o worker não herda o estado do servidor)"""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _executor_workers = workers
+        return _executor
+
+
+def shutdown_executor():
+    """Encerra o pool de renderização (shutdown da aplicação)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+@dataclass
+class PdfPart:
+    """Seção do relatório renderizada como um PDF separado"""
+    kind: str                 # objectives | key_results
+    content: ReportContent    # apenas os dados desta parte
+    offset: int = 0           # índice do primeiro objetivo no relatório inteiro
+    total: int = 0            # total de objetivos do relatório
+    heading: bool = False     # primeira parte da seção (leva o título)
+
+
+class PartCache:
+    """PDFs de partes já renderizadas em um diretório, por hash dos dados da parte"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._used: Set[str] = set()
+
+    def key(self, part: PdfPart) -> str:
+        data = (
+            part.kind, part.offset, part.total, part.heading,
+            [obj.model_dump_json() for obj in part.content.objectives or []],
+            [kr.model_dump_json() for kr in part.content.key_results or []],
+        )
+        return hashlib.sha1(repr(data).encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[Tuple[int, List[TocEntry]]]:
+        """(páginas, sumário) da parte guardada, ou None"""
+        self._used.add(key)
+        try:
+            with open(os.path.join(self.directory, f"{key}.json")) as f:
+                pages, entries = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if not os.path.exists(self.path(key)):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pages, [tuple(entry) for entry in entries]
+
+    def put(self, key: str, result: Tuple[int, List[TocEntry]]):
+        with open(os.path.join(self.directory, f"{key}.json"), "w") as f:
+            json.dump(result, f)
+
+    def prune(self):
+        """Remove as partes que não foram usadas nesta renderização"""
+        for name in os.listdir(self.directory):
+            if os.path.splitext(name)[0] not in self._used:
+                os.remove(os.path.join(self.directory, name))
+
+
+def should_render_in_parts(content: ReportContent, workers: Optional[int] = None,
+                           part_cache: Optional["PartCache"] = None) -> bool:
+    """
+    Vale a pena dividir: pypdf disponível, relatório acima do limite configurado e
+    ganho real: mais de um worker, ou um PartCache para reaproveitar partes.
+    Com um único núcleo e sem cache, a junção e o sumário só somariam tempo.
+    """
+    if not PYPDF_AVAILABLE or content.metadata.report_type == "SINGLE_OBJECTIVE":
+        return False
+    if max(1, workers or settings.REPORT_PDF_WORKERS) <= 1 and part_cache is None:
+        return False
+    items = len(content.objectives or []) + len(content.key_results or [])
+    return items >= settings.REPORT_PDF_PARALLEL_THRESHOLD
+
+
+def plan_parts(content: ReportContent, objectives_per_chunk: int, key_results_per_chunk: int) -> List[PdfPart]:
+    """Divide objetivos e KRs em lotes, cada um com o subconjunto de dados que usa"""
+    parts: List[PdfPart] = []
+
+    # Lote par: a quebra de página a cada 2 objetivos coincide com o início das partes
+    objectives_per_chunk = max(2, objectives_per_chunk + objectives_per_chunk % 2)
+    objectives = content.objectives or []
+    krs_by_objective: Dict[str, List[KeyResultReportData]] = {}
+    for kr in content.key_results or []:
+        if kr.objective_id:
+            krs_by_objective.setdefault(kr.objective_id, []).append(kr)
+
+    for start in range(0, len(objectives), objectives_per_chunk):
+        chunk = objectives[start:start + objectives_per_chunk]
+        chunk_krs = [kr for obj in chunk for kr in krs_by_objective.get(obj.id, ())]
+        parts.append(PdfPart(
+            kind='objectives',
+            content=content.model_copy(update={'objectives': chunk, 'key_results': chunk_krs}),
+            offset=start,
+            total=len(objectives),
+            heading=start == 0,
+        ))
+
+    # KRs agrupados por objetivo (como na seção "Todos os Key Results"); um grupo não é partido
+    groups: Dict[str, List[KeyResultReportData]] = {}
+    for kr in content.key_results or []:
+        groups.setdefault(kr.objective_title, []).append(kr)
+
+    batch: List[KeyResultReportData] = []
+    for krs in groups.values():
+        if batch and len(batch) + len(krs) > key_results_per_chunk:
+            parts.append(PdfPart(kind='key_results', content=content.model_copy(update={'objectives': [], 'key_results': batch})))
+            batch = []
+        batch.extend(krs)
+    if batch:
+        parts.append(PdfPart(kind='key_results', content=content.model_copy(update={'objectives': [], 'key_results': batch})))
+
+    first_kr = next((part for part in parts if part.kind == 'key_results'), None)
+    if first_kr:
+        first_kr.heading = True
+    return parts
+
+
+def render_part(part: PdfPart, filepath: str) -> Tuple[int, List[TocEntry]]:
+    """Renderiza uma parte (no worker); retorna (páginas, entradas do sumário com página local)"""
+    story = PdfReportRenderer(part.content).section(part.kind, offset=part.offset, total=part.total, heading=part.heading)
+    doc = ReportDocTemplate(filepath, page_numbers=False)
+    doc.build(story)
+    return doc.page, doc.toc_entries
+
+
+def _render_section(renderer: PdfReportRenderer, kind: str, filepath: str) -> Tuple[int, List[TocEntry]]:
+    doc = ReportDocTemplate(filepath, page_numbers=False)
+    doc.build(renderer.section(kind))
+    return doc.page, doc.toc_entries
+
+
+def _render_toc(entries: List[TocEntry], filepath: str) -> int:
+    """Página(s) de sumário; retorna a quantidade de páginas"""
+    rows = []
+    for level, label, page in entries:
+        if len(label) > TOC_LABEL_MAX:
+            label = label[:TOC_LABEL_MAX - 3] + '...'
+        rows.append([("    " * level) + label, str(page)])
+
+    story = [Paragraph("📑 Sumário", STYLES['subtitle']), Spacer(1, 10)]
+    if rows:
+        story.append(Table(rows, colWidths=[5.2*inch, 0.8*inch], style=TOC_TABLE_STYLE))
+    doc = ReportDocTemplate(filepath, page_numbers=False)
+    doc.build(story)
+    return doc.page
+
+
+def _stamp_page_numbers(writer: "PdfWriter"):
+    """
+    Acrescenta o rodapé "Página N de M" a cada página.
+
+    O texto entra como um content stream extra (com o conteúdo original isolado em q/Q);
+    merge_page reinterpretaria e regravaria sem compressão o conteúdo de todas as páginas.
+    """
+    font = _ADD_OBJECT(writer, DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica'),
+        NameObject('/Encoding'): NameObject('/WinAnsiEncoding'),
+    }))
+    save = DecodedStreamObject()
+    save.set_data(b"q\n")
+    save = _ADD_OBJECT(writer, save)
+
+    total_pages = len(writer.pages)
+    right = A4[0] - PAGE_MARGINS['rightMargin']
+    for number, page in enumerate(writer.pages, start=1):
+        text = f"Página {number} de {total_pages}"
+        x = right - stringWidth(text, 'Helvetica', 7)
+        footer = DecodedStreamObject()
+        footer.set_data(
+            f"Q\nq BT /FPageNumber 7 Tf 0.612 0.639 0.686 rg {x:.2f} 6 Td ({text}) Tj ET Q\n".encode('cp1252')
+        )
+
+        contents = page.get('/Contents')
+        original = list(contents.get_object()) if isinstance(contents.get_object(), ArrayObject) else [contents]
+        page[NameObject('/Contents')] = ArrayObject([save, *original, _ADD_OBJECT(writer, footer)])
+
+        resources = page.setdefault(NameObject('/Resources'), DictionaryObject()).get_object()
+        fonts = resources.setdefault(NameObject('/Font'), DictionaryObject()).get_object()
+        fonts[NameObject('/FPageNumber')] = font
+
+
+def render_in_parts(content: ReportContent, filepath: str, workers: Optional[int] = None,
+                    part_cache: Optional[PartCache] = None) -> str:
+    """
+    Renderiza o relatório em partes (em paralelo quando workers > 1) e une em filepath.
+
+    part_cache: reaproveita as partes com os mesmos dados e guarda as renderizadas.
+    """
+    workers = max(1, workers or settings.REPORT_PDF_WORKERS)
+    parts = plan_parts(content, settings.REPORT_PDF_OBJECTIVES_PER_CHUNK, settings.REPORT_PDF_KEY_RESULTS_PER_CHUNK)
+    workdir = tempfile.mkdtemp(prefix="pdf_parts_", dir=os.path.dirname(filepath) or None)
+    try:
+        results: List[Optional[Tuple[int, List[TocEntry]]]] = [None] * len(parts)
+        if part_cache is not None:
+            keys = [part_cache.key(part) for part in parts]
+            part_paths = [part_cache.path(key) for key in keys]
+            results = [part_cache.get(key) for key in keys]
+        else:
+            part_paths = [os.path.join(workdir, f"part_{i:04d}.pdf") for i in range(len(parts))]
+        pending = [i for i, result in enumerate(results) if result is None]
+        header_path = os.path.join(workdir, "header.pdf")
+        closing_path = os.path.join(workdir, "closing.pdf")
+        toc_path = os.path.join(workdir, "toc.pdf")
+
+        # Cabeçalho e conclusão usam o relatório inteiro: ficam no processo principal,
+        # renderizados enquanto os workers cuidam dos lotes
+        renderer = PdfReportRenderer(content)
+        if workers > 1 and pending:
+            futures = [(i, _get_executor(workers).submit(render_part, parts[i], part_paths[i])) for i in pending]
+            header = _render_section(renderer, 'header', header_path)
+            closing = _render_section(renderer, 'closing', closing_path)
+            for i, future in futures:
+                results[i] = future.result()
+        else:
+            header = _render_section(renderer, 'header', header_path)
+            for i in pending:
+                results[i] = render_part(parts[i], part_paths[i])
+            closing = _render_section(renderer, 'closing', closing_path)
+
+        if part_cache is not None:
+            for i in pending:
+                part_cache.put(keys[i], results[i])
+
+        sections = [(header_path, header)] + list(zip(part_paths, results)) + [(closing_path, closing)]
+
+        # Sumário logo após o cabeçalho; renderizado de novo se a numeração mudar o nº de páginas dele
+        toc_pages = 0
+        while True:
+            entries: List[TocEntry] = []
+            first_page = 1
+            for index, (_, (pages, toc_entries)) in enumerate(sections):
+                entries.extend((level, label, first_page + page - 1) for level, label, page in toc_entries)
+                first_page += pages
+                if index == 0:
+                    first_page += toc_pages
+            rendered_pages = _render_toc(entries, toc_path)
+            if rendered_pages == toc_pages:
+                break
+            toc_pages = rendered_pages
+
+        writer = PdfWriter()
+        for path in [header_path, toc_path] + [path for path, _ in sections[1:]]:
+            writer.append(path)
+
+        _stamp_page_numbers(writer)
+
+        parent = None
+        for level, label, page in entries:
+            if level == 0:
+                parent = writer.add_outline_item(label, page - 1)
+            else:
+                writer.add_outline_item(label, page - 1, parent=parent)
+        writer.page_mode = "/UseOutlines"
+
+        with open(filepath, "wb") as output:
+            writer.write(output)
+        print(f"DEBUG: PDF montado em {len(sections)} partes ({len(writer.pages)} páginas, {workers} worker(s), "
+              f"{len(parts) - len(pending)} reaproveitadas)")
+        return filepath
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
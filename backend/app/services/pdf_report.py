@@ -0,0 +1,717 @@
+"""
+Motor de renderização dos relatórios PDF (ReportLab)
+
+Tudo que não depende dos dados é montado uma única vez por processo:
+- estilos de parágrafo (STYLES) e de tabela (TABLE_STYLES);
+- templates de página (um conjunto por thread: o Frame guarda estado durante o build).
+
+Barras de progresso e separadores são Flowables desenhados direto no canvas, em vez
+de uma Table de uma célula para cada barra/linha.
+"""
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+try:
+    from reportlab import rl_config
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import (
+        BaseDocTemplate, Flowable, Frame, PageBreak, PageTemplate, Paragraph, Spacer, Table, TableStyle
+    )
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+    Flowable = object
+
+from ..models.reports import ReportContent, KeyResultReportData
+from .pdf_charts import CHARTS_AVAILABLE, evolution_chart, key_results_chart, status_chart
+
+PAGE_MARGINS = {"rightMargin": 72, "leftMargin": 72, "topMargin": 72, "bottomMargin": 18}
+
+STATUS_DISPLAY = {
+    'PLANNED': '📋 Planejado',
+    'ON_TRACK': '🟢 No Prazo',
+    'AT_RISK': '🟡 Em Risco',
+    'BEHIND': '🔴 Atrasado',
+    'COMPLETED': '✅ Concluído'
+}
+
+RECOMMENDATIONS = (
+    "📊 Realizar check-ins regulares para manter o progresso atualizado",
+    "🎯 Focar nos objetivos com maior impacto estratégico",
+    "👥 Garantir alinhamento entre equipes e objetivos",
+    "📈 Monitorar KPIs semanalmente para identificar desvios rapidamente",
+    "🔄 Ajustar metas conforme necessário baseado em dados reais"
+)
+
+# Paletas das barras: (progresso mínimo, cor da barra, cor de fundo), da maior faixa para a menor
+PROGRESS_PALETTE = (
+    (80, '#10b981', '#d1fae5'),
+    (60, '#f59e0b', '#fef3c7'),
+    (30, '#f97316', '#fed7aa'),
+    (0, '#ef4444', '#fecaca'),
+)
+HIGHLIGHT_PALETTE = (
+    (90, '#059669', '#d1fae5'),
+    (70, '#10b981', '#ecfdf5'),
+    (50, '#f59e0b', '#fef3c7'),
+    (25, '#f97316', '#fed7aa'),
+    (0, '#ef4444', '#fecaca'),
+)
+
+
+def status_display(status: str) -> str:
+    """Converter status para exibição com emoji"""
+    return STATUS_DISPLAY.get(status, f'📌 {status}')
+
+
+def _text(value: Any) -> str:
+    """Texto livre (títulos, descrições) escapado para o mini-HTML do Paragraph"""
+    return escape(str(value)) if value is not None else ''
+
+
+def _build_styles() -> Dict[str, "ParagraphStyle"]:
+    base = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle', parent=base['Heading1'], fontSize=24, spaceAfter=30,
+            alignment=TA_CENTER, textColor=colors.HexColor('#1f2937')
+        ),
+        'subtitle': ParagraphStyle(
+            'CustomSubtitle', parent=base['Heading2'], fontSize=16, spaceAfter=20, spaceBefore=20,
+            textColor=colors.HexColor('#374151'), borderWidth=1, borderColor=colors.HexColor('#e5e7eb'),
+            borderPadding=10, backColor=colors.HexColor('#f9fafb')
+        ),
+        'section': ParagraphStyle(
+            'SectionHeader', parent=base['Heading3'], fontSize=14, spaceAfter=12, spaceBefore=16,
+            textColor=colors.HexColor('#4f46e5'), borderWidth=0, borderColor=colors.HexColor('#4f46e5'),
+            leftIndent=0
+        ),
+        'info': ParagraphStyle(
+            'InfoText', parent=base['Normal'], fontSize=10, textColor=colors.HexColor('#6b7280'), spaceAfter=6
+        ),
+        'normal': base['Normal'],
+        'footer': ParagraphStyle(
+            'Footer', parent=base['Normal'], fontSize=8, textColor=colors.HexColor('#9ca3af'), alignment=TA_CENTER
+        ),
+    }
+
+
+def _key_value_style(label_color: str, background: str, grid_color: str, font_size: int,
+                     padding: int, grid_width: float = 0.5, valign: str = 'TOP', row_backgrounds=None) -> "TableStyle":
+    """Tabela de duas colunas 'rótulo | valor'"""
+    commands = [
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor(background)),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor(label_color)),
+        ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#1f2937')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), font_size),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), padding),
+        ('TOPPADDING', (0, 0), (-1, -1), padding),
+        ('GRID', (0, 0), (-1, -1), grid_width, colors.HexColor(grid_color)),
+        ('VALIGN', (0, 0), (-1, -1), valign),
+    ]
+    if row_backgrounds:
+        commands.append(('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.HexColor(c) for c in row_backgrounds]))
+    return TableStyle(commands)
+
+
+def _grid_style(header_color: str, header_size: int, body_size: int, padding: int,
+                center_from: Tuple[int, int], center_to: Tuple[int, int] = (-1, -1),
+                grid_width: float = 0.5, grid_color: str = '#d1d5db', valign: str = 'MIDDLE',
+                row_backgrounds=None) -> "TableStyle":
+    """Tabela com linha de cabeçalho colorida"""
+    commands = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(header_color)),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', center_from, center_to, 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), header_size),
+        ('FONTSIZE', (0, 1), (-1, -1), body_size),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), padding),
+        ('TOPPADDING', (0, 0), (-1, -1), padding),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), grid_width, colors.HexColor(grid_color)),
+        ('VALIGN', (0, 0), (-1, -1), valign),
+    ]
+    if row_backgrounds:
+        commands.append(('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor(c) for c in row_backgrounds]))
+    return TableStyle(commands)
+
+
+def _build_table_styles() -> Dict[str, "TableStyle"]:
+    metrics = _grid_style(
+        '#4f46e5', 12, 11, 10, (1, 1), (1, -1), grid_width=1, grid_color='#e5e7eb',
+        row_backgrounds=['#ffffff', '#f8fafc']
+    )
+    metrics.add('ALIGN', (2, 1), (2, -1), 'CENTER')
+    metrics.add('FONTNAME', (0, 1), (-1, -1), 'Helvetica')
+    return {
+        'company_info': _key_value_style('#374151', '#f8fafc', '#e5e7eb', 11, 8, valign='MIDDLE'),
+        'metrics': metrics,
+        'status': _grid_style('#6b7280', 11, 10, 8, (1, 1)),
+        'single_objective': _key_value_style('#4f46e5', '#f8fafc', '#e2e8f0', 11, 10, grid_width=1),
+        'single_kr': _key_value_style('#6b7280', '#ffffff', '#e5e7eb', 10, 8, row_backgrounds=['#f9fafb', '#ffffff']),
+        'single_kr_checkins': _grid_style(
+            '#8b5cf6', 9, 8, 6, (1, 1), (2, -1), valign='TOP', row_backgrounds=['#ffffff', '#faf5ff']
+        ),
+        'objective': _key_value_style('#4b5563', '#fafafa', '#e5e7eb', 10, 8),
+        'objective_krs': _grid_style('#7c3aed', 10, 9, 6, (1, 1), row_backgrounds=['#ffffff', '#f8fafc']),
+        'objective_checkins': _grid_style('#6b7280', 9, 8, 6, (1, 1), (1, -1)),
+        'key_result': _key_value_style('#4b5563', '#f8fafc', '#e5e7eb', 9, 6),
+    }
+
+
+if REPORTLAB_AVAILABLE:
+    # Streams comprimidos em binário: sem a codificação ASCII85 (mais CPU e ~25% mais bytes)
+    rl_config.useA85 = 0
+    STYLES = _build_styles()
+    TABLE_STYLES = _build_table_styles()
+
+
+class ProgressBar(Flowable):
+    """Barra de progresso desenhada direto no canvas (fundo, preenchimento e borda)"""
+
+    def __init__(self, progress: float, width: float, height: float,
+                 palette=PROGRESS_PALETTE, border_width: float = 1, border_color: Optional[str] = None):
+        super().__init__()
+        self.progress = max(0.0, min(float(progress or 0), 100.0))
+        self.width = width
+        self.height = height
+        self.border_width = border_width
+        _, bar_color, background = next(entry for entry in palette if self.progress >= entry[0])
+        self.bar_color = colors.HexColor(bar_color)
+        self.background = colors.HexColor(background)
+        self.border_color = colors.HexColor(border_color) if border_color else self.bar_color
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        canvas = self.canv
+        canvas.setFillColor(self.background)
+        canvas.rect(0, 0, self.width, self.height, stroke=0, fill=1)
+        if self.progress > 0:
+            canvas.setFillColor(self.bar_color)
+            canvas.rect(0, 0, self.width * self.progress / 100, self.height, stroke=0, fill=1)
+        canvas.setStrokeColor(self.border_color)
+        canvas.setLineWidth(self.border_width)
+        canvas.rect(0, 0, self.width, self.height, stroke=1, fill=0)
+
+
+class Divider(Flowable):
+    """Linha separadora horizontal"""
+
+    def __init__(self, width: float, thickness: float = 0.05 * 72, color: str = '#e5e7eb'):
+        super().__init__()
+        self.width = width
+        self.height = thickness
+        self.color = colors.HexColor(color) if REPORTLAB_AVAILABLE else color
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.setFillColor(self.color)
+        self.canv.rect(0, 0, self.width, self.height, stroke=0, fill=1)
+
+
+def draw_page_number(canvas, number: int):
+    """Número da página no rodapé (também usado ao carimbar PDFs montados em partes)"""
+    canvas.saveState()
+    canvas.setFont('Helvetica', 7)
+    canvas.setFillColor(colors.HexColor('#9ca3af'))
+    canvas.drawRightString(A4[0] - PAGE_MARGINS['rightMargin'], 6, f"Página {number}")
+    canvas.restoreState()
+
+
+def _on_page(canvas, doc):
+    draw_page_number(canvas, doc.page)
+
+
+_local = threading.local()
+
+
+def _page_templates(page_numbers: bool) -> List["PageTemplate"]:
+    """Templates de página montados uma vez por thread"""
+    cache = getattr(_local, 'page_templates', None)
+    if cache is None:
+        cache = _local.page_templates = {}
+    templates = cache.get(page_numbers)
+    if templates is None:
+        width, height = A4
+        frame = Frame(
+            PAGE_MARGINS['leftMargin'],
+            PAGE_MARGINS['bottomMargin'],
+            width - PAGE_MARGINS['leftMargin'] - PAGE_MARGINS['rightMargin'],
+            height - PAGE_MARGINS['topMargin'] - PAGE_MARGINS['bottomMargin'],
+            id='normal'
+        )
+        on_page = _on_page if page_numbers else (lambda canvas, doc: None)
+        templates = cache[page_numbers] = [PageTemplate(id='report', frames=[frame], onPage=on_page, pagesize=A4)]
+    return templates
+
+
+class ReportDocTemplate(BaseDocTemplate if REPORTLAB_AVAILABLE else object):
+    """
+    Documento A4 com os templates de página compartilhados.
+
+    Registra em toc_entries (nível, texto, página) os títulos marcados com toc_heading.
+    page_numbers=False quando a numeração é carimbada depois (PDF montado em partes).
+    """
+
+    def __init__(self, filename, page_numbers: bool = True, **kwargs):
+        super().__init__(filename, pagesize=A4, **PAGE_MARGINS, **kwargs)
+        self.addPageTemplates(_page_templates(page_numbers))
+        self.toc_entries: List[Tuple[int, str, int]] = []
+
+    def afterFlowable(self, flowable):
+        entry = getattr(flowable, 'toc_entry', None)
+        if entry:
+            self.toc_entries.append((entry[0], entry[1], self.page))
+
+
+def toc_heading(text: str, style, level: int, label: str) -> "Paragraph":
+    """Título que entra no sumário (label sem emoji) quando o PDF é montado em partes"""
+    paragraph = Paragraph(text, style)
+    paragraph.toc_entry = (level, label)
+    return paragraph
+
+
+class PdfReportRenderer:
+    """Monta a story do relatório a partir do ReportContent, seção por seção"""
+
+    def __init__(self, content: ReportContent):
+        self.content = content
+        self.is_single_objective = (
+            content.metadata.report_type == "SINGLE_OBJECTIVE" and
+            content.objectives and
+            len(content.objectives) == 1
+        )
+        self.include_charts = CHARTS_AVAILABLE and content.metadata.include_charts
+        # KRs por objetivo agrupados uma vez (em vez de filtrar a lista toda a cada objetivo)
+        self.key_results_by_objective: Dict[str, List[KeyResultReportData]] = defaultdict(list)
+        for kr in content.key_results or []:
+            if kr.objective_id:
+                self.key_results_by_objective[kr.objective_id].append(kr)
+
+    def render(self, filepath: str) -> str:
+        ReportDocTemplate(filepath).build(self.story())
+        return filepath
+
+    def story(self) -> List["Flowable"]:
+        story = self.header()
+        if self.include_charts:
+            story.extend(self.charts())
+        if self.content.objectives:
+            story.extend(self.objectives())
+        if self.content.key_results:
+            story.extend(self.key_results())
+        story.extend(self.closing())
+        return story
+
+    def section(self, kind: str, offset: int = 0, total: Optional[int] = None, heading: bool = True) -> List["Flowable"]:
+        """
+        Story de uma seção isolada (uma parte do PDF montado em partes).
+
+        offset/total situam um lote de objetivos no relatório inteiro, para manter a
+        quebra de página a cada 2 objetivos e o separador entre eles.
+        """
+        if kind == 'header':
+            story = self.header()
+            if self.include_charts:
+                story.extend(self.charts())
+        elif kind == 'objectives':
+            story = self.objectives(offset=offset, total=total, heading=heading)
+        elif kind == 'key_results':
+            story = self.key_results(heading=heading)
+        elif kind == 'closing':
+            story = self.closing()
+        else:
+            raise ValueError(f"Seção desconhecida: {kind}")
+        # Cada parte já começa em página nova
+        while story and isinstance(story[0], PageBreak):
+            story.pop(0)
+        return story
+
+    # ---------- Cabeçalho e resumo ----------
+
+    def header(self) -> List["Flowable"]:
+        content = self.content
+        story: List[Flowable] = []
+        company_name = content.dashboard_data.company_name if content.dashboard_data else "Empresa"
+
+        if self.is_single_objective:
+            story.append(Paragraph("📋 Relatório Detalhado do Objetivo", STYLES['title']))
+            story.append(Spacer(1, 20))
+            story.append(Paragraph(f"🎯 {_text(content.objectives[0].title)}", STYLES['subtitle']))
+            story.append(Spacer(1, 15))
+        else:
+            story.append(Paragraph(f"📊 Relatório OKR - {_text(company_name)}", STYLES['title']))
+            story.append(Spacer(1, 30))
+
+        data = content.dashboard_data
+        if not data:
+            return story
+
+        info_data = [
+            ['🏢 Empresa', data.company_name],
+            ['📅 Período', data.report_period],
+            ['🕒 Gerado em', data.generation_date.strftime('%d/%m/%Y às %H:%M')],
+            ['👥 Usuários Ativos', str(data.active_users)],
+            ['🎯 Ciclo Ativo', data.active_cycle_name or 'Nenhum ciclo ativo']
+        ]
+        story.append(Table(info_data, colWidths=[2*inch, 3*inch], style=TABLE_STYLES['company_info']))
+        story.append(Spacer(1, 30))
+
+        # Resumo Executivo com métricas destacadas
+        story.append(toc_heading("📈 Resumo Executivo", STYLES['subtitle'], 0, "Resumo Executivo"))
+
+        def traffic_light(value: float, green: float, yellow: float) -> str:
+            return '🟢' if value >= green else '🟡' if value >= yellow else '🔴'
+
+        metrics_data = [
+            ['Métrica', 'Valor', 'Status'],
+            ['🎯 Total de Objetivos', str(data.total_objectives), '✅' if data.total_objectives > 0 else '⚠️'],
+            ['🔑 Total de Key Results', str(data.total_key_results), '✅' if data.total_key_results > 0 else '⚠️'],
+            ['📊 Progresso Geral', f"{data.overall_progress:.1f}%", traffic_light(data.overall_progress, 70, 40)],
+            ['✅ Taxa de Conclusão', f"{data.completion_rate:.1f}%", traffic_light(data.completion_rate, 80, 50)],
+            ['⏰ Taxa No Prazo', f"{data.on_track_rate:.1f}%", traffic_light(data.on_track_rate, 80, 50)]
+        ]
+        story.append(Table(metrics_data, colWidths=[2.5*inch, 1.5*inch, 1*inch], style=TABLE_STYLES['metrics']))
+        story.append(Spacer(1, 20))
+
+        # Distribuição por Status
+        if data.objectives_by_status:
+            story.append(Paragraph("📋 Distribuição de Objetivos por Status", STYLES['section']))
+            status_data = [['Status', 'Quantidade', 'Percentual']]
+            for status, count in data.objectives_by_status.items():
+                percentage = (count / data.total_objectives * 100) if data.total_objectives > 0 else 0
+                status_data.append([status_display(status), str(count), f"{percentage:.1f}%"])
+            story.append(Table(status_data, colWidths=[2*inch, 1*inch, 1*inch], style=TABLE_STYLES['status']))
+            story.append(Spacer(1, 25))
+
+        return story
+
+    # ---------- Gráficos ----------
+
+    def charts(self) -> List["Flowable"]:
+        """Gráficos vetoriais (include_charts): status, evolução e progresso dos KRs"""
+        content = self.content
+        drawings = []
+        if content.dashboard_data and content.dashboard_data.objectives_by_status:
+            drawings.append(status_chart(content.dashboard_data.objectives_by_status))
+        if content.evolution and len(content.evolution.weeks) >= 2:
+            drawings.append(evolution_chart(content.evolution.weeks, content.evolution.progress, content.evolution.title))
+
+        if self.is_single_objective:
+            items = [(kr.get('title', 'Key Result'), kr.get('progress') or 0.0) for kr in content.objectives[0].key_results or []]
+        else:
+            items = [(kr.title, kr.progress) for kr in content.key_results or []]
+        if items:
+            drawings.append(key_results_chart(items))
+
+        if not drawings:
+            return []
+        story: List[Flowable] = [toc_heading("📊 Gráficos", STYLES['subtitle'], 0, "Gráficos")]
+        for drawing in drawings:
+            story.append(drawing)
+            story.append(Spacer(1, 20))
+        return story
+
+    # ---------- Objetivos ----------
+
+    def objectives(self, offset: int = 0, total: Optional[int] = None, heading: bool = True) -> List["Flowable"]:
+        objectives = self.content.objectives
+        total = len(objectives) if total is None else total
+        story: List[Flowable] = []
+        if heading:
+            if self.is_single_objective:
+                story.extend(self.single_objective(objectives[0]))
+            else:
+                story.append(toc_heading("🎯 Objetivos Detalhados", STYLES['subtitle'], 0, "Objetivos Detalhados"))
+                story.append(Spacer(1, 10))
+
+        for i, obj in enumerate(objectives, start=offset):
+            # Nova página a cada 2 objetivos para melhor organização
+            if i > offset and i % 2 == 0:
+                story.append(PageBreak())
+            story.extend(self.objective_block(obj, last=i == total - 1))
+        return story
+
+    def single_objective(self, objective) -> List["Flowable"]:
+        """Layout especial para relatório de objetivo individual"""
+        story: List[Flowable] = []
+        obj_info = [
+            ['👤 Responsável', objective.owner_name or 'Não atribuído'],
+            ['🔄 Ciclo', objective.cycle_name],
+            ['📊 Status', status_display(objective.status)],
+            ['📈 Progresso', f"{objective.progress:.1f}%"],
+            ['🔑 Key Results', f"{objective.key_results_completed}/{objective.key_results_count} concluídos"],
+            ['📅 Criado em', objective.created_at.strftime('%d/%m/%Y %H:%M') if objective.created_at else 'N/A'],
+            ['🔄 Última atualização', objective.updated_at.strftime('%d/%m/%Y %H:%M') if objective.updated_at else 'N/A']
+        ]
+        if objective.description:
+            obj_info.append(['📝 Descrição', objective.description])
+
+        story.append(Table(obj_info, colWidths=[2*inch, 4*inch], style=TABLE_STYLES['single_objective']))
+        story.append(Spacer(1, 20))
+        story.append(Paragraph(f"🎯 Progresso do Objetivo: {objective.progress:.1f}%", STYLES['section']))
+        story.append(Spacer(1, 10))
+        story.append(ProgressBar(objective.progress, 5*inch, 0.4*inch, palette=HIGHLIGHT_PALETTE, border_width=2))
+        story.append(Spacer(1, 30))
+
+        if objective.key_results:
+            story.append(Paragraph("🔑 Key Results Detalhados", STYLES['subtitle']))
+            story.append(Spacer(1, 15))
+            for i, kr in enumerate(objective.key_results):
+                if i > 0:
+                    story.append(Spacer(1, 20))
+                story.extend(self.single_objective_kr(kr))
+        return story
+
+    def single_objective_kr(self, kr: Dict[str, Any]) -> List["Flowable"]:
+        story: List[Flowable] = [
+            Paragraph(f"🎯 {_text(kr.get('title', 'Key Result'))}", STYLES['section']),
+            Spacer(1, 8),
+        ]
+
+        kr_info = [
+            ['📊 Status', status_display(kr.get('status', 'PLANNED'))],
+            ['📈 Progresso', f"{kr.get('progress', 0):.1f}%"],
+            ['👤 Responsável', kr.get('owner_name') or 'Não atribuído']
+        ]
+        target_value = kr.get('target_value')
+        current_value = kr.get('current_value')
+        if target_value is not None and target_value > 0:
+            kr_info.extend([
+                ['🎯 Meta', f"{target_value:.2f}"],
+                ['📊 Valor Atual', f"{current_value:.2f}" if current_value is not None else "0.00"],
+                ['📏 Unidade', kr.get('unit') or 'N/A']
+            ])
+        confidence = kr.get('confidence_level')
+        if confidence is not None:
+            kr_info.append(['🎯 Confiança', f"{confidence * 100:.0f}%"])
+        if kr.get('description'):
+            kr_info.append(['📝 Descrição', kr['description']])
+
+        recent_checkins = kr.get('recent_checkins', [])
+        last_checkin_date = _format_date(recent_checkins[0].get('checkin_date')) if recent_checkins else None
+        kr_info.extend([
+            ['📅 Criado em', _format_date(kr.get('created_at')) or 'N/A'],
+            ['🔄 Atualizado em', _format_date(kr.get('updated_at')) or 'N/A'],
+            ['📊 Check-ins', f"{len(recent_checkins)} realizados"],
+            ['📅 Último check-in', last_checkin_date or 'Nunca']
+        ])
+        story.append(Table(kr_info, colWidths=[1.8*inch, 4.2*inch], style=TABLE_STYLES['single_kr']))
+
+        kr_progress = kr.get('progress', 0)
+        story.append(Spacer(1, 8))
+        story.append(Paragraph(f"Progresso: {kr_progress:.1f}%", STYLES['normal']))
+        story.append(ProgressBar(kr_progress, 3.5*inch, 0.25*inch))
+
+        if recent_checkins:
+            story.append(Spacer(1, 15))
+            story.append(Paragraph("📊 Check-ins Recentes:", STYLES['normal']))
+            story.append(Spacer(1, 8))
+            checkin_data = [['Data', 'Valor', 'Confiança', 'Notas']]
+            for checkin in recent_checkins[:3]:  # Últimos 3 check-ins
+                value = checkin.get('value_at_checkin')
+                confidence = checkin.get('confidence_level_at_checkin')
+                notes = checkin.get('notes', '')
+                if notes and len(notes) > 40:
+                    notes = notes[:40] + '...'
+                checkin_data.append([
+                    _format_date(checkin.get('checkin_date')) or 'N/A',
+                    f"{float(value):.2f}" if value is not None else 'N/A',
+                    f"{float(confidence) * 100:.0f}%" if confidence is not None else 'N/A',
+                    notes or 'Sem observações'
+                ])
+            story.append(Table(
+                checkin_data, colWidths=[1*inch, 1*inch, 0.8*inch, 2.2*inch], style=TABLE_STYLES['single_kr_checkins']
+            ))
+        return story
+
+    def objective_block(self, obj, last: bool = False) -> List["Flowable"]:
+        """Card de um objetivo: dados, barra de progresso, KRs e check-ins recentes"""
+        story: List[Flowable] = [
+            toc_heading(f"🎯 {_text(obj.title)}", STYLES['section'], 1, obj.title),
+            Spacer(1, 8),
+        ]
+
+        obj_info = [
+            ['👤 Responsável', obj.owner_name or 'Não atribuído'],
+            ['🔄 Ciclo', obj.cycle_name],
+            ['📊 Status', status_display(obj.status)],
+            ['📈 Progresso', f"{obj.progress:.1f}%"],
+            ['🔑 Key Results', f"{obj.key_results_completed}/{obj.key_results_count} concluídos"],
+            ['📅 Criado em', obj.created_at.strftime('%d/%m/%Y') if obj.created_at else 'N/A'],
+            ['🔄 Atualizado em', obj.updated_at.strftime('%d/%m/%Y') if obj.updated_at else 'N/A']
+        ]
+        if obj.description:
+            obj_info.append(['📝 Descrição', obj.description])
+        story.append(Table(obj_info, colWidths=[1.5*inch, 4*inch], style=TABLE_STYLES['objective']))
+        story.append(Spacer(1, 15))
+
+        story.append(Paragraph(f"Progresso: {obj.progress:.1f}%", STYLES['normal']))
+        story.append(Spacer(1, 5))
+        story.append(ProgressBar(obj.progress, 4.5*inch, 0.3*inch, border_color='#d1d5db'))
+        story.append(Spacer(1, 20))
+
+        obj_key_results = self.key_results_by_objective.get(obj.id)
+        if obj_key_results:
+            story.append(Paragraph("🔑 Key Results deste Objetivo:", STYLES['normal']))
+            story.append(Spacer(1, 8))
+            kr_data = [['Key Result', 'Progresso', 'Status', 'Tipo']]
+            for kr in obj_key_results:
+                progress_display = f"{kr.progress:.1f}%"
+                if kr.target_value and kr.current_value is not None:
+                    progress_display += f" ({kr.current_value}/{kr.target_value})"
+                kr_data.append([
+                    kr.title[:40] + '...' if len(kr.title) > 40 else kr.title,
+                    progress_display,
+                    status_display(kr.status),
+                    'Numérico' if kr.target_value else 'Booleano'
+                ])
+            story.append(Table(
+                kr_data, colWidths=[2.5*inch, 1.2*inch, 0.8*inch, 0.8*inch], style=TABLE_STYLES['objective_krs']
+            ))
+            story.append(Spacer(1, 15))
+
+        recent_checkins = getattr(obj, 'recent_checkins', None)
+        if recent_checkins:
+            story.append(Paragraph("📊 Check-ins Recentes:", STYLES['normal']))
+            story.append(Spacer(1, 8))
+            checkin_data = [['Data', 'Progresso', 'Comentário']]
+            for checkin in recent_checkins[:3]:  # Últimos 3 check-ins
+                comment = checkin.get('comment', '')
+                if len(comment) > 50:
+                    comment = comment[:50] + '...'
+                checkin_data.append([
+                    checkin.get('date', 'N/A'),
+                    f"{checkin.get('progress', 0):.1f}%",
+                    comment or 'Sem comentário'
+                ])
+            story.append(Table(
+                checkin_data, colWidths=[1*inch, 1*inch, 3*inch], style=TABLE_STYLES['objective_checkins']
+            ))
+            story.append(Spacer(1, 20))
+
+        # Separador entre objetivos
+        if not last:
+            story.append(Spacer(1, 10))
+            story.append(Divider(5.5*inch))
+            story.append(Spacer(1, 15))
+        return story
+
+    # ---------- Key Results ----------
+
+    def key_results(self, heading: bool = True) -> List["Flowable"]:
+        """Seção dedicada aos Key Results (nova página), agrupados por objetivo"""
+        story: List[Flowable] = [PageBreak()]
+        if heading:
+            story.append(toc_heading("🔑 Todos os Key Results", STYLES['subtitle'], 0, "Todos os Key Results"))
+            story.append(Spacer(1, 15))
+
+        kr_by_objective: Dict[str, List[KeyResultReportData]] = {}
+        for kr in self.content.key_results:
+            kr_by_objective.setdefault(kr.objective_title, []).append(kr)
+
+        for obj_title, krs in kr_by_objective.items():
+            story.append(Paragraph(f"🎯 {_text(obj_title)}", STYLES['section']))
+            story.append(Spacer(1, 10))
+            for kr in krs:
+                story.append(Table(self._kr_info(kr), colWidths=[1.5*inch, 4*inch], style=TABLE_STYLES['key_result']))
+                story.append(Spacer(1, 12))
+            story.append(Spacer(1, 15))
+        return story
+
+    def _kr_info(self, kr: KeyResultReportData) -> List[List[str]]:
+        kr_info = [
+            ['🔑 Título', kr.title],
+            ['📊 Status', status_display(kr.status)],
+            ['📈 Progresso', f"{kr.progress:.1f}%"],
+            ['🎯 Tipo', 'Numérico' if kr.target_value else 'Booleano']
+        ]
+        if kr.target_value:
+            kr_info.append(['🎯 Meta', str(kr.target_value)])
+            kr_info.append(['📊 Valor Atual', str(kr.current_value or 0)])
+            kr_info.append(['📏 Unidade', kr.unit or 'N/A'])
+        if kr.description:
+            kr_info.append(['📝 Descrição', kr.description])
+        kr_info.append(['📅 Criado em', kr.created_at.strftime('%d/%m/%Y') if kr.created_at else 'N/A'])
+        kr_info.append(['🔄 Atualizado em', kr.updated_at.strftime('%d/%m/%Y') if kr.updated_at else 'N/A'])
+        return kr_info
+
+    # ---------- Resumo final ----------
+
+    def insights(self) -> List[str]:
+        data = self.content.dashboard_data
+        if not data:
+            return []
+
+        insights = []
+        if data.overall_progress >= 80:
+            insights.append("✅ Excelente progresso geral! A empresa está no caminho certo para atingir seus objetivos.")
+        elif data.overall_progress >= 60:
+            insights.append("🟡 Progresso satisfatório, mas há espaço para melhorias em alguns objetivos.")
+        else:
+            insights.append("🔴 Atenção necessária! O progresso geral está abaixo do esperado.")
+
+        if data.completion_rate >= 80:
+            insights.append("🎯 Alta taxa de conclusão de objetivos demonstra eficiência na execução.")
+        elif data.completion_rate < 50:
+            insights.append("⚠️ Taxa de conclusão baixa. Revisar estratégias e recursos alocados.")
+
+        if data.objectives_by_status:
+            behind_count = data.objectives_by_status.get('BEHIND', 0)
+            at_risk_count = data.objectives_by_status.get('AT_RISK', 0)
+            if behind_count > 0:
+                insights.append(f"🚨 {behind_count} objetivo(s) atrasado(s) requer(em) atenção imediata.")
+            if at_risk_count > 0:
+                insights.append(f"⚠️ {at_risk_count} objetivo(s) em risco precisa(m) de monitoramento.")
+        return insights
+
+    def closing(self) -> List["Flowable"]:
+        """Resumo final (nova página) com insights, recomendações e rodapé"""
+        story: List[Flowable] = [
+            PageBreak(),
+            toc_heading("📋 Resumo Executivo", STYLES['subtitle'], 0, "Insights e Recomendações"),
+            Spacer(1, 15),
+        ]
+        for insight in self.insights():
+            story.append(Paragraph(insight, STYLES['normal']))
+            story.append(Spacer(1, 8))
+
+        story.append(Spacer(1, 15))
+        story.append(Paragraph("💡 Recomendações:", STYLES['section']))
+        story.append(Spacer(1, 10))
+        for recommendation in RECOMMENDATIONS:
+            story.append(Paragraph(recommendation, STYLES['normal']))
+
+        story.append(Spacer(1, 30))
+        story.append(Paragraph(
+            f"Relatório gerado automaticamente pelo Sistema OKR • {datetime.now().strftime('%d/%m/%Y às %H:%M')}",
+            STYLES['footer']
+        ))
+        return story
+
+
+def _format_date(value: Optional[str]) -> Optional[str]:
+    """Timestamp ISO do Supabase -> 'dd/mm/aaaa' (None se ausente ou inválido)"""
+    if not value:
+        return None
+    try:
+        from .report_data import safe_parse_datetime
+        return safe_parse_datetime(value).strftime('%d/%m/%Y')
+    except Exception:
+        return None
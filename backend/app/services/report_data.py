@@ -0,0 +1,466 @@
+"""
+Busca dos dados dos relatórios no Supabase (usada pela API e pelo agendador de relatórios)
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..models.reports import (
+    DashboardReportData, EvolutionReportData, KeyResultReportData, ObjectiveReportData, ReportFilters
+)
+from ..utils.row_mapper import RowMapper, nested
+from ..utils.supabase import fetch_all, supabase_admin
+from .evolution_service import evolution_service, series_points
+from .report_rows import KEY_RESULT_COLUMNS, OBJECTIVE_COLUMNS, ReportColumn, column_needs, select_fields
+
+def safe_parse_datetime(date_string: str) -> datetime:
+    """
+    Função helper para parser seguro de datas ISO que podem ter microssegundos com muitos dígitos
+    """
+    if not date_string:
+        return datetime.now()
+    
+    try:
+        # Python 3.11+ já aceita "Z" e frações com qualquer número de dígitos
+        return datetime.fromisoformat(date_string)
+    except ValueError:
+        pass
+    
+    try:
+        # Remover Z e adicionar timezone UTC
+        clean_date = date_string.replace('Z', '+00:00')
+        
+        # Se tem microssegundos com mais de 6 dígitos, truncar para 6
+        if '.' in clean_date and '+' in clean_date:
+            parts = clean_date.split('+')
+            date_part = parts[0]
+            tz_part = '+' + parts[1]
+            
+            if '.' in date_part:
+                main_part, microsec_part = date_part.split('.')
+                # Truncar microssegundos para 6 dígitos
+                microsec_part = microsec_part[:6].ljust(6, '0')
+                clean_date = f"{main_part}.{microsec_part}{tz_part}"
+        
+        return datetime.fromisoformat(clean_date)
+    except Exception as e:
+        print(f"DEBUG: Erro ao parser data '{date_string}': {e}")
+        return datetime.now()
+
+# Ids por filtro in_(): mantém a URL da consulta curta
+ID_FILTER_CHUNK_SIZE = 200
+
+def _fetch_by_ids(build_query: Callable[[], Any], column: str, ids: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+    """Todas as linhas da consulta (paginada), com in_(column, ids) em lotes de ID_FILTER_CHUNK_SIZE"""
+    if ids is None:
+        return fetch_all(build_query)
+    ids = list(ids)
+    rows: List[Dict[str, Any]] = []
+    for start in range(0, len(ids), ID_FILTER_CHUNK_SIZE):
+        chunk = ids[start:start + ID_FILTER_CHUNK_SIZE]
+        rows.extend(fetch_all(lambda: build_query().in_(column, chunk)))
+    return rows
+
+def _report_datetime(column: str):
+    return lambda row: safe_parse_datetime(row.get(column))
+
+# Linhas com colunas podadas (Parquet/Arrow): campos ausentes recebem os valores padrão abaixo
+OBJECTIVE_REPORT_MAPPER = RowMapper(
+    ObjectiveReportData,
+    defaults={'title': '', 'status': 'PLANNED', 'progress': 0.0, 'key_results_count': 0, 'key_results_completed': 0},
+    owner_name=nested('owner', 'name'),
+    cycle_name=nested('cycle', 'name', 'Sem ciclo'),
+    created_at=_report_datetime('created_at'),
+    updated_at=_report_datetime('updated_at')
+)
+
+KEY_RESULT_REPORT_MAPPER = RowMapper(
+    KeyResultReportData,
+    defaults={
+        'title': '', 'target_value': 0.0, 'current_value': 0.0, 'start_value': 0.0, 'unit': 'NUMBER',
+        'status': 'PLANNED', 'progress': 0.0, 'checkins_count': 0
+    },
+    objective_title=nested('objective', 'title', 'Objetivo não encontrado'),
+    owner_name=nested('owner', 'name'),
+    created_at=_report_datetime('created_at'),
+    updated_at=_report_datetime('updated_at')
+)
+
+async def get_company_data(company_id: str):
+    """Busca dados da empresa"""
+    try:
+        response = supabase_admin().from_('companies').select('name').eq('id', company_id).single().execute()
+        return response.data if response.data else None
+    except Exception as e:
+        print(f"DEBUG: Erro ao buscar empresa: {e}")
+        return None
+
+async def get_single_objective_for_report(company_id: str, objective_id: str) -> Optional[ObjectiveReportData]:
+    """Busca dados detalhados de um objetivo específico para relatório"""
+    try:
+        # Buscar o objetivo
+        response = supabase_admin().from_('objectives').select(
+            '''
+            id, title, description, owner_id, company_id, cycle_id, 
+            status, progress, created_at, updated_at,
+            owner:users!owner_id(name),
+            cycle:cycles!cycle_id(name)
+            '''
+        ).eq('company_id', company_id).eq('id', objective_id).single().execute()
+        
+        if not response.data:
+            return None
+        
+        obj = response.data
+        
+        # Buscar Key Results detalhados do objetivo
+        kr_response = supabase_admin().from_('key_results').select(
+            '''
+            id, title, description, objective_id, owner_id, target_value,
+            current_value, start_value, unit, status, progress, confidence_level,
+            created_at, updated_at,
+            owner:users!owner_id(name)
+            '''
+        ).eq('objective_id', objective_id).execute()
+        
+        kr_data = kr_response.data if kr_response.data else []
+        
+        # Contar Key Results
+        kr_count = len(kr_data)
+        kr_completed = len([kr for kr in kr_data if kr.get('status') == 'COMPLETED'])
+        
+        # Formatar Key Results para incluir no relatório
+        formatted_key_results = []
+        for kr in kr_data:
+            # Buscar check-ins do Key Result
+            checkins_response = supabase_admin().from_('kr_checkins').select(
+                'id, checkin_date, value_at_checkin, notes, confidence_level_at_checkin'
+            ).eq('key_result_id', kr['id']).order('checkin_date', desc=True).limit(5).execute()
+            
+            checkins_data = checkins_response.data if checkins_response.data else []
+            
+            formatted_key_results.append({
+                'id': kr['id'],
+                'title': kr['title'],
+                'description': kr.get('description'),
+                'objective_id': kr['objective_id'],
+                'target_value': float(kr.get('target_value', 0)) if kr.get('target_value') else None,
+                'current_value': float(kr.get('current_value', 0)) if kr.get('current_value') else None,
+                'start_value': float(kr.get('start_value', 0)) if kr.get('start_value') else None,
+                'unit': kr.get('unit'),
+                'status': kr.get('status'),
+                'progress': float(kr.get('progress', 0)) if kr.get('progress') else 0.0,
+                'confidence_level': float(kr.get('confidence_level', 0)) if kr.get('confidence_level') else None,
+                'owner_name': kr['owner']['name'] if kr.get('owner') else None,
+                'created_at': kr['created_at'],
+                'updated_at': kr['updated_at'],
+                'recent_checkins': checkins_data
+            })
+        
+        return ObjectiveReportData(
+            id=obj['id'],
+            title=obj['title'],
+            description=obj.get('description'),
+            owner_name=obj['owner']['name'] if obj.get('owner') else None,
+            cycle_name=obj['cycle']['name'] if obj.get('cycle') else 'Sem ciclo',
+            status=obj.get('status', 'PLANNED'),
+            progress=float(obj.get('progress', 0)),
+            created_at=safe_parse_datetime(obj['created_at']),
+            updated_at=safe_parse_datetime(obj['updated_at']),
+            key_results_count=kr_count,
+            key_results_completed=kr_completed,
+            key_results=formatted_key_results
+        )
+    
+    except Exception as e:
+        print(f"DEBUG: Erro ao buscar objetivo para relatório: {e}")
+        return None
+
+async def get_objectives_for_report(
+    company_id: str,
+    filters: ReportFilters,
+    columns: Optional[Sequence[ReportColumn]] = None,
+    include_nested: bool = True,
+    objective_ids: Optional[Sequence[str]] = None,
+    strict: bool = False
+) -> List[ObjectiveReportData]:
+    """
+    Busca objetivos formatados para relatório
+    
+    columns: colunas exportadas (Parquet/Arrow); só os campos e consultas delas são buscados.
+    Campos não pedidos ficam com valores padrão no modelo.
+    objective_ids: restringe a busca a esses objetivos (atualização incremental do agendador).
+    strict: propaga erros em vez de devolver lista vazia.
+    """
+    try:
+        if objective_ids is not None and not objective_ids:
+            return []
+        columns = OBJECTIVE_COLUMNS if columns is None else columns
+        needs = column_needs(columns)
+        search_fields = ('title', 'description') if filters.search else ()
+        
+        def build_query():
+            # Query base (ordem estável para a paginação)
+            query = supabase_admin().from_('objectives').select(
+                select_fields(columns, 'id', *search_fields)
+            ).eq('company_id', company_id)
+            
+            # Aplicar filtros (busca textual é filtrada abaixo, no cliente)
+            if filters.status:
+                query = query.in_('status', filters.status)
+                
+            if filters.owner_id:
+                query = query.eq('owner_id', filters.owner_id)
+                
+            if filters.cycle_id:
+                query = query.eq('cycle_id', filters.cycle_id)
+            return query.order('id')
+        
+        objectives_data = _fetch_by_ids(build_query, 'id', objective_ids)
+        
+        # Buscar contagem de Key Results para cada objetivo
+        objectives_with_kr_count = []
+        
+        for obj in objectives_data:
+            # Filtrar por busca textual se necessário
+            if filters.search:
+                search_term = filters.search.lower()
+                if (search_term not in (obj.get('title') or '').lower() and 
+                    search_term not in (obj.get('description') or '').lower()):
+                    continue
+            
+            # Contar Key Results (apenas se as colunas de contagem forem exportadas)
+            kr_count = kr_completed = 0
+            if 'key_result_counts' in needs:
+                kr_response = supabase_admin().from_('key_results').select(
+                    'id, status'
+                ).eq('objective_id', obj['id']).execute()
+                
+                kr_data = kr_response.data if kr_response.data else []
+                kr_count = len(kr_data)
+                kr_completed = len([kr for kr in kr_data if kr.get('status') == 'COMPLETED'])
+            
+            # Incluir Key Results se solicitado
+            key_results = None
+            if include_nested and filters.include_key_results:
+                kr_detailed = supabase_admin().from_('key_results').select(
+                    'id, title, current_value, target_value, unit, status, progress'
+                ).eq('objective_id', obj['id']).execute()
+                key_results = kr_detailed.data if kr_detailed.data else []
+            
+            objectives_with_kr_count.append(OBJECTIVE_REPORT_MAPPER(
+                obj,
+                key_results_count=kr_count,
+                key_results_completed=kr_completed,
+                key_results=key_results
+            ))
+        
+        return objectives_with_kr_count
+    
+    except Exception as e:
+        print(f"DEBUG: Erro ao buscar objetivos para relatório: {e}")
+        if strict:
+            raise
+        return []
+
+async def get_key_results_for_report(
+    company_id: str,
+    filters: ReportFilters,
+    columns: Optional[Sequence[ReportColumn]] = None,
+    objective_ids: Optional[Sequence[str]] = None,
+    strict: bool = False
+) -> List[KeyResultReportData]:
+    """
+    Busca Key Results formatados para relatório
+    
+    columns: colunas exportadas (Parquet/Arrow); só os campos e consultas delas são buscados.
+    objective_ids: apenas os KRs desses objetivos (já validados como da empresa).
+    strict: propaga erros em vez de devolver lista vazia.
+    """
+    try:
+        # Relatório completo (sem poda) também usa updated_at, que não é coluna exportada
+        extra_fields = ('updated_at',) if columns is None else ()
+        columns = KEY_RESULT_COLUMNS if columns is None else columns
+        needs = column_needs(columns)
+        search_fields = ('title', 'description') if filters.search else ()
+        
+        # Objetivos informados pelo chamador ou filtro por objetivo específico: usar diretamente
+        if objective_ids is not None:
+            objective_ids = [i for i in objective_ids if not filters.objective_id or i == filters.objective_id]
+            if not objective_ids:
+                return []
+        elif filters.objective_id:
+            objective_ids = [filters.objective_id]
+        else:
+            # Primeiro, buscar objetivos da empresa
+            objectives_data = fetch_all(
+                lambda: supabase_admin().from_('objectives').select('id').eq('company_id', company_id).order('id')
+            )
+            
+            if not objectives_data:
+                return []
+            
+            objective_ids = [obj['id'] for obj in objectives_data]
+        
+        def build_query():
+            # Buscar Key Results (ordem estável para a paginação)
+            query = supabase_admin().from_('key_results').select(
+                select_fields(columns, 'id', 'objective_id', *extra_fields, *search_fields)
+            )
+            
+            # Aplicar filtros
+            if filters.status:
+                query = query.in_('status', filters.status)
+                
+            if filters.owner_id:
+                query = query.eq('owner_id', filters.owner_id)
+            return query.order('id')
+        
+        kr_data = _fetch_by_ids(build_query, 'objective_id', objective_ids)
+        
+        # Processar dados
+        key_results = []
+        
+        for kr in kr_data:
+            # Filtrar por busca textual se necessário
+            if filters.search:
+                search_term = filters.search.lower()
+                if (search_term not in (kr.get('title') or '').lower() and 
+                    search_term not in (kr.get('description') or '').lower()):
+                    continue
+            
+            # Contar check-ins e buscar último (apenas se essas colunas forem exportadas)
+            checkins_count = 0
+            last_checkin_date = None
+            if 'checkins' in needs:
+                checkins_response = supabase_admin().from_('kr_checkins').select(
+                    'id, checkin_date'
+                ).eq('key_result_id', kr['id']).order('checkin_date', desc=True).execute()
+                
+                checkins_data = checkins_response.data if checkins_response.data else []
+                checkins_count = len(checkins_data)
+                
+                if checkins_data:
+                    last_checkin_date = safe_parse_datetime(checkins_data[0]['checkin_date'])
+            
+            key_results.append(KEY_RESULT_REPORT_MAPPER(
+                kr,
+                checkins_count=checkins_count,
+                last_checkin_date=last_checkin_date
+            ))
+        
+        return key_results
+    
+    except Exception as e:
+        print(f"DEBUG: Erro ao buscar Key Results para relatório: {e}")
+        if strict:
+            raise
+        return []
+
+async def get_dashboard_data_for_report(
+    company_id: str,
+    objectives: Optional[List[ObjectiveReportData]] = None,
+    key_results: Optional[List[KeyResultReportData]] = None
+) -> DashboardReportData:
+    """
+    Busca dados do dashboard para relatório
+    
+    objectives/key_results: dados da empresa inteira já carregados (evita buscar de novo)
+    """
+    try:
+        # Buscar empresa
+        company_data = await get_company_data(company_id)
+        
+        # Buscar estatísticas
+        objectives_data = objectives if objectives is not None else await get_objectives_for_report(company_id, ReportFilters())
+        key_results_data = key_results if key_results is not None else await get_key_results_for_report(company_id, ReportFilters())
+        
+        # Contar usuários ativos
+        users_response = supabase_admin().from_('users').select('id').eq(
+            'company_id', company_id
+        ).eq('is_active', True).execute()
+        active_users = len(users_response.data) if users_response.data else 0
+        
+        # Buscar ciclo ativo
+        cycle_response = supabase_admin().from_('cycles').select(
+            'name'
+        ).eq('company_id', company_id).eq('is_active', True).execute()
+        
+        active_cycle_name = None
+        if cycle_response.data:
+            active_cycle_name = cycle_response.data[0]['name']
+        
+        # Calcular métricas
+        total_objectives = len(objectives_data)
+        total_key_results = len(key_results_data)
+        
+        # Progresso geral
+        overall_progress = 0.0
+        if objectives_data:
+            overall_progress = sum(obj.progress for obj in objectives_data) / len(objectives_data)
+        
+        # Contadores por status
+        objectives_by_status = {}
+        for obj in objectives_data:
+            status = obj.status
+            objectives_by_status[status] = objectives_by_status.get(status, 0) + 1
+        
+        # Taxas de conclusão
+        completed_count = objectives_by_status.get('COMPLETED', 0)
+        on_track_count = objectives_by_status.get('ON_TRACK', 0)
+        
+        completion_rate = (completed_count / total_objectives * 100) if total_objectives > 0 else 0
+        on_track_rate = ((completed_count + on_track_count) / total_objectives * 100) if total_objectives > 0 else 0
+        
+        return DashboardReportData(
+            company_name=company_data.get('name', 'Empresa') if company_data else 'Empresa',
+            report_period=f"Até {datetime.now().strftime('%d/%m/%Y')}",
+            generation_date=datetime.now(),
+            total_objectives=total_objectives,
+            total_key_results=total_key_results,
+            active_users=active_users,
+            active_cycle_name=active_cycle_name,
+            overall_progress=overall_progress,
+            objectives_by_status=objectives_by_status,
+            completion_rate=completion_rate,
+            on_track_rate=on_track_rate
+        )
+    
+    except Exception as e:
+        print(f"DEBUG: Erro ao buscar dados do dashboard para relatório: {e}")
+        # Retornar dados mínimos em caso de erro
+        return DashboardReportData(
+            company_name="Empresa",
+            report_period=f"Até {datetime.now().strftime('%d/%m/%Y')}",
+            generation_date=datetime.now(),
+            total_objectives=0,
+            total_key_results=0,
+            active_users=0,
+            active_cycle_name=None,
+            overall_progress=0.0,
+            objectives_by_status={},
+            completion_rate=0.0,
+            on_track_rate=0.0
+        )
+
+async def get_evolution_for_report(company_id: str, objective_id: Optional[str] = None) -> Optional[EvolutionReportData]:
+    """Série de evolução já calculada (dashboard_evolution_series) para o gráfico do PDF"""
+    try:
+        if objective_id:
+            series = await asyncio.to_thread(evolution_service.get_objective_series, company_id, objective_id)
+            title = "Evolução do progresso do objetivo"
+        else:
+            company_series = await asyncio.to_thread(evolution_service.get_or_build_series, company_id)
+            points = series_points(company_series, datetime.now().date())
+            series = {
+                "weeks": [point["week"].isoformat() for point in points],
+                "progress": [point["progress"] for point in points],
+            }
+            title = "Evolução do progresso da empresa"
+    except Exception as e:
+        print(f"DEBUG: Série de evolução indisponível para o relatório: {e}")
+        return None
+    
+    if not series or not series.get("weeks"):
+        return None
+    return EvolutionReportData(title=title, weeks=series["weeks"], progress=series["progress"])
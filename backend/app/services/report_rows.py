@@ -0,0 +1,112 @@
+"""
+Colunas tipadas das exportações tabulares (objetivos e Key Results)
+
+Cada coluna declara uma única vez o nome técnico, o cabeçalho, o tipo do valor e
+como extraí-lo do modelo. Os writers (Excel, CSV...) percorrem as linhas como
+tuplas de valores tipados e decidem a formatação pelo tipo da coluna, sem montar
+dicionários ou DataFrames intermediários.
+
+Tipos: text, enum (texto de domínio pequeno), integer, number, percent (0-100),
+datetime e date. Valor ausente é None; `empty` é o texto exibido nesse caso.
+
+`fields` são os trechos do select do Supabase de que a coluna depende e `needs`
+as consultas extras (contagem de KRs, check-ins): exportar só algumas colunas
+busca só o necessário.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Callable, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class ReportColumn:
+    key: str
+    header: str
+    kind: str
+    getter: Callable[[Any], Any]
+    empty: str = ''
+    fields: Tuple[str, ...] = ()
+    needs: FrozenSet[str] = frozenset()
+
+
+def _column(key: str, header: str, kind: str = 'text', empty: str = '', getter: Optional[Callable[[Any], Any]] = None,
+            fields: Optional[Tuple[str, ...]] = None, needs: Tuple[str, ...] = ()) -> ReportColumn:
+    return ReportColumn(
+        key=key, header=header, kind=kind, getter=getter or attrgetter(key), empty=empty,
+        fields=(key,) if fields is None else fields, needs=frozenset(needs)
+    )
+
+
+def _confidence_percent(kr) -> Optional[float]:
+    return kr.confidence_level * 100 if kr.confidence_level else None
+
+
+OBJECTIVE_COLUMNS: Tuple[ReportColumn, ...] = (
+    _column('id', 'ID'),
+    _column('title', 'Título'),
+    _column('description', 'Descrição'),
+    _column('owner_name', 'Responsável', empty='Não atribuído', fields=('owner:users!owner_id(name)',)),
+    _column('cycle_name', 'Ciclo', fields=('cycle:cycles!cycle_id(name)',)),
+    _column('status', 'Status', 'enum'),
+    _column('progress', 'Progresso (%)', 'percent'),
+    _column('key_results_count', 'Key Results Total', 'integer', fields=(), needs=('key_result_counts',)),
+    _column('key_results_completed', 'Key Results Concluídos', 'integer', fields=(), needs=('key_result_counts',)),
+    _column('created_at', 'Data Criação', 'datetime'),
+    _column('updated_at', 'Última Atualização', 'datetime'),
+)
+
+KEY_RESULT_COLUMNS: Tuple[ReportColumn, ...] = (
+    _column('id', 'ID'),
+    _column('title', 'Título'),
+    _column('description', 'Descrição'),
+    _column('objective_title', 'Objetivo', fields=('objective:objectives!objective_id(title)',)),
+    _column('owner_name', 'Responsável', empty='Não atribuído', fields=('owner:users!owner_id(name)',)),
+    _column('start_value', 'Valor Inicial', 'number'),
+    _column('current_value', 'Valor Atual', 'number'),
+    _column('target_value', 'Valor Meta', 'number'),
+    _column('unit', 'Unidade', 'enum'),
+    _column('status', 'Status', 'enum'),
+    _column('progress', 'Progresso (%)', 'percent'),
+    _column('confidence', 'Confiança (%)', 'percent', getter=_confidence_percent, fields=('confidence_level',)),
+    _column('checkins_count', 'Check-ins', 'integer', fields=(), needs=('checkins',)),
+    _column('last_checkin_date', 'Último Check-in', 'date', empty='Nunca', fields=(), needs=('checkins',)),
+    _column('created_at', 'Data Criação', 'datetime'),
+)
+
+
+def select_columns(columns: Sequence[ReportColumn], keys: Optional[Sequence[str]]) -> Tuple[ReportColumn, ...]:
+    """Colunas pedidas (na ordem da definição); None/vazio = todas. ValueError para chave desconhecida"""
+    if not keys:
+        return tuple(columns)
+    known = {column.key for column in columns}
+    unknown = [key for key in keys if key not in known]
+    if unknown:
+        raise ValueError(f"Colunas desconhecidas: {', '.join(unknown)}. Disponíveis: {', '.join(sorted(known))}")
+    wanted = set(keys)
+    return tuple(column for column in columns if column.key in wanted)
+
+
+def select_fields(columns: Sequence[ReportColumn], *always: str) -> str:
+    """Select do Supabase com os campos das colunas (sem repetição) mais os obrigatórios"""
+    fields: List[str] = []
+    for field in (*always, *(field for column in columns for field in column.fields)):
+        if field not in fields:
+            fields.append(field)
+    return ', '.join(fields)
+
+
+def column_needs(columns: Sequence[ReportColumn]) -> FrozenSet[str]:
+    return frozenset().union(*(column.needs for column in columns))
+
+
+def naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Datas sem timezone (Excel e os formatos de data locais não guardam offset)"""
+    return value.replace(tzinfo=None) if value is not None and value.tzinfo is not None else value
+
+
+def iter_rows(items: Iterable[Any], columns: Sequence[ReportColumn]) -> Iterator[Tuple[Any, ...]]:
+    """Linhas como tuplas de valores tipados, na ordem das colunas"""
+    getters = [column.getter for column in columns]
+    for item in items:
+        yield tuple(getter(item) for getter in getters)
@@ -0,0 +1,483 @@
+"""
+Relatórios agendados por empresa (processo separado da API)
+
+Em vez de todos os responsáveis exportarem o mesmo relatório COMPLETE na segunda
+de manhã, cada agendamento (report_schedules) tem uma expressão cron no fuso da
+empresa e o agendador gera o arquivo fora do pico:
+- um lease no banco (scheduler_locks) garante uma única instância ativa;
+- cada agendamento é reivindicado antes de rodar (running_until): enquanto a
+  marca vale, ele não é selecionado de novo, mesmo que passe do prazo e o
+  next_run_at ainda não tenha avançado. O prazo é verificado dentro do worker,
+  que para antes de substituir arquivos, snapshot ou partes do PDF;
+- next_run_at recebe um deslocamento fixo por agendamento (até
+  REPORT_SCHEDULE_SPREAD_MINUTES), então "toda segunda às 5h" não dispara tudo
+  no mesmo minuto;
+- a geração é incremental: um snapshot por agendamento guarda as linhas do último
+  relatório por objetivo, com uma impressão digital feita dos updated_at do objetivo
+  e dos seus KRs. Só os objetivos com impressão diferente (novos, alterados ou com
+  KRs alterados) são buscados de novo; os removidos saem do snapshot;
+- no PDF, as partes (lotes de objetivos/KRs) com os mesmos dados são reaproveitadas
+  do PartCache: só as seções que mudaram são renderizadas.
+
+Nomes de responsáveis/ciclos não alteram updated_at dos objetivos; por isso o
+snapshot é descartado a cada REPORT_SCHEDULE_FULL_REFRESH_INTERVAL (busca completa).
+O arquivo gerado fica em REPORT_SCHEDULE_OUTPUT_DIR, que a API lê no download.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from supabase import Client
+
+from ..core.settings import settings
+from ..models.reports import (
+    KeyResultReportData, ObjectiveReportData, ReportContent, ReportFilters, ReportFormat,
+    ReportMetadata, ReportStatus, ReportType
+)
+from ..utils.cron import CronExpression
+from ..utils.scheduler_lease import SchedulerLease
+from ..utils.supabase import fetch_all
+from .pdf_parallel import PartCache
+from .report_data import (
+    get_dashboard_data_for_report, get_evolution_for_report, get_key_results_for_report, get_objectives_for_report
+)
+from .report_generator import ReportGenerator
+
+SCHEDULE_TABLE = "report_schedules"
+RUNS_TABLE = "report_schedule_runs"
+
+# Filtros que restringem os objetivos (com algum deles, o dashboard não pode usar o snapshot)
+RESTRICTING_FILTERS = ('search', 'status', 'owner_id', 'cycle_id', 'objective_id', 'start_date', 'end_date')
+
+
+def schedule_offset(schedule_id: str) -> timedelta:
+    """Deslocamento fixo do agendamento dentro da janela de espalhamento"""
+    spread = max(1, settings.REPORT_SCHEDULE_SPREAD_MINUTES)
+    return timedelta(minutes=zlib.crc32(schedule_id.encode()) % spread)
+
+
+def next_run_at(cron: str, schedule_id: str, after: Optional[datetime] = None) -> datetime:
+    """Próxima execução (UTC) do agendamento depois de `after`, já com o deslocamento"""
+    after = after or datetime.now(timezone.utc)
+    offset = schedule_offset(schedule_id)
+    local = (after - offset).astimezone(ZoneInfo(settings.REPORT_SCHEDULE_TIMEZONE))
+    return (CronExpression.parse(cron).next_after(local) + offset).astimezone(timezone.utc)
+
+
+def schedule_dir(schedule_id: str) -> str:
+    return os.path.join(settings.REPORT_SCHEDULE_OUTPUT_DIR, schedule_id)
+
+
+class ScheduleDeadlineExceeded(Exception):
+    """Agendamento passou do prazo (ou o lease foi perdido) antes de gravar o resultado"""
+
+
+@dataclass
+class ScheduledReportMetrics:
+    """Métricas de uma execução de agendamento"""
+    run_id: str
+    schedule_id: str
+    company_id: str
+    started_at: str
+    status: str = ReportStatus.PROCESSING.value
+    finished_at: Optional[str] = None
+    duration_seconds: float = 0.0
+    full_refresh: bool = False
+    objectives_total: int = 0
+    objectives_refetched: int = 0
+    objectives_removed: int = 0
+    pdf_parts_rendered: int = 0
+    pdf_parts_reused: int = 0
+    file_size: int = 0
+    error: Optional[str] = None
+
+
+class ReportSnapshot:
+    """
+    Linhas do último relatório de um agendamento, por objetivo (JSON compactado em disco).
+
+    entries: {objective_id: {"fingerprint", "objective" (ou None se filtrado), "key_results"}}
+    Um objetivo só fica como None quando os filtros do agendamento o excluem; sem
+    filtros, um objetivo ausente na busca falha a execução (ver _refresh_snapshot).
+    """
+
+    def __init__(self, path: str, definition: str):
+        self.path = path
+        self.definition = definition
+        self.refreshed_at: Optional[str] = None
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("definition") == definition:
+            self.refreshed_at = data.get("refreshed_at")
+            self.entries = data.get("entries", {})
+
+    def is_stale(self, now: datetime) -> bool:
+        """Sem snapshot válido ou mais antigo que o intervalo de busca completa"""
+        if not self.refreshed_at:
+            return True
+        refreshed = datetime.fromisoformat(self.refreshed_at)
+        return now - refreshed > timedelta(seconds=settings.REPORT_SCHEDULE_FULL_REFRESH_INTERVAL)
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({"definition": self.definition, "refreshed_at": self.refreshed_at, "entries": self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+
+class ReportScheduler:
+    """Gera os relatórios agendados vencidos, um lote por rodada"""
+
+    LOCK_NAME = "report_scheduler"
+
+    def __init__(
+        self,
+        supabase_admin: Client,
+        max_workers: int = settings.REPORT_SCHEDULER_MAX_WORKERS,
+        timeout: int = settings.REPORT_SCHEDULER_TIMEOUT,
+        lock_ttl: int = settings.REPORT_SCHEDULER_LOCK_TTL,
+        batch_size: int = settings.REPORT_SCHEDULER_BATCH_SIZE,
+    ):
+        self.supabase = supabase_admin
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.lock_ttl = lock_ttl
+        self.batch_size = batch_size
+        self.lease = SchedulerLease(supabase_admin, self.LOCK_NAME, lock_ttl)
+        self.holder = self.lease.holder
+        # Agendamentos com worker em andamento neste processo (nunca selecionados de novo)
+        self._running: set = set()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="report-worker")
+
+    # ---------- Eleição de líder (lease no banco) ----------
+
+    def acquire_lock(self) -> bool:
+        """Adquire ou renova o lease. Retorna False se outra instância é líder."""
+        return self.lease.acquire()
+
+    def release_lock(self):
+        self.lease.release()
+
+    # ---------- Snapshot incremental ----------
+
+    def _fingerprints(self, company_id: str) -> Dict[str, str]:
+        """Impressão digital por objetivo: updated_at do objetivo e dos seus KRs (2 consultas leves)"""
+        objectives = fetch_all(lambda: self.supabase.table("objectives").select(
+            "id, updated_at"
+        ).eq("company_id", company_id).order("id"))
+        key_results = fetch_all(lambda: self.supabase.table("key_results").select(
+            "id, objective_id, updated_at, objectives!inner(company_id)"
+        ).eq("objectives.company_id", company_id).order("id"))
+
+        parts: Dict[str, List[str]] = {row["id"]: [row.get("updated_at") or ""] for row in objectives}
+        for kr in key_results:
+            if kr["objective_id"] in parts:
+                parts[kr["objective_id"]].append(f"{kr['id']}:{kr.get('updated_at') or ''}")
+        return {
+            objective_id: hashlib.sha1("|".join(sorted(values[1:]) + values[:1]).encode()).hexdigest()
+            for objective_id, values in parts.items()
+        }
+
+    async def _fetch_rows(self, company_id: str, filters: ReportFilters, objective_ids: Optional[List[str]],
+                          with_objectives: bool, with_key_results: bool):
+        # strict: uma falha de busca não pode virar "objetivo sem linhas" no snapshot
+        objectives = await get_objectives_for_report(
+            company_id, filters, objective_ids=objective_ids, strict=True
+        ) if with_objectives else []
+        key_results = await get_key_results_for_report(
+            company_id, filters, objective_ids=objective_ids, strict=True
+        ) if with_key_results else []
+        return objectives, key_results
+
+    def _refresh_snapshot(self, schedule: Dict[str, Any], snapshot: ReportSnapshot, filters: ReportFilters,
+                          metrics: ScheduledReportMetrics, now: datetime):
+        """Atualiza o snapshot buscando só os objetivos com impressão digital diferente"""
+        report_type = schedule["report_type"]
+        company_id = schedule["company_id"]
+        with_objectives = report_type in (ReportType.OBJECTIVES, ReportType.COMPLETE, ReportType.DASHBOARD)
+        with_key_results = report_type in (ReportType.KEY_RESULTS, ReportType.COMPLETE, ReportType.DASHBOARD)
+
+        fingerprints = self._fingerprints(company_id)
+        removed = [objective_id for objective_id in snapshot.entries if objective_id not in fingerprints]
+        changed = [
+            objective_id for objective_id, fingerprint in fingerprints.items()
+            if (snapshot.entries.get(objective_id) or {}).get("fingerprint") != fingerprint
+        ]
+        full = snapshot.is_stale(now) or len(changed) > settings.REPORT_SCHEDULE_MAX_INCREMENTAL
+
+        metrics.full_refresh = full
+        metrics.objectives_total = len(fingerprints)
+        metrics.objectives_removed = 0 if full else len(removed)
+        metrics.objectives_refetched = len(fingerprints) if full else len(changed)
+        if not full and not changed and not removed:
+            return
+
+        objectives, key_results = asyncio.run(self._fetch_rows(
+            company_id, filters, None if full else changed, with_objectives, with_key_results
+        ))
+        objectives_by_id = {obj.id: obj for obj in objectives}
+        key_results_by_objective: Dict[str, List[KeyResultReportData]] = {}
+        for kr in key_results:
+            key_results_by_objective.setdefault(kr.objective_id, []).append(kr)
+
+        # Sem filtros restritivos, todo objetivo com impressão digital tem que voltar na busca:
+        # um ausente não pode ser gravado como "filtrado" (sumiria dos próximos relatórios)
+        if with_objectives and not any(getattr(filters, name) for name in RESTRICTING_FILTERS):
+            missing = [i for i in (fingerprints if full else changed) if i not in objectives_by_id]
+            if missing:
+                raise RuntimeError(
+                    f"{len(missing)} objetivo(s) ausente(s) na busca do relatório (ex.: {missing[0]}); snapshot mantido"
+                )
+
+        if full:
+            snapshot.entries = {}
+            snapshot.refreshed_at = now.isoformat()
+        for objective_id in removed:
+            snapshot.entries.pop(objective_id, None)
+        for objective_id in (fingerprints if full else changed):
+            obj = objectives_by_id.get(objective_id)
+            snapshot.entries[objective_id] = {
+                "fingerprint": fingerprints[objective_id],
+                "objective": obj.model_dump(mode="json") if obj else None,
+                "key_results": [kr.model_dump(mode="json") for kr in key_results_by_objective.get(objective_id, [])],
+            }
+
+    def _content(self, schedule: Dict[str, Any], snapshot: ReportSnapshot, filters: ReportFilters,
+                 metrics: ScheduledReportMetrics) -> ReportContent:
+        """Conteúdo do relatório montado a partir do snapshot (ordem estável por criação)"""
+        report_type = ReportType(schedule["report_type"])
+        report_format = ReportFormat(schedule["format"])
+        objectives = sorted(
+            (ObjectiveReportData.model_validate(entry["objective"]) for entry in snapshot.entries.values() if entry["objective"]),
+            key=lambda obj: (obj.created_at, obj.id)
+        )
+        order = {obj.id: i for i, obj in enumerate(objectives)}
+        key_results = sorted(
+            (KeyResultReportData.model_validate(kr) for entry in snapshot.entries.values() for kr in entry["key_results"]),
+            key=lambda kr: (order.get(kr.objective_id, len(order)), kr.created_at, kr.id)
+        )
+
+        company_id = schedule["company_id"]
+        dashboard_data = None
+        if report_type in (ReportType.DASHBOARD, ReportType.COMPLETE):
+            restricted = any(getattr(filters, name) for name in RESTRICTING_FILTERS)
+            dashboard_data = asyncio.run(
+                get_dashboard_data_for_report(company_id) if restricted
+                else get_dashboard_data_for_report(company_id, objectives, key_results)
+            )
+
+        include_charts = schedule.get("include_charts", False) and report_format == ReportFormat.PDF
+        evolution = None
+        if include_charts and report_type in (ReportType.DASHBOARD, ReportType.COMPLETE):
+            evolution = asyncio.run(get_evolution_for_report(company_id))
+
+        shown_objectives = objectives if report_type in (ReportType.OBJECTIVES, ReportType.COMPLETE) else None
+        shown_key_results = key_results if report_type in (ReportType.KEY_RESULTS, ReportType.COMPLETE) else None
+        metadata = ReportMetadata(
+            id=metrics.run_id,
+            name=schedule["name"],
+            report_type=report_type,
+            format=report_format,
+            status=ReportStatus.PROCESSING,
+            filters_applied=filters,
+            include_charts=include_charts,
+            compressed=schedule.get("compress", False) and report_format == ReportFormat.CSV,
+            records_count=len(shown_objectives or []) + len(shown_key_results or []),
+            generation_started_at=datetime.now()
+        )
+        return ReportContent(
+            metadata=metadata,
+            dashboard_data=dashboard_data,
+            objectives=shown_objectives,
+            key_results=shown_key_results,
+            evolution=evolution
+        )
+
+    # ---------- Execução ----------
+
+    def _definition(self, schedule: Dict[str, Any]) -> str:
+        """Hash da definição: mudar tipo, formato ou filtros descarta o snapshot"""
+        definition = [schedule["report_type"], schedule["format"], schedule.get("filters") or {}]
+        return hashlib.sha1(json.dumps(definition, sort_keys=True).encode()).hexdigest()
+
+    def _check_deadline(self, schedule_id: str, deadline: Optional[float], stop: Optional[threading.Event]):
+        if stop is not None and stop.is_set():
+            raise ScheduleDeadlineExceeded("lease perdido, execução interrompida")
+        if deadline is not None and time.monotonic() >= deadline:
+            raise ScheduleDeadlineExceeded(f"timeout após {self.timeout}s")
+
+    def run_schedule(self, schedule: Dict[str, Any], deadline: Optional[float] = None,
+                     stop: Optional[threading.Event] = None) -> ScheduledReportMetrics:
+        """
+        Gera o relatório de um agendamento e grava o resultado (roda em thread do pool).
+
+        A thread não pode ser interrompida de fora: o prazo é verificado entre as
+        etapas e, vencido, a execução falha antes de substituir snapshot e arquivo.
+        """
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        metrics = ScheduledReportMetrics(
+            run_id=str(uuid.uuid4()),
+            schedule_id=schedule["id"],
+            company_id=schedule["company_id"],
+            started_at=now.isoformat(),
+        )
+        directory = schedule_dir(schedule["id"])
+        os.makedirs(directory, exist_ok=True)
+        # Fim da execução libera a reivindicação (running_until)
+        update: Dict[str, Any] = {"last_run_at": now.isoformat(), "updated_at": now.isoformat(), "running_until": None}
+
+        try:
+            filters = ReportFilters(**(schedule.get("filters") or {}))
+            snapshot = ReportSnapshot(os.path.join(directory, "snapshot.json.gz"), self._definition(schedule))
+            self._refresh_snapshot(schedule, snapshot, filters, metrics, now)
+            self._check_deadline(schedule["id"], deadline, stop)
+            content = self._content(schedule, snapshot, filters, metrics)
+            self._check_deadline(schedule["id"], deadline, stop)
+
+            part_cache = PartCache(os.path.join(directory, "pdf_parts")) if content.metadata.format == ReportFormat.PDF else None
+            filepath = ReportGenerator(output_dir=directory, part_cache=part_cache).generate_report(
+                content, content.metadata.format
+            )
+            try:
+                self._check_deadline(schedule["id"], deadline, stop)
+            except ScheduleDeadlineExceeded:
+                os.remove(filepath)  # Fora do prazo: o arquivo anterior continua sendo o válido
+                raise
+            if part_cache is not None:
+                part_cache.prune()
+                metrics.pdf_parts_rendered = part_cache.misses
+                metrics.pdf_parts_reused = part_cache.hits
+
+            # Snapshot só avança depois do arquivo gerado
+            snapshot.save()
+            previous = schedule.get("last_file_path")
+            if previous and previous != filepath and os.path.exists(previous):
+                os.remove(previous)
+
+            metrics.status = ReportStatus.COMPLETED.value
+            metrics.file_size = os.path.getsize(filepath)
+            update.update({
+                "last_status": metrics.status,
+                "last_error": None,
+                "last_file_path": filepath,
+                "last_file_size": metrics.file_size,
+            })
+        except Exception as e:
+            metrics.status = ReportStatus.FAILED.value
+            metrics.error = str(e)[:500]
+            update.update({"last_status": metrics.status, "last_error": metrics.error})
+            print(f"❌ Agendador de relatórios: falha no agendamento {schedule['id']}: {e}")
+
+        try:
+            update["next_run_at"] = next_run_at(schedule["cron"], schedule["id"], now).isoformat()
+        except ValueError as e:
+            # Expressão que não coincide mais com nenhuma data: desativar
+            update.update({"enabled": False, "next_run_at": None, "last_error": str(e)})
+        self.supabase.table(SCHEDULE_TABLE).update(update).eq("id", schedule["id"]).execute()
+
+        metrics.duration_seconds = round(time.perf_counter() - started, 3)
+        metrics.finished_at = datetime.now(timezone.utc).isoformat()
+        self._record_metrics(metrics)
+        return metrics
+
+    def due_schedules(self) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc).isoformat()
+        response = self.supabase.table(SCHEDULE_TABLE).select("*").eq("enabled", True).lte(
+            "next_run_at", now
+        ).or_(f"running_until.is.null,running_until.lt.{now}").order("next_run_at").limit(self.batch_size).execute()
+        return [schedule for schedule in response.data or [] if schedule["id"] not in self._running]
+
+    def claim(self, schedule: Dict[str, Any]) -> bool:
+        """
+        Marca o agendamento como em execução (UPDATE condicional). A marca cobre o
+        prazo mais um TTL do lease; se o processo morrer, vence e ele volta a ser elegível.
+        """
+        now = datetime.now(timezone.utc)
+        running_until = now + timedelta(seconds=self.timeout + self.lock_ttl)
+        response = self.supabase.table(SCHEDULE_TABLE).update({"running_until": running_until.isoformat()}).eq(
+            "id", schedule["id"]
+        ).or_(f"running_until.is.null,running_until.lt.{now.isoformat()}").execute()
+        return bool(response.data)
+
+    async def _run_one(self, schedule: Dict[str, Any], semaphore: asyncio.Semaphore,
+                       stop: threading.Event) -> Optional[str]:
+        """Status da execução, ou None se o agendamento não chegou a rodar"""
+        async with semaphore:
+            if stop.is_set():
+                return None
+            loop = asyncio.get_running_loop()
+            schedule_id = schedule["id"]
+            try:
+                if not await loop.run_in_executor(self._executor, self.claim, schedule):
+                    return None  # Reivindicado por outra execução
+                self._running.add(schedule_id)
+                deadline = time.monotonic() + self.timeout
+                # Sem wait_for: a vaga só é liberada quando a thread termina de fato
+                metrics = await loop.run_in_executor(self._executor, self.run_schedule, schedule, deadline, stop)
+                return metrics.status
+            except Exception as e:
+                print(f"❌ Agendador de relatórios: erro ao gravar o agendamento {schedule_id}: {e}")
+                return ReportStatus.FAILED.value
+            finally:
+                self._running.discard(schedule_id)
+
+    async def run_once(self) -> Optional[Tuple[int, int]]:
+        """Uma rodada: (agendamentos executados, falhas). None se esta instância não é a líder."""
+        if not self.acquire_lock():
+            print(f"⏸️  Agendador de relatórios: outra instância detém o lease '{self.LOCK_NAME}', aguardando...")
+            return None
+
+        stop = threading.Event()
+        lease_task = asyncio.create_task(self.lease.keep(stop))
+        try:
+            schedules = await asyncio.get_running_loop().run_in_executor(self._executor, self.due_schedules)
+            if not schedules:
+                return 0, 0
+            semaphore = asyncio.Semaphore(self.max_workers)
+            results = await asyncio.gather(*(self._run_one(schedule, semaphore, stop) for schedule in schedules))
+            executed = [status for status in results if status is not None]
+            failed = sum(1 for status in executed if status != ReportStatus.COMPLETED.value)
+            return len(executed), failed
+        finally:
+            lease_task.cancel()
+
+    def _record_metrics(self, metrics: ScheduledReportMetrics):
+        mode = "completa" if metrics.full_refresh else "incremental"
+        print(
+            f"📊 Relatório agendado {metrics.schedule_id}: {metrics.status} em {metrics.duration_seconds}s "
+            f"(busca {mode}: {metrics.objectives_refetched}/{metrics.objectives_total} objetivos, "
+            f"{metrics.objectives_removed} removidos; PDF: {metrics.pdf_parts_rendered} partes renderizadas, "
+            f"{metrics.pdf_parts_reused} reaproveitadas)"
+        )
+        try:
+            self.supabase.table(RUNS_TABLE).insert(asdict(metrics)).execute()
+        except Exception as e:
+            print(f"DEBUG: Erro ao registrar execução do agendamento: {e}")
+
+    async def run_forever(self, interval: int = settings.REPORT_SCHEDULER_INTERVAL):
+        """Busca agendamentos vencidos a cada 'interval' segundos até ser cancelado"""
+        try:
+            while True:
+                result = await self.run_once()
+                if result and result[0]:
+                    print(f"🗓️  Agendador de relatórios: {result[0]} relatórios gerados ({result[1]} falhas)")
+                await asyncio.sleep(interval)
+        finally:
+            self.release_lock()
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,185 @@
+"""
+Lista de revogação de tokens em memória (Bloom filter)
+
+Evita consultar user_sessions a cada requisição autenticada para saber se o
+token foi revogado. O filtro guarda os hashes SHA-256 (TokenService._hash_token)
+dos access tokens revogados e ainda não expirados:
+- "não está no filtro" é definitivo: o token não foi revogado;
+- "talvez esteja" (revogado ou falso positivo) é confirmado no banco.
+
+O filtro é carregado no startup, atualizado por polling incremental a partir do
+watermark de revoked_at e reconstruído periodicamente para descartar sessões
+já expiradas. Revogações feitas neste processo entram no filtro na hora.
+"""
+import asyncio
+import math
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..core.settings import settings
+from ..utils.supabase import get_admin_client
+
+
+class RevokedTokenFilter:
+    """Bloom filter de hashes SHA-256 (hex) de tokens revogados"""
+
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = max(1, capacity)
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, token_hash: str):
+        # O hash do token já é SHA-256: dois blocos de 64 bits bastam para o
+        # double hashing (h1 + i*h2), sem recalcular hashes por posição
+        h1 = int(token_hash[:16], 16)
+        h2 = int(token_hash[16:32], 16) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, token_hash: str):
+        for position in self._positions(token_hash):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, token_hash: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(token_hash))
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+
+class RevocationService:
+    """Mantém o filtro de revogação do processo (worker) sincronizado com user_sessions"""
+
+    def __init__(
+        self,
+        capacity: int = settings.REVOCATION_FILTER_CAPACITY,
+        fp_rate: float = settings.REVOCATION_FILTER_FP_RATE,
+        poll_interval: int = settings.REVOCATION_POLL_INTERVAL,
+        rebuild_interval: int = settings.REVOCATION_REBUILD_INTERVAL,
+    ):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.poll_interval = poll_interval
+        self.rebuild_interval = rebuild_interval
+        self._filter = RevokedTokenFilter(capacity, fp_rate)
+        self._watermark: Optional[str] = None
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.last_rebuild_at: Optional[datetime] = None
+        self.false_positives = 0
+        self.confirmed_revocations = 0
+
+    def _fetch_revoked(self, since: Optional[str]) -> List[Dict[str, Any]]:
+        supabase = get_admin_client()
+        rows = []
+        offset = 0
+        page_size = 1000
+        while True:
+            query = supabase.from_('user_sessions').select("access_token_hash, revoked_at").eq(
+                'is_revoked', True
+            ).gte('expires_at', datetime.utcnow().isoformat())
+            if since:
+                # gte (e não gt): revogações no mesmo instante do watermark não se perdem;
+                # reinserir um hash no filtro é inofensivo
+                query = query.gte('revoked_at', since)
+            batch = query.order('revoked_at').range(offset, offset + page_size - 1).execute().data or []
+            rows.extend(batch)
+            if len(batch) < page_size:
+                return rows
+            offset += page_size
+
+    def rebuild(self) -> int:
+        """Recarrega o filtro inteiro (startup e periodicamente, para descartar sessões expiradas)"""
+        rows = self._fetch_revoked(None)
+        capacity = max(self.capacity, len(rows) * 2)
+        new_filter = RevokedTokenFilter(capacity, self.fp_rate)
+        for row in rows:
+            new_filter.add(row['access_token_hash'])
+        with self._lock:
+            self._filter = new_filter
+            self._watermark = max((row['revoked_at'] for row in rows if row.get('revoked_at')), default=self._watermark)
+            self.loaded = True
+            self.last_rebuild_at = datetime.utcnow()
+        print(f"🔒 Lista de revogação carregada: {len(rows)} tokens, {new_filter.memory_bytes / 1024:.0f} KB")
+        return len(rows)
+
+    def poll(self) -> int:
+        """Aplica as revogações registradas desde o último watermark"""
+        rows = self._fetch_revoked(self._watermark)
+        with self._lock:
+            for row in rows:
+                self._filter.add(row['access_token_hash'])
+                if row.get('revoked_at') and (not self._watermark or row['revoked_at'] > self._watermark):
+                    self._watermark = row['revoked_at']
+        if self._filter.saturated:
+            # Mais revogações que a capacidade prevista: reconstruir com tamanho maior
+            self.rebuild()
+        return len(rows)
+
+    def add_revoked(self, token_hashes: Iterable[str]):
+        """Registra revogações feitas por este processo (sem esperar o polling)"""
+        with self._lock:
+            for token_hash in token_hashes:
+                if token_hash:
+                    self._filter.add(token_hash)
+
+    def might_be_revoked(self, token_hash: str) -> bool:
+        """False é definitivo; True precisa de confirmação no banco"""
+        return self.loaded and token_hash in self._filter
+
+    def confirm_revoked(self, token_hash: str) -> bool:
+        """Confirma no banco um resultado positivo do filtro"""
+        response = get_admin_client().from_('user_sessions').select("id").eq(
+            'access_token_hash', token_hash
+        ).eq('is_revoked', True).limit(1).execute()
+        revoked = bool(response.data)
+        if revoked:
+            self.confirmed_revocations += 1
+        else:
+            self.false_positives += 1
+        return revoked
+
+    def is_revoked(self, token_hash: str) -> bool:
+        """Consulta completa usada pela dependency de autenticação"""
+        return self.might_be_revoked(token_hash) and self.confirm_revoked(token_hash)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "tokens": self._filter.count,
+            "capacity": self._filter.capacity,
+            "memory_bytes": self._filter.memory_bytes,
+            "num_hashes": self._filter.num_hashes,
+            "watermark": self._watermark,
+            "last_rebuild_at": self.last_rebuild_at.isoformat() if self.last_rebuild_at else None,
+            "confirmed_revocations": self.confirmed_revocations,
+            "false_positives": self.false_positives,
+        }
+
+    async def run_periodically(self):
+        """Task de background: carga inicial, polling incremental e reconstrução periódica"""
+        while True:
+            try:
+                if not self.loaded or (datetime.utcnow() - self.last_rebuild_at).total_seconds() >= self.rebuild_interval:
+                    await asyncio.to_thread(self.rebuild)
+                else:
+                    await asyncio.to_thread(self.poll)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"DEBUG: Erro ao atualizar lista de revogação: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+
+# Instância por processo (worker)
+revocation_service = RevocationService()
@@ -0,0 +1,318 @@
+"""
+Estado das assinaturas mantido localmente a partir do Asaas
+
+Os caminhos de requisição nunca chamam o Asaas para saber o status/plano:
+- o webhook do Asaas aplica cada evento na tabela subscriptions (uma vez por
+  id de evento, descartando eventos mais antigos que o estado atual);
+- get_entitlement lê a tabela local com cache em processo por usuário;
+- a reconciliação periódica lista as assinaturas no Asaas em páginas e corrige
+  em lote o que divergir (eventos perdidos, webhook fora do ar); roda em uma
+  única instância por vez (lease em scheduler_locks).
+
+O cache é por processo: o worker que recebe o webhook invalida na hora, os
+demais enxergam a mudança em até SUBSCRIPTION_CACHE_TTL segundos.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+from ..core.settings import settings
+from ..models.subscription import SubscriptionEntitlement
+from ..utils.asaas import asaas_request
+from ..utils.scheduler_lease import SchedulerLease
+from ..utils.supabase import get_admin_client
+
+# Status (do Asaas ou locais) que dão direito de uso do plano
+ENTITLED_STATUSES = {"ACTIVE"}
+
+# Eventos de cobrança que alteram o status da assinatura
+PAYMENT_EVENT_STATUS = {
+    "PAYMENT_CONFIRMED": "ACTIVE",
+    "PAYMENT_RECEIVED": "ACTIVE",
+    "PAYMENT_OVERDUE": "OVERDUE",
+}
+
+# Página máxima da listagem de assinaturas do Asaas
+ASAAS_PAGE_SIZE = 100
+
+# Nome do lease da reconciliação em scheduler_locks
+RECONCILE_LOCK_NAME = "subscription_reconcile"
+
+class UnknownSubscriptionError(Exception):
+    """Evento de uma assinatura ainda sem linha local: o webhook responde erro para o Asaas reenviar"""
+
+
+_entitlement_cache: Dict[str, Tuple[float, SubscriptionEntitlement]] = {}
+_entitlement_cache_lock = threading.Lock()
+
+
+def invalidate_entitlements(user_ids):
+    """Remove do cache o direito de uso dos usuários informados"""
+    with _entitlement_cache_lock:
+        for user_id in user_ids:
+            if user_id:
+                _entitlement_cache.pop(str(user_id), None)
+
+
+def _parse_event_at(value: Optional[str]) -> str:
+    """dateCreated do Asaas ('2024-06-12 16:45:03', horário de Brasília) -> ISO com timezone"""
+    if not value:
+        return datetime.utcnow().isoformat() + "+00:00"
+    parsed = datetime.fromisoformat(value.replace(" ", "T"))
+    return parsed.isoformat() + ("-03:00" if parsed.tzinfo is None else "")
+
+
+def subscription_status_from_event(payload: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Extrai (subscription_id, status, next_due_date) de um evento do webhook"""
+    event = payload.get("event") or ""
+    # Campos fora do formato esperado são tratados como ausentes (evento ignorado)
+    subscription = payload.get("subscription") if isinstance(payload.get("subscription"), dict) else {}
+    payment = payload.get("payment") if isinstance(payload.get("payment"), dict) else {}
+
+    if event.startswith("SUBSCRIPTION_"):
+        if event == "SUBSCRIPTION_DELETED" or subscription.get("deleted"):
+            status = "cancelled"
+        elif event == "SUBSCRIPTION_INACTIVATED":
+            status = "INACTIVE"
+        else:
+            status = subscription.get("status")
+        return subscription.get("id"), status, subscription.get("nextDueDate")
+
+    if event in PAYMENT_EVENT_STATUS and payment.get("subscription"):
+        return payment["subscription"], PAYMENT_EVENT_STATUS[event], None
+
+    return None, None, None
+
+
+class SubscriptionService:
+    """Leitura e sincronização do estado local das assinaturas"""
+
+    def __init__(self, supabase_admin=None):
+        self._supabase = supabase_admin
+        self._lease: Optional[SchedulerLease] = None
+
+    @property
+    def supabase(self):
+        return self._supabase or get_admin_client()
+
+    @property
+    def lease(self) -> SchedulerLease:
+        # Criado sob demanda: a instância do módulo existe antes do cliente Supabase
+        if self._lease is None:
+            self._lease = SchedulerLease(self.supabase, RECONCILE_LOCK_NAME, settings.SUBSCRIPTION_RECONCILE_LOCK_TTL)
+        return self._lease
+
+    # ---------- Leitura (caminho quente) ----------
+
+    def get_entitlement(self, user_id: str) -> SubscriptionEntitlement:
+        """Plano e status do usuário a partir da tabela local (com cache)"""
+        key = str(user_id)
+        now = time.monotonic()
+        with _entitlement_cache_lock:
+            cached = _entitlement_cache.get(key)
+            if cached and cached[0] > now:
+                return cached[1]
+
+        response = self.supabase.table("subscriptions").select(
+            "*"
+        ).eq("user_id", key).order("created_at", desc=True).execute()
+        rows = response.data or []
+        # Uma assinatura ativa vale mais que a mais recente (ex.: troca de plano pendente)
+        row = next((r for r in rows if r.get("status") in ENTITLED_STATUSES), rows[0] if rows else None)
+
+        entitlement = SubscriptionEntitlement(
+            user_id=key,
+            active=bool(row and row.get("status") in ENTITLED_STATUSES),
+            plan=row.get("plan") if row else None,
+            status=row.get("status") if row else None,
+            subscription_id=row.get("subscription_id") if row else None,
+            next_due_date=row.get("next_due_date") if row else None,
+        )
+
+        with _entitlement_cache_lock:
+            if len(_entitlement_cache) >= settings.CACHE_MAXSIZE:
+                _entitlement_cache.clear()
+            _entitlement_cache[key] = (now + settings.SUBSCRIPTION_CACHE_TTL, entitlement)
+        return entitlement
+
+    # ---------- Webhook ----------
+
+    def apply_webhook_event(self, payload: Dict[str, Any]) -> bool:
+        """Aplica um evento do Asaas; retorna False se ignorado (duplicado, fora de ordem ou irrelevante).
+
+        Levanta UnknownSubscriptionError se a assinatura ainda não tem linha local
+        (ex.: PAYMENT_CONFIRMED antes do INSERT da rota de criação) e o evento é
+        recente; o evento não é registrado e a reentrega do Asaas o aplica.
+        """
+        event_id = payload.get("id")
+        subscription_id, status, next_due_date = subscription_status_from_event(payload)
+        if not event_id or not subscription_id:
+            return False
+
+        event_at = _parse_event_at(payload.get("dateCreated"))
+        try:
+            response = self.supabase.rpc("apply_subscription_event", {
+                "p_event_id": event_id,
+                "p_event": payload.get("event"),
+                "p_subscription_id": subscription_id,
+                "p_status": status,
+                "p_event_at": event_at,
+                "p_next_due_date": next_due_date,
+            }).execute()
+            result = response.data or {}
+            if result.get("outcome") == "unknown":
+                self._raise_if_retryable(subscription_id, event_at)
+            user_ids = [result["user_id"]] if result.get("user_id") else []
+        except APIError as e:
+            if "function" not in str(e).lower() and "PGRST202" not in str(e):
+                raise
+            # Função ainda não criada (performance_setup.sql): UPDATE direto, sem deduplicação
+            update = {"status": status, "updated_at": datetime.utcnow().isoformat()}
+            if next_due_date:
+                update["next_due_date"] = next_due_date
+            response = self.supabase.table("subscriptions").update(
+                {k: v for k, v in update.items() if v is not None}
+            ).eq("subscription_id", subscription_id).execute()
+            user_ids = [row.get("user_id") for row in response.data or []]
+            if not response.data:
+                self._raise_if_retryable(subscription_id, event_at)
+
+        invalidate_entitlements(user_ids)
+        if user_ids:
+            print(f"DEBUG: Webhook Asaas {payload.get('event')} aplicado em {subscription_id} -> {status}")
+        return bool(user_ids)
+
+    @staticmethod
+    def _raise_if_retryable(subscription_id: str, event_at: str):
+        """Pede reenvio de eventos recentes de assinaturas desconhecidas; os antigos
+        (assinaturas criadas fora desta aplicação) são ignorados e ficam para a reconciliação"""
+        age = (datetime.now(timezone.utc) - datetime.fromisoformat(event_at)).total_seconds()
+        if age <= settings.SUBSCRIPTION_WEBHOOK_RETRY_WINDOW:
+            raise UnknownSubscriptionError(f"Assinatura {subscription_id} ainda não registrada localmente")
+        print(f"DEBUG: Webhook Asaas para assinatura desconhecida {subscription_id} ignorado (evento antigo)")
+
+    # ---------- Reconciliação ----------
+
+    async def _fetch_asaas_states(self) -> Dict[str, Dict[str, Any]]:
+        """Todas as assinaturas do Asaas, paginadas (offset/limit)"""
+        states: Dict[str, Dict[str, Any]] = {}
+        offset = 0
+        while True:
+            response = await asaas_request("GET", "subscriptions", data={
+                "offset": offset,
+                "limit": ASAAS_PAGE_SIZE,
+                "includeDeleted": "true",
+            })
+            body = response.json()
+            for item in body.get("data") or []:
+                states[item["id"]] = {
+                    "subscription_id": item["id"],
+                    "status": "cancelled" if item.get("deleted") else item.get("status"),
+                    "next_due_date": item.get("nextDueDate"),
+                }
+            if not body.get("hasMore"):
+                return states
+            offset += ASAAS_PAGE_SIZE
+
+    def _fetch_local_states(self) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        page_size = 1000
+        start = 0
+        while True:
+            batch = self.supabase.table("subscriptions").select(
+                "subscription_id, status, next_due_date"
+            ).order("subscription_id").range(start, start + page_size - 1).execute().data or []
+            rows.extend(batch)
+            if len(batch) < page_size:
+                return rows
+            start += page_size
+
+    def _sync_states(self, changes: List[Dict[str, Any]], started_at: str) -> List[str]:
+        """Aplica as divergências em um único UPDATE (ou um por assinatura, sem a função SQL)"""
+        try:
+            response = self.supabase.rpc("sync_subscription_states", {
+                "p_states": changes,
+                "p_started_at": started_at,
+            }).execute()
+            return [row if isinstance(row, str) else next(iter(row.values())) for row in response.data or []]
+        except APIError as e:
+            if "function" not in str(e).lower() and "PGRST202" not in str(e):
+                raise
+        user_ids = []
+        for change in changes:
+            response = self.supabase.table("subscriptions").update({
+                "status": change["status"],
+                "next_due_date": change["next_due_date"],
+                "updated_at": datetime.utcnow().isoformat(),
+            }).eq("subscription_id", change["subscription_id"]).execute()
+            user_ids.extend(row.get("user_id") for row in response.data or [])
+        return user_ids
+
+    async def reconcile(self, stop: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Compara o Asaas com a tabela local e corrige as divergências em lote
+        (sem gravar nada se 'stop' for sinalizado, ex.: lease perdido)"""
+        started = time.perf_counter()
+        started_at = datetime.utcnow().isoformat() + "+00:00"
+
+        remote = await self._fetch_asaas_states()
+        local = await asyncio.to_thread(self._fetch_local_states)
+
+        changes = []
+        for row in local:
+            state = remote.get(row.get("subscription_id"))
+            if not state:
+                continue
+            if state["status"] != row.get("status") or (state["next_due_date"] or None) != (row.get("next_due_date") or None):
+                changes.append(state)
+
+        lease_lost = bool(stop and stop.is_set())
+        user_ids = []
+        if changes and not lease_lost:
+            user_ids = await asyncio.to_thread(self._sync_states, changes, started_at)
+        invalidate_entitlements(user_ids)
+
+        return {
+            "asaas_subscriptions": len(remote),
+            "local_subscriptions": len(local),
+            "updated": len(user_ids),
+            "lease_lost": lease_lost,
+            "duration_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    async def reconcile_once(self) -> Optional[Dict[str, Any]]:
+        """Uma reconciliação sob o lease. Retorna None se outra instância o detém."""
+        if not await asyncio.to_thread(self.lease.acquire):
+            print(f"⏸️  Reconciliação: outra instância detém o lease '{self.lease.name}', pulando")
+            return None
+
+        stop = threading.Event()
+        lease_task = asyncio.create_task(self.lease.keep(stop))
+        try:
+            return await self.reconcile(stop)
+        finally:
+            lease_task.cancel()
+
+    async def run_periodically(self):
+        """Task de background: reconciliação a cada SUBSCRIPTION_RECONCILE_INTERVAL segundos"""
+        try:
+            while True:
+                await asyncio.sleep(settings.SUBSCRIPTION_RECONCILE_INTERVAL)
+                try:
+                    metrics = await self.reconcile_once()
+                    if metrics is not None:
+                        print(f"DEBUG: Reconciliação de assinaturas: {metrics}")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"DEBUG: Erro na reconciliação de assinaturas: {e}")
+        finally:
+            if self._lease is not None:
+                self._lease.release()
+
+
+# Instância por processo (worker)
+subscription_service = SubscriptionService()
@@ -1,13 +1,17 @@
 """
 Serviço avançado para gerenciamento de tokens JWT no banco de dados
 """
+import asyncio
 import hashlib
 import secrets
+import threading
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Dict, Any, Tuple
 from uuid import UUID
 
+from postgrest.exceptions import APIError
+
 from ..utils.supabase import get_admin_client
 from ..models.session import (
     UserSession, 
@@ -17,6 +21,139 @@ from ..models.session import (
     RefreshTokenResponse
 )
 from ..core.settings import settings, get_environment_config
+from .revocation_service import revocation_service
+
+
+class SessionActivityBuffer:
+    """
+    Buffer em memória de atividade de sessões (write-behind de last_used_at).
+    
+    Cada validação apenas registra o horário de uso da sessão; os toques são
+    coalescidos por sessão e gravados em lote a cada flush_interval segundos
+    ou quando max_pending sessões estiverem pendentes.
+    """
+    
+    def __init__(
+        self,
+        flush_interval: int = settings.SESSION_ACTIVITY_FLUSH_INTERVAL,
+        max_pending: int = settings.SESSION_ACTIVITY_MAX_PENDING
+    ):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def touch(self, session_id: str) -> bool:
+        """Registra uso da sessão. Retorna True quando o buffer atingiu max_pending."""
+        with self._lock:
+            self._pending[str(session_id)] = datetime.utcnow().isoformat()
+            return len(self._pending) >= self.max_pending
+    
+    def discard(self, session_ids) -> None:
+        """Descarta toques pendentes de sessões revogadas"""
+        with self._lock:
+            for session_id in session_ids:
+                self._pending.pop(str(session_id), None)
+    
+    def flush(self) -> int:
+        """Grava os toques pendentes em uma única chamada ao banco"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        
+        supabase = get_admin_client()
+        touches = [{"id": session_id, "last_used_at": used_at} for session_id, used_at in batch.items()]
+        try:
+            supabase.rpc("touch_user_sessions", {"p_touches": touches}).execute()
+        except APIError as e:
+            # Função touch_user_sessions() ainda não criada: um UPDATE com o horário mais recente
+            print(f"DEBUG: RPC touch_user_sessions indisponível, usando UPDATE em lote: {e}")
+            try:
+                supabase.from_('user_sessions').update({
+                    'last_used_at': max(batch.values())
+                }).in_('id', list(batch)).execute()
+            except Exception as e_update:
+                print(f"DEBUG: Erro ao gravar atividade de sessões: {e_update}")
+                return 0
+        except Exception as e:
+            print(f"DEBUG: Erro ao gravar atividade de sessões: {e}")
+            return 0
+        return len(batch)
+    
+    async def run_periodically(self):
+        """Task de background: grava o buffer a cada flush_interval segundos"""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await asyncio.to_thread(self.flush)
+        except asyncio.CancelledError:
+            # Último flush no shutdown para não perder atividade registrada
+            await asyncio.to_thread(self.flush)
+            raise
+
+
+class SessionLookupCache:
+    """
+    Cache de curta duração hash do token -> sessão (positivo e negativo).
+    
+    Revogações feitas por este processo invalidam as entradas na hora; em outros
+    workers a entrada expira em no máximo SESSION_CACHE_TTL segundos.
+    """
+    
+    def __init__(
+        self,
+        ttl: int = settings.SESSION_CACHE_TTL,
+        negative_ttl: int = settings.SESSION_NEGATIVE_CACHE_TTL,
+        maxsize: int = settings.CACHE_MAXSIZE
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self._entries: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, token_hash: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Retorna (encontrado, dados da sessão ou None para negativo)"""
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if not entry:
+                return False, None
+            if entry[0] <= time.monotonic():
+                del self._entries[token_hash]
+                return False, None
+            return True, entry[1]
+    
+    def put(self, token_hash: str, session_data: Optional[Dict[str, Any]], expires_at: Optional[datetime] = None):
+        ttl = self.ttl if session_data else self.negative_ttl
+        if expires_at is not None:
+            # Nunca manter em cache além da expiração da própria sessão
+            if expires_at.tzinfo:
+                expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+            remaining = (expires_at - datetime.utcnow()).total_seconds()
+            ttl = min(ttl, max(0, remaining))
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                self._entries.clear()
+            self._entries[token_hash] = (time.monotonic() + ttl, session_data)
+    
+    def invalidate_token(self, token_hash: str):
+        with self._lock:
+            self._entries.pop(token_hash, None)
+    
+    def invalidate_where(self, field: str, value: str):
+        """Remove entradas positivas cuja sessão tem field == value (id ou user_id)"""
+        with self._lock:
+            for token_hash in [
+                h for h, (_, data) in self._entries.items() if data and str(data.get(field)) == value
+            ]:
+                del self._entries[token_hash]
+
+
+# Instâncias por processo (worker)
+session_activity_buffer = SessionActivityBuffer()
+session_lookup_cache = SessionLookupCache()
+
 
 class TokenService:
     """Serviço para gerenciamento de tokens JWT no banco de dados"""
@@ -26,6 +163,17 @@ class TokenService:
         """Gera hash SHA-256 do token para armazenamento seguro"""
         return hashlib.sha256(token.encode()).hexdigest()
     
+    @staticmethod
+    def _to_user_session(session_data: Dict[str, Any]) -> UserSession:
+        """Converte a linha de user_sessions para o modelo"""
+        session_data = dict(session_data)
+        session_data["id"] = UUID(session_data["id"])
+        session_data["user_id"] = UUID(session_data["user_id"])
+        session_data["created_at"] = datetime.fromisoformat(session_data["created_at"].replace("Z", "+00:00"))
+        session_data["last_used_at"] = datetime.fromisoformat(session_data["last_used_at"].replace("Z", "+00:00"))
+        session_data["expires_at"] = datetime.fromisoformat(session_data["expires_at"].replace("Z", "+00:00"))
+        return UserSession(**session_data)
+    
     @staticmethod
     def _parse_user_agent(user_agent: Optional[str]) -> Dict[str, Any]:
         """Extrai informações do user agent"""
@@ -113,6 +261,7 @@ class TokenService:
             response = supabase.from_('user_sessions').insert(session_data).execute()
             
             if response.data:
+                session_lookup_cache.invalidate_token(session_data["access_token_hash"])
                 session_data_response = response.data[0]
                 session_data_response["id"] = UUID(session_data_response["id"])
                 session_data_response["user_id"] = UUID(session_data_response["user_id"])
@@ -148,36 +297,37 @@ class TokenService:
         update_last_used: bool = True
     ) -> Optional[UserSession]:
         """
-        Valida access token e opcionalmente atualiza last_used_at
+        Valida access token e opcionalmente registra o uso da sessão.
+        
+        A consulta é servida pelo cache hash -> sessão quando possível e
+        last_used_at é gravado em lote pelo SessionActivityBuffer.
         """
         try:
-            supabase = get_admin_client()
             token_hash = cls._hash_token(access_token)
             
-            # Buscar sessão ativa
-            response = supabase.from_('user_sessions').select("*").eq(
-                'access_token_hash', token_hash
-            ).eq('is_revoked', False).gte('expires_at', datetime.utcnow().isoformat()).execute()
-            
-            if response.data:
-                session_data = response.data[0]
-                
-                # Atualizar last_used_at se solicitado
-                if update_last_used:
-                    supabase.from_('user_sessions').update({
-                        'last_used_at': datetime.utcnow().isoformat()
-                    }).eq('id', session_data['id']).execute()
-                
-                # Converter para modelo
-                session_data["id"] = UUID(session_data["id"])
-                session_data["user_id"] = UUID(session_data["user_id"])
-                session_data["created_at"] = datetime.fromisoformat(session_data["created_at"].replace("Z", "+00:00"))
-                session_data["last_used_at"] = datetime.fromisoformat(session_data["last_used_at"].replace("Z", "+00:00"))
-                session_data["expires_at"] = datetime.fromisoformat(session_data["expires_at"].replace("Z", "+00:00"))
+            found, session_data = session_lookup_cache.get(token_hash)
+            if not found:
+                # Buscar sessão ativa
+                supabase = get_admin_client()
+                response = supabase.from_('user_sessions').select("*").eq(
+                    'access_token_hash', token_hash
+                ).eq('is_revoked', False).gte('expires_at', datetime.utcnow().isoformat()).execute()
                 
-                return UserSession(**session_data)
-                
-            return None
+                session_data = response.data[0] if response.data else None
+                expires_at = (
+                    datetime.fromisoformat(session_data["expires_at"].replace("Z", "+00:00"))
+                    if session_data else None
+                )
+                session_lookup_cache.put(token_hash, session_data, expires_at)
+            
+            if not session_data:
+                return None
+            
+            # Registrar uso (gravado em lote em background)
+            if update_last_used and session_activity_buffer.touch(session_data['id']):
+                await asyncio.to_thread(session_activity_buffer.flush)
+            
+            return cls._to_user_session(session_data)
             
         except Exception as e:
             print(f"DEBUG: Erro ao validar token - usando validação padrão: {e}")
@@ -220,6 +370,10 @@ class TokenService:
                 
                 supabase.from_('user_sessions').update(update_data).eq('id', session['id']).execute()
                 
+                # O access token anterior deixa de ser válido
+                session_lookup_cache.invalidate_token(session['access_token_hash'])
+                session_lookup_cache.invalidate_token(update_data['access_token_hash'])
+                
                 return RefreshTokenResponse(
                     access_token=new_access_token,
                     refresh_token=new_refresh_token,
@@ -253,6 +407,11 @@ class TokenService:
             
             response = supabase.from_('user_sessions').update(update_data).eq('id', str(session_id)).execute()
             
+            # Invalidar cache imediatamente (e descartar atividade pendente)
+            session_lookup_cache.invalidate_where('id', str(session_id))
+            session_activity_buffer.discard([session_id])
+            revocation_service.add_revoked(item.get('access_token_hash') for item in response.data or [])
+            
             return bool(response.data)
             
         except Exception as e:
@@ -283,6 +442,13 @@ class TokenService:
             
             response = query.execute()
             
+            # Invalidar cache imediatamente das sessões revogadas
+            revoked_ids = [item['id'] for item in response.data or []]
+            for revoked_id in revoked_ids:
+                session_lookup_cache.invalidate_where('id', str(revoked_id))
+            session_activity_buffer.discard(revoked_ids)
+            revocation_service.add_revoked(item.get('access_token_hash') for item in response.data or [])
+            
             return len(response.data) if response.data else 0
             
         except Exception as e:
@@ -342,21 +508,17 @@ class TokenService:
             return UserSessionsResponse(sessions=[], total=0)
     
     @classmethod
-    async def cleanup_expired_sessions(cls, older_than_days: int = 7) -> int:
+    async def cleanup_expired_sessions(cls, older_than_days: int = 7, max_rows: Optional[int] = None) -> int:
         """
-        Remove sessões expiradas há mais de X dias
+        Remove sessões expiradas há mais de X dias, em lotes limitados (revogadas só após expirar)
         """
+        from .maintenance_service import MaintenanceService
+        
         try:
-            supabase = get_admin_client()
-            
-            cutoff_date = datetime.utcnow() - timedelta(days=older_than_days)
-            
-            response = supabase.from_('user_sessions').delete().lt(
-                'expires_at', cutoff_date.isoformat()
-            ).execute()
-            
-            return len(response.data) if response.data else 0
+            service = MaintenanceService(get_admin_client())
+            metrics = await asyncio.to_thread(service.cleanup_sessions, older_than_days, max_rows)
+            return metrics.deleted
             
         except Exception as e:
             print(f"DEBUG: Erro ao limpar sessões expiradas: {e}")
-            return 0 
\ No newline at end of file
+            return 0
@@ -1,8 +1,45 @@
-import os
-import requests
+import asyncio
+import random
+from typing import Optional
+
+import httpx
+
 from ..core.config import ASAAS_API_KEY
+from ..core.settings import settings
+from .circuit_breaker import CircuitBreaker
+
+ASAAS_API_URL = settings.ASAAS_API_URL
+
+# Métodos que podem ser repetidos com segurança (o Asaas não duplica o efeito)
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+
+# Estado compartilhado pelo processo: pool HTTP, circuit breaker e bulkhead
+_http_client: Optional[httpx.AsyncClient] = None
+_bulkhead: Optional[asyncio.Semaphore] = None
+
+asaas_breaker = CircuitBreaker(
+    "asaas",
+    failure_threshold=settings.ASAAS_BREAKER_FAILURE_THRESHOLD,
+    base_backoff=settings.ASAAS_BREAKER_BASE_BACKOFF,
+    max_backoff=settings.ASAAS_BREAKER_MAX_BACKOFF,
+)
+
+
+class AsaasError(Exception):
+    """Erro na chamada à API do Asaas (status HTTP + corpo da resposta)"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(f"Asaas {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+class AsaasUnavailableError(AsaasError):
+    """Asaas lento ou fora do ar (timeout, circuito aberto ou bulkhead cheio)"""
+
+    def __init__(self, detail: str):
+        super().__init__(503, detail)
 
-ASAAS_API_URL = "https://api-sandbox.asaas.com/v3"
 
 def get_asaas_api_key() -> str:
     """Retorna a chave da API do Asaas"""
@@ -10,38 +47,124 @@ def get_asaas_api_key() -> str:
         raise ValueError("Variável de ambiente ASAAS_API_KEY deve estar configurada.")
     return ASAAS_API_KEY
 
-def asaas_request(method: str, endpoint: str, data: dict = None) -> requests.Response:
+
+def get_http_client() -> httpx.AsyncClient:
+    """Cliente HTTP assíncrono do processo para o Asaas (pool + timeouts explícitos)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            base_url=ASAAS_API_URL,
+            timeout=httpx.Timeout(
+                settings.ASAAS_READ_TIMEOUT,
+                connect=settings.ASAAS_CONNECT_TIMEOUT,
+                pool=settings.ASAAS_BULKHEAD_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.ASAAS_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.ASAAS_MAX_CONCURRENCY,
+            ),
+        )
+    return _http_client
+
+
+def _get_bulkhead() -> asyncio.Semaphore:
+    global _bulkhead
+    if _bulkhead is None:
+        _bulkhead = asyncio.Semaphore(settings.ASAAS_MAX_CONCURRENCY)
+    return _bulkhead
+
+
+async def close_http_client():
+    """Fecha o pool de conexões (shutdown da aplicação)"""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+def _retry_delay(attempt: int) -> float:
+    """Backoff exponencial com jitter completo"""
+    return random.uniform(0, settings.ASAAS_RETRY_BASE_DELAY * (2 ** attempt))
+
+
+async def asaas_request(method: str, endpoint: str, data: dict = None, idempotent: Optional[bool] = None) -> httpx.Response:
     """
     Função genérica para fazer requisições à API do Asaas.
+
+    - no máximo ASAAS_MAX_CONCURRENCY chamadas simultâneas por worker (bulkhead);
+      quem não consegue vaga em ASAAS_BULKHEAD_TIMEOUT segundos recebe 503;
+    - circuito aberto após falhas seguidas: falha na hora, sem chamar o Asaas;
+    - repetição com backoff para métodos idempotentes (e, em POST, apenas
+      quando a conexão nem chegou a ser estabelecida).
     """
-    api_key = get_asaas_api_key()
+    method = method.upper()
+    if method not in {"GET", "POST", "PUT", "DELETE"}:
+        raise ValueError(f"Método HTTP não suportado: {method}")
+    if idempotent is None:
+        idempotent = method in IDEMPOTENT_METHODS
+
     headers = {
-        "access_token": api_key,
+        "access_token": get_asaas_api_key(),
         "Content-Type": "application/json"
     }
-    url = f"{ASAAS_API_URL}/{endpoint}"
-
-    if method.upper() == "POST":
-        response = requests.post(url, headers=headers, json=data)
-    elif method.upper() == "GET":
-        response = requests.get(url, headers=headers, params=data)
-    elif method.upper() == "PUT":
-        response = requests.put(url, headers=headers, json=data)
-    elif method.upper() == "DELETE":
-        response = requests.delete(url, headers=headers)
-    else:
-        raise ValueError(f"Método HTTP não suportado: {method}")
+    request_kwargs = {"params": data} if method == "GET" else ({"json": data} if data is not None else {})
+
+    bulkhead = _get_bulkhead()
+    try:
+        await asyncio.wait_for(bulkhead.acquire(), timeout=settings.ASAAS_BULKHEAD_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise AsaasUnavailableError("Muitas requisições simultâneas ao Asaas, tente novamente")
+
+    if not asaas_breaker.allow_request():
+        bulkhead.release()
+        raise AsaasUnavailableError(f"Asaas indisponível, nova tentativa em {asaas_breaker.retry_in():.0f}s")
+
+    settled = False  # resultado já registrado no breaker
+    try:
+        attempt = 0
+        while True:
+            try:
+                response = await get_http_client().request(method, f"/{endpoint}", headers=headers, **request_kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # Requisição não foi enviada: seguro repetir até em POST
+                error, retryable = e, True
+            except httpx.TransportError as e:
+                error, retryable = e, idempotent
+            else:
+                if response.status_code < 500 and response.status_code != 429:
+                    settled = True
+                    asaas_breaker.record_success()
+                    if response.status_code >= 400:
+                        raise AsaasError(response.status_code, response.text)
+                    return response
+                error, retryable = AsaasError(response.status_code, response.text), idempotent
 
-    response.raise_for_status() # Lança exceção para códigos de status HTTP de erro
-    return response
+            if not retryable or attempt >= settings.ASAAS_MAX_RETRIES:
+                settled = True
+                asaas_breaker.record_failure(error)
+                if isinstance(error, AsaasError):
+                    raise error
+                raise AsaasUnavailableError(f"Falha de comunicação com o Asaas: {error!r}") from error
 
-def create_asaas_customer(customer_data: dict) -> dict:
+            await asyncio.sleep(_retry_delay(attempt))
+            attempt += 1
+    except BaseException as e:
+        # Cancelamento ou erro inesperado: sem registrar, a chamada de teste do
+        # half-open ficaria pendente e o circuito recusaria tudo dali em diante
+        if not settled:
+            asaas_breaker.record_failure(e)
+        raise
+    finally:
+        bulkhead.release()
+
+
+async def create_asaas_customer(customer_data: dict) -> dict:
     """
     Cria um novo cliente no Asaas.
     """
     if not ASAAS_API_KEY:
         # Se não tiver chave do Asaas, retornar um ID fictício
         return {"id": "mock_customer_id"}
-    
-    response = asaas_request("POST", "customers", data=customer_data)
-    return response.json() 
\ No newline at end of file
+
+    response = await asaas_request("POST", "customers", data=customer_data)
+    return response.json()
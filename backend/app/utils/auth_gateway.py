@@ -0,0 +1,119 @@
+"""
+Gateway stateless para o Supabase Auth (GoTrue)
+
+Chama os endpoints REST do GoTrue diretamente com um cliente HTTP assíncrono
+compartilhado (pool de conexões). Cada chamada recebe e devolve seus próprios
+tokens: não existe sessão mutável compartilhada entre requisições, ao contrário
+de supabase_client().auth.sign_in_with_password()/sign_out(), que gravam a
+sessão no cliente global do processo.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import httpx
+
+from ..core.config import SUPABASE_URL, SUPABASE_KEY
+from ..core.settings import settings
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+class AuthGatewayError(Exception):
+    """Erro retornado pelo GoTrue (status HTTP + mensagem)"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+@dataclass
+class AuthSession:
+    """Tokens emitidos pelo GoTrue para um login/refresh"""
+    access_token: str
+    refresh_token: str
+    expires_in: int
+    token_type: str = "bearer"
+    user: Dict[str, Any] = field(default_factory=dict)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Cliente HTTP assíncrono do processo (pool de conexões keep-alive)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            base_url=f"{(SUPABASE_URL or '').rstrip('/')}/auth/v1",
+            headers={"apikey": SUPABASE_KEY or "", "Content-Type": "application/json"},
+            timeout=httpx.Timeout(settings.AUTH_GATEWAY_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.AUTH_GATEWAY_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AUTH_GATEWAY_MAX_CONNECTIONS,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Fecha o pool de conexões (shutdown da aplicação)"""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+async def _request(method: str, path: str, access_token: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+    bearer = access_token or SUPABASE_KEY
+    headers = {"Authorization": f"Bearer {bearer}"} if bearer else {}
+    response = await get_http_client().request(method, path, headers=headers, **kwargs)
+
+    if response.status_code >= 400:
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        message = body.get("error_description") or body.get("msg") or body.get("message") or response.text
+        raise AuthGatewayError(response.status_code, message)
+
+    return response.json() if response.content else {}
+
+
+def _to_session(data: Dict[str, Any]) -> AuthSession:
+    return AuthSession(
+        access_token=data["access_token"],
+        refresh_token=data["refresh_token"],
+        expires_in=data.get("expires_in", 3600),
+        token_type=data.get("token_type", "bearer"),
+        user=data.get("user") or {},
+    )
+
+
+async def sign_in_with_password(email: str, password: str) -> AuthSession:
+    """Login por email e senha (grant_type=password)"""
+    data = await _request("POST", "/token", params={"grant_type": "password"}, json={
+        "email": email,
+        "password": password,
+    })
+    return _to_session(data)
+
+
+async def refresh_session(refresh_token: str) -> AuthSession:
+    """Troca um refresh token por uma nova sessão (grant_type=refresh_token)"""
+    data = await _request("POST", "/token", params={"grant_type": "refresh_token"}, json={
+        "refresh_token": refresh_token,
+    })
+    return _to_session(data)
+
+
+async def sign_out(access_token: str):
+    """Encerra apenas a sessão deste token no GoTrue (scope=local)"""
+    await _request("POST", "/logout", access_token=access_token, params={"scope": "local"})
+
+
+async def get_user(access_token: str) -> Dict[str, Any]:
+    """Dados do usuário dono do token"""
+    return await _request("GET", "/user", access_token=access_token)
+
+
+async def update_user(access_token: str, attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """Atualiza o usuário dono do token (ex.: {"password": ...})"""
+    return await _request("PUT", "/user", access_token=access_token, json=attributes)
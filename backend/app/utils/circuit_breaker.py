@@ -0,0 +1,121 @@
+"""
+Circuit breaker simples (closed / open / half-open) com backoff exponencial
+
+Usado para parar de chamar um serviço externo durante uma indisponibilidade:
+- closed: chamadas liberadas; falhas consecutivas acima do limite abrem o circuito;
+- open: chamadas recusadas sem I/O até o fim do backoff (dobra a cada reabertura);
+- half-open: uma única chamada de teste decide se fecha ou reabre o circuito
+  (se ela não registrar resultado em trial_timeout segundos, outra é liberada).
+"""
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class CircuitBreakerOpenError(Exception):
+    """Circuito aberto: o serviço está indisponível e a chamada nem foi feita"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Serviço '{name}' temporariamente indisponível (nova tentativa em {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Estado de saúde de um serviço, compartilhado por todas as requisições do processo"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 3, base_backoff: float = 2.0, max_backoff: float = 60.0,
+                 trial_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.trial_timeout = trial_timeout
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._open_count = 0
+        self._open_until = 0.0
+        self._trial_in_flight = False
+        self._trial_started = 0.0
+        self._last_error: Optional[str] = None
+        self._last_change = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def is_closed(self) -> bool:
+        return self._state == self.CLOSED
+
+    def retry_in(self) -> float:
+        """Segundos até o fim do backoff (0 se não estiver aberto)"""
+        if self._state != self.OPEN:
+            return 0.0
+        return max(0.0, self._open_until - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Decide sem I/O se a chamada pode ser feita (no half-open, libera só a chamada de teste)"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() >= self._open_until:
+                self._transition(self.HALF_OPEN)
+            if self._state != self.HALF_OPEN:
+                return False
+            now = time.monotonic()
+            # Chamada de teste que nunca registrou resultado não prende o half-open
+            if not self._trial_in_flight or now - self._trial_started >= self.trial_timeout:
+                self._trial_in_flight = True
+                self._trial_started = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            self._open_count = 0
+            self._trial_in_flight = False
+            self._last_error = None
+            if self._state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self, error: Any = None):
+        with self._lock:
+            self._consecutive_failures += 1
+            self._trial_in_flight = False
+            if error is not None:
+                self._last_error = str(error)
+            if self._state == self.OPEN:
+                # Chamadas que já estavam em andamento não estendem o backoff atual
+                return
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self._open_count += 1
+        backoff = min(self.max_backoff, self.base_backoff * (2 ** (self._open_count - 1)))
+        # Jitter para que vários workers não testem o serviço no mesmo instante
+        self._open_until = time.monotonic() + backoff * random.uniform(0.8, 1.2)
+        self._transition(self.OPEN)
+
+    def _transition(self, state: str):
+        if state != self._state:
+            print(f"DEBUG: Circuit breaker '{self.name}': {self._state} -> {state}")
+            self._state = state
+            self._last_change = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self._state,
+            "consecutive_failures": self._consecutive_failures,
+            "retry_in_seconds": round(self.retry_in(), 1),
+            "last_error": self._last_error,
+            "last_change": self._last_change,
+        }
@@ -0,0 +1,362 @@
+"""
+Compressão das respostas HTTP (substitui o GZipMiddleware)
+
+- Negociação pelo Accept-Encoding entre zstd, br e gzip (q-values do cliente,
+  desempate pela ordem de COMPRESSION_ENCODINGS). brotli e zstandard são
+  opcionais: sem eles, só gzip.
+- Nível por content type (COMPRESSION_LEVELS): JSON da API com níveis rápidos,
+  textos maiores (CSV) com níveis mais altos.
+- Corpos acima de COMPRESSION_THREAD_THRESHOLD são comprimidos em thread, sem
+  segurar o event loop.
+- Só tipos compressíveis (texto/JSON/XML) são comprimidos: downloads que já são
+  compactados (xlsx, pdf, parquet, arrow, csv.gz) passam direto.
+- Respostas completas de GET recebem um ETag fraco (hash do corpo, se a rota não
+  definiu um): If-None-Match igual responde 304, e os bytes comprimidos ficam num
+  LRU por (ETag, codificação, nível), reaproveitados quando a mesma resposta é
+  servida de novo (ex.: dashboard da empresa consultado por vários usuários).
+"""
+import asyncio
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from ..core.settings import settings
+
+ZSTD = "zstd"
+BROTLI = "br"
+GZIP = "gzip"
+
+AVAILABLE = {ZSTD: ZSTD_AVAILABLE, BROTLI: BROTLI_AVAILABLE, GZIP: True}
+DEFAULT_LEVELS = {ZSTD: 3, BROTLI: 4, GZIP: 6}
+
+# Formatos já compactados (downloads de relatórios, imagens, arquivos)
+ALREADY_COMPRESSED = frozenset({
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.apache.parquet",
+    "application/vnd.apache.arrow.stream",
+    "application/gzip",
+    "application/zip",
+    "application/octet-stream",
+    "image/png",
+    "image/jpeg",
+    "image/webp",
+})
+COMPRESSIBLE_TYPES = frozenset({
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+})
+
+
+def media_type(content_type: str) -> str:
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    media = media_type(content_type)
+    if media in ALREADY_COMPRESSED or media == "text/event-stream":
+        return False
+    return (
+        media.startswith("text/") or media in COMPRESSIBLE_TYPES
+        or media.endswith("+json") or media.endswith("+xml")
+    )
+
+
+def parse_encodings(text: str) -> List[str]:
+    """Codificações configuradas que estão instaladas, na ordem de preferência"""
+    encodings = [item.strip().lower() for item in text.split(",") if item.strip()]
+    return [encoding for encoding in encodings if AVAILABLE.get(encoding)]
+
+
+def parse_levels(text: str) -> Dict[str, Dict[str, int]]:
+    """"application/json:zstd=3,br=4;text/*:br=6" -> {"application/json": {"zstd": 3, "br": 4}, ...}"""
+    levels: Dict[str, Dict[str, int]] = {}
+    for group in text.split(";"):
+        if not group.strip():
+            continue
+        try:
+            content_type, pairs = group.split(":", 1)
+            levels[content_type.strip().lower()] = {
+                encoding.strip().lower(): int(level)
+                for encoding, level in (pair.split("=", 1) for pair in pairs.split(","))
+            }
+        except ValueError:
+            print(f"⚠️  COMPRESSION_LEVELS: grupo inválido ignorado: '{group}'")
+    return levels
+
+
+def negotiate(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """Codificação escolhida (maior q do cliente; empate pela ordem do servidor) ou None"""
+    if not accept_encoding or not encodings:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == ZSTD:
+        # ZstdCompressor não é thread-safe: um por chamada
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    if encoding == BROTLI:
+        return brotli.compress(body, quality=level)
+    return zlib.compress(body, level, wbits=31)  # 31 = cabeçalho gzip
+
+
+class StreamCompressor:
+    """Compressão incremental para respostas em streaming"""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == ZSTD:
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        elif encoding == BROTLI:
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == BROTLI:
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        if self.encoding == BROTLI:
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressedCache:
+    """LRU dos corpos comprimidos por (ETag, codificação, nível), limitado em bytes"""
+
+    def __init__(self, max_bytes: int, max_entry: int):
+        self.max_bytes = max_bytes
+        self.max_entry = max_entry
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str, int], bytes]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str, int]) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: Tuple[str, str, int], body: bytes):
+        if len(body) > self.max_entry or key in self._entries:
+            return
+        self._entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Comparação fraca do If-None-Match (ignora o prefixo W/)"""
+    if if_none_match.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == target:
+            return True
+    return False
+
+
+def _weak(etag: str) -> str:
+    """ETag forte vira fraco quando o corpo é recodificado (bytes diferentes do original)"""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compressão (zstd/br/gzip) com ETag e cache dos corpos comprimidos"""
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+        self.encodings = parse_encodings(settings.COMPRESSION_ENCODINGS)
+        self.levels = parse_levels(settings.COMPRESSION_LEVELS)
+        self.thread_threshold = settings.COMPRESSION_THREAD_THRESHOLD
+        self.cache = CompressedCache(settings.COMPRESSION_CACHE_MAX_BYTES, settings.COMPRESSION_CACHE_MAX_ENTRY)
+
+    def level(self, content_type: str, encoding: str) -> int:
+        media = media_type(content_type)
+        for key in (media, f"{media.split('/', 1)[0]}/*"):
+            levels = self.levels.get(key)
+            if levels and encoding in levels:
+                return levels[encoding]
+        return DEFAULT_LEVELS[encoding]
+
+    async def compress(self, body: bytes, encoding: str, level: int) -> bytes:
+        if len(body) >= self.thread_threshold:
+            return await asyncio.to_thread(compress, body, encoding, level)
+        return compress(body, encoding, level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        responder = _CompressionResponder(
+            self,
+            send,
+            encoding=negotiate(request_headers.get("accept-encoding", ""), self.encodings),
+            if_none_match=request_headers.get("if-none-match"),
+            conditional=scope["method"] in ("GET", "HEAD"),
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Estado de uma resposta: decide no primeiro bloco do corpo se comprime, e como"""
+
+    def __init__(self, middleware: CompressionMiddleware, send, encoding: Optional[str],
+                 if_none_match: Optional[str], conditional: bool):
+        self.middleware = middleware
+        self._send = send
+        self.encoding = encoding
+        self.if_none_match = if_none_match
+        self.conditional = conditional
+        self.start_message = None
+        self.mode: Optional[str] = None  # "passthrough" | "stream"
+        self.stream: Optional[StreamCompressor] = None
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Cabeçalhos só saem junto com o primeiro bloco do corpo
+            self.start_message = message
+            return
+        if message_type != "http.response.body" or self.mode == "passthrough":
+            await self._send(message)
+            return
+        if self.mode == "stream":
+            await self._send_stream_chunk(message)
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        status = self.start_message["status"]
+        eligible = (
+            status not in (204, 206, 304)
+            and "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "")
+            and is_compressible(headers.get("content-type"))
+            and (more_body or len(body) >= self.middleware.minimum_size)
+        )
+        if not eligible:
+            self.mode = "passthrough"
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            await self._start_stream(headers, message)
+        else:
+            await self._send_complete(headers, body, status)
+
+    async def _send_complete(self, headers: MutableHeaders, body: bytes, status: int):
+        self.mode = "passthrough"
+        etag = None
+        if self.conditional and status == 200:
+            etag = headers.get("etag") or f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            if self.if_none_match and _etag_matches(self.if_none_match, etag):
+                not_modified = MutableHeaders()
+                not_modified["etag"] = etag
+                for name in ("vary", "cache-control"):
+                    if name in headers:
+                        not_modified[name] = headers[name]
+                await self._send({"type": "http.response.start", "status": 304, "headers": not_modified.raw})
+                await self._send({"type": "http.response.body", "body": b""})
+                return
+            headers["etag"] = etag
+
+        if self.encoding:
+            level = self.middleware.level(headers.get("content-type", ""), self.encoding)
+            key = (etag, self.encoding, level) if etag else None
+            compressed = self.middleware.cache.get(key) if key else None
+            if compressed is None:
+                compressed = await self.middleware.compress(body, self.encoding, level)
+                if key:
+                    self.middleware.cache.put(key, compressed)
+            if len(compressed) < len(body):
+                body = compressed
+                headers["content-encoding"] = self.encoding
+                headers["content-length"] = str(len(body))
+                if etag:
+                    headers["etag"] = _weak(etag)
+
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": body})
+
+    async def _start_stream(self, headers: MutableHeaders, message):
+        if not self.encoding:
+            self.mode = "passthrough"
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+        self.mode = "stream"
+        level = self.middleware.level(headers.get("content-type", ""), self.encoding)
+        self.stream = StreamCompressor(self.encoding, level)
+        headers["content-encoding"] = self.encoding
+        if "content-length" in headers:
+            del headers["content-length"]
+        if "etag" in headers:
+            headers["etag"] = _weak(headers["etag"])
+        await self._send(self.start_message)
+        await self._send_stream_chunk(message)
+
+    async def _send_stream_chunk(self, message):
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if len(body) >= self.middleware.thread_threshold:
+            data = await asyncio.to_thread(self.stream.compress, body)
+        else:
+            data = self.stream.compress(body)
+        if not more_body:
+            data += self.stream.finish()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,100 @@
+"""
+Expressões cron de 5 campos (minuto hora dia-do-mês mês dia-da-semana)
+
+Suporta '*', listas (1,15), intervalos (1-5), passos (*/15, 0-30/10) e 7 como
+domingo. Como no cron, se dia-do-mês e dia-da-semana forem ambos restritos, basta
+um deles coincidir. Usado pelos agendamentos de relatórios.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import FrozenSet
+
+# (mínimo, máximo) de cada campo
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+# Limite da busca pelo próximo horário (expressões como "0 0 31 2 *" nunca coincidem)
+MAX_SEARCH_DAYS = 366 * 4
+
+
+def _parse_field(text: str, minimum: int, maximum: int) -> FrozenSet[int]:
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Passo inválido: {step_text}")
+        if part == '*':
+            start, end = minimum, maximum
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = maximum if step > 1 else start
+        if start < minimum or end > maximum or start > end:
+            raise ValueError(f"Valor fora do intervalo {minimum}-{maximum}: {part}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronExpression:
+    minutes: FrozenSet[int]
+    hours: FrozenSet[int]
+    days: FrozenSet[int]
+    months: FrozenSet[int]
+    weekdays: FrozenSet[int]  # 0 = domingo
+    days_restricted: bool
+    weekdays_restricted: bool
+
+    @classmethod
+    def parse(cls, expression: str) -> "CronExpression":
+        """ValueError se a expressão for inválida"""
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError("A expressão cron deve ter 5 campos: minuto hora dia mês dia-da-semana")
+        try:
+            minutes, hours, days, months, weekdays = (
+                _parse_field(text, minimum, maximum) for text, (minimum, maximum) in zip(fields, FIELD_RANGES)
+            )
+        except ValueError as e:
+            raise ValueError(f"Expressão cron inválida '{expression}': {e}")
+        return cls(
+            minutes=minutes,
+            hours=hours,
+            days=days,
+            months=months,
+            weekdays=frozenset(day % 7 for day in weekdays),
+            days_restricted=fields[2] != '*',
+            weekdays_restricted=fields[4] != '*',
+        )
+
+    def _day_matches(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        in_weekdays = (day.isoweekday() % 7) in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return in_days or in_weekdays
+        return in_days and in_weekdays
+
+    def next_after(self, after: datetime) -> datetime:
+        """Primeiro horário estritamente depois de `after` (mesmo tzinfo de `after`)"""
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        hours = sorted(self.hours)
+        minutes = sorted(self.minutes)
+        day = start.replace(hour=0, minute=0)
+        for offset in range(MAX_SEARCH_DAYS):
+            current = day + timedelta(days=offset)
+            if not self._day_matches(current):
+                continue
+            for hour in hours:
+                if offset == 0 and hour < start.hour:
+                    continue
+                for minute in minutes:
+                    candidate = current.replace(hour=hour, minute=minute)
+                    if candidate >= start:
+                        return candidate
+        raise ValueError("A expressão cron não tem próxima execução")
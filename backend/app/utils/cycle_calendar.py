@@ -0,0 +1,388 @@
+"""
+Calendário de ciclos em memória
+
+Os ciclos (da empresa ou globais de um ano) são convertidos uma única vez em
+arrays ordenados por data de início (ordinais inteiros), com busca por bisect
+do ciclo que contém uma data. O status temporal (dias, progresso, passado/
+futuro) é memoizado por (início, fim, dia): um ciclo editado gera uma chave
+nova e o cálculo antigo simplesmente deixa de ser usado.
+
+Os calendários das empresas ficam em cache por escopo ("company:<id>") e são
+invalidados pelas rotas que criam, editam, ativam ou removem ciclos. Nos demais
+workers, a versão do calendário (cycle_calendar_versions, incrementada por
+trigger em cycles) é conferida a cada CYCLE_CALENDAR_VERSION_CHECK segundos e o
+calendário é recarregado quando ela muda. Os ciclos globais ficam em um
+registro carregado no startup (ver load_global_cycles).
+"""
+import asyncio
+import bisect
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..core.settings import settings
+from .supabase import supabase_admin
+
+COMPANY_CYCLE_FIELDS = "id, name, start_date, end_date, is_active, created_at, updated_at"
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_string(value: str) -> date:
+    if "T" in value or " " in value:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+    return date.fromisoformat(value[:10])
+
+
+def parse_cycle_date(value: Any) -> date:
+    """Aceita date, datetime, 'YYYY-MM-DD' ou ISO completo (com 'T'/'Z') e retorna date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return _parse_date_string(value)
+
+
+@dataclass(frozen=True)
+class CycleTimeline:
+    """Status temporal de um ciclo em um dia"""
+    start_date: date
+    end_date: date
+    days_total: int
+    days_elapsed: int
+    days_remaining: int
+    progress_percentage: float
+    is_current: bool
+    is_future: bool
+    is_past: bool
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "days_total": self.days_total,
+            "days_elapsed": self.days_elapsed,
+            "days_remaining": self.days_remaining,
+            "progress_percentage": self.progress_percentage,
+            "is_current": self.is_current,
+            "is_future": self.is_future,
+            "is_past": self.is_past,
+        }
+
+
+@lru_cache(maxsize=8192)
+def _timeline(start_date: date, end_date: date, today: date) -> CycleTimeline:
+    days_total = (end_date - start_date).days + 1
+    days_elapsed = max(0, (today - start_date).days + 1)
+    days_remaining = max(0, (end_date - today).days)
+
+    if days_total > 0:
+        progress_percentage = min(100.0, max(0.0, (days_elapsed / days_total) * 100))
+    else:
+        progress_percentage = 0.0
+
+    return CycleTimeline(
+        start_date=start_date,
+        end_date=end_date,
+        days_total=days_total,
+        days_elapsed=days_elapsed,
+        days_remaining=days_remaining,
+        progress_percentage=round(progress_percentage, 2),
+        is_current=start_date <= today <= end_date,
+        is_future=today < start_date,
+        is_past=today > end_date,
+    )
+
+
+def cycle_timeline(cycle_data: Dict[str, Any], today: Optional[date] = None) -> CycleTimeline:
+    """Status temporal do ciclo no dia (hoje por padrão), memoizado por (ciclo, dia)"""
+    return _timeline(
+        parse_cycle_date(cycle_data["start_date"]),
+        parse_cycle_date(cycle_data["end_date"]),
+        today or date.today(),
+    )
+
+
+class CycleCalendar:
+    """Ciclos de um escopo ordenados por início, com busca por data em O(log n)"""
+
+    __slots__ = ("cycles", "_sorted", "_starts", "_ends", "_max_end", "_by_id")
+
+    def __init__(self, cycles: Iterable[Dict[str, Any]]):
+        # Ordem original (ex.: created_at desc da consulta) preservada para listagens
+        self.cycles: List[Dict[str, Any]] = list(cycles)
+        spans = sorted(
+            (
+                (parse_cycle_date(c["start_date"]).toordinal(), parse_cycle_date(c["end_date"]).toordinal(), c)
+                for c in self.cycles
+                if c.get("start_date") and c.get("end_date")
+            ),
+            # Mesmo início: o ciclo mais curto fica depois e é encontrado primeiro
+            key=lambda span: (span[0], -span[1]),
+        )
+        self._sorted = [c for _, _, c in spans]
+        self._starts = [s for s, _, _ in spans]
+        self._ends = [e for _, e, _ in spans]
+        # Maior data de fim até cada posição: permite parar a busca em ciclos sobrepostos
+        self._max_end: List[int] = []
+        running = -1
+        for end in self._ends:
+            running = max(running, end)
+            self._max_end.append(running)
+        self._by_id = {str(c["id"]): c for c in self.cycles if c.get("id") is not None}
+
+    def __len__(self) -> int:
+        return len(self.cycles)
+
+    def get(self, cycle_id: Any) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(str(cycle_id))
+
+    def all_containing(self, day: date) -> List[Dict[str, Any]]:
+        """Ciclos que contêm a data, do início mais recente para o mais antigo"""
+        ordinal = day.toordinal()
+        index = bisect.bisect_right(self._starts, ordinal) - 1
+        found = []
+        while index >= 0 and self._max_end[index] >= ordinal:
+            if self._ends[index] >= ordinal:
+                found.append(self._sorted[index])
+            index -= 1
+        return found
+
+    def containing(self, day: date) -> Optional[Dict[str, Any]]:
+        """Ciclo que contém a data (o de início mais recente e, no empate, o mais curto)"""
+        found = self.all_containing(day)
+        return found[0] if found else None
+
+    def by_start(self, descending: bool = False) -> List[Dict[str, Any]]:
+        """Ciclos ordenados por data de início"""
+        return self._sorted[::-1] if descending else list(self._sorted)
+
+    def first_where(self, field: str) -> Optional[Dict[str, Any]]:
+        """Primeiro ciclo com a flag informada (ex.: is_active, is_current)"""
+        return next((c for c in self.cycles if c.get(field)), None)
+
+
+# Cache de calendários por escopo: {escopo: (expira_em, conferido_em, versão, calendário)}
+_calendars: Dict[str, Tuple[float, float, Any, CycleCalendar]] = {}
+_calendars_lock = threading.Lock()
+
+
+def get_calendar(
+    scope: str,
+    loader: Callable[[], List[Dict[str, Any]]],
+    version_loader: Optional[Callable[[], Any]] = None,
+) -> CycleCalendar:
+    """Calendário do escopo; carrega com 'loader' na primeira vez, após o TTL ou
+    quando 'version_loader' (conferido a cada CYCLE_CALENDAR_VERSION_CHECK) muda"""
+    now = time.monotonic()
+    with _calendars_lock:
+        cached = _calendars.get(scope)
+
+    version = None
+    if cached and cached[0] > now:
+        if version_loader is None or now - cached[1] < settings.CYCLE_CALENDAR_VERSION_CHECK:
+            return cached[3]
+        version = version_loader()
+        if version == cached[2]:
+            with _calendars_lock:
+                _calendars[scope] = (cached[0], now, version, cached[3])
+            return cached[3]
+    elif version_loader is not None:
+        version = version_loader()
+
+    # Versão lida antes dos dados: uma alteração no meio só provoca mais uma recarga
+    calendar = CycleCalendar(loader())
+    with _calendars_lock:
+        if len(_calendars) >= settings.CACHE_MAXSIZE:
+            _calendars.clear()
+        _calendars[scope] = (now + settings.CYCLE_CALENDAR_TTL, now, version, calendar)
+    return calendar
+
+
+def invalidate_calendar(scope: str):
+    with _calendars_lock:
+        _calendars.pop(scope, None)
+
+
+def _company_calendar_version(company_id: str, client=None) -> Optional[int]:
+    """Versão atual do calendário da empresa (None se ainda não houver ou em caso de erro)"""
+    try:
+        response = (client or supabase_admin()).from_('cycle_calendar_versions').select(
+            "version"
+        ).eq('company_id', str(company_id)).execute()
+    except Exception as e:
+        # Sem a tabela (SQL não aplicado) vale apenas o TTL
+        print(f"DEBUG: Erro ao consultar versão do calendário de ciclos: {e}")
+        return None
+    return response.data[0]['version'] if response.data else None
+
+
+def get_company_calendar(company_id: str, client=None) -> CycleCalendar:
+    """Ciclos personalizados da empresa (ordem original: created_at desc)"""
+    return get_calendar(
+        f"company:{company_id}",
+        lambda: (client or supabase_admin()).from_('cycles').select(
+            COMPANY_CYCLE_FIELDS
+        ).eq('company_id', str(company_id)).order('created_at', desc=True).execute().data or [],
+        lambda: _company_calendar_version(company_id, client),
+    )
+
+
+def invalidate_company_cycles(company_id: str):
+    """Chamado após criar, editar, ativar ou remover ciclos da empresa (neste worker;
+    os demais percebem pela versão em cycle_calendar_versions)"""
+    invalidate_calendar(f"company:{company_id}")
+
+
+# ---------- Registro de ciclos globais ----------
+# Todos os anos carregados de uma vez no startup (poucas dezenas de linhas) e
+# recarregados diariamente logo após a meia-noite (is_current muda com a data).
+# Alterações na tabela incrementam global_cycle_versions (trigger): cada worker
+# confere a versão a cada CYCLE_CALENDAR_VERSION_CHECK segundos e recarrega se
+# ela mudou. Fora dessa conferência, resolver o ciclo atual não faz I/O.
+_global_registry: Dict[int, CycleCalendar] = {}
+_global_registry_loaded_at: Optional[datetime] = None
+_global_registry_version: Optional[int] = None
+_global_version_checked_at = 0.0
+_global_registry_lock = threading.Lock()
+
+
+def _global_cycles_version(client=None) -> Optional[int]:
+    """Versão atual dos ciclos globais (None se ainda não houver ou em caso de erro)"""
+    try:
+        response = (client or supabase_admin()).from_('global_cycle_versions').select("version").execute()
+    except Exception as e:
+        # Sem a tabela (SQL não aplicado) vale apenas a recarga diária
+        print(f"DEBUG: Erro ao consultar versão dos ciclos globais: {e}")
+        return None
+    return response.data[0]['version'] if response.data else None
+
+
+def load_global_cycles(client=None) -> int:
+    """(Re)carrega todos os ciclos globais; retorna quantos foram carregados"""
+    global _global_registry, _global_registry_loaded_at, _global_registry_version, _global_version_checked_at
+    # Versão lida antes dos dados: uma alteração no meio só provoca mais uma recarga
+    version = _global_cycles_version(client)
+    rows = (client or supabase_admin()).from_('global_cycles').select(
+        "*"
+    ).order('year').order('start_date').execute().data or []
+
+    by_year: Dict[int, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_year.setdefault(int(row['year']), []).append(row)
+
+    registry = {year: CycleCalendar(cycles) for year, cycles in by_year.items()}
+    with _global_registry_lock:
+        _global_registry = registry
+        _global_registry_loaded_at = datetime.now()
+        _global_registry_version = version
+        _global_version_checked_at = time.monotonic()
+    return len(rows)
+
+
+def _ensure_global_cycles():
+    """Carrega o registro na primeira vez e recarrega se outra instância alterou a tabela"""
+    global _global_version_checked_at
+    if _global_registry_loaded_at is None:
+        load_global_cycles()
+        return
+    now = time.monotonic()
+    if now - _global_version_checked_at < settings.CYCLE_CALENDAR_VERSION_CHECK:
+        return
+    _global_version_checked_at = now
+    if _global_cycles_version() != _global_registry_version:
+        load_global_cycles()
+
+
+def get_global_calendar(year: int) -> CycleCalendar:
+    """Ciclos globais de um ano (ordem: start_date)"""
+    _ensure_global_cycles()
+    return _global_registry.get(int(year)) or CycleCalendar([])
+
+
+def get_global_years() -> List[int]:
+    """Anos com ciclos globais cadastrados"""
+    _ensure_global_cycles()
+    return sorted(_global_registry)
+
+
+def get_current_global_cycle(today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """Ciclo global marcado como atual (is_current) no ano corrente"""
+    today = today or date.today()
+    return get_global_calendar(today.year).first_where('is_current')
+
+
+def find_global_cycle(code: str, year: int) -> Optional[Dict[str, Any]]:
+    """Ciclo global pelo código (ex.: Q1, S2) no calendário do ano"""
+    return next((c for c in get_global_calendar(year).cycles if c.get("code") == code), None)
+
+
+def get_global_registry_status() -> Dict[str, Any]:
+    return {
+        "loaded_at": _global_registry_loaded_at.isoformat() if _global_registry_loaded_at else None,
+        "version": _global_registry_version,
+        "years": sorted(_global_registry),
+        "cycles": sum(len(calendar) for calendar in _global_registry.values()),
+    }
+
+
+async def run_global_cycle_refresher():
+    """Task de background: recarrega o registro após cada meia-noite e a cada GLOBAL_CYCLE_REFRESH_INTERVAL"""
+    while True:
+        now = datetime.now()
+        next_midnight = datetime.combine(now.date() + timedelta(days=1), dt_time(0, 0, 5))
+        await asyncio.sleep(min(settings.GLOBAL_CYCLE_REFRESH_INTERVAL, (next_midnight - now).total_seconds()))
+        try:
+            count = await asyncio.to_thread(load_global_cycles)
+            print(f"DEBUG: Registro de ciclos globais recarregado ({count} ciclos)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"DEBUG: Erro ao recarregar ciclos globais: {e}")
+
+
+# ---------- Preferência de ciclo por usuário ----------
+# {(user_id, company_id): (expira_em, linha de user_cycle_preferences ou None)}
+# Conferir uma versão custaria a mesma leitura por chave primária da própria
+# preferência, então os outros workers usam só o TTL curto (CYCLE_PREFERENCE_CACHE_TTL)
+_preference_cache: Dict[Tuple[str, str], Tuple[float, Optional[Dict[str, Any]]]] = {}
+_preference_cache_lock = threading.Lock()
+
+
+def get_user_cycle_preference(user_id: str, company_id: str) -> Optional[Dict[str, Any]]:
+    """Preferência de ciclo global do usuário (com cache; None = sem preferência)"""
+    key = (str(user_id), str(company_id))
+    now = time.monotonic()
+    with _preference_cache_lock:
+        cached = _preference_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    response = supabase_admin().from_('user_cycle_preferences').select(
+        "*"
+    ).eq('user_id', key[0]).eq('company_id', key[1]).execute()
+    preference = response.data[0] if response.data else None
+    set_user_cycle_preference(user_id, company_id, preference)
+    return preference
+
+
+def set_user_cycle_preference(user_id: str, company_id: str, preference: Optional[Dict[str, Any]]):
+    """Grava a preferência no cache (chamado também após o PUT, sem nova leitura)"""
+    with _preference_cache_lock:
+        if len(_preference_cache) >= settings.CACHE_MAXSIZE:
+            _preference_cache.clear()
+        _preference_cache[(str(user_id), str(company_id))] = (
+            time.monotonic() + settings.CYCLE_PREFERENCE_CACHE_TTL, preference
+        )
+
+
+def resolve_user_global_cycle(user_id: str, company_id: str) -> Optional[Dict[str, Any]]:
+    """Ciclo global preferido pelo usuário ou, sem preferência válida, o ciclo atual"""
+    preference = get_user_cycle_preference(user_id, company_id)
+    if preference:
+        cycle = find_global_cycle(preference['global_cycle_code'], preference['year'])
+        if cycle:
+            return cycle
+    return get_current_global_cycle()
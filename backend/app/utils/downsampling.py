@@ -0,0 +1,47 @@
+"""
+Redução de séries para gráficos (Largest-Triangle-Three-Buckets)
+
+O LTTB mantém o primeiro e o último ponto e escolhe, em cada faixa da série, o
+ponto que forma o maior triângulo com o ponto já escolhido e a média da faixa
+seguinte. Picos e vales continuam visíveis com uma fração dos pontos, então o
+custo de desenhar o gráfico fica limitado pelo limite, não pelo tamanho da série.
+"""
+from typing import List, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+
+def lttb(points: Sequence[Point], threshold: int) -> List[Point]:
+    """Reduz `points` (ordenados por x) a no máximo `threshold` pontos"""
+    size = len(points)
+    if threshold >= size or threshold < 3:
+        return list(points)
+
+    sampled: List[Point] = [points[0]]
+    # Faixas entre o primeiro e o último ponto
+    bucket = (size - 2) / (threshold - 2)
+    selected = 0
+
+    for i in range(threshold - 2):
+        # Média da próxima faixa (o último ponto, na última)
+        next_start = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, size)
+        count = next_end - next_start
+        avg_x = sum(points[j][0] for j in range(next_start, next_end)) / count
+        avg_y = sum(points[j][1] for j in range(next_start, next_end)) / count
+
+        ax, ay = points[selected]
+        best_area = -1.0
+        best = start = int(i * bucket) + 1
+        for j in range(start, next_start):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+
+        sampled.append(points[best])
+        selected = best
+
+    sampled.append(points[-1])
+    return sampled
@@ -0,0 +1,60 @@
+"""
+Respostas JSON rápidas
+
+- FastJSONResponse: default_response_class da API. Serializa com orjson quando
+  instalado (datetime, UUID, Enum e dataclasses nativos, em C), senão com o
+  json da biblioteca padrão, como o JSONResponse do FastAPI.
+- ModelResponse: para rotas de leitura que devolvem um modelo Pydantic já
+  montado. O FastAPI converteria o retorno com model_dump, validaria de novo
+  contra o response_model e só então geraria o JSON; aqui o modelo vira bytes
+  direto em model_dump_json (pydantic-core). O response_model continua no
+  decorator para a documentação OpenAPI e deve ser a mesma classe do retorno.
+"""
+import json
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(value: Any) -> Any:
+    """Tipos que o orjson não serializa sozinho (mesma saída do jsonable_encoder)"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Tipo não serializável em JSON: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    # Mesmos parâmetros do JSONResponse do Starlette
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse com orjson (fallback para o json padrão)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class ModelResponse(FastJSONResponse):
+    """Modelo Pydantic serializado direto por model_dump_json, sem revalidação"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+        return dumps(content)
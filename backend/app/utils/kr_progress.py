@@ -0,0 +1,15 @@
+"""
+Regra de progresso dos Key Results
+
+Usada pelas rotas de KRs/check-ins (valor gravado em key_results.progress) e pelo
+replay da série de evolução do dashboard: as duas precisam dar o mesmo número.
+"""
+
+
+def calculate_progress(current_value: float, start_value: float, target_value: float) -> float:
+    """Calcula o progresso do Key Result baseado nos valores"""
+    if target_value == start_value:
+        return 100.0 if current_value >= target_value else 0.0
+    
+    progress = ((current_value - start_value) / (target_value - start_value)) * 100
+    return max(0.0, min(100.0, progress))  # Limita entre 0 e 100
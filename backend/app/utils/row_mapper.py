@@ -0,0 +1,161 @@
+"""
+Linhas do Supabase -> modelos Pydantic, sem dicionário intermediário nem revalidação
+
+Um RowMapper é montado uma vez por modelo (constante de módulo): para cada campo
+do modelo decide de onde vem o valor (coluna de mesmo nome, outra coluna ou uma
+função da linha), o conversor pelo tipo anotado (UUID, datetime, float, Enum...)
+e o valor usado quando a coluna vem nula ou ausente. Cada linha passa só pelos
+getters/conversores já resolvidos e o modelo é criado como no model_construct
+(instância preenchida direto, sem passar pelo pydantic-core).
+
+Nenhum validador é executado: use apenas com linhas vindas do banco (já passaram
+pelas validações na escrita), nunca com dados do cliente.
+
+    OBJECTIVE_MAPPER = RowMapper(ObjectiveWithDetails, owner_name=nested('owner', 'name'))
+    objectives = [OBJECTIVE_MAPPER(row, key_results_count=counts[row['id']]) for row in rows]
+"""
+import types
+from datetime import date, datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin
+from uuid import UUID, SafeUUID
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def _to_datetime(value: Any) -> datetime:
+    # Python 3.11+: aceita "Z" e frações com qualquer número de dígitos (formato do PostgREST)
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def _to_date(value: Any) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(value[:10])
+
+
+_new_object = object.__new__
+_set_attribute = object.__setattr__
+
+
+@lru_cache(maxsize=16384)
+def _parse_uuid(value: str) -> UUID:
+    """UUID do texto canônico do Postgres sem as validações de formato do construtor"""
+    if len(value) != 36:
+        return UUID(value)
+    uuid = _new_object(UUID)
+    _set_attribute(uuid, 'int', int(value.replace('-', ''), 16))
+    _set_attribute(uuid, 'is_safe', SafeUUID.unknown)
+    return uuid
+
+
+def _to_uuid(value: Any) -> UUID:
+    # Cache: chaves estrangeiras (objetivo, responsável) se repetem na página e entre requisições
+    return value if isinstance(value, UUID) else _parse_uuid(value)
+
+
+def _enum_converter(enum: Type[Enum]) -> Callable[[Any], Enum]:
+    """Busca direta valor -> membro (Enum(valor) passa pelo EnumMeta.__call__, bem mais lento)"""
+    members = {member.value: member for member in enum}
+    return lambda value: members.get(value) or enum(value)
+
+
+def _converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """Conversor do valor do banco para o tipo do campo (None = usar como veio)"""
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _converter(args[0]) if len(args) == 1 else None
+    if not isinstance(annotation, type):
+        return None
+    if issubclass(annotation, Enum):
+        return _enum_converter(annotation)
+    if annotation is datetime:
+        return _to_datetime
+    if annotation is date:
+        return _to_date
+    if annotation is UUID:
+        return _to_uuid
+    if annotation in (float, int):
+        return annotation
+    return None
+
+
+def nested(relation: str, field: str, default: Any = None) -> Callable[[Dict[str, Any]], Any]:
+    """Campo de uma relação embutida no select ("owner:users(name)" -> row['owner']['name'])"""
+    def get(row: Dict[str, Any]) -> Any:
+        related = row.get(relation)
+        if not related:
+            return default
+        value = related.get(field)
+        return default if value is None else value
+    return get
+
+
+class RowMapper:
+    """
+    Mapeamento linha -> modelo compilado uma vez.
+
+    sources: por campo, o nome da coluna (str) ou uma função row -> valor final
+    (sem conversão). Campos não informados usam a coluna de mesmo nome.
+    defaults: valor para coluna nula/ausente (padrão: o default do campo no modelo).
+    """
+
+    def __init__(self, model: Type[ModelT], defaults: Optional[Dict[str, Any]] = None, **sources: Any):
+        defaults = defaults or {}
+        unknown = set(sources) | set(defaults)
+        unknown.difference_update(model.model_fields)
+        if unknown:
+            raise ValueError(f"Campos inexistentes em {model.__name__}: {', '.join(sorted(unknown))}")
+
+        self.model = model
+        # Um passo por campo, na ordem do modelo (a ordem do JSON segue a do __dict__)
+        self._plan: List[Tuple[str, Optional[str], Optional[Callable[[Any], Any]], Any, Optional[Callable[[], Any]]]] = []
+        for name, field in model.model_fields.items():
+            source = sources.get(name, name)
+            if callable(source):
+                # Função da linha: valor final, sem conversão
+                self._plan.append((name, None, source, None, None))
+                continue
+            factory = None
+            if name in defaults:
+                default = defaults[name]
+            elif field.default_factory is not None:
+                default, factory = None, field.default_factory
+            else:
+                default = None if field.is_required() else field.default
+            self._plan.append((name, source, _converter(field.annotation), default, factory))
+        self._fields_set = frozenset(model.model_fields)
+        # Sem __post_init__/atributos privados, criar a instância direto equivale ao model_construct
+        self._direct = not model.__pydantic_post_init__ and not model.__private_attributes__ and not model.__pydantic_root_model__
+
+    def values(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Valores já convertidos de uma linha (sem criar o modelo)"""
+        values = {}
+        for name, column, convert, default, factory in self._plan:
+            if column is None:
+                values[name] = convert(row)
+                continue
+            value = row.get(column)
+            if value is None:
+                values[name] = factory() if factory else default
+            else:
+                values[name] = convert(value) if convert else value
+        return values
+
+    def __call__(self, row: Dict[str, Any], **extra: Any) -> ModelT:
+        """Modelo de uma linha confiável do banco; extra sobrescreve campos (contagens, etc.)"""
+        values = self.values(row)
+        if extra:
+            values.update(extra)
+        if not self._direct:
+            return self.model.model_construct(set(self._fields_set), **values)
+        instance = _new_object(self.model)
+        _set_attribute(instance, '__dict__', values)
+        _set_attribute(instance, '__pydantic_fields_set__', set(self._fields_set))
+        _set_attribute(instance, '__pydantic_extra__', None)
+        _set_attribute(instance, '__pydantic_private__', None)
+        return instance
+
+    def many(self, rows: List[Dict[str, Any]]) -> List[ModelT]:
+        return [self(row) for row in rows]
@@ -0,0 +1,78 @@
+"""
+Lease no banco (scheduler_locks) para processos que devem rodar em uma única instância
+
+Usado pelos agendadores (alertas, relatórios) e pela reconciliação de assinaturas:
+- acquire(): insere o lease ou assume um expirado (UPDATE condicional atômico);
+  renova se já for nosso;
+- keep(stop): renova a cada ttl/3 durante uma rodada longa; se outra instância
+  assumiu, ou se não foi possível renovar antes de vencer, sinaliza stop para que
+  a rodada pare antes de gravar qualquer coisa;
+- release(): apaga o lease se ainda for nosso.
+"""
+import asyncio
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from postgrest.exceptions import APIError
+from supabase import Client
+
+LOCK_TABLE = "scheduler_locks"
+
+
+class SchedulerLease:
+    """Lease nomeado de uma instância (holder = host + sufixo aleatório)"""
+
+    def __init__(self, supabase: Client, name: str, ttl: int):
+        self.supabase = supabase
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
+
+    def acquire(self) -> bool:
+        """Adquire ou renova o lease. Retorna False se outra instância o detém."""
+        now = datetime.utcnow()
+        lease = {
+            "name": self.name,
+            "holder": self.holder,
+            "expires_at": (now + timedelta(seconds=self.ttl)).isoformat(),
+            "updated_at": now.isoformat(),
+        }
+        try:
+            self.supabase.table(LOCK_TABLE).insert(lease).execute()
+            return True
+        except APIError:
+            pass  # Lease já existe: tentar assumir se expirou ou se já é nosso
+
+        # UPDATE condicional atômico: só uma instância consegue assumir um lease expirado
+        response = self.supabase.table(LOCK_TABLE).update(lease).eq("name", self.name).or_(
+            f"expires_at.lt.{now.isoformat()},holder.eq.{self.holder}"
+        ).execute()
+        return bool(response.data)
+
+    def release(self):
+        """Libera o lease (se ainda for nosso)"""
+        try:
+            self.supabase.table(LOCK_TABLE).delete().eq("name", self.name).eq("holder", self.holder).execute()
+        except Exception as e:
+            print(f"DEBUG: Erro ao liberar lease '{self.name}': {e}")
+
+    async def keep(self, stop: threading.Event):
+        """Renova o lease até ser cancelado; se ele for perdido, sinaliza stop e termina"""
+        renewed_at = time.monotonic()
+        while True:
+            await asyncio.sleep(max(1, self.ttl // 3))
+            try:
+                held = await asyncio.get_running_loop().run_in_executor(None, self.acquire)
+            except Exception as e:
+                print(f"DEBUG: Erro ao renovar lease '{self.name}': {e}")
+                held = time.monotonic() - renewed_at < self.ttl
+            else:
+                if held:
+                    renewed_at = time.monotonic()
+            if not held:
+                print(f"⚠️  Lease '{self.name}' perdido, interrompendo a rodada")
+                stop.set()
+                return
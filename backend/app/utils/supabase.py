@@ -2,9 +2,12 @@ import os
 from supabase import create_client, Client
 from functools import lru_cache
 import time
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
 import asyncio
 
+from .circuit_breaker import CircuitBreaker
+from ..core.settings import settings
+
 # Configurações do Supabase
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")  # anon key
@@ -18,7 +21,20 @@ _last_connectivity_check = 0
 
 # Configurações ajustadas para melhor performance
 REFRESH_INTERVAL = 1800  # Renovar conexões a cada 30 minutos em vez de 1 hora
-CONNECTIVITY_CHECK_INTERVAL = 60  # Verificar conectividade a cada 1 minuto
+
+# Circuit breaker de conectividade do processo: mantido apenas pelo prober em
+# background (run_health_prober); as requisições só leem o estado, sem I/O
+supabase_breaker = CircuitBreaker(
+    "supabase",
+    failure_threshold=settings.SUPABASE_BREAKER_FAILURE_THRESHOLD,
+    base_backoff=settings.SUPABASE_BREAKER_BASE_BACKOFF,
+    max_backoff=settings.SUPABASE_BREAKER_MAX_BACKOFF,
+)
+
+
+class SupabaseUnavailableError(ValueError):
+    """Supabase indisponível segundo o prober: falhar rápido com 503"""
+
 
 # Status de conectividade melhorado
 _connectivity_status = {
@@ -48,53 +64,67 @@ def _should_refresh_connection() -> bool:
         return True
     return False
 
-def _check_connectivity() -> bool:
-    """Verifica conectividade com sistema mais inteligente de detecção de problemas"""
+def probe_connection() -> bool:
+    """
+    Executa UMA sonda de conectividade e atualiza o circuit breaker.
+    
+    Chamada pelo prober em background (e por endpoints administrativos);
+    nunca no caminho das requisições normais.
+    """
     global _connectivity_status
     
     current_time = time.time()
+    _connectivity_status["last_check"] = current_time
     
-    # Verificar apenas a cada minuto para reduzir spam mas manter responsividade
-    if current_time - _connectivity_status["last_check"] < CONNECTIVITY_CHECK_INTERVAL:
-        return _connectivity_status["is_connected"]
+    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        _connectivity_status["is_connected"] = False
+        _connectivity_status["last_error"] = "Credenciais não configuradas"
+        return False
     
-    _connectivity_status["last_check"] = current_time
+    admin = get_supabase_admin()
+    healthy = _test_client_health(admin)
+    if not healthy:
+        # JWT do cliente pode ter expirado: recriar uma vez antes de contar a falha
+        admin = get_supabase_admin(force_refresh=True)
+        healthy = _test_client_health(admin)
     
-    try:
-        if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-            _connectivity_status["is_connected"] = False
-            _connectivity_status["last_error"] = "Credenciais não configuradas"
-            _connectivity_status["consecutive_failures"] += 1
-            return False
-        
-        # Criar um novo cliente para teste (não usar cache)
-        test_client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-        
-        # Teste mais simples e rápido
-        response = test_client.from_('users').select('id').limit(1).execute()
-        
-        # Reset em caso de sucesso
+    if healthy:
+        supabase_breaker.record_success()
         _connectivity_status["is_connected"] = True
-        _connectivity_status["error_count"] = 0
         _connectivity_status["consecutive_failures"] = 0
         _connectivity_status["last_error"] = None
         _connectivity_status["last_success"] = current_time
-        return True
-        
-    except Exception as e:
+    else:
+        supabase_breaker.record_failure(_connectivity_status.get("last_probe_error"))
         _connectivity_status["error_count"] += 1
         _connectivity_status["consecutive_failures"] += 1
-        _connectivity_status["last_error"] = str(e)
-        
-        # Sistema de tolerância melhorado
-        max_failures = 5 if _is_local_environment() else 3
-        
-        if _connectivity_status["consecutive_failures"] >= max_failures:
-            _connectivity_status["is_connected"] = False
-            print(f"DEBUG: Conectividade perdida após {_connectivity_status['consecutive_failures']} falhas consecutivas")
-        
-        print(f"DEBUG: Erro de conectividade Supabase (tentativa {_connectivity_status['error_count']}): {e}")
-        return _connectivity_status["is_connected"]
+        _connectivity_status["last_error"] = _connectivity_status.get("last_probe_error")
+        _connectivity_status["is_connected"] = supabase_breaker.is_closed()
+        print(f"DEBUG: Sonda Supabase falhou ({_connectivity_status['consecutive_failures']} seguidas): {_connectivity_status['last_error']}")
+    
+    return healthy
+
+async def run_health_prober():
+    """
+    Prober único por worker: sonda a cada SUPABASE_PROBE_INTERVAL segundos com o
+    circuito fechado; com o circuito aberto, espera o backoff exponencial e faz
+    a sonda de teste (half-open) que decide se o circuito fecha.
+    """
+    while True:
+        try:
+            if supabase_breaker.state == CircuitBreaker.OPEN:
+                await asyncio.sleep(max(0.5, supabase_breaker.retry_in()))
+                if not supabase_breaker.allow_request():
+                    continue
+            await asyncio.to_thread(probe_connection)
+            if supabase_breaker.is_closed():
+                await asyncio.sleep(settings.SUPABASE_PROBE_INTERVAL)
+        except asyncio.CancelledError:
+            print("🛑 Prober de conectividade Supabase cancelado")
+            raise
+        except Exception as e:
+            print(f"DEBUG: Erro no prober de conectividade: {e}")
+            await asyncio.sleep(settings.SUPABASE_PROBE_INTERVAL)
 
 def _test_client_health(client: Optional[Client]) -> bool:
     """Testa se um cliente específico está funcionando"""
@@ -106,6 +136,7 @@ def _test_client_health(client: Optional[Client]) -> bool:
         response = client.from_('users').select('id').limit(1).execute()
         return True
     except Exception as e:
+        _connectivity_status["last_probe_error"] = str(e)
         error_str = str(e).lower()
         # Detectar especificamente erro de JWT expirado
         if any(jwt_error in error_str for jwt_error in ['jwt expired', 'pgrst301', 'expired', 'invalid jwt']):
@@ -127,8 +158,7 @@ def get_supabase_client(force_refresh: bool = False) -> Optional[Client]:
     should_refresh = (
         force_refresh or 
         _should_refresh_connection() or 
-        cache_key not in _client_cache or
-        not _test_client_health(_client_cache.get(cache_key))
+        cache_key not in _client_cache
     )
     
     if should_refresh:
@@ -157,8 +187,7 @@ def get_supabase_admin(force_refresh: bool = False) -> Optional[Client]:
     should_refresh = (
         force_refresh or 
         _should_refresh_connection() or 
-        cache_key not in _admin_cache or
-        not _test_client_health(_admin_cache.get(cache_key))
+        cache_key not in _admin_cache
     )
     
     if should_refresh:
@@ -214,46 +243,22 @@ def supabase_super_admin():
     return _supabase_super_admin
 
 def check_connection() -> bool:
-    """Verifica se a conexão está funcionando com sistema de tolerância melhorado"""
-    try:
-        if not _check_connectivity():
-            print("DEBUG: Conectividade Supabase com problemas - tentando renovar...")
-            
-            # Tentar renovar automaticamente em qualquer ambiente
-            admin = get_supabase_admin(force_refresh=True)
-            if admin and _test_client_health(admin):
-                print("DEBUG: Renovação bem-sucedida")
-                return True
-            
-            print("DEBUG: Renovação falhou")
-            return False
-        
-        # Se a conectividade está OK, fazer teste final
-        admin = get_supabase_admin()
-        if admin and _test_client_health(admin):
-            return True
-        else:
-            # Se o teste falhou, forçar renovação
-            print("DEBUG: Teste de saúde do cliente falhou, renovando...")
-            admin = get_supabase_admin(force_refresh=True)
-            return admin and _test_client_health(admin)
-            
-    except Exception as e:
-        print(f"DEBUG: Erro final na verificação de conexão: {e}")
-        return False
-    
-    return False
+    """Estado atual da conexão segundo o prober (sem I/O)"""
+    return bool(SUPABASE_URL and SUPABASE_SERVICE_KEY) and supabase_breaker.is_closed()
+
+def _raise_if_unavailable():
+    """Falha rápido (503) enquanto o circuito estiver aberto, em vez de acumular timeouts"""
+    if not supabase_breaker.is_closed():
+        raise SupabaseUnavailableError(
+            f"Supabase temporariamente indisponível. Tente novamente em {max(1, round(supabase_breaker.retry_in()))}s"
+        )
 
-# Funções de acesso otimizadas com fallback de renovação melhorado
+# Funções de acesso otimizadas (sem sondas no caminho da requisição)
 def get_client() -> Client:
     """Retorna o cliente Supabase, inicializando se necessário com melhor tratamento de erro"""
+    _raise_if_unavailable()
     client = get_supabase_client()
     
-    # Se o cliente não existe ou não está funcionando, tentar renovar
-    if not client or not _test_client_health(client):
-        print("DEBUG: Cliente principal com problemas, renovando...")
-        client = get_supabase_client(force_refresh=True)
-    
     if not client:
         if _is_local_environment():
             raise ValueError("Cliente Supabase não configurado. Verifique as variáveis SUPABASE_URL e SUPABASE_KEY no arquivo .env")
@@ -263,13 +268,9 @@ def get_client() -> Client:
 
 def get_admin_client() -> Client:
     """Retorna o cliente Supabase admin, inicializando se necessário com melhor tratamento de erro"""
+    _raise_if_unavailable()
     admin = get_supabase_admin()
     
-    # Se o cliente não existe ou não está funcionando, tentar renovar
-    if not admin or not _test_client_health(admin):
-        print("DEBUG: Cliente admin com problemas, renovando...")
-        admin = get_supabase_admin(force_refresh=True)
-    
     if not admin:
         if _is_local_environment():
             raise ValueError("Cliente Supabase admin não configurado. Verifique as variáveis SUPABASE_URL e SUPABASE_SERVICE_KEY no arquivo .env")
@@ -321,5 +322,18 @@ def get_connectivity_status():
         "last_success": _connectivity_status["last_success"],
         "environment": "local" if _is_local_environment() else "production",
         "credentials_configured": bool(SUPABASE_URL and SUPABASE_KEY and SUPABASE_SERVICE_KEY),
+        "circuit_breaker": supabase_breaker.snapshot(),
         "refresh_interval": 900 if _is_local_environment() else REFRESH_INTERVAL
-    } 
\ No newline at end of file
+    } 
+
+def fetch_all(build_query: Callable[[], Any], page_size: int = 1000) -> List[Dict[str, Any]]:
+    """Executa a consulta paginando pelo limite de linhas do PostgREST (build_query deve ter order estável)"""
+    rows = []
+    offset = 0
+    while True:
+        response = build_query().range(offset, offset + page_size - 1).execute()
+        batch = response.data or []
+        rows.extend(batch)
+        if len(batch) < page_size:
+            return rows
+        offset += page_size
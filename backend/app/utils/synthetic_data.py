@@ -0,0 +1,463 @@
+"""
+Gerador de dados sintéticos para testes de escala
+
+Produz empresas completas (usuários, ciclos, objetivos, Key Results, check-ins,
+notificações e sessões) usando os mesmos modelos Pydantic de app/models/*.
+A geração é determinística pela seed: a mesma seed + data de referência
+produz exatamente os mesmos IDs, textos e valores.
+
+Os registros são gerados de forma preguiçosa (generators), então é possível
+escrever empresas com 50k objetivos e anos de check-ins sem manter tudo em memória.
+"""
+import csv
+import json
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..models.company import Company
+from ..models.cycle import Cycle
+from ..models.key_result import Checkin, KeyResult, KRStatus, KRUnit
+from ..models.notification import Notification, NotificationPriority, NotificationType
+from ..models.objective import Objective, ObjectiveStatus
+from ..models.session import UserSession
+from ..models.user import UserDB, UserRole
+
+
+@dataclass(frozen=True)
+class ScaleProfile:
+    """Tamanho de uma empresa sintética"""
+    name: str
+    objectives: int
+    key_results_per_objective: int = 5
+    users: int = 10
+    cycles: int = 4
+    history_days: int = 365
+    checkin_interval_days: int = 7
+    notifications_per_user: int = 50
+    sessions_per_user: int = 3
+
+
+# Perfis pré-definidos usados pelos testes de performance
+SCALE_PROFILES: Dict[str, ScaleProfile] = {
+    "small": ScaleProfile(name="small", objectives=10, users=5),
+    "medium": ScaleProfile(name="medium", objectives=1_000, users=100, history_days=730),
+    "large": ScaleProfile(name="large", objectives=50_000, users=2_000, history_days=730, checkin_interval_days=14),
+}
+
+# Ordem de escrita respeitando as foreign keys
+TABLE_ORDER = [
+    "companies",
+    "users",
+    "cycles",
+    "objectives",
+    "key_results",
+    "kr_checkins",
+    "notifications",
+    "user_sessions",
+]
+
+_OBJECTIVE_TOPICS = [
+    "Aumentar receita recorrente", "Melhorar satisfação dos clientes", "Reduzir churn",
+    "Acelerar entregas do produto", "Fortalecer a cultura interna", "Expandir para novos mercados",
+    "Otimizar custos operacionais", "Aumentar qualidade do software", "Escalar o time comercial",
+]
+_KR_TOPICS = [
+    "Atingir NPS", "Fechar novos contratos", "Reduzir tempo de resposta", "Publicar releases",
+    "Contratar pessoas", "Aumentar MRR", "Reduzir bugs críticos", "Concluir treinamentos",
+]
+_FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Hugo", "Isabela", "João"]
+_LAST_NAMES = ["Silva", "Souza", "Oliveira", "Santos", "Lima", "Costa", "Pereira", "Almeida"]
+
+
+class SyntheticDataGenerator:
+    """Gera datasets determinísticos por seed para uma ou mais empresas"""
+
+    def __init__(
+        self,
+        profile: ScaleProfile,
+        seed: int = 42,
+        companies: int = 1,
+        reference_date: Optional[date] = None,
+    ):
+        self.profile = profile
+        self.seed = seed
+        self.companies = companies
+        self.reference_date = reference_date or date.today()
+        self._reference_dt = datetime.combine(self.reference_date, time(12, 0))
+        # Usuários da última empresa gerada: os iteradores percorrem uma empresa por vez
+        # e cada objetivo/KR sorteia responsáveis da mesma lista
+        self._users_cache: Optional[Tuple[int, List[uuid.UUID]]] = None
+
+    # ---------- Helpers determinísticos ----------
+
+    def _rng(self, *scope: Any) -> random.Random:
+        """RNG isolado por escopo, para que cada tabela seja reprodutível independentemente"""
+        return random.Random(f"{self.seed}:" + ":".join(str(s) for s in scope))
+
+    @staticmethod
+    def _uuid(rng: random.Random) -> uuid.UUID:
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    def _company_ids(self) -> List[uuid.UUID]:
+        rng = self._rng("companies")
+        return [self._uuid(rng) for _ in range(self.companies)]
+
+    def _user_ids(self, company_index: int) -> List[uuid.UUID]:
+        if self._users_cache is None or self._users_cache[0] != company_index:
+            rng = self._rng("users", company_index)
+            self._users_cache = (company_index, [self._uuid(rng) for _ in range(self.profile.users)])
+        return self._users_cache[1]
+
+    def _cycle_windows(self, company_index: int) -> List[Tuple[uuid.UUID, date, date]]:
+        """Ciclos trimestrais consecutivos terminando após a data de referência"""
+        rng = self._rng("cycles", company_index)
+        windows = []
+        end = self.reference_date + timedelta(days=45)
+        for _ in range(self.profile.cycles):
+            start = end - timedelta(days=90)
+            windows.append((self._uuid(rng), start, end))
+            end = start - timedelta(days=1)
+        windows.reverse()
+        return windows
+
+    # ---------- Geração por tabela ----------
+
+    def iter_companies(self) -> Iterator[Company]:
+        created = self._reference_dt - timedelta(days=self.profile.history_days)
+        for index, company_id in enumerate(self._company_ids()):
+            yield Company(
+                id=company_id,
+                name=f"Empresa Sintética {self.profile.name} #{index + 1}",
+                created_at=created,
+                updated_at=created,
+            )
+
+    def iter_users(self) -> Iterator[UserDB]:
+        created = self._reference_dt - timedelta(days=self.profile.history_days)
+        for c_index, company_id in enumerate(self._company_ids()):
+            rng = self._rng("user-data", c_index)
+            for u_index, user_id in enumerate(self._user_ids(c_index)):
+                name = f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+                username = f"synthetic_{c_index}_{u_index}"
+                yield UserDB(
+                    id=user_id,
+                    email=f"{username}@example.com",
+                    username=username,
+                    name=name,
+                    role=UserRole.ADMIN if u_index == 0 else rng.choice([UserRole.MANAGER, UserRole.COLLABORATOR]),
+                    company_id=company_id,
+                    is_owner=u_index == 0,
+                    is_active=True,
+                    created_at=created,
+                    updated_at=created,
+                )
+
+    def iter_cycles(self) -> Iterator[Cycle]:
+        for c_index, company_id in enumerate(self._company_ids()):
+            for cycle_id, start, end in self._cycle_windows(c_index):
+                created = datetime.combine(start, time(9, 0)) - timedelta(days=7)
+                yield Cycle(
+                    id=cycle_id,
+                    company_id=company_id,
+                    name=f"Ciclo {start.strftime('%m/%Y')}",
+                    start_date=start,
+                    end_date=end,
+                    is_active=start <= self.reference_date <= end,
+                    created_at=created,
+                    updated_at=created,
+                )
+
+    def _iter_objective_rows(self) -> Iterator[Tuple[int, uuid.UUID, Objective]]:
+        for c_index, company_id in enumerate(self._company_ids()):
+            rng = self._rng("objectives", c_index)
+            users = self._user_ids(c_index)
+            cycles = self._cycle_windows(c_index)
+            for o_index in range(self.profile.objectives):
+                cycle_id, start, _ = cycles[o_index % len(cycles)]
+                created = datetime.combine(start, time(10, 0)) + timedelta(minutes=o_index % 1440)
+                progress = round(rng.uniform(0, 100), 2)
+                yield c_index, company_id, Objective(
+                    id=self._uuid(rng),
+                    title=f"{rng.choice(_OBJECTIVE_TOPICS)} #{o_index + 1}",
+                    description="Objetivo gerado para testes de escala",
+                    owner_id=rng.choice(users),
+                    company_id=company_id,
+                    cycle_id=cycle_id,
+                    status=_objective_status(progress),
+                    progress=progress,
+                    created_at=created,
+                    updated_at=created,
+                )
+
+    def iter_objectives(self) -> Iterator[Objective]:
+        for _, _, objective in self._iter_objective_rows():
+            yield objective
+
+    def _iter_key_result_rows(self) -> Iterator[Tuple[int, Objective, KeyResult]]:
+        for c_index, _, objective in self._iter_objective_rows():
+            rng = self._rng("key_results", objective.id)
+            users = self._user_ids(c_index)
+            for k_index in range(self.profile.key_results_per_objective):
+                target = float(rng.choice([10, 50, 100, 1_000, 10_000]))
+                current = round(rng.uniform(0, target), 2)
+                progress = round(min(100.0, current / target * 100), 2)
+                yield c_index, objective, KeyResult(
+                    id=self._uuid(rng),
+                    objective_id=objective.id,
+                    owner_id=rng.choice(users),
+                    title=f"{rng.choice(_KR_TOPICS)} ({k_index + 1})",
+                    description=None,
+                    target_value=target,
+                    start_value=0.0,
+                    current_value=current,
+                    unit=rng.choice([KRUnit.NUMBER, KRUnit.PERCENTAGE, KRUnit.CURRENCY]),
+                    confidence_level=round(rng.uniform(0.3, 1.0), 2),
+                    status=_kr_status(progress),
+                    progress=progress,
+                    created_at=objective.created_at,
+                    updated_at=objective.created_at,
+                )
+
+    def iter_key_results(self) -> Iterator[KeyResult]:
+        for _, _, key_result in self._iter_key_result_rows():
+            yield key_result
+
+    def iter_checkins(self) -> Iterator[Checkin]:
+        interval = max(1, self.profile.checkin_interval_days)
+        first_day = self._reference_dt - timedelta(days=self.profile.history_days)
+        for c_index, _, kr in self._iter_key_result_rows():
+            rng = self._rng("checkins", kr.id)
+            users = self._user_ids(c_index)
+            steps = self.profile.history_days // interval
+            value = kr.start_value or 0.0
+            increment = (kr.current_value - value) / steps if steps else 0.0
+            for step in range(steps):
+                value = round(value + increment * rng.uniform(0.5, 1.5), 2)
+                moment = first_day + timedelta(days=step * interval, minutes=rng.randint(0, 600))
+                yield Checkin(
+                    id=self._uuid(rng),
+                    key_result_id=kr.id,
+                    author_id=rng.choice(users),
+                    checkin_date=moment,
+                    value_at_checkin=value,
+                    confidence_level_at_checkin=round(rng.uniform(0.3, 1.0), 2),
+                    notes=None,
+                    created_at=moment,
+                )
+
+    def iter_notifications(self) -> Iterator[Notification]:
+        types = list(NotificationType)
+        for c_index, company_id in enumerate(self._company_ids()):
+            rng = self._rng("notifications", c_index)
+            for user_id in self._user_ids(c_index):
+                for n_index in range(self.profile.notifications_per_user):
+                    n_type = types[n_index % len(types)]
+                    created = self._reference_dt - timedelta(hours=rng.randint(0, self.profile.history_days * 24))
+                    yield Notification(
+                        id=str(self._uuid(rng)),
+                        user_id=str(user_id),
+                        company_id=str(company_id),
+                        type=n_type,
+                        title=f"Alerta sintético {n_type.value}",
+                        message="Notificação gerada para testes de escala",
+                        data={"synthetic": True},
+                        priority=rng.choice(list(NotificationPriority)),
+                        is_read=rng.random() < 0.7,
+                        created_at=created,
+                        updated_at=created,
+                    )
+
+    def iter_sessions(self) -> Iterator[UserSession]:
+        for c_index in range(self.companies):
+            rng = self._rng("sessions", c_index)
+            for user_id in self._user_ids(c_index):
+                for _ in range(self.profile.sessions_per_user):
+                    created = self._reference_dt - timedelta(hours=rng.randint(0, self.profile.history_days * 24))
+                    revoked = rng.random() < 0.2
+                    yield UserSession(
+                        id=self._uuid(rng),
+                        user_id=user_id,
+                        access_token_hash=f"{rng.getrandbits(256):064x}",
+                        refresh_token_hash=f"{rng.getrandbits(256):064x}",
+                        device_info={"browser": "Chrome", "os": "Linux", "device": "Desktop"},
+                        ip_address=f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                        user_agent="synthetic-data-generator",
+                        created_at=created,
+                        last_used_at=created + timedelta(minutes=rng.randint(0, 600)),
+                        expires_at=created + timedelta(days=30),
+                        is_revoked=revoked,
+                        revoked_at=created + timedelta(days=1) if revoked else None,
+                        revoked_reason="logout_all" if revoked else None,
+                    )
+
+    def iter_table(self, table: str) -> Iterator[Dict[str, Any]]:
+        """Linhas de uma tabela já no formato de colunas do banco"""
+        generators = {
+            "companies": self.iter_companies,
+            "users": self.iter_users,
+            "cycles": self.iter_cycles,
+            "objectives": self.iter_objectives,
+            "key_results": self.iter_key_results,
+            "kr_checkins": self.iter_checkins,
+            "notifications": self.iter_notifications,
+            "user_sessions": self.iter_sessions,
+        }
+        if table not in generators:
+            raise ValueError(f"Tabela não suportada pelo gerador: {table}")
+        for model in generators[table]():
+            yield model.model_dump(mode="json")
+
+    def estimated_rows(self) -> Dict[str, int]:
+        """Quantidade de linhas esperada por tabela (sem gerar os dados)"""
+        p = self.profile
+        objectives = p.objectives * self.companies
+        key_results = objectives * p.key_results_per_objective
+        users = p.users * self.companies
+        return {
+            "companies": self.companies,
+            "users": users,
+            "cycles": p.cycles * self.companies,
+            "objectives": objectives,
+            "key_results": key_results,
+            "kr_checkins": key_results * (p.history_days // max(1, p.checkin_interval_days)),
+            "notifications": users * p.notifications_per_user,
+            "user_sessions": users * p.sessions_per_user,
+        }
+
+
+def _objective_status(progress: float) -> ObjectiveStatus:
+    if progress >= 100:
+        return ObjectiveStatus.COMPLETED
+    if progress >= 70:
+        return ObjectiveStatus.ON_TRACK
+    if progress >= 30:
+        return ObjectiveStatus.AT_RISK
+    return ObjectiveStatus.BEHIND
+
+
+def _kr_status(progress: float) -> KRStatus:
+    return KRStatus(_objective_status(progress).value)
+
+
+# ---------- Writers ----------
+
+def _chunks(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _sql_literal(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _copy_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def write_jsonl(generator: SyntheticDataGenerator, output_dir: Path, tables: Optional[List[str]] = None) -> Dict[str, int]:
+    """Um arquivo <tabela>.jsonl por tabela (fixture local para testes)"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    for table in tables or TABLE_ORDER:
+        count = 0
+        with open(output_dir / f"{table}.jsonl", "w", encoding="utf-8") as handle:
+            for row in generator.iter_table(table):
+                handle.write(json.dumps(row, ensure_ascii=False))
+                handle.write("\n")
+                count += 1
+        counts[table] = count
+    return counts
+
+
+def write_sql(
+    generator: SyntheticDataGenerator,
+    output_file: Path,
+    tables: Optional[List[str]] = None,
+    batch_size: int = 1000,
+) -> Dict[str, int]:
+    """Script SQL com INSERTs multi-linha em lotes, dentro de uma transação"""
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    with open(output_file, "w", encoding="utf-8") as handle:
+        handle.write("BEGIN;\n")
+        for table in tables or TABLE_ORDER:
+            count = 0
+            for chunk in _chunks(generator.iter_table(table), batch_size):
+                columns = list(chunk[0].keys())
+                handle.write(f"INSERT INTO {table} ({', '.join(columns)}) VALUES\n")
+                handle.write(",\n".join(
+                    "(" + ", ".join(_sql_literal(row.get(col)) for col in columns) + ")" for row in chunk
+                ))
+                handle.write("\nON CONFLICT DO NOTHING;\n")
+                count += len(chunk)
+            counts[table] = count
+        handle.write("COMMIT;\n")
+    return counts
+
+
+def write_copy(generator: SyntheticDataGenerator, output_file: Path, tables: Optional[List[str]] = None) -> Dict[str, int]:
+    """Script para psql com blocos COPY ... FROM STDIN (CSV), o caminho mais rápido de carga"""
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    with open(output_file, "w", encoding="utf-8", newline="") as handle:
+        for table in tables or TABLE_ORDER:
+            rows = generator.iter_table(table)
+            first = next(rows, None)
+            if first is None:
+                counts[table] = 0
+                continue
+            columns = list(first.keys())
+            handle.write(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv);\n")
+            writer = csv.writer(handle, lineterminator="\n")
+            count = 0
+            for row in _chain_first(first, rows):
+                writer.writerow([_copy_value(row.get(col)) for col in columns])
+                count += 1
+            handle.write("\\.\n")
+            counts[table] = count
+    return counts
+
+
+def load_into_supabase(
+    generator: SyntheticDataGenerator,
+    supabase_admin,
+    tables: Optional[List[str]] = None,
+    batch_size: int = 500,
+) -> Dict[str, int]:
+    """Carga direta em um projeto Supabase local/staging via inserts em lote"""
+    counts = {}
+    for table in tables or TABLE_ORDER:
+        count = 0
+        for chunk in _chunks(generator.iter_table(table), batch_size):
+            supabase_admin.from_(table).upsert(chunk).execute()
+            count += len(chunk)
+        counts[table] = count
+        print(f"DEBUG: {count} linhas carregadas em {table}")
+    return counts
+
+
+def _chain_first(first: Dict[str, Any], rows: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    yield first
+    yield from rows
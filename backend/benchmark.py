@@ -0,0 +1,983 @@
+#!/usr/bin/env python3
+"""
+Benchmarks locais dos componentes de performance do OKR Backend
+Uso: python benchmark.py revocation [--size N] [--fp-rate TAXA]
+     python benchmark.py login [--logins N] [--latency-ms MS] [--concurrency 1 10 50 100]
+     python benchmark.py asaas [--requests N] [--latency-ms MS] [--read-timeout S] [--max-concurrency N]
+     python benchmark.py pdf [--objectives N] [--key-results N] [--runs N] [--workers N]
+     python benchmark.py charts [--points N] [--objectives N] [--key-results N] [--runs N]
+     python benchmark.py excel [--rows 10000 100000] [--key-results N]
+     python benchmark.py columnar [--rows N] [--columns id title progress]
+     python benchmark.py csv [--rows N] [--runs N]
+     python benchmark.py json [--items N] [--iterations N]
+     python benchmark.py mapping [--rows N] [--runs N]
+     python benchmark.py compression [--items N] [--iterations N]
+     python benchmark.py alerts [--key-results N] [--latency-ms MS] [--runs N]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+
+def _token_hashes(count: int, prefix: str):
+    return [hashlib.sha256(f"{prefix}:{i}".encode()).hexdigest() for i in range(count)]
+
+
+def bench_revocation(args):
+    """Memória e taxa de falsos positivos do filtro de revogação vs. set de hashes"""
+    from app.services.revocation_service import RevokedTokenFilter
+
+    print(f"🔒 Lista de revogação: {args.size:,} sessões revogadas, FP alvo {args.fp_rate}")
+    revoked = _token_hashes(args.size, "revoked")
+    others = _token_hashes(args.size, "active")
+
+    started = time.perf_counter()
+    bloom = RevokedTokenFilter(args.size, args.fp_rate)
+    for token_hash in revoked:
+        bloom.add(token_hash)
+    build_seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    hash_set = set(revoked)
+    set_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert all(token_hash in bloom for token_hash in revoked[:10000]), "falso negativo no filtro"
+
+    started = time.perf_counter()
+    false_positives = sum(1 for token_hash in others if token_hash in bloom)
+    lookup_seconds = time.perf_counter() - started
+
+    print(f"   🧮 Bits: {bloom.num_bits:,} | Hashes: {bloom.num_hashes}")
+    print(f"   💾 Bloom filter: {sys.getsizeof(bloom._bits) / 1024 / 1024:.2f} MB")
+    print(f"   💾 set() de hashes: {set_memory / 1024 / 1024:.2f} MB (sem contar as strings)")
+    print(f"   💾 set() + strings: {(set_memory + sum(sys.getsizeof(h) for h in revoked)) / 1024 / 1024:.2f} MB")
+    print(f"   🎯 Falsos positivos: {false_positives:,}/{len(others):,} ({false_positives / len(others):.4%})")
+    print(f"   ⏱️  Construção: {build_seconds:.2f}s | Consulta: {lookup_seconds / len(others) * 1e6:.2f} µs/token")
+    del hash_set
+
+
+async def _start_gotrue_stub(latency: float):
+    """GoTrue local mínimo: /token (password) e /logout, com latência fixa"""
+    from aiohttp import web
+
+    async def token(request):
+        body = await request.json()
+        await asyncio.sleep(latency)
+        if request.query.get("grant_type") != "password" or body.get("password") != "senha-correta":
+            return web.json_response({"error_description": "Invalid login credentials"}, status=400)
+        email = body["email"]
+        return web.json_response({
+            "access_token": f"access:{email}",
+            "refresh_token": f"refresh:{email}",
+            "expires_in": 3600,
+            "token_type": "bearer",
+            "user": {"id": hashlib.md5(email.encode()).hexdigest(), "email": email},
+        })
+
+    async def logout(request):
+        await asyncio.sleep(latency)
+        return web.Response(status=204)
+
+    app = web.Application()
+    app.router.add_post("/auth/v1/token", token)
+    app.router.add_post("/auth/v1/logout", logout)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def _bench_login(args):
+    from app.utils import auth_gateway
+
+    runner, stub_url = await _start_gotrue_stub(args.latency_ms / 1000)
+    auth_gateway.SUPABASE_URL = stub_url
+    try:
+        print(f"🔑 Logins concorrentes contra GoTrue local ({args.latency_ms}ms de latência, {args.logins} logins por nível)")
+        for concurrency in args.concurrency:
+            semaphore = asyncio.Semaphore(concurrency)
+            mismatches = 0
+
+            async def login(i):
+                nonlocal mismatches
+                email = f"user{i}@example.com"
+                async with semaphore:
+                    session = await auth_gateway.sign_in_with_password(email, "senha-correta")
+                    await auth_gateway.sign_out(session.access_token)
+                # Cada requisição precisa receber os tokens do próprio usuário
+                if session.access_token != f"access:{email}" or session.user.get("email") != email:
+                    mismatches += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(login(i) for i in range(args.logins)))
+            elapsed = time.perf_counter() - started
+            print(f"   👥 Concorrência {concurrency:>4}: {args.logins / elapsed:8.1f} logins/s "
+                  f"({elapsed:.2f}s, tokens trocados: {mismatches})")
+    finally:
+        await auth_gateway.close_http_client()
+        await runner.cleanup()
+
+
+def bench_login(args):
+    """Vazão de login pelo gateway stateless em vários níveis de concorrência"""
+    asyncio.run(_bench_login(args))
+
+
+async def _start_asaas_stub():
+    """Asaas local com latência e falhas controladas pelo benchmark (stub.latency / stub.fail)"""
+    from aiohttp import web
+
+    class Stub:
+        latency = 0.0
+        fail = False
+        in_flight = 0
+        peak = 0
+        calls = 0
+
+    stub = Stub()
+
+    async def handler(request):
+        stub.calls += 1
+        stub.in_flight += 1
+        stub.peak = max(stub.peak, stub.in_flight)
+        try:
+            await asyncio.sleep(stub.latency)
+            if stub.fail:
+                return web.json_response({"errors": [{"description": "Serviço indisponível"}]}, status=503)
+            return web.json_response({"id": f"sub_{stub.calls}", "status": "ACTIVE"})
+        finally:
+            stub.in_flight -= 1
+
+    app = web.Application()
+    app.router.add_route("*", "/v3/{tail:.*}", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, stub, f"http://127.0.0.1:{port}/v3"
+
+
+async def _measure_loop_lag(stop: asyncio.Event, samples: list):
+    """Atraso do event loop: quanto um sleep de 10ms demora de fato"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - started - 0.01)
+
+
+async def _run_asaas_scenario(asaas, count: int):
+    results = {"ok": 0, "unavailable": 0, "errors": 0}
+    latencies = []
+    lag_samples = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_measure_loop_lag(stop, lag_samples))
+
+    async def call(i):
+        started = time.perf_counter()
+        try:
+            await asaas.asaas_request("GET", f"subscriptions/sub_{i}")
+            results["ok"] += 1
+        except asaas.AsaasError as e:
+            results["unavailable" if e.status_code >= 500 else "errors"] += 1
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(count)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await lag_task
+    latencies.sort()
+    return {
+        **results,
+        "elapsed": elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "max": latencies[-1],
+        "lag_max": max(lag_samples, default=0.0),
+    }
+
+
+def _print_asaas_scenario(title: str, result: dict, stub):
+    print(f"   {title}")
+    print(f"      ✅ {result['ok']} ok | 🚫 {result['unavailable']} 5xx | ❌ {result['errors']} erros "
+          f"| {stub.calls} chamadas ao Asaas (pico simultâneo no servidor: {stub.peak})")
+    print(f"      ⏱️  p50 {result['p50'] * 1000:.0f}ms | máx {result['max'] * 1000:.0f}ms "
+          f"| total {result['elapsed']:.2f}s | atraso máx. do event loop {result['lag_max'] * 1000:.1f}ms")
+
+
+async def _bench_asaas(args):
+    from app.core.settings import settings
+    from app.utils import asaas
+
+    settings.ASAAS_READ_TIMEOUT = args.read_timeout
+    settings.ASAAS_MAX_CONCURRENCY = args.max_concurrency
+    settings.ASAAS_RETRY_BASE_DELAY = 0.05
+
+    runner, stub, stub_url = await _start_asaas_stub()
+    asaas.ASAAS_API_URL = stub_url
+    asaas.ASAAS_API_KEY = asaas.ASAAS_API_KEY or "chave-benchmark"
+    print(f"💳 Asaas local: {args.requests} requisições simultâneas, bulkhead {args.max_concurrency}, "
+          f"read timeout {args.read_timeout}s")
+
+    def reset(latency: float, fail: bool = False):
+        stub.latency, stub.fail, stub.peak, stub.calls = latency, fail, 0, 0
+
+    try:
+        reset(args.latency_ms / 1000)
+        _print_asaas_scenario(f"🟢 Saudável ({args.latency_ms}ms)",
+                              await _run_asaas_scenario(asaas, args.requests), stub)
+
+        reset(args.read_timeout * 3)
+        _print_asaas_scenario(f"🐢 Lento ({args.read_timeout * 3:.0f}s por resposta, acima do read timeout)",
+                              await _run_asaas_scenario(asaas, args.requests), stub)
+        print(f"      🔌 Circuito: {asaas.asaas_breaker.state}")
+
+        reset(args.latency_ms / 1000, fail=True)
+        asaas.asaas_breaker.record_success()
+        _print_asaas_scenario("🔴 Fora do ar (503 em toda chamada)",
+                              await _run_asaas_scenario(asaas, args.requests), stub)
+        print(f"      🔌 Circuito: {asaas.asaas_breaker.state} "
+              f"(nova tentativa em {asaas.asaas_breaker.retry_in():.1f}s)")
+
+        reset(args.latency_ms / 1000, fail=True)
+        _print_asaas_scenario("⚡ Circuito aberto (falha imediata, sem chamar o Asaas)",
+                              await _run_asaas_scenario(asaas, args.requests), stub)
+    finally:
+        await asaas.close_http_client()
+        await runner.cleanup()
+
+
+def bench_asaas(args):
+    """Timeouts, bulkhead e circuit breaker do cliente Asaas contra um servidor local"""
+    asyncio.run(_bench_asaas(args))
+
+
+def _report_content(objectives: int, key_results_per_objective: int, seed: int = 42, evolution_points: int = 0):
+    """ReportContent COMPLETE sintético (determinístico pela seed), sem acesso ao Supabase"""
+    from app.models.reports import (
+        DashboardReportData, EvolutionReportData, KeyResultReportData, ObjectiveReportData, ReportContent,
+        ReportFormat, ReportMetadata, ReportStatus, ReportType
+    )
+
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 15, 10, 0)
+    statuses = ['PLANNED', 'ON_TRACK', 'AT_RISK', 'BEHIND', 'COMPLETED']
+    objective_rows, kr_rows = [], []
+    for i in range(objectives):
+        objective_id = f"obj-{i}"
+        title = f"Objetivo {i}: aumentar a receita recorrente do segmento {i % 7}"
+        progress_values = []
+        for j in range(key_results_per_objective):
+            progress = rng.uniform(0, 100)
+            progress_values.append(progress)
+            kr_rows.append(KeyResultReportData(
+                id=f"kr-{i}-{j}", title=f"KR {j} do objetivo {i}: atingir a meta trimestral",
+                description="Meta acompanhada semanalmente" if j % 2 else None,
+                objective_id=objective_id, objective_title=title, owner_name=f"Pessoa {j}",
+                target_value=100.0, current_value=round(progress, 2), start_value=0.0, unit="PERCENTAGE",
+                status=rng.choice(statuses), progress=progress, confidence_level=rng.random(),
+                created_at=now - timedelta(days=90), updated_at=now, checkins_count=rng.randint(0, 12),
+                last_checkin_date=now - timedelta(days=rng.randint(0, 30))
+            ))
+        objective_rows.append(ObjectiveReportData(
+            id=objective_id, title=title, description="Descrição do objetivo " * 3, owner_name="Responsável",
+            cycle_name="Q1 2026", status=rng.choice(statuses),
+            progress=sum(progress_values) / len(progress_values) if progress_values else 0.0,
+            created_at=now - timedelta(days=90), updated_at=now,
+            key_results_count=key_results_per_objective,
+            key_results_completed=sum(1 for p in progress_values if p >= 100)
+        ))
+
+    by_status = {}
+    for obj in objective_rows:
+        by_status[obj.status] = by_status.get(obj.status, 0) + 1
+
+    # Série semanal com passeio aleatório (gráfico de evolução)
+    evolution = None
+    if evolution_points:
+        first_week = now.date() - timedelta(weeks=evolution_points)
+        progress, value = [], 0.0
+        for _ in range(evolution_points):
+            value = min(100.0, max(0.0, value + rng.uniform(-2, 3)))
+            progress.append(round(value, 2))
+        evolution = EvolutionReportData(
+            title="Evolução do progresso da empresa",
+            weeks=[(first_week + timedelta(weeks=i)).isoformat() for i in range(evolution_points)],
+            progress=progress
+        )
+
+    return ReportContent(
+        metadata=ReportMetadata(
+            id="bench", name="Benchmark", report_type=ReportType.COMPLETE, format=ReportFormat.PDF,
+            status=ReportStatus.PROCESSING, generation_started_at=now, include_charts=bool(evolution_points)
+        ),
+        dashboard_data=DashboardReportData(
+            company_name="Empresa Benchmark", report_period="Q1 2026", generation_date=now,
+            total_objectives=objectives, total_key_results=len(kr_rows), active_users=25,
+            active_cycle_name="Q1 2026", overall_progress=50.0, objectives_by_status=by_status,
+            completion_rate=20.0, on_track_rate=40.0
+        ),
+        objectives=objective_rows,
+        key_results=kr_rows,
+        evolution=evolution
+    )
+
+
+def bench_pdf(args):
+    """Tempo e pico de memória do relatório PDF COMPLETE: documento único x partes em paralelo"""
+    from app.services.pdf_parallel import render_in_parts
+    from app.services.pdf_report import PdfReportRenderer
+
+    content = _report_content(args.objectives, args.key_results)
+    output_dir = tempfile.mkdtemp(prefix="okr-bench-")
+    filepath = os.path.join(output_dir, "relatorio.pdf")
+    print(f"📄 PDF COMPLETE: {args.objectives} objetivos x {args.key_results} KRs ({args.runs} execuções, {os.cpu_count()} CPUs)")
+
+    renderers = [
+        ("Documento único", lambda: PdfReportRenderer(content).render(filepath)),
+        (f"Em partes ({args.workers} workers)", lambda: render_in_parts(content, filepath, workers=args.workers)),
+    ]
+    for label, render in renderers:
+        # Primeira execução fora da medição (sobe o pool de processos)
+        render()
+        timings = []
+        for run in range(args.runs):
+            started = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - started)
+        size = os.path.getsize(filepath)
+
+        # Pico de memória medido em uma execução separada (tracemalloc deixa tudo mais lento;
+        # no modo em partes só enxerga o processo principal)
+        tracemalloc.start()
+        render()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"   {label}")
+        print(f"      ⏱️  Tempo: melhor {min(timings):.2f}s | média {sum(timings) / len(timings):.2f}s")
+        print(f"      💾 Pico de memória (tracemalloc): {peak / 1024 / 1024:.1f} MB")
+        print(f"      📦 Arquivo: {size / 1024:.0f} KB")
+
+    from app.services.pdf_parallel import shutdown_executor
+    shutdown_executor()
+    os.remove(filepath)
+    os.rmdir(output_dir)
+
+
+def bench_charts(args):
+    """Gráficos do PDF: montagem a frio x cache por hash dos dados, e o PDF com/sem gráficos"""
+    from app.services import pdf_charts
+    from app.services.pdf_report import PdfReportRenderer
+
+    content = _report_content(args.objectives, args.key_results, evolution_points=args.points)
+    print(f"📊 Gráficos: série de {args.points} semanas, {len(content.key_results)} KRs ({args.runs} execuções)")
+
+    def build_charts():
+        return PdfReportRenderer(content).charts()
+
+    cold, cached = [], []
+    for run in range(args.runs):
+        pdf_charts.clear_cache()
+        started = time.perf_counter()
+        build_charts()
+        cold.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        build_charts()
+        cached.append(time.perf_counter() - started)
+    print(f"   🧊 Montagem a frio: melhor {min(cold) * 1000:.1f}ms")
+    print(f"   ♻️  Do cache: melhor {min(cached) * 1000:.2f}ms")
+
+    output_dir = tempfile.mkdtemp(prefix="okr-bench-")
+    filepath = os.path.join(output_dir, "relatorio.pdf")
+    without_charts = content.model_copy(update={'metadata': content.metadata.model_copy(update={'include_charts': False})})
+    for label, report in (("sem gráficos", without_charts), ("com gráficos", content)):
+        timings = []
+        for run in range(args.runs):
+            started = time.perf_counter()
+            PdfReportRenderer(report).render(filepath)
+            timings.append(time.perf_counter() - started)
+        print(f"   📄 PDF {label}: melhor {min(timings):.2f}s | {os.path.getsize(filepath) / 1024:.0f} KB")
+    os.remove(filepath)
+    os.rmdir(output_dir)
+
+
+def _child_peak_rss(work, queue):
+    """Executa work() em um processo filho e devolve (segundos, aumento do pico de RSS em KB)"""
+    import resource
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    work()
+    elapsed = time.perf_counter() - started
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline))
+
+
+def bench_excel(args):
+    """Exportação Excel em streaming: linhas/segundo e pico de RSS (o conteúdo é gerado antes do fork)"""
+    import multiprocessing
+    from app.services.excel_report import write_excel_report
+
+    output_dir = tempfile.mkdtemp(prefix="okr-bench-")
+    filepath = os.path.join(output_dir, "relatorio.xlsx")
+    context = multiprocessing.get_context("fork")
+    print(f"📊 Excel (openpyxl write_only, {args.key_results} KRs por objetivo)")
+    for rows in args.rows:
+        objectives = max(1, rows // (args.key_results + 1))
+        content = _report_content(objectives, args.key_results)
+        total_rows = len(content.objectives) + len(content.key_results)
+
+        queue = context.Queue()
+        process = context.Process(target=_child_peak_rss, args=(lambda: write_excel_report(content, filepath), queue))
+        process.start()
+        elapsed, rss_kb = queue.get()
+        process.join()
+        print(f"   {total_rows:>8} linhas: {elapsed:.2f}s | {total_rows / elapsed:,.0f} linhas/s | "
+              f"pico de RSS +{rss_kb / 1024:.1f} MB | arquivo {os.path.getsize(filepath) / 1024 / 1024:.1f} MB")
+    os.remove(filepath)
+    os.rmdir(output_dir)
+
+
+def _legacy_key_results_csv(stream, key_results):
+    """Formatação célula a célula do CSV antigo (strftime por célula), para comparação"""
+    import csv
+    writer = csv.writer(stream, delimiter=';')
+    for kr in key_results:
+        writer.writerow([
+            kr.id, kr.title, kr.description or '', kr.objective_title, kr.owner_name or 'Não atribuído',
+            f"{kr.start_value:.2f}", f"{kr.current_value:.2f}", f"{kr.target_value:.2f}", kr.unit, kr.status,
+            f"{kr.progress:.1f}%", f"{(kr.confidence_level or 0) * 100:.0f}%" if kr.confidence_level else '',
+            kr.checkins_count, kr.last_checkin_date.strftime('%d/%m/%Y') if kr.last_checkin_date else 'Nunca',
+            kr.created_at.strftime('%d/%m/%Y %H:%M'),
+        ])
+
+
+def bench_csv(args):
+    """CSV COMPLETE em uma passada: linhas/segundo com e sem gzip x formatação antiga dos KRs"""
+    from app.models.reports import ReportType
+    from app.services.csv_report import format_date, format_datetime
+    from app.services.report_generator import ReportGenerator
+
+    content = _report_content(max(1, args.rows // 4), 3)
+    content.metadata.report_type = ReportType.COMPLETE
+    total_rows = len(content.objectives) + len(content.key_results)
+    output_dir = tempfile.mkdtemp(prefix="okr-bench-")
+    generator = ReportGenerator(output_dir)
+    print(f"🧾 CSV COMPLETE: {total_rows} linhas ({len(content.objectives)} objetivos + {len(content.key_results)} KRs)")
+
+    def measure(label, run, rows):
+        timings, size = [], 0
+        for _ in range(args.runs):
+            format_date.cache_clear()
+            format_datetime.cache_clear()
+            started = time.perf_counter()
+            filepath = run()
+            timings.append(time.perf_counter() - started)
+            size = os.path.getsize(filepath)
+            os.remove(filepath)
+        best = min(timings)
+        print(f"   {label:<30} {best:6.2f}s | {rows / best:>10,.0f} linhas/s | {size / 1024 / 1024:6.1f} MB")
+
+    def legacy():
+        filepath = os.path.join(output_dir, "legado.csv")
+        with open(filepath, 'w', newline='', encoding='utf-8') as stream:
+            _legacy_key_results_csv(stream, content.key_results)
+        return filepath
+
+    def key_results_only():
+        content.metadata.report_type = ReportType.KEY_RESULTS
+        try:
+            return generator.generate_report(content, "CSV")
+        finally:
+            content.metadata.report_type = ReportType.COMPLETE
+
+    def complete(compressed):
+        def run():
+            content.metadata.compressed = compressed
+            return generator.generate_report(content, "CSV")
+        return run
+
+    measure("KRs, formatação antiga", legacy, len(content.key_results))
+    measure("KRs, csv_report", key_results_only, len(content.key_results))
+    measure("COMPLETE", complete(False), total_rows)
+    measure("COMPLETE gzip", complete(True), total_rows)
+    os.rmdir(output_dir)
+
+
+def bench_columnar(args):
+    """Key Results em CSV x Parquet x Arrow: tempo e tamanho do arquivo (com e sem poda de colunas)"""
+    from app.models.reports import ReportFilters, ReportFormat, ReportType
+    from app.services.report_generator import ReportGenerator
+
+    content = _report_content(max(1, args.rows // 3), 3)
+    content.metadata.report_type = ReportType.KEY_RESULTS
+    output_dir = tempfile.mkdtemp(prefix="okr-bench-")
+    generator = ReportGenerator(output_dir)
+    print(f"🧱 Key Results: {len(content.key_results)} linhas")
+
+    def run(label, format):
+        started = time.perf_counter()
+        filepath = generator.generate_report(content, format)
+        elapsed = time.perf_counter() - started
+        size = os.path.getsize(filepath)
+        os.remove(filepath)
+        print(f"   {label:<28} {elapsed:6.2f}s | {len(content.key_results) / elapsed:>10,.0f} linhas/s | {size / 1024:>8,.0f} KB")
+
+    for format in (ReportFormat.CSV, ReportFormat.PARQUET, ReportFormat.ARROW):
+        run(format.value, format)
+    content.metadata.filters_applied = ReportFilters(columns=args.columns)
+    for format in (ReportFormat.PARQUET, ReportFormat.ARROW):
+        run(f"{format.value} ({len(args.columns)} colunas)", format)
+    os.rmdir(output_dir)
+
+
+def _api_payloads(items: int):
+    """Respostas sintéticas de /api/objectives/ e /api/dashboard/* com `items` itens por página"""
+    from uuid import uuid4
+    from app.models.dashboard import (
+        DashboardStats, EvolutionData, EvolutionPoint, PerformanceSummary, ProgressData, StatusColor,
+        TrendAnalysis, TrendDirection
+    )
+    from app.models.objective import ObjectiveFilter, ObjectiveListResponse, ObjectiveStatus, ObjectiveWithDetails
+
+    rng = random.Random(42)
+    now = datetime(2025, 1, 6, 9, 30)
+    company_id = uuid4()
+    statuses = list(ObjectiveStatus)
+    objectives = ObjectiveListResponse(
+        objectives=[
+            ObjectiveWithDetails(
+                id=uuid4(), title=f"Objetivo {i} - aumentar a retenção de clientes", description="Descrição " * 10,
+                owner_id=uuid4(), company_id=company_id, cycle_id=uuid4(), status=rng.choice(statuses),
+                progress=round(rng.uniform(0, 100), 2), created_at=now - timedelta(days=i), updated_at=now,
+                owner_name=f"Responsável {i % 17}", cycle_name="Q1 2025", key_results_count=rng.randint(0, 6)
+            )
+            for i in range(items)
+        ],
+        total=items * 10,
+        has_more=True,
+        filters_applied=ObjectiveFilter(limit=items, offset=0)
+    )
+    evolution = EvolutionData(
+        period_start="2023-01-02", period_end="2025-01-06", current_date="2025-01-06",
+        evolution_points=[
+            EvolutionPoint(
+                date=(now - timedelta(weeks=items - i)).date().isoformat(),
+                actual_progress=round(rng.uniform(0, 100), 1), expected_progress=round(i * 100 / items, 1),
+                objectives_count=rng.randint(10, 50)
+            )
+            for i in range(items)
+        ],
+        trend_analysis=TrendAnalysis(direction="UP", average_weekly_growth=1.2, consistency_score=80.0, prediction_next_week=55.0),
+        performance_summary=PerformanceSummary(
+            overall_score=72.5, time_efficiency=90.0, goal_achievement=48.2, team_engagement=70.0
+        )
+    )
+    stats = DashboardStats(
+        total_objectives=120, total_key_results=480, active_users=35, active_cycle_name="Q1 2025",
+        active_cycle_progress=6.7, company_name="Empresa", last_updated=now.isoformat()
+    )
+    progress = ProgressData(
+        current_progress=48.2, expected_progress=51.0, variance=-2.8, status_color=StatusColor.YELLOW,
+        trend_direction=TrendDirection.UP, trend_percentage=2.5, cycle_days_total=90, cycle_days_elapsed=6,
+        cycle_days_remaining=84
+    )
+    return [
+        ("/api/objectives/", ObjectiveListResponse, objectives),
+        ("/api/dashboard/evolution", EvolutionData, evolution),
+        ("/api/dashboard/stats", DashboardStats, stats),
+        ("/api/dashboard/progress", ProgressData, progress),
+    ]
+
+
+def bench_json(args):
+    """Serialização das respostas: caminho padrão do FastAPI x orjson x model_dump_json direto"""
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from app.utils.json_response import ORJSON_AVAILABLE, FastJSONResponse, ModelResponse
+
+    print(f"⚡ Serialização JSON: páginas de {args.items} itens, {args.iterations} iterações "
+          f"(orjson {'disponível' if ORJSON_AVAILABLE else 'indisponível'})")
+
+    async def via_fastapi(field, model, response_class):
+        # O que o FastAPI faz com o retorno de uma rota com response_model
+        content = await serialize_response(field=field, response_content=model)
+        return response_class(content).body
+
+    def measure(run) -> float:
+        best = float('inf')
+        for _ in range(3):
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                run()
+            best = min(best, time.perf_counter() - started)
+        return best / args.iterations * 1_000_000
+
+    loop = asyncio.new_event_loop()
+    try:
+        for path, model_class, model in _api_payloads(args.items):
+            field = create_response_field(name=f"Response_{model_class.__name__}", type_=model_class)
+            body = ModelResponse(model).body
+            # Mesmo JSON nos três caminhos
+            expected = json.loads(loop.run_until_complete(via_fastapi(field, model, JSONResponse)))
+            assert json.loads(body) == expected == json.loads(loop.run_until_complete(
+                via_fastapi(field, model, FastJSONResponse)
+            )), path
+            before = measure(lambda: loop.run_until_complete(via_fastapi(field, model, JSONResponse)))
+            with_orjson = measure(lambda: loop.run_until_complete(via_fastapi(field, model, FastJSONResponse)))
+            direct = measure(lambda: ModelResponse(model).body)
+            print(f"   {path:<26} padrão {before:8.1f}µs | orjson {with_orjson:8.1f}µs | "
+                  f"model_dump_json {direct:8.1f}µs ({before / direct:4.1f}x) | {len(body) / 1024:6.1f} KB")
+    finally:
+        loop.close()
+
+
+def _key_result_rows(count: int):
+    """Linhas de key_results como o PostgREST devolve (UUIDs e datas em texto, relações embutidas)"""
+    from uuid import uuid4
+
+    rng = random.Random(42)
+    objective_ids = [str(uuid4()) for _ in range(max(1, count // 4))]
+    owner_ids = [str(uuid4()) for _ in range(25)]
+    return [
+        {
+            'id': str(uuid4()), 'title': f"KR {i} - reduzir churn mensal", 'description': "Descrição do KR " * 4,
+            'objective_id': objective_ids[i // 4], 'owner_id': rng.choice(owner_ids), 'target_value': 100, 'current_value': rng.randint(0, 100),
+            'start_value': 0, 'unit': rng.choice(['PERCENTAGE', 'NUMBER', 'CURRENCY']),
+            'confidence_level': rng.choice([None, 0.5, 0.8]), 'status': rng.choice(['PLANNED', 'ON_TRACK', 'AT_RISK']),
+            'progress': round(rng.uniform(0, 100), 2),
+            'created_at': f"2025-01-{1 + i % 28:02d}T09:30:00.{rng.randint(0, 999999):06d}+00:00",
+            'updated_at': f"2025-02-{1 + i % 28:02d}T18:05:12.{rng.randint(0, 999999):06d}+00:00",
+            'owner': {'name': f"Responsável {i % 17}"}, 'objective': {'title': "Objetivo X"},
+        }
+        for i in range(count)
+    ]
+
+
+def _legacy_key_result(kr):
+    """Conversão campo a campo + validação do modelo (como os routers faziam)"""
+    from app.models.key_result import KeyResultWithDetails
+
+    formatted_data = {
+        'id': kr['id'],
+        'title': kr['title'],
+        'description': kr['description'],
+        'objective_id': kr['objective_id'],
+        'owner_id': kr['owner_id'],
+        'target_value': float(kr['target_value']),
+        'current_value': float(kr['current_value']) if kr['current_value'] else 0.0,
+        'start_value': float(kr['start_value']) if kr['start_value'] else 0.0,
+        'unit': kr['unit'],
+        'confidence_level': float(kr['confidence_level']) if kr['confidence_level'] else None,
+        'status': kr['status'],
+        'progress': float(kr['progress']) if kr['progress'] else 0.0,
+        'created_at': kr['created_at'],
+        'updated_at': kr['updated_at'],
+        'owner_name': kr['owner']['name'] if kr.get('owner') else None,
+        'objective_title': kr['objective']['title'] if kr.get('objective') else 'Objetivo não encontrado'
+    }
+    return KeyResultWithDetails(**formatted_data)
+
+
+def _legacy_key_result_report(kr):
+    """KeyResultReportData como get_key_results_for_report montava antes"""
+    from app.models.reports import KeyResultReportData
+    from app.services.report_data import safe_parse_datetime
+
+    return KeyResultReportData(
+        id=kr['id'],
+        title=kr.get('title', ''),
+        description=kr.get('description'),
+        objective_id=kr.get('objective_id'),
+        objective_title=kr['objective']['title'] if kr.get('objective') else 'Objetivo não encontrado',
+        owner_name=kr['owner']['name'] if kr.get('owner') else None,
+        target_value=float(kr.get('target_value', 0)),
+        current_value=float(kr.get('current_value', 0)),
+        start_value=float(kr.get('start_value', 0)),
+        unit=kr.get('unit', 'NUMBER'),
+        status=kr.get('status', 'PLANNED'),
+        progress=float(kr.get('progress', 0)),
+        confidence_level=float(kr.get('confidence_level', 0)) if kr.get('confidence_level') else None,
+        created_at=safe_parse_datetime(kr.get('created_at')),
+        updated_at=safe_parse_datetime(kr.get('updated_at')),
+        checkins_count=0,
+        last_checkin_date=None
+    )
+
+
+def bench_mapping(args):
+    """Custo por linha da conversão linha do banco -> modelo: dict + validação x RowMapper"""
+    from app.routers.key_results import KEY_RESULT_MAPPER
+    from app.services.report_data import KEY_RESULT_REPORT_MAPPER
+    from app.utils import row_mapper
+
+    rows = _key_result_rows(args.rows)
+    print(f"🧩 Mapeamento de linhas: {args.rows:,} Key Results")
+
+    def measure(run) -> float:
+        best = float('inf')
+        for _ in range(args.runs):
+            row_mapper._parse_uuid.cache_clear()  # cache de UUIDs frio a cada execução
+            started = time.perf_counter()
+            for row in rows:
+                run(row)
+            best = min(best, time.perf_counter() - started)
+        return best / len(rows) * 1_000_000
+
+    scenarios = [
+        ("KeyResultWithDetails (API)", _legacy_key_result, KEY_RESULT_MAPPER),
+        ("KeyResultReportData (relatório)", _legacy_key_result_report,
+         lambda row: KEY_RESULT_REPORT_MAPPER(row, checkins_count=0, last_checkin_date=None)),
+    ]
+    for label, legacy, mapper in scenarios:
+        # Mesmo JSON nos dois caminhos
+        for row in rows[:100]:
+            assert legacy(row).model_dump_json() == mapper(row).model_dump_json(), label
+        before = measure(legacy)
+        after = measure(mapper)
+        print(f"   {label:<34} dict + validação {before:6.2f}µs/linha | RowMapper {after:6.2f}µs/linha ({before / after:4.1f}x)")
+
+
+def bench_compression(args):
+    """Compressão das respostas: gzip do GZipMiddleware x zstd/br nos níveis configurados, e o cache por ETag"""
+    from app.utils import compression
+    from app.utils.json_response import ModelResponse
+
+    middleware = compression.CompressionMiddleware(None)
+    encodings = middleware.encodings
+    print(f"🗜️  Compressão: páginas de {args.items} itens, {args.iterations} iterações (disponíveis: {', '.join(encodings)})")
+
+    def measure(run) -> float:
+        best = float('inf')
+        for _ in range(3):
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                run()
+            best = min(best, time.perf_counter() - started)
+        return best / args.iterations * 1_000_000
+
+    async def request(body: bytes, encoding: str):
+        # Resposta completa passando pelo middleware, como numa rota GET
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+            await send({"type": "http.response.body", "body": body})
+
+        async def send(message):
+            pass
+
+        middleware.app = app
+        await middleware({"type": "http", "method": "GET", "headers": [(b"accept-encoding", encoding.encode())]}, None, send)
+
+    loop = asyncio.new_event_loop()
+    try:
+        for path, _, model in _api_payloads(args.items):
+            body = ModelResponse(model).body
+            if len(body) < middleware.minimum_size:
+                print(f"   {path} ({len(body)} bytes): abaixo de COMPRESSION_MINIMUM_SIZE, enviado sem compressão")
+                continue
+            # GZipMiddleware do Starlette: gzip nível 9
+            baseline = measure(lambda: compression.compress(body, compression.GZIP, 9))
+            baseline_size = len(compression.compress(body, compression.GZIP, 9))
+            print(f"   {path} ({len(body) / 1024:.1f} KB): GZipMiddleware gzip-9 {baseline:7.1f}µs -> {baseline_size / 1024:5.1f} KB")
+            for encoding in encodings:
+                level = middleware.level("application/json", encoding)
+                compressed = compression.compress(body, encoding, level)
+                elapsed = measure(lambda: compression.compress(body, encoding, level))
+                middleware.cache = compression.CompressedCache(1024 * 1024, 1024 * 1024)
+                loop.run_until_complete(request(body, encoding))  # aquece o cache
+                cached = measure(lambda: loop.run_until_complete(request(body, encoding)))
+                assert middleware.cache.hits >= args.iterations, encoding
+                print(f"      {encoding + '-' + str(level):<8} {elapsed:7.1f}µs -> {len(compressed) / 1024:5.1f} KB "
+                      f"({len(body) / len(compressed):4.1f}:1) | middleware com cache (ETag igual) {cached:6.1f}µs")
+    finally:
+        loop.close()
+
+
+class _TableQuery:
+    """Consulta PostgREST mínima sobre linhas em memória (eq/gte/order/range/limit), contando execuções"""
+
+    def __init__(self, client, rows):
+        self.client = client
+        self.rows = rows
+        self.filters = []
+        self.bounds = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        if "." not in column:  # filtros em relações embutidas: dataset de uma empresa só
+            self.filters.append(lambda row: str(row.get(column)) == str(value))
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: (row.get(column) or "") >= value)
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end + 1)
+        return self
+
+    def limit(self, count):
+        self.bounds = (0, count)
+        return self
+
+    def execute(self):
+        self.client.queries += 1
+        time.sleep(self.client.latency)
+        rows = [row for row in self.rows if all(check(row) for check in self.filters)]
+        if self.bounds:
+            rows = rows[self.bounds[0]:self.bounds[1]]
+        return type("Response", (), {"data": rows})()
+
+
+def bench_alerts(args):
+    """Geração de alertas de uma empresa (4 geradores) sobre um snapshot sintético, contando consultas"""
+    from datetime import date
+    from app.services.notification_service import NotificationService
+    from app.utils.synthetic_data import ScaleProfile, SyntheticDataGenerator
+
+    key_results_per_objective = 5
+    profile = ScaleProfile(
+        name="alerts", objectives=max(1, args.key_results // key_results_per_objective),
+        key_results_per_objective=key_results_per_objective, users=200, history_days=120
+    )
+    generator = SyntheticDataGenerator(profile, reference_date=date.today())
+    company_id = next(generator.iter_table("companies"))["id"]
+    cycles = {row["id"]: row for row in generator.iter_table("cycles")}
+    tables = {
+        "notification_settings": [],
+        "users": list(generator.iter_table("users")),
+        "cycles": list(cycles.values()),
+        "objectives": [
+            {**row, "cycles": {"start_date": cycles[row["cycle_id"]]["start_date"], "end_date": cycles[row["cycle_id"]]["end_date"]}}
+            for row in generator.iter_table("objectives")
+        ],
+        "key_results": [{**row, "objectives": {"company_id": company_id}} for row in generator.iter_table("key_results")],
+        "kr_checkins": list(generator.iter_table("kr_checkins")),
+    }
+
+    class Client:
+        queries = 0
+        latency = args.latency_ms / 1000
+
+        def table(self, name):
+            return _TableQuery(self, tables[name])
+
+    print(f"🔔 Alertas: {len(tables['key_results']):,} KRs, {len(tables['objectives']):,} objetivos, "
+          f"{len(tables['kr_checkins']):,} check-ins, latência simulada {args.latency_ms}ms por consulta")
+    client = Client()
+    service = NotificationService(client)
+    best = float('inf')
+    for _ in range(args.runs):
+        client.queries = 0
+        started = time.perf_counter()
+        alerts = asyncio.run(service.generate_automatic_alerts(company_id))
+        best = min(best, time.perf_counter() - started)
+    by_type = {}
+    for alert in alerts:
+        by_type[alert.type.value] = by_type.get(alert.type.value, 0) + 1
+    print(f"   {client.queries} consultas | {best * 1000:.0f}ms ({client.queries * args.latency_ms}ms de latência) | "
+          f"{len(alerts):,} alertas: " + ", ".join(f"{name} {count:,}" for name, count in sorted(by_type.items())))
+
+
+def main():
+    """Função principal dos benchmarks"""
+    parser = argparse.ArgumentParser(description='Benchmarks locais (sem acesso ao Supabase)')
+    subparsers = parser.add_subparsers(dest='suite', required=True)
+
+    revocation = subparsers.add_parser('revocation', help='Filtro de revogação de tokens')
+    revocation.add_argument('--size', type=int, default=1_000_000, help='Sessões revogadas (padrão: 1.000.000)')
+    revocation.add_argument('--fp-rate', type=float, default=0.001, help='Taxa de falsos positivos alvo (padrão: 0.001)')
+    revocation.set_defaults(func=bench_revocation)
+
+    login = subparsers.add_parser('login', help='Logins concorrentes contra um GoTrue local')
+    login.add_argument('--logins', type=int, default=500, help='Logins por nível de concorrência (padrão: 500)')
+    login.add_argument('--latency-ms', type=int, default=20, help='Latência simulada do GoTrue (padrão: 20ms)')
+    login.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50, 100], help='Níveis de concorrência')
+    login.set_defaults(func=bench_login)
+
+    asaas = subparsers.add_parser('asaas', help='Cliente Asaas contra um servidor local lento/fora do ar')
+    asaas.add_argument('--requests', type=int, default=200, help='Requisições simultâneas por cenário (padrão: 200)')
+    asaas.add_argument('--latency-ms', type=int, default=50, help='Latência do Asaas saudável (padrão: 50ms)')
+    asaas.add_argument('--read-timeout', type=float, default=1.0, help='Read timeout do cliente (padrão: 1s)')
+    asaas.add_argument('--max-concurrency', type=int, default=10, help='Vagas do bulkhead (padrão: 10)')
+    asaas.set_defaults(func=bench_asaas)
+
+    pdf = subparsers.add_parser('pdf', help='Renderização de relatório PDF grande')
+    pdf.add_argument('--objectives', type=int, default=500, help='Objetivos no relatório (padrão: 500)')
+    pdf.add_argument('--key-results', type=int, default=3, help='Key Results por objetivo (padrão: 3)')
+    pdf.add_argument('--runs', type=int, default=3, help='Execuções cronometradas (padrão: 3)')
+    pdf.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processos da renderização em partes (padrão: nº de CPUs)')
+    pdf.set_defaults(func=bench_pdf)
+
+    excel = subparsers.add_parser('excel', help='Exportação Excel em streaming')
+    excel.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000], help='Linhas por execução (objetivos + KRs)')
+    excel.add_argument('--key-results', type=int, default=3, help='Key Results por objetivo (padrão: 3)')
+    excel.set_defaults(func=bench_excel)
+
+    csv_suite = subparsers.add_parser('csv', help='Exportação CSV em uma passada (com e sem gzip)')
+    csv_suite.add_argument('--rows', type=int, default=100_000, help='Linhas exportadas (objetivos + KRs, padrão: 100.000)')
+    csv_suite.add_argument('--runs', type=int, default=3, help='Execuções cronometradas (padrão: 3)')
+    csv_suite.set_defaults(func=bench_csv)
+
+    columnar = subparsers.add_parser('columnar', help='Exportação Parquet/Arrow x CSV')
+    columnar.add_argument('--rows', type=int, default=100_000, help='Key Results exportados (padrão: 100.000)')
+    columnar.add_argument('--columns', nargs='+', default=['id', 'title', 'status', 'progress'], help='Colunas na execução podada')
+    columnar.set_defaults(func=bench_columnar)
+
+    json_suite = subparsers.add_parser('json', help='Serialização das respostas da API (objetivos e dashboard)')
+    json_suite.add_argument('--items', type=int, default=100, help='Itens por página (padrão: 100)')
+    json_suite.add_argument('--iterations', type=int, default=200, help='Serializações por medição (padrão: 200)')
+    json_suite.set_defaults(func=bench_json)
+
+    mapping = subparsers.add_parser('mapping', help='Conversão de linhas do banco em modelos (custo por linha)')
+    mapping.add_argument('--rows', type=int, default=20_000, help='Linhas convertidas por execução (padrão: 20.000)')
+    mapping.add_argument('--runs', type=int, default=3, help='Execuções cronometradas (padrão: 3)')
+    mapping.set_defaults(func=bench_mapping)
+
+    compression_suite = subparsers.add_parser('compression', help='Compressão das respostas (gzip x br x zstd, cache por ETag)')
+    compression_suite.add_argument('--items', type=int, default=100, help='Itens por página (padrão: 100)')
+    compression_suite.add_argument('--iterations', type=int, default=200, help='Compressões por medição (padrão: 200)')
+    compression_suite.set_defaults(func=bench_compression)
+
+    alerts = subparsers.add_parser('alerts', help='Geração de alertas sobre um snapshot sintético (consultas e tempo)')
+    alerts.add_argument('--key-results', type=int, default=5000, help='Key Results da empresa (padrão: 5.000)')
+    alerts.add_argument('--latency-ms', type=int, default=5, help='Latência simulada por consulta (padrão: 5ms)')
+    alerts.add_argument('--runs', type=int, default=3, help='Execuções cronometradas (padrão: 3)')
+    alerts.set_defaults(func=bench_alerts)
+
+    charts = subparsers.add_parser('charts', help='Gráficos vetoriais dos relatórios PDF')
+    charts.add_argument('--points', type=int, default=5000, help='Semanas na série de evolução (padrão: 5000)')
+    charts.add_argument('--objectives', type=int, default=100, help='Objetivos no relatório (padrão: 100)')
+    charts.add_argument('--key-results', type=int, default=3, help='Key Results por objetivo (padrão: 3)')
+    charts.add_argument('--runs', type=int, default=3, help='Execuções cronometradas (padrão: 3)')
+    charts.set_defaults(func=bench_charts)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
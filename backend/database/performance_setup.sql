@@ -0,0 +1,487 @@
+-- =====================================================================
+-- Sistema OKR - Ajustes de banco para performance e escala
+-- Execute no Supabase SQL Editor. Todos os comandos são idempotentes.
+-- =====================================================================
+
+-- ---------------------------------------------------------------------
+-- Notificações: deduplicação de alertas automáticos
+-- Chave determinística "TIPO:entidade:período" gerada pelo backend.
+-- Só notificações não lidas deduplicam: depois de lida, a condição pode ser
+-- notificada de novo. Notificações manuais (sem chave) não são afetadas.
+-- ---------------------------------------------------------------------
+ALTER TABLE notifications ADD COLUMN IF NOT EXISTS dedup_key TEXT;
+
+DROP INDEX IF EXISTS notifications_user_dedup_key_idx;
+CREATE UNIQUE INDEX IF NOT EXISTS notifications_user_dedup_key_unread_idx
+    ON notifications (user_id, dedup_key)
+    WHERE dedup_key IS NOT NULL AND NOT is_read;
+
+-- Consulta prévia: company_id = ? AND is_read = false AND dedup_key IN (...)
+DROP INDEX IF EXISTS notifications_company_dedup_key_idx;
+CREATE INDEX IF NOT EXISTS notifications_company_dedup_key_unread_idx
+    ON notifications (company_id, dedup_key)
+    WHERE dedup_key IS NOT NULL AND NOT is_read;
+
+-- INSERT em lote com ON CONFLICT no índice parcial (o upsert do PostgREST não
+-- informa o predicado do índice, então não consegue usá-lo como árbitro)
+CREATE OR REPLACE FUNCTION insert_notifications_dedup(p_rows JSONB)
+RETURNS INT LANGUAGE sql AS $$
+    WITH inserted AS (
+        INSERT INTO notifications (
+            user_id, company_id, type, title, message, data, priority, is_read, dedup_key, created_at, updated_at
+        )
+        SELECT user_id, company_id, type, title, message, data, priority, is_read, dedup_key, created_at, updated_at
+        FROM jsonb_populate_recordset(NULL::notifications, p_rows)
+        ON CONFLICT (user_id, dedup_key) WHERE dedup_key IS NOT NULL AND NOT is_read DO NOTHING
+        RETURNING 1
+    )
+    SELECT COUNT(*)::int FROM inserted;
+$$;
+
+-- ---------------------------------------------------------------------
+-- Agendador de alertas (alert_scheduler.py)
+-- Lease de liderança por shard, watermark por empresa e métricas por rodada.
+-- ---------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS scheduler_locks (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS alert_scheduler_watermarks (
+    company_id UUID PRIMARY KEY REFERENCES companies(id) ON DELETE CASCADE,
+    last_run_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS alert_scheduler_runs (
+    run_id UUID PRIMARY KEY,
+    holder TEXT NOT NULL,
+    shard_index INT NOT NULL,
+    shard_count INT NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL,
+    finished_at TIMESTAMPTZ,
+    duration_seconds DOUBLE PRECISION,
+    tenants_total INT,
+    tenants_evaluated INT,
+    tenants_skipped INT,
+    tenants_failed INT,
+    tenants_timed_out INT,
+    alerts_generated INT,
+    notifications_created INT,
+    lease_lost BOOLEAN DEFAULT FALSE,
+    errors JSONB DEFAULT '[]'::jsonb
+);
+ALTER TABLE alert_scheduler_runs ADD COLUMN IF NOT EXISTS lease_lost BOOLEAN DEFAULT FALSE;
+
+-- Detecção de empresas alteradas desde o último watermark
+CREATE INDEX IF NOT EXISTS objectives_updated_at_idx ON objectives (updated_at);
+CREATE INDEX IF NOT EXISTS key_results_updated_at_idx ON key_results (updated_at);
+CREATE INDEX IF NOT EXISTS kr_checkins_created_at_idx ON kr_checkins (created_at);
+
+-- ---------------------------------------------------------------------
+-- Notificações: contadores por usuário e estatísticas agregadas
+-- notification_counters é mantida incrementalmente por triggers (um UPDATE
+-- por usuário afetado em cada comando), então o badge do sino é uma leitura
+-- por chave primária. notification_stats() calcula todas as estatísticas em
+-- uma única varredura agrupada. O índice por (company_id, updated_at) atende à
+-- sincronização do cache de contadores entre processos.
+-- ---------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS notification_counters (
+    user_id UUID NOT NULL,
+    company_id UUID NOT NULL,
+    total INT NOT NULL DEFAULT 0,
+    unread INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (user_id, company_id)
+);
+
+CREATE INDEX IF NOT EXISTS notifications_user_company_created_idx
+    ON notifications (user_id, company_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS notification_counters_company_updated_idx
+    ON notification_counters (company_id, updated_at);
+
+CREATE OR REPLACE FUNCTION notification_counters_on_insert() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO notification_counters AS c (user_id, company_id, total, unread)
+    SELECT user_id, company_id, COUNT(*), COUNT(*) FILTER (WHERE NOT is_read)
+    FROM new_rows GROUP BY user_id, company_id
+    ON CONFLICT (user_id, company_id) DO UPDATE
+        SET total = c.total + EXCLUDED.total,
+            unread = c.unread + EXCLUDED.unread,
+            updated_at = now();
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION notification_counters_on_update() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE notification_counters c
+    SET unread = GREATEST(c.unread + d.delta, 0), updated_at = now()
+    FROM (
+        SELECT n.user_id, n.company_id,
+               SUM((NOT n.is_read)::int - (NOT o.is_read)::int) AS delta
+        FROM new_rows n JOIN old_rows o ON o.id = n.id
+        WHERE n.is_read IS DISTINCT FROM o.is_read
+        GROUP BY n.user_id, n.company_id
+    ) d
+    WHERE c.user_id = d.user_id AND c.company_id = d.company_id AND d.delta <> 0;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION notification_counters_on_delete() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE notification_counters c
+    SET total = GREATEST(c.total - d.total, 0),
+        unread = GREATEST(c.unread - d.unread, 0),
+        updated_at = now()
+    FROM (
+        SELECT user_id, company_id, COUNT(*) AS total, COUNT(*) FILTER (WHERE NOT is_read) AS unread
+        FROM old_rows GROUP BY user_id, company_id
+    ) d
+    WHERE c.user_id = d.user_id AND c.company_id = d.company_id;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS notifications_counters_insert ON notifications;
+CREATE TRIGGER notifications_counters_insert
+    AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_on_insert();
+
+DROP TRIGGER IF EXISTS notifications_counters_update ON notifications;
+CREATE TRIGGER notifications_counters_update
+    AFTER UPDATE ON notifications
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_on_update();
+
+DROP TRIGGER IF EXISTS notifications_counters_delete ON notifications;
+CREATE TRIGGER notifications_counters_delete
+    AFTER DELETE ON notifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_on_delete();
+
+-- Carga inicial / reconciliação dos contadores (pode ser reexecutada)
+INSERT INTO notification_counters (user_id, company_id, total, unread)
+SELECT user_id, company_id, COUNT(*), COUNT(*) FILTER (WHERE NOT is_read)
+FROM notifications GROUP BY user_id, company_id
+ON CONFLICT (user_id, company_id) DO UPDATE
+    SET total = EXCLUDED.total, unread = EXCLUDED.unread, updated_at = now();
+
+CREATE OR REPLACE FUNCTION notification_stats(p_user_id UUID, p_company_id UUID)
+RETURNS JSONB LANGUAGE sql STABLE AS $$
+    WITH grouped AS (
+        SELECT type, priority,
+               COUNT(*) AS total,
+               COUNT(*) FILTER (WHERE NOT is_read) AS unread,
+               COUNT(*) FILTER (WHERE created_at >= now() - INTERVAL '24 hours') AS recent
+        FROM notifications
+        WHERE user_id = p_user_id AND company_id = p_company_id
+        GROUP BY type, priority
+    )
+    SELECT jsonb_build_object(
+        'total', COALESCE(SUM(total), 0),
+        'unread', COALESCE(SUM(unread), 0),
+        'recent_count', COALESCE(SUM(recent), 0),
+        'by_type', COALESCE((SELECT jsonb_object_agg(type, n) FROM (SELECT type, SUM(total) AS n FROM grouped GROUP BY type) t), '{}'::jsonb),
+        'by_priority', COALESCE((SELECT jsonb_object_agg(priority::text, n) FROM (SELECT priority, SUM(total) AS n FROM grouped GROUP BY priority) p), '{}'::jsonb)
+    )
+    FROM grouped;
+$$;
+
+-- ---------------------------------------------------------------------
+-- Sessões: gravação em lote de last_used_at (SessionActivityBuffer)
+-- Recebe [{"id": ..., "last_used_at": ...}, ...] e aplica em um único UPDATE.
+-- ---------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION touch_user_sessions(p_touches JSONB)
+RETURNS INT LANGUAGE sql AS $$
+    WITH updated AS (
+        UPDATE user_sessions s
+        SET last_used_at = GREATEST(s.last_used_at, t.last_used_at)
+        FROM jsonb_to_recordset(p_touches) AS t(id UUID, last_used_at TIMESTAMPTZ)
+        WHERE s.id = t.id
+        RETURNING 1
+    )
+    SELECT COUNT(*)::int FROM updated;
+$$;
+
+-- ---------------------------------------------------------------------
+-- Sessões: lista de revogação em memória (RevocationService)
+-- Carga inicial e polling incremental por revoked_at; confirmação por hash.
+-- ---------------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS user_sessions_revoked_at_idx
+    ON user_sessions (revoked_at)
+    WHERE is_revoked;
+
+CREATE INDEX IF NOT EXISTS user_sessions_access_token_hash_idx
+    ON user_sessions (access_token_hash);
+
+-- ---------------------------------------------------------------------
+-- Manutenção em lotes (maintenance.py / MaintenanceService)
+-- Cada chamada apaga no máximo p_limit linhas na ordem do índice;
+-- SKIP LOCKED evita esperar por linhas em uso pela API.
+-- ---------------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS user_sessions_expires_at_idx ON user_sessions (expires_at);
+CREATE INDEX IF NOT EXISTS notifications_created_at_idx ON notifications (created_at);
+
+CREATE OR REPLACE FUNCTION delete_expired_sessions_chunk(p_cutoff TIMESTAMPTZ, p_limit INT)
+RETURNS INT LANGUAGE sql AS $$
+    WITH doomed AS (
+        SELECT id FROM user_sessions
+        WHERE expires_at < p_cutoff
+        ORDER BY expires_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ), deleted AS (
+        -- Só sessões expiradas: a linha de uma sessão revogada ainda válida é o que
+        -- faz confirm_revoked recusar o JWT, então fica até o expires_at passar
+        DELETE FROM user_sessions WHERE id IN (SELECT id FROM doomed) RETURNING 1
+    )
+    SELECT COUNT(*)::int FROM deleted;
+$$;
+
+CREATE OR REPLACE FUNCTION delete_old_notifications_chunk(p_cutoff TIMESTAMPTZ, p_limit INT)
+RETURNS INT LANGUAGE sql AS $$
+    WITH doomed AS (
+        SELECT id FROM notifications
+        WHERE created_at < p_cutoff
+        ORDER BY created_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ), deleted AS (
+        DELETE FROM notifications WHERE id IN (SELECT id FROM doomed) RETURNING 1
+    )
+    SELECT COUNT(*)::int FROM deleted;
+$$;
+
+-- ---------------------------------------------------------------------
+-- Assinaturas: estado local mantido pelo webhook do Asaas (SubscriptionService)
+-- Leituras de status/plano nunca chamam o Asaas. status_event_at guarda o
+-- instante do último evento aplicado, para descartar eventos fora de ordem;
+-- asaas_webhook_events deduplica reentregas pelo id do evento.
+-- A reconciliação roda sob o lease "subscription_reconcile" (scheduler_locks).
+-- ---------------------------------------------------------------------
+ALTER TABLE subscriptions ADD COLUMN IF NOT EXISTS next_due_date DATE;
+ALTER TABLE subscriptions ADD COLUMN IF NOT EXISTS status_event_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS subscriptions_user_created_idx
+    ON subscriptions (user_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS subscriptions_subscription_id_idx
+    ON subscriptions (subscription_id);
+
+CREATE TABLE IF NOT EXISTS asaas_webhook_events (
+    event_id TEXT PRIMARY KEY,
+    event TEXT NOT NULL,
+    subscription_id TEXT,
+    received_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Aplica um evento uma única vez. Retorna {"outcome", "user_id"}:
+--   applied   -> status atualizado (user_id afetado);
+--   duplicate -> evento já processado;
+--   stale     -> assinatura existe, mas o estado atual é mais recente;
+--   unknown   -> nenhuma linha local com o subscription_id (ex.: evento chegou
+--                antes do INSERT da rota de criação). O evento NÃO é registrado,
+--                para que a reentrega do Asaas seja aplicada.
+DROP FUNCTION IF EXISTS apply_subscription_event(TEXT, TEXT, TEXT, TEXT, TIMESTAMPTZ, DATE);
+CREATE OR REPLACE FUNCTION apply_subscription_event(
+    p_event_id TEXT,
+    p_event TEXT,
+    p_subscription_id TEXT,
+    p_status TEXT,
+    p_event_at TIMESTAMPTZ,
+    p_next_due_date DATE DEFAULT NULL
+) RETURNS JSONB LANGUAGE plpgsql AS $$
+DECLARE
+    v_user_id UUID;
+    v_updated BOOLEAN;
+BEGIN
+    IF EXISTS (SELECT 1 FROM asaas_webhook_events WHERE event_id = p_event_id) THEN
+        RETURN jsonb_build_object('outcome', 'duplicate');
+    END IF;
+
+    UPDATE subscriptions
+    SET status = COALESCE(p_status, status),
+        next_due_date = COALESCE(p_next_due_date, next_due_date),
+        status_event_at = p_event_at,
+        updated_at = now()
+    WHERE subscription_id = p_subscription_id
+      AND (status_event_at IS NULL OR status_event_at <= p_event_at)
+    RETURNING user_id INTO v_user_id;
+    v_updated := FOUND;
+
+    IF NOT v_updated AND NOT EXISTS (SELECT 1 FROM subscriptions WHERE subscription_id = p_subscription_id) THEN
+        RETURN jsonb_build_object('outcome', 'unknown');
+    END IF;
+
+    -- Entregas simultâneas do mesmo evento aplicam o mesmo estado; só uma fica registrada
+    INSERT INTO asaas_webhook_events (event_id, event, subscription_id)
+    VALUES (p_event_id, p_event, p_subscription_id)
+    ON CONFLICT (event_id) DO NOTHING;
+
+    IF NOT v_updated THEN
+        RETURN jsonb_build_object('outcome', 'stale');
+    END IF;
+    RETURN jsonb_build_object('outcome', 'applied', 'user_id', v_user_id);
+END;
+$$;
+
+-- Reconciliação em lote: [{"subscription_id", "status", "next_due_date"}, ...]
+-- em um único UPDATE; não sobrescreve eventos recebidos depois de p_started_at
+CREATE OR REPLACE FUNCTION sync_subscription_states(p_states JSONB, p_started_at TIMESTAMPTZ)
+RETURNS SETOF UUID LANGUAGE sql AS $$
+    UPDATE subscriptions AS s
+    SET status = t.status,
+        next_due_date = t.next_due_date,
+        status_event_at = p_started_at,
+        updated_at = now()
+    FROM jsonb_to_recordset(p_states) AS t(subscription_id TEXT, status TEXT, next_due_date DATE)
+    WHERE s.subscription_id = t.subscription_id
+      AND (s.status_event_at IS NULL OR s.status_event_at <= p_started_at)
+    RETURNING s.user_id;
+$$;
+
+-- ---------------------------------------------------------------------
+-- Ciclos: versão do calendário por empresa e dos ciclos globais (cycle_calendar.py)
+-- Incrementada por trigger a cada comando em cycles; os workers comparam a
+-- versão do calendário em cache a cada CYCLE_CALENDAR_VERSION_CHECK segundos
+-- e recarregam quando ela muda. Sem FK: a remoção em cascata de uma empresa
+-- também dispara o trigger.
+-- ---------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS cycle_calendar_versions (
+    company_id UUID PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION cycle_calendar_versions_bump() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO cycle_calendar_versions AS v (company_id)
+        SELECT DISTINCT company_id FROM old_rows WHERE company_id IS NOT NULL
+        ON CONFLICT (company_id) DO UPDATE SET version = v.version + 1, updated_at = now();
+    ELSE
+        INSERT INTO cycle_calendar_versions AS v (company_id)
+        SELECT DISTINCT company_id FROM new_rows WHERE company_id IS NOT NULL
+        ON CONFLICT (company_id) DO UPDATE SET version = v.version + 1, updated_at = now();
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS cycles_calendar_version_insert ON cycles;
+CREATE TRIGGER cycles_calendar_version_insert
+    AFTER INSERT ON cycles
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION cycle_calendar_versions_bump();
+
+DROP TRIGGER IF EXISTS cycles_calendar_version_update ON cycles;
+CREATE TRIGGER cycles_calendar_version_update
+    AFTER UPDATE ON cycles
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION cycle_calendar_versions_bump();
+
+DROP TRIGGER IF EXISTS cycles_calendar_version_delete ON cycles;
+CREATE TRIGGER cycles_calendar_version_delete
+    AFTER DELETE ON cycles
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION cycle_calendar_versions_bump();
+
+-- Ciclos globais: versão única da tabela (registro em memória de cycle_calendar.py)
+CREATE TABLE IF NOT EXISTS global_cycle_versions (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION global_cycle_versions_bump() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO global_cycle_versions AS v (id) VALUES (1)
+    ON CONFLICT (id) DO UPDATE SET version = v.version + 1, updated_at = now();
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS global_cycles_version_bump ON global_cycles;
+CREATE TRIGGER global_cycles_version_bump
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON global_cycles
+    FOR EACH STATEMENT EXECUTE FUNCTION global_cycle_versions_bump();
+
+-- ---------------------------------------------------------------------
+-- Dashboard: série semanal de evolução por empresa (EvolutionService)
+-- Construída por replay dos kr_checkins; watermark_at/watermark_ids marcam o
+-- último check-in processado (atualização incremental). O endpoint
+-- /api/dashboard/evolution lê apenas a coluna series; detail_series guarda
+-- as séries por objetivo e por KR.
+-- ---------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS dashboard_evolution_series (
+    company_id UUID PRIMARY KEY REFERENCES companies(id) ON DELETE CASCADE,
+    watermark_at TIMESTAMPTZ,
+    watermark_ids TEXT[] NOT NULL DEFAULT '{}',
+    state JSONB NOT NULL DEFAULT '{}',
+    series JSONB NOT NULL DEFAULT '{}',
+    detail_series JSONB NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- ---------------------------------------------------------------------
+-- Relatórios agendados (report_scheduler.py / ReportScheduler)
+-- next_run_at já inclui o deslocamento por agendamento (fora do pico);
+-- o agendador busca os vencidos pelo índice parcial. O lease usa
+-- scheduler_locks (nome "report_scheduler").
+-- ---------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS report_schedules (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    company_id UUID NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
+    created_by UUID REFERENCES users(id) ON DELETE SET NULL,
+    name TEXT NOT NULL,
+    report_type TEXT NOT NULL,
+    format TEXT NOT NULL,
+    filters JSONB NOT NULL DEFAULT '{}',
+    include_charts BOOLEAN NOT NULL DEFAULT false,
+    compress BOOLEAN NOT NULL DEFAULT false,
+    cron TEXT NOT NULL,
+    enabled BOOLEAN NOT NULL DEFAULT true,
+    next_run_at TIMESTAMPTZ,
+    last_run_at TIMESTAMPTZ,
+    last_status TEXT,
+    last_error TEXT,
+    last_file_path TEXT,
+    last_file_size BIGINT,
+    running_until TIMESTAMPTZ,  -- reivindicação da execução em andamento (agendador)
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+ALTER TABLE report_schedules ADD COLUMN IF NOT EXISTS running_until TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS report_schedules_due_idx ON report_schedules (next_run_at) WHERE enabled;
+CREATE INDEX IF NOT EXISTS report_schedules_company_idx ON report_schedules (company_id);
+
+CREATE TABLE IF NOT EXISTS report_schedule_runs (
+    run_id UUID PRIMARY KEY,
+    schedule_id UUID NOT NULL REFERENCES report_schedules(id) ON DELETE CASCADE,
+    company_id UUID NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL,
+    finished_at TIMESTAMPTZ,
+    duration_seconds DOUBLE PRECISION,
+    status TEXT NOT NULL,
+    full_refresh BOOLEAN,
+    objectives_total INT,
+    objectives_refetched INT,
+    objectives_removed INT,
+    pdf_parts_rendered INT,
+    pdf_parts_reused INT,
+    file_size BIGINT,
+    error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS report_schedule_runs_schedule_idx ON report_schedule_runs (schedule_id, started_at DESC);
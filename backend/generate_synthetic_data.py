@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Gerador de datasets sintéticos para testes de escala do OKR Backend
+Uso: python generate_synthetic_data.py [--profile small|medium|large] [--seed SEED]
+                                       [--format jsonl|sql|copy|supabase] [--output PATH]
+"""
+
+import argparse
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.synthetic_data import (  # noqa: E402
+    SCALE_PROFILES,
+    TABLE_ORDER,
+    SyntheticDataGenerator,
+    load_into_supabase,
+    write_copy,
+    write_jsonl,
+    write_sql,
+)
+
+
+def main():
+    """Função principal do gerador"""
+    parser = argparse.ArgumentParser(description='Gerador de dados sintéticos (testes de escala)')
+    parser.add_argument('--profile', choices=sorted(SCALE_PROFILES), default='small', help='Tamanho da empresa (padrão: small)')
+    parser.add_argument('--companies', type=int, default=1, help='Número de empresas (padrão: 1)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed para geração determinística (padrão: 42)')
+    parser.add_argument('--reference-date', type=date.fromisoformat, default=None, help='Data de referência YYYY-MM-DD (padrão: hoje)')
+    parser.add_argument('--format', choices=['jsonl', 'sql', 'copy', 'supabase'], default='jsonl', help='Formato de saída (padrão: jsonl)')
+    parser.add_argument('--output', type=Path, default=Path('synthetic_data'), help='Diretório (jsonl) ou arquivo (sql/copy) de saída')
+    parser.add_argument('--tables', nargs='*', choices=TABLE_ORDER, default=None, help='Gerar apenas estas tabelas')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Linhas por INSERT em lote (padrão: 1000)')
+    parser.add_argument('--dry-run', action='store_true', help='Apenas mostrar a quantidade estimada de linhas')
+
+    args = parser.parse_args()
+
+    generator = SyntheticDataGenerator(
+        SCALE_PROFILES[args.profile],
+        seed=args.seed,
+        companies=args.companies,
+        reference_date=args.reference_date,
+    )
+
+    print("🧪 Gerador de dados sintéticos")
+    print(f"   📦 Perfil: {args.profile} ({args.companies} empresa(s))")
+    print(f"   🎲 Seed: {args.seed}")
+    print(f"   📅 Data de referência: {generator.reference_date.isoformat()}")
+    for table, rows in generator.estimated_rows().items():
+        if not args.tables or table in args.tables:
+            print(f"   - {table}: ~{rows:,} linhas")
+
+    if args.dry_run:
+        return
+
+    started = time.perf_counter()
+    if args.format == 'jsonl':
+        counts = write_jsonl(generator, args.output, args.tables)
+    elif args.format == 'sql':
+        counts = write_sql(generator, args.output, args.tables, batch_size=args.batch_size)
+    elif args.format == 'copy':
+        counts = write_copy(generator, args.output, args.tables)
+    else:
+        from app.core.config import SUPABASE_URL  # noqa: F401 - carrega o .env
+        from app.utils.supabase import get_admin_client
+        counts = load_into_supabase(generator, get_admin_client(), args.tables, batch_size=args.batch_size)
+
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"✅ {total:,} linhas geradas em {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} linhas/s)")
+    if args.format != 'supabase':
+        print(f"   📂 Saída: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Job de manutenção do banco do OKR Backend (processo separado da API)
+Uso: python maintenance.py [--once] [--interval SEGUNDOS] [--chunk-size N]
+                           [--rows-per-second N] [--dry-run]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.core.config import SUPABASE_URL  # noqa: E402,F401 - carrega o .env
+from app.core.settings import settings  # noqa: E402
+from app.services.maintenance_service import MaintenanceService  # noqa: E402
+from app.utils.supabase import get_admin_client  # noqa: E402
+
+
+def main():
+    """Função principal do job de manutenção"""
+    parser = argparse.ArgumentParser(description='Limpeza em lotes de sessões expiradas e notificações antigas')
+    parser.add_argument('--once', action='store_true', help='Executar uma única rodada e sair')
+    parser.add_argument('--interval', type=int, default=settings.MAINTENANCE_INTERVAL, help='Segundos entre rodadas')
+    parser.add_argument('--chunk-size', type=int, default=settings.MAINTENANCE_CHUNK_SIZE, help='Linhas por DELETE')
+    parser.add_argument('--rows-per-second', type=int, default=settings.MAINTENANCE_ROWS_PER_SECOND, help='Orçamento de linhas apagadas por segundo (0 = sem limite)')
+    parser.add_argument('--sessions-days', type=int, default=settings.SESSION_RETENTION_DAYS, help='Manter sessões expiradas por N dias')
+    parser.add_argument('--notifications-days', type=int, default=settings.NOTIFICATION_RETENTION_DAYS, help='Manter notificações por N dias')
+    parser.add_argument('--dry-run', action='store_true', help='Apenas contar as linhas que seriam removidas')
+
+    args = parser.parse_args()
+
+    service = MaintenanceService(get_admin_client(), chunk_size=args.chunk_size, rows_per_second=args.rows_per_second)
+
+    print("🧹 Job de manutenção iniciando...")
+    print(f"   📦 Lote: {args.chunk_size} linhas | Orçamento: {args.rows_per_second or 'sem limite'} linhas/s")
+    print(f"   🔑 Sessões: {args.sessions_days} dias | 🔔 Notificações: {args.notifications_days} dias")
+    print(f"   🔄 Intervalo: {'rodada única' if args.once else f'{args.interval}s'}")
+
+    try:
+        while True:
+            for task, days in ((service.cleanup_sessions, args.sessions_days),
+                               (service.compact_notifications, args.notifications_days)):
+                try:
+                    metrics = task(days, dry_run=args.dry_run, progress=True)
+                    action = "seriam removidas" if args.dry_run else "removidas"
+                    print(f"📊 {metrics.task}: {metrics.deleted} linhas {action} em {metrics.chunks} lotes, "
+                          f"{metrics.duration_seconds}s ({metrics.rows_per_second}/s)")
+                except Exception as e:
+                    print(f"❌ Erro na manutenção ({task.__name__}): {e}")
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\n🛑 Job de manutenção interrompido pelo usuário.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Agendador de relatórios do OKR Backend (processo separado da API)
+Uso: python report_scheduler.py [--once] [--interval SEGUNDOS] [--workers N]
+
+O diretório REPORT_SCHEDULE_OUTPUT_DIR precisa ser compartilhado com a API
+(volume), que serve o último arquivo de cada agendamento.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.core.config import SUPABASE_URL  # noqa: E402,F401 - carrega o .env
+from app.core.settings import settings  # noqa: E402
+from app.services.report_scheduler import ReportScheduler  # noqa: E402
+from app.utils.supabase import get_admin_client  # noqa: E402
+
+
+def main():
+    """Função principal do agendador"""
+    parser = argparse.ArgumentParser(description='Agendador de relatórios (geração fora do pico, incremental)')
+    parser.add_argument('--once', action='store_true', help='Executar uma única rodada e sair')
+    parser.add_argument('--interval', type=int, default=settings.REPORT_SCHEDULER_INTERVAL, help='Segundos entre rodadas')
+    parser.add_argument('--workers', type=int, default=settings.REPORT_SCHEDULER_MAX_WORKERS, help='Relatórios gerados em paralelo')
+    parser.add_argument('--timeout', type=int, default=settings.REPORT_SCHEDULER_TIMEOUT, help='Timeout por relatório (segundos)')
+
+    args = parser.parse_args()
+
+    scheduler = ReportScheduler(get_admin_client(), max_workers=args.workers, timeout=args.timeout)
+
+    print("🗓️  Agendador de relatórios iniciando...")
+    print(f"   👥 Workers: {args.workers}")
+    print(f"   ⏱️  Timeout por relatório: {args.timeout}s")
+    print(f"   📁 Saída: {settings.REPORT_SCHEDULE_OUTPUT_DIR}")
+    print(f"   🔄 Intervalo: {'rodada única' if args.once else f'{args.interval}s'}")
+
+    try:
+        if args.once:
+            result = asyncio.run(scheduler.run_once())
+            scheduler.release_lock()
+            sys.exit(0 if result is None or not result[1] else 1)
+        asyncio.run(scheduler.run_forever(args.interval))
+    except KeyboardInterrupt:
+        print("\n🛑 Agendador de relatórios interrompido pelo usuário.")
+        scheduler.release_lock()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Resiliência do cliente Asaas (app/utils/asaas.py) contra um Asaas local
+
+Usa o servidor falso do benchmark (benchmark.py asaas), com latência e falhas
+controladas: read timeout, repetição só em métodos idempotentes, circuit
+breaker (abre após falhas, half-open após o backoff) e bulkhead.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.core.settings import settings
+from app.utils import asaas
+from app.utils.circuit_breaker import CircuitBreaker
+from benchmark import _start_asaas_stub
+
+BACKOFF = 0.2
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Cliente com estado novo (pool, bulkhead e breaker) e parâmetros curtos para o teste"""
+    monkeypatch.setattr(settings, "ASAAS_READ_TIMEOUT", 0.2)
+    monkeypatch.setattr(settings, "ASAAS_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "ASAAS_RETRY_BASE_DELAY", 0.0)
+    monkeypatch.setattr(settings, "ASAAS_MAX_CONCURRENCY", 10)
+    monkeypatch.setattr(settings, "ASAAS_BULKHEAD_TIMEOUT", 0.05)
+    monkeypatch.setattr(asaas, "ASAAS_API_KEY", "chave-teste")
+    monkeypatch.setattr(asaas, "_http_client", None)
+    monkeypatch.setattr(asaas, "_bulkhead", None)
+    monkeypatch.setattr(asaas, "asaas_breaker", CircuitBreaker(
+        "asaas-teste", failure_threshold=2, base_backoff=BACKOFF, max_backoff=BACKOFF
+    ))
+    return asaas
+
+
+def run_against_stub(client, scenario):
+    """Roda scenario(stub) com o cliente apontado para o Asaas local"""
+    async def main():
+        runner, stub, stub_url = await _start_asaas_stub()
+        client.ASAAS_API_URL = stub_url
+        try:
+            return await scenario(stub)
+        finally:
+            await client.close_http_client()
+            await runner.cleanup()
+
+    original_url = client.ASAAS_API_URL
+    try:
+        return asyncio.run(main())
+    finally:
+        client.ASAAS_API_URL = original_url
+
+
+def test_read_timeout_surfaces_as_unavailable(client, monkeypatch):
+    monkeypatch.setattr(settings, "ASAAS_MAX_RETRIES", 0)
+
+    async def scenario(stub):
+        stub.latency = 1.0
+        with pytest.raises(client.AsaasUnavailableError) as error:
+            await client.asaas_request("GET", "subscriptions/sub_1")
+        return error.value
+
+    error = run_against_stub(client, scenario)
+    assert error.status_code == 503
+
+
+def test_retries_only_idempotent_methods(client):
+    async def scenario(stub):
+        stub.fail = True
+        with pytest.raises(client.AsaasError):
+            await client.asaas_request("GET", "subscriptions/sub_1")
+        get_calls = stub.calls
+
+        client.asaas_breaker.record_success()
+        stub.calls = 0
+        with pytest.raises(client.AsaasError):
+            await client.asaas_request("POST", "subscriptions", data={"customer": "cus_1"})
+        post_calls = stub.calls
+
+        # Read timeout também não é repetido em POST (o Asaas pode ter processado)
+        client.asaas_breaker.record_success()
+        stub.fail, stub.latency, stub.calls = False, 1.0, 0
+        with pytest.raises(client.AsaasUnavailableError):
+            await client.asaas_request("POST", "subscriptions", data={"customer": "cus_1"})
+        await asyncio.sleep(1.0)  # deixa a chamada pendente terminar no servidor
+        return get_calls, post_calls, stub.calls
+
+    get_calls, post_calls, post_timeout_calls = run_against_stub(client, scenario)
+    assert get_calls == 1 + settings.ASAAS_MAX_RETRIES
+    assert post_calls == 1
+    assert post_timeout_calls == 1
+
+
+def test_breaker_opens_after_failures_and_half_opens_after_backoff(client, monkeypatch):
+    monkeypatch.setattr(settings, "ASAAS_MAX_RETRIES", 0)
+    breaker = client.asaas_breaker
+
+    async def scenario(stub):
+        stub.fail = True
+        for _ in range(breaker.failure_threshold):
+            with pytest.raises(client.AsaasError):
+                await client.asaas_request("GET", "subscriptions/sub_1")
+        assert breaker.state == CircuitBreaker.OPEN
+
+        # Aberto: falha na hora, sem chamar o Asaas
+        calls = stub.calls
+        started = time.perf_counter()
+        with pytest.raises(client.AsaasUnavailableError):
+            await client.asaas_request("GET", "subscriptions/sub_1")
+        assert stub.calls == calls
+        assert time.perf_counter() - started < 0.05
+
+        # Após o backoff, uma chamada de teste (half-open) fecha o circuito se tiver sucesso
+        await asyncio.sleep(BACKOFF * 1.3)
+        stub.fail = False
+        response = await client.asaas_request("GET", "subscriptions/sub_1")
+        assert response.status_code == 200
+        assert stub.calls == calls + 1
+        return breaker.state
+
+    assert run_against_stub(client, scenario) == CircuitBreaker.CLOSED
+
+
+def test_failed_half_open_trial_reopens_circuit(client, monkeypatch):
+    monkeypatch.setattr(settings, "ASAAS_MAX_RETRIES", 0)
+    breaker = client.asaas_breaker
+
+    async def scenario(stub):
+        stub.fail = True
+        for _ in range(breaker.failure_threshold):
+            with pytest.raises(client.AsaasError):
+                await client.asaas_request("GET", "subscriptions/sub_1")
+        await asyncio.sleep(BACKOFF * 1.3)
+        assert breaker.allow_request()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        # Só a chamada de teste passa enquanto o half-open está em andamento
+        assert not breaker.allow_request()
+        breaker.record_failure("falha na chamada de teste")
+        return breaker.state
+
+    assert run_against_stub(client, scenario) == CircuitBreaker.OPEN
+
+
+def test_bulkhead_rejects_requests_beyond_max_concurrency(client, monkeypatch):
+    monkeypatch.setattr(settings, "ASAAS_MAX_CONCURRENCY", 2)
+
+    async def scenario(stub):
+        stub.latency = 0.15  # abaixo do read timeout, acima do ASAAS_BULKHEAD_TIMEOUT
+        results = await asyncio.gather(*(
+            client.asaas_request("GET", f"subscriptions/sub_{i}") for i in range(5)
+        ), return_exceptions=True)
+        return results, stub.peak
+
+    results, peak = run_against_stub(client, scenario)
+    rejected = [r for r in results if isinstance(r, asaas.AsaasUnavailableError)]
+    assert len(rejected) == 3
+    assert all("simultâneas" in r.detail for r in rejected)
+    assert sum(1 for r in results if not isinstance(r, Exception)) == 2
+    assert peak <= 2
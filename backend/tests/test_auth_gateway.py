@@ -0,0 +1,64 @@
+"""
+Logins concorrentes pelo gateway stateless (app/utils/auth_gateway.py)
+
+Sobe o GoTrue local do benchmark (benchmark.py login) e dispara N logins ao
+mesmo tempo pelo cliente HTTP compartilhado: cada chamada tem que receber os
+tokens do próprio usuário, nunca os de um login concorrente.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.utils import auth_gateway
+from benchmark import _start_gotrue_stub
+
+LOGINS = 200
+
+
+@asynccontextmanager
+async def gotrue_stub(latency: float):
+    """Aponta o gateway para o GoTrue local enquanto o bloco roda"""
+    runner, stub_url = await _start_gotrue_stub(latency)
+    original_url = auth_gateway.SUPABASE_URL
+    auth_gateway.SUPABASE_URL = stub_url
+    try:
+        yield
+    finally:
+        await auth_gateway.close_http_client()
+        auth_gateway.SUPABASE_URL = original_url
+        await runner.cleanup()
+
+
+def test_concurrent_logins_get_their_own_tokens():
+    emails = [f"user{i}@example.com" for i in range(LOGINS)]
+
+    async def scenario():
+        async with gotrue_stub(latency=0.01):
+            sessions = await asyncio.gather(*(
+                auth_gateway.sign_in_with_password(email, "senha-correta") for email in emails
+            ))
+            await asyncio.gather(*(auth_gateway.sign_out(session.access_token) for session in sessions))
+            return sessions
+
+    sessions = asyncio.run(scenario())
+
+    assert len(sessions) == LOGINS
+    for email, session in zip(emails, sessions):
+        assert session.access_token == f"access:{email}"
+        assert session.refresh_token == f"refresh:{email}"
+        assert session.user["email"] == email
+    assert len({session.access_token for session in sessions}) == LOGINS
+
+
+def test_wrong_password_does_not_affect_concurrent_logins():
+    async def scenario():
+        async with gotrue_stub(latency=0.0):
+            return await asyncio.gather(
+                auth_gateway.sign_in_with_password("ok@example.com", "senha-correta"),
+                auth_gateway.sign_in_with_password("bad@example.com", "senha-errada"),
+                return_exceptions=True,
+            )
+
+    ok, bad = asyncio.run(scenario())
+    assert ok.access_token == "access:ok@example.com"
+    assert isinstance(bad, auth_gateway.AuthGatewayError)
+    assert bad.status_code == 400
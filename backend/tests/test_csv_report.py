@@ -0,0 +1,118 @@
+"""
+Exportação CSV em uma passada (app/services/csv_report.py)
+
+Relatório COMPLETE pequeno e determinístico: seções, cabeçalhos, formatação
+por coluna (datas, percentuais, vazios) e a saída gzip (.csv.gz).
+"""
+import csv
+import gzip
+from datetime import datetime
+
+import pytest
+
+from app.models.reports import (
+    DashboardReportData, KeyResultReportData, ObjectiveReportData, ReportContent,
+    ReportFormat, ReportMetadata, ReportStatus, ReportType
+)
+from app.services.csv_report import DELIMITER, write_csv_report
+from app.services.report_rows import KEY_RESULT_COLUMNS, OBJECTIVE_COLUMNS
+
+NOW = datetime(2026, 1, 15, 10, 30)
+CREATED = datetime(2025, 10, 1, 8, 5)
+
+
+@pytest.fixture
+def content() -> ReportContent:
+    objectives = [
+        ObjectiveReportData(
+            id="obj-1", title="Aumentar a receita", description="Receita recorrente", owner_name="Ana",
+            cycle_name="Q1 2026", status="ON_TRACK", progress=62.5, created_at=CREATED, updated_at=NOW,
+            key_results_count=2, key_results_completed=1
+        ),
+        ObjectiveReportData(
+            id="obj-2", title="Reduzir churn; mensal", description=None, owner_name=None,
+            cycle_name="Sem ciclo", status="PLANNED", progress=0.0, created_at=CREATED, updated_at=NOW,
+            key_results_count=0, key_results_completed=0
+        ),
+    ]
+    key_results = [
+        KeyResultReportData(
+            id="kr-1", title="MRR de 100 mil", description=None, objective_id="obj-1",
+            objective_title="Aumentar a receita", owner_name="Ana", target_value=100000.0,
+            current_value=75000.0, start_value=50000.0, unit="CURRENCY", status="ON_TRACK",
+            progress=50.0, confidence_level=0.8, created_at=CREATED, updated_at=NOW,
+            checkins_count=3, last_checkin_date=datetime(2026, 1, 10, 9, 0)
+        ),
+        KeyResultReportData(
+            id="kr-2", title="Novos clientes", description="Canal inbound", objective_id="obj-1",
+            objective_title="Aumentar a receita", owner_name=None, target_value=20.0,
+            current_value=20.0, start_value=0.0, unit="NUMBER", status="COMPLETED",
+            progress=100.0, confidence_level=None, created_at=CREATED, updated_at=NOW,
+            checkins_count=0, last_checkin_date=None
+        ),
+    ]
+    return ReportContent(
+        metadata=ReportMetadata(
+            id="test", name="Teste", report_type=ReportType.COMPLETE, format=ReportFormat.CSV,
+            status=ReportStatus.PROCESSING, generation_started_at=NOW
+        ),
+        dashboard_data=DashboardReportData(
+            company_name="Empresa Teste", report_period="Q1 2026", generation_date=NOW,
+            total_objectives=2, total_key_results=2, active_users=3, active_cycle_name="Q1 2026",
+            overall_progress=31.25, objectives_by_status={"ON_TRACK": 1, "PLANNED": 1},
+            completion_rate=50.0, on_track_rate=50.0
+        ),
+        objectives=objectives,
+        key_results=key_results,
+    )
+
+
+def read_rows(path, compressed: bool = False):
+    opener = gzip.open if compressed else open
+    with opener(path, 'rt', newline='', encoding='utf-8') as f:
+        return list(csv.reader(f, delimiter=DELIMITER))
+
+
+def section(rows, title: str):
+    """Linhas da tabela que vem logo após o título da seção (até a próxima linha vazia)"""
+    start = rows.index([title]) + 1
+    end = next((i for i in range(start, len(rows)) if not rows[i]), len(rows))
+    return rows[start:end]
+
+
+def test_complete_report_sections(content, tmp_path):
+    rows = read_rows(write_csv_report(content, str(tmp_path / "report.csv")))
+
+    assert rows[0] == ['RELATÓRIO COMPLETO OKR']
+    assert ['Empresa:', 'Empresa Teste'] in rows
+    assert ['Gerado em:', '15/01/2026 10:30'] in rows
+    assert ['Progresso Geral:', '31.2%'] in rows
+
+    objectives = section(rows, 'OBJETIVOS')
+    assert objectives[0] == [column.header for column in OBJECTIVE_COLUMNS]
+    assert objectives[1:] == [
+        ['obj-1', 'Aumentar a receita', 'Receita recorrente', 'Ana', 'Q1 2026', 'ON_TRACK', '62.5%',
+         '2', '1', '01/10/2025 08:05', '15/01/2026 10:30'],
+        ['obj-2', 'Reduzir churn; mensal', '', 'Não atribuído', 'Sem ciclo', 'PLANNED', '0.0%',
+         '0', '0', '01/10/2025 08:05', '15/01/2026 10:30'],
+    ]
+
+    key_results = section(rows, 'KEY RESULTS')
+    assert key_results[0] == [column.header for column in KEY_RESULT_COLUMNS]
+    assert key_results[1:] == [
+        ['kr-1', 'MRR de 100 mil', '', 'Aumentar a receita', 'Ana', '50000.00', '75000.00', '100000.00',
+         'CURRENCY', 'ON_TRACK', '50.0%', '80%', '3', '10/01/2026', '01/10/2025 08:05'],
+        ['kr-2', 'Novos clientes', 'Canal inbound', 'Aumentar a receita', 'Não atribuído', '0.00', '20.00',
+         '20.00', 'NUMBER', 'COMPLETED', '100.0%', '', '0', 'Nunca', '01/10/2025 08:05'],
+    ]
+
+
+def test_gzip_output_round_trips(content, tmp_path):
+    plain = tmp_path / "report.csv"
+    compressed = tmp_path / "report.csv.gz"
+    write_csv_report(content, str(plain))
+    write_csv_report(content, str(compressed), compress=True)
+
+    with gzip.open(compressed, 'rb') as f:
+        assert f.read() == plain.read_bytes()
+    assert read_rows(compressed, compressed=True) == read_rows(plain)